@@ -0,0 +1,84 @@
+"""Benchmark dictionary extraction from raw YMMP projects of growing size.
+
+Synthetic projects mixing telops, tachie, images, group packs and effect
+items are absorbed with :func:`auto_movie_edit.absorb.extract_dictionaries`,
+writing the templates serially and on the thread pool, and then absorbed
+again into the same store.  The time per item should stay flat as the
+project grows, both write modes must produce the same template files and
+the re-run must not write any file.
+
+Usage::
+
+    python benchmarks/bench_absorb.py [--items 1000 2500 5000] [--keyframes 40]
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from auto_movie_edit.absorb import TEMPLATE_WRITE_WORKERS, extract_dictionaries
+
+_PREFIX = "YukkuriMovieMaker.Project.Items."
+
+
+def _keyframes(index: int, count: int) -> dict:
+    return {"Values": [{"Value": float(index % 13 + step)} for step in range(count)], "Span": 0.0}
+
+
+def _item(index: int, keyframes: int) -> dict:
+    kind = index % 5
+    common = {"Frame": index * 12, "Length": 60, "Layer": index % 10, "X": _keyframes(index, keyframes)}
+    if kind == 0:
+        return {"$type": f"{_PREFIX}TextItem, YukkuriMovieMaker", "Text": f"テロップ{index}", **common}
+    if kind == 1:
+        eye = f"C:/tachie/【目】emotion{index % 40}.png"
+        return {"$type": f"{_PREFIX}TachieItem, YukkuriMovieMaker", "CharacterName": "ゆっくり霊夢", "TachieItemParameter": {"Eye": eye}, **common}
+    if kind == 2:
+        return {"$type": f"{_PREFIX}ImageItem, YukkuriMovieMaker", "FilePath": f"C:/img/{index}.png", **common}
+    if kind == 3:
+        children = [{"Frame": index * 12 + offset * 6, "Length": 6, "Zoom": _keyframes(offset, keyframes)} for offset in range(4)]
+        return {"$type": f"{_PREFIX}GroupItem, YukkuriMovieMaker", "Items": children, **common}
+    return {"$type": f"{_PREFIX}ZoomEffectItem, YukkuriMovieMaker", "Zoom": _keyframes(index, keyframes), **common}
+
+
+def _run(project: dict, directory: Path, workers: int) -> tuple[float, int, int, dict]:
+    started = time.perf_counter()
+    result = extract_dictionaries(project, directory, workers=workers)
+    elapsed = time.perf_counter() - started
+    aliases = sum(len(rows) for rows in (result.telop_patterns, result.assets, result.packs))
+    files = {path.relative_to(directory).as_posix(): path.read_bytes() for path in directory.rglob("*.json")}
+    return elapsed, aliases, result.stored_templates, files
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, nargs="+", default=[1000, 2500, 5000])
+    parser.add_argument("--keyframes", type=int, default=40)
+    args = parser.parse_args()
+
+    identical = True
+    print(f"{'items':>8}{'serial':>12}{'pool':>12}{'re-run':>12}{'per item':>12}  aliases -> files, re-written")
+    for count in args.items:
+        project = {"FilePath": "C:/projects/bench.ymmp", "Timelines": [{"Items": [_item(index, args.keyframes) for index in range(count)]}]}
+        with tempfile.TemporaryDirectory() as serial_dir, tempfile.TemporaryDirectory() as pool_dir:
+            serial, aliases, _, serial_files = _run(project, Path(serial_dir), 1)
+            pool, _, _, pool_files = _run(project, Path(pool_dir), TEMPLATE_WRITE_WORKERS)
+            rerun, _, rewritten, _ = _run(project, Path(pool_dir), TEMPLATE_WRITE_WORKERS)
+        identical &= serial_files == pool_files and rewritten == 0
+        print(
+            f"{count:>8}{serial * 1000:>10.1f}ms{pool * 1000:>10.1f}ms{rerun * 1000:>10.1f}ms"
+            f"{pool / count * 1e6:>10.1f}us  {aliases} -> {len(pool_files)}, {rewritten}"
+        )
+
+    if not identical:
+        print("thread pool writes differ from the serial run or the re-run wrote files", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
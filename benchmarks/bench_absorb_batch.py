@@ -0,0 +1,96 @@
+"""Benchmark absorbing many YMMP projects into one workbook.
+
+Synthetic projects (two timelines each, overlapping telops and effects) are
+absorbed once per file, as repeated ``absorb`` runs did, and then in one
+``absorb`` run with one process and with a process pool.  The merged
+workbook dictionaries of all three runs are compared.
+
+Usage::
+
+    python benchmarks/bench_absorb_batch.py [--files 24] [--items 1500] [--workers 0]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from typer.testing import CliRunner
+
+from auto_movie_edit.cli import app
+from auto_movie_edit.workbook import load_workbook_data
+
+_PREFIX = "YukkuriMovieMaker.Project.Items."
+
+
+def _project(index: int, items: int) -> dict:
+    def _item(position: int) -> dict:
+        common = {"Frame": position * 10, "Length": 40, "Layer": position % 8, "X": {"Values": [{"Value": float(position % 9)}]}}
+        if position % 3 == 0:
+            return {"$type": f"{_PREFIX}TextItem, YukkuriMovieMaker", "Text": f"テロップ{(index * 37 + position) % 900}", **common}
+        if position % 3 == 1:
+            return {"$type": f"{_PREFIX}ZoomEffectItem, YukkuriMovieMaker", "Zoom": position % 25, **common}
+        return {"$type": f"{_PREFIX}ImageItem, YukkuriMovieMaker", "FilePath": f"C:/img/{position % 120}.png", **common}
+
+    half = items // 2
+    return {
+        "FilePath": f"C:/projects/channel_{index:03d}.ymmp",
+        "Timelines": [{"Items": [_item(p) for p in range(half)]}, {"Items": [_item(p) for p in range(half, items)]}],
+    }
+
+
+def _absorb(arguments: list[str]) -> float:
+    started = time.perf_counter()
+    completed = CliRunner().invoke(app, ["absorb", *arguments])
+    if completed.exit_code != 0:
+        raise RuntimeError(completed.output)
+    return time.perf_counter() - started
+
+
+def _dictionaries(xlsx: Path) -> tuple:
+    data = load_workbook_data(xlsx)
+    return tuple(sorted(rows) for rows in (data.telop_patterns, data.assets, data.packs, data.fx_presets))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=24)
+    parser.add_argument("--items", type=int, default=1500)
+    parser.add_argument("--workers", type=int, default=0, help="0: CPU count")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        root = Path(directory)
+        projects = root / "projects"
+        projects.mkdir()
+        for index in range(args.files):
+            payload = json.dumps(_project(index, args.items), ensure_ascii=False)
+            (projects / f"channel_{index:03d}.ymmp").write_text(payload, encoding="utf-8")
+
+        timings = {}
+        per_file = root / "per_file" / "sheet.xlsx"
+        timings["per file"] = sum(
+            _absorb(["--ymmp", str(source), "--xlsx", str(per_file), "--workers", "1"])
+            for source in sorted(projects.glob("*.ymmp"))
+        )
+        serial = root / "serial" / "sheet.xlsx"
+        timings["serial"] = _absorb(["--ymmp", str(projects), "--xlsx", str(serial), "--workers", "1"])
+        pooled = root / "pool" / "sheet.xlsx"
+        timings["pool"] = _absorb(["--ymmp", str(projects), "--xlsx", str(pooled), "--workers", str(args.workers)])
+        for name, elapsed in timings.items():
+            print(f"{name:>10}{elapsed * 1000:>12.1f} ms")
+
+        identical = _dictionaries(per_file) == _dictionaries(serial) == _dictionaries(pooled)
+
+    if not identical:
+        print("merged dictionaries differ between the runs", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
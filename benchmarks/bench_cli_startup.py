@@ -0,0 +1,119 @@
+"""Startup-time benchmark for the ``auto-movie-edit`` command line.
+
+Each scenario runs the CLI in a fresh interpreter several times and reports
+the median wall-clock time against a target.  The script exits with status 1
+when a target is missed or when a lightweight command pulls in a heavy module.
+
+Usage::
+
+    python benchmarks/bench_cli_startup.py [--runs 7]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+SAMPLE_YMMP = REPO_ROOT / "tests" / "data" / "hiragana_shrink_sample.ymmp"
+
+# Median wall-clock targets in milliseconds, including interpreter start-up.
+TARGETS_MS = {
+    "--help": 500.0,
+    "filter hira-shrink": 300.0,
+    "history-feedback": 300.0,
+}
+
+# Modules that only the workbook/build/suggestion commands may import.
+HEAVY_MODULES = (
+    "openpyxl",
+    "fugashi",
+    "auto_movie_edit.workbook",
+    "auto_movie_edit.ymmp",
+    "auto_movie_edit.proposals",
+    "auto_movie_edit.language",
+)
+
+_RUNNER = (
+    "import sys\n"
+    "from auto_movie_edit.cli import app\n"
+    "sys.argv[0] = 'auto-movie-edit'\n"
+    "try:\n"
+    "    app()\n"
+    "finally:\n"
+    "    heavy = sorted(name for name in {heavy!r} if name in sys.modules)\n"
+    "    sys.stderr.write('HEAVY=' + ','.join(heavy) + '\\n')\n"
+)
+
+
+def _run(args: list[str]) -> tuple[float, list[str]]:
+    code = _RUNNER.format(heavy=HEAVY_MODULES)
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-c", code, *args],
+        capture_output=True,
+        text=True,
+        cwd=REPO_ROOT,
+    )
+    elapsed = (time.perf_counter() - started) * 1000.0
+    heavy: list[str] = []
+    for line in completed.stderr.splitlines():
+        if line.startswith("HEAVY="):
+            heavy = [name for name in line[len("HEAVY="):].split(",") if name]
+    return elapsed, heavy
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=7, help="Runs per scenario")
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp(prefix="ame-startup-"))
+    try:
+        history_file = workdir / "history" / "20240101" / "history.jsonl"
+        history_file.parent.mkdir(parents=True)
+        history_file.write_text(
+            json.dumps({"row_index": 1, "warnings": ["Pack not found: demo"]}) + "\n",
+            encoding="utf-8",
+        )
+        scenarios = {
+            "--help": ["--help"],
+            "filter hira-shrink": [
+                "filter",
+                "hira-shrink",
+                "--input-path",
+                str(SAMPLE_YMMP),
+                "--out",
+                str(workdir / "out.ymmp"),
+            ],
+            "history-feedback": ["history-feedback", "--history-path", str(workdir / "history")],
+        }
+
+        failed = False
+        print(f"{'scenario':<22}{'median ms':>12}{'target ms':>12}  heavy imports")
+        for name, argv in scenarios.items():
+            _run(argv)  # warm the bytecode cache
+            timings: list[float] = []
+            heavy: list[str] = []
+            for _ in range(max(1, args.runs)):
+                elapsed, heavy = _run(argv)
+                timings.append(elapsed)
+            median = statistics.median(timings)
+            target = TARGETS_MS[name]
+            status = "ok" if median <= target and not heavy else "FAIL"
+            failed |= status != "ok"
+            print(f"{name:<22}{median:>12.1f}{target:>12.1f}  {', '.join(heavy) or '-'}  [{status}]")
+        return 1 if failed else 0
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,83 @@
+"""Benchmark batch filtering of YMMP files with one process, a pool and a re-run.
+
+Copies of a synthetic project are filtered with ``hira-shrink`` by a single
+process and by a process pool, then the batch is run again so that every
+file is skipped through ``filter_manifest.json``.  The outputs of the serial
+and the parallel run are compared.
+
+Usage::
+
+    python benchmarks/bench_filter_batch.py [--files 64] [--items 3000] [--workers 0]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from auto_movie_edit.filter_batch import collect_filter_inputs, filter_files
+
+
+def _project(items: int) -> dict:
+    return {
+        "Timelines": [
+            {
+                "Items": [
+                    {
+                        "$type": "YukkuriMovieMaker.Project.Items.TextItem, YukkuriMovieMaker",
+                        "Text": f"これはテロップ{index}です",
+                        "Zoom": {"Values": [{"Value": 100.0 + index % 7}, {"Value": 120.0}]},
+                        "FontSize": 60.0,
+                    }
+                    for index in range(items)
+                ]
+            }
+        ]
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=64)
+    parser.add_argument("--items", type=int, default=3000)
+    parser.add_argument("--workers", type=int, default=0, help="0: CPU count")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        source_dir = Path(directory) / "projects"
+        source_dir.mkdir()
+        payload = json.dumps(_project(args.items), ensure_ascii=False)
+        for index in range(args.files):
+            (source_dir / f"project_{index:03d}.ymmp").write_text(payload, encoding="utf-8")
+        base, sources = collect_filter_inputs(source_dir)
+
+        timings = {}
+        for name, out, workers in (
+            ("serial", "serial", 1),
+            ("pool", "pool", args.workers or None),
+            ("re-run", "pool", args.workers or None),
+        ):
+            started = time.perf_counter()
+            results = filter_files(sources, base, Path(directory) / out, ["hira-shrink:0.8"], workers=workers)
+            timings[name] = time.perf_counter() - started
+            statuses = {result.status for result in results}
+            print(f"{name:>8}{timings[name] * 1000:>12.1f} ms  {', '.join(sorted(statuses))}")
+
+        identical = all(
+            (Path(directory) / "serial" / source.name).read_bytes()
+            == (Path(directory) / "pool" / source.name).read_bytes()
+            for source in sources
+        )
+
+    if not identical:
+        print("parallel output differs from the serial run", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,82 @@
+"""Benchmark the streaming filter against loading the whole project.
+
+A synthetic project with long keyframe arrays is filtered with
+``hira-shrink`` by :func:`apply_filters` (``json.loads`` of the whole file)
+and by :func:`stream_filter`.  Time and peak Python memory (tracemalloc) are
+reported, and the two outputs must be identical.
+
+Usage::
+
+    python benchmarks/bench_filter_stream.py [--items 2000] [--keyframes 400]
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from auto_movie_edit.filter_stream import stream_filter
+from auto_movie_edit.filters import apply_filters
+from auto_movie_edit.utils import dump_json
+
+
+def _project(items: int, keyframes: int) -> dict:
+    timeline = []
+    for index in range(items):
+        values = [{"Value": 100.0 + (frame % 13) * 0.5} for frame in range(keyframes)]
+        if index % 4 == 0:
+            timeline.append(
+                {
+                    "$type": "YukkuriMovieMaker.Project.Items.TextItem, YukkuriMovieMaker",
+                    "Text": f"ひらがなのおおいてろっぷ{index}",
+                    "Zoom": {"Values": values[:8]},
+                }
+            )
+        else:
+            timeline.append(
+                {"$type": "YukkuriMovieMaker.Project.Items.ImageItem, YukkuriMovieMaker", "X": {"Values": values}}
+            )
+    return {"Timelines": [{"Items": timeline}], "Characters": []}
+
+
+def _measure(function, *args, **kwargs) -> tuple[float, int]:
+    tracemalloc.start()
+    started = time.perf_counter()
+    function(*args, **kwargs)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=2000)
+    parser.add_argument("--keyframes", type=int, default=400)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        source = Path(directory) / "large.ymmp"
+        dump_json(source, _project(args.items, args.keyframes))
+        print(f"project size: {source.stat().st_size:,} bytes")
+
+        loaded = Path(directory) / "loaded.ymmp"
+        streamed = Path(directory) / "streamed.ymmp"
+        print(f"{'mode':>10}{'ms':>12}{'peak bytes':>16}")
+        for name, function, target in (("json", apply_filters, loaded), ("stream", stream_filter, streamed)):
+            elapsed, peak = _measure(function, source, target, ["hira-shrink:0.8"])
+            print(f"{name:>10}{elapsed * 1000:>12.1f}{peak:>16,}")
+        identical = loaded.read_bytes() == streamed.read_bytes()
+
+    if not identical:
+        print("streamed output differs from the in-memory filter", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
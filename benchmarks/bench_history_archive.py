@@ -0,0 +1,71 @@
+"""Benchmark size and scan time of compressed history days against plain JSONL.
+
+A synthetic period of history is written as dated ``history.jsonl`` files,
+summarised, then rotated into compressed archives and summarised again.  The
+on-disk size and the time of a full warning summary are reported for both
+layouts, and the two summaries are compared.
+
+Usage::
+
+    python benchmarks/bench_history_archive.py [--days 90] [--entries 200] [--codec auto]
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+from auto_movie_edit.history import iter_history_entries, summarize_warnings
+from auto_movie_edit.history_archive import CODECS, resolve_codec, rotate_history
+
+from bench_history_store import _write_history
+
+
+def _size(root: Path) -> int:
+    return sum(path.stat().st_size for path in root.rglob("history.jsonl*"))
+
+
+def _summarize(root: Path) -> tuple[list, float]:
+    started = time.perf_counter()
+    summaries = summarize_warnings(iter_history_entries(root), sample_limit=6)
+    return summaries, time.perf_counter() - started
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--entries", type=int, default=200)
+    parser.add_argument("--codec", choices=CODECS, default="auto")
+    args = parser.parse_args()
+
+    codec = resolve_codec(args.codec)
+    with tempfile.TemporaryDirectory() as directory:
+        root = Path(directory) / "history"
+        _write_history(root, args.days, args.entries)
+        plain_size = _size(root)
+        expected, plain_scan = _summarize(root)
+
+        # _write_history starts on 2024-01-01; rotate as if the next day had come.
+        started = time.perf_counter()
+        rotate_history(root, codec=codec, today=date(2024, 1, 1) + timedelta(days=args.days))
+        rotation = time.perf_counter() - started
+        archive_size = _size(root)
+        actual, archive_scan = _summarize(root)
+
+        print(f"rotated {args.days} days with {codec} in {rotation:.2f}s")
+        print(f"{'layout':>10}{'bytes':>14}{'scan ms':>12}")
+        for name, size, scan in (("jsonl", plain_size, plain_scan), (codec, archive_size, archive_scan)):
+            print(f"{name:>10}{size:>14,}{scan * 1000:>12.1f}")
+
+    if actual != expected:
+        print("summaries of compressed history differ from history.jsonl", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
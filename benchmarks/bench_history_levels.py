@@ -0,0 +1,75 @@
+"""Benchmark build time and history size for each history level.
+
+A synthetic timeline is built once per level with a streaming
+``HistoryWriter`` and the time spent building and writing history, the size
+of ``history.jsonl`` and the proposal learning input are reported.  Every
+level except ``off`` must give the model the same learning input.
+
+Usage::
+
+    python benchmarks/bench_history_levels.py [--rows 2000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from auto_movie_edit.history import iter_history_entries
+from auto_movie_edit.models import TimelineRow, WorkbookData
+from auto_movie_edit.proposal_log import _delta_record
+from auto_movie_edit.utils import Timecode
+from auto_movie_edit.ymmp import HISTORY_LEVELS, HistoryWriter, build_project, write_outputs
+
+
+def _rows(count: int) -> list[TimelineRow]:
+    return [
+        TimelineRow(
+            index=index + 2,
+            start=Timecode(0, index // 60, index % 60, 0),
+            end=Timecode(0, index // 60, index % 60, 500),
+            subtitle=f"字幕 {index % 97}",
+            telop=f"telop_{index % 7}",
+            packs=[f"pack_{index % 11}"],
+            notes={"approval": "TRUE" if index % 3 else "FALSE", "memo": "確認済み"},
+        )
+        for index in range(count)
+    ]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=2000)
+    args = parser.parse_args()
+
+    rows = _rows(args.rows)
+    learning: dict[str, list] = {}
+    print(f"{'level':>10}{'build ms':>12}{'bytes':>14}")
+    with tempfile.TemporaryDirectory() as directory:
+        for level in HISTORY_LEVELS:
+            out = Path(directory) / level
+            writer = HistoryWriter(out, learn=False) if level != "off" else None
+            started = time.perf_counter()
+            project, warnings, _ = build_project(
+                WorkbookData(timeline=rows), history_level=level, history_writer=writer
+            )
+            write_outputs(project, warnings, out, history_writer=writer)
+            elapsed = time.perf_counter() - started
+            size = sum(path.stat().st_size for path in out.rglob("history.jsonl"))
+            print(f"{level:>10}{elapsed * 1000:>12.1f}{size:>14,}")
+            if level != "off":
+                entries = iter_history_entries(out / "history")
+                # Builds of different levels may start in different seconds.
+                learning[level] = [{**_delta_record(entry), "timestamp": None} for entry in entries]
+
+    if any(records != learning["full"] for records in learning.values()):
+        print("history levels give the proposal model different input", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+"""Benchmark warning summaries from the SQLite history store against history.jsonl.
+
+A synthetic year of history is written as dated ``history.jsonl`` files and
+imported into ``history.sqlite``.  Summaries over the whole year and over one
+month are computed both by streaming the JSONL files and from the store's
+per-day aggregates, and the two results are compared.
+
+Usage::
+
+    python benchmarks/bench_history_store.py [--days 365] [--entries 200]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+from auto_movie_edit.history import HistoryFilter, iter_history_entries, summarize_warnings
+from auto_movie_edit.history_sqlite import SqliteHistoryStore
+
+_WARNINGS = (
+    "Pack not found: {0}",
+    "Telop pattern not found: {0}",
+    "FX preset not found: {0}",
+    "Layer band overflow for '{0}'",
+)
+
+
+def _write_history(root: Path, days: int, entries: int) -> None:
+    rng = random.Random(days * entries)
+    first = date(2024, 1, 1)
+    for offset in range(days):
+        directory = root / (first + timedelta(days=offset)).strftime("%Y%m%d")
+        directory.mkdir(parents=True)
+        lines = []
+        for index in range(entries):
+            warnings = [
+                rng.choice(_WARNINGS).format(f"id{rng.randrange(50)}")
+                for _ in range(rng.choice((0, 0, 0, 1, 2)))
+            ]
+            entry = {
+                "timestamp": f"{first + timedelta(days=offset)}T00:00:{index % 60:02d}Z",
+                "row_index": index % 40 + 2,
+                "telop": f"telop_{rng.randrange(30)}",
+                "packs": [f"pack_{rng.randrange(30)}"],
+                "fx": [{"fx_id": f"fx_{rng.randrange(30)}"}],
+                "warnings": warnings,
+            }
+            lines.append(json.dumps(entry, ensure_ascii=False))
+        (directory / "history.jsonl").write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+def _normalised(summaries: list) -> list:
+    return sorted(summaries, key=lambda item: item["label"])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--entries", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        root = Path(directory) / "history"
+        _write_history(root, args.days, args.entries)
+        started = time.perf_counter()
+        with SqliteHistoryStore.open(root / "history.sqlite") as store:
+            store.import_jsonl(root)
+        print(f"imported {args.days * args.entries:,} entries in {time.perf_counter() - started:.1f}s")
+
+        ok = True
+        print(f"{'range':>10}{'jsonl ms':>12}{'sqlite ms':>12}")
+        for name, history_filter in (
+            ("year", HistoryFilter()),
+            ("month", HistoryFilter(since=date(2024, 3, 1), until=date(2024, 3, 31))),
+            ("pack", HistoryFilter(packs=frozenset({"pack_3"}))),
+        ):
+            started = time.perf_counter()
+            expected = summarize_warnings(
+                iter_history_entries(root, history_filter=history_filter), sample_limit=6
+            )
+            streamed = time.perf_counter() - started
+
+            started = time.perf_counter()
+            with SqliteHistoryStore.open(root / "history.sqlite") as store:
+                actual = store.summarize_warnings(history_filter, sample_limit=6)
+            queried = time.perf_counter() - started
+            print(f"{name:>10}{streamed * 1000:>12.1f}{queried * 1000:>12.1f}")
+            ok &= _normalised(actual) == _normalised(expected)
+
+    if not ok:
+        print("SQLite summaries differ from history.jsonl", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,74 @@
+"""Benchmark opening a memory-mapped snapshot against loading the JSON model.
+
+A synthetic model is saved as JSON and exported with ``write_snapshot``.  The
+time to open each file and answer the same ``suggest`` queries is reported,
+and every answer from the snapshot is checked against the JSON model.
+
+Usage::
+
+    python benchmarks/bench_proposal_snapshot.py [--catalogue 3000] [--queries 200]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from auto_movie_edit.proposal_snapshot import ProposalSnapshot, write_snapshot
+from auto_movie_edit.proposals import ProposalModel
+
+from bench_proposal_suggest import _model
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--catalogue", type=int, default=3000)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(args.catalogue)
+    subtitles = [
+        " ".join(f"語{rng.randrange(220)}" for _ in range(3)) for _ in range(args.queries)
+    ]
+    with tempfile.TemporaryDirectory() as directory:
+        json_path = Path(directory) / "proposal_model.json"
+        snapshot_path = json_path.with_suffix(".snapshot")
+        source = _model(args.catalogue, seed=args.catalogue)
+        source.save(json_path)
+        write_snapshot(source, snapshot_path)
+
+        started = time.perf_counter()
+        model = ProposalModel._load_snapshot(json_path)
+        json_load = time.perf_counter() - started
+        started = time.perf_counter()
+        expected = [model.suggest(subtitle).items for subtitle in subtitles]
+        json_query = time.perf_counter() - started
+
+        started = time.perf_counter()
+        snapshot = ProposalSnapshot.open(snapshot_path)
+        snapshot_load = time.perf_counter() - started
+        started = time.perf_counter()
+        actual = [snapshot.suggest(subtitle).items for subtitle in subtitles]
+        snapshot_query = time.perf_counter() - started
+        snapshot.close()
+
+        print(f"{'format':>10}{'bytes':>14}{'open ms':>12}{'query ms':>12}")
+        for name, path, load, query in (
+            ("json", json_path, json_load, json_query),
+            ("snapshot", snapshot_path, snapshot_load, snapshot_query),
+        ):
+            size = path.stat().st_size
+            print(f"{name:>10}{size:>14,}{load * 1000:>12.2f}{query * 1000:>12.2f}")
+
+    if actual != expected:
+        print("snapshot suggestions differ from the JSON model", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,89 @@
+"""Benchmark top-k proposal ranking against the full aggregate-and-sort path.
+
+Synthetic proposal models with growing catalogues are queried with random
+subtitles.  Every query checks that ``_top_candidates`` returns exactly the
+candidates of ``_rank_candidates(_collect_candidates(...))``.
+
+Usage::
+
+    python benchmarks/bench_proposal_suggest.py [--queries 200] [--sizes 100 1000 3000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+
+from auto_movie_edit.proposals import ProposalModel
+
+_CATEGORIES = ("telop", "pack", "asset", "fx")
+
+
+def _model(catalogue: int, seed: int) -> ProposalModel:
+    rng = random.Random(seed)
+    words = [f"語{index}" for index in range(200)]
+    history = []
+    for index in range(catalogue * 3):
+        history.append(
+            {
+                "timestamp": f"2024-01-01T00:00:{index % 60:02d}Z",
+                "row_index": index % 50 + 2,
+                "start": f"00:00:{index % 60:02d}.000",
+                "subtitle": " ".join(rng.choices(words, k=3)),
+                "telop": f"telop_{rng.randrange(catalogue)}",
+                "packs": [f"pack_{rng.randrange(catalogue)}"],
+                "objects": [{"identifier": f"asset_{rng.randrange(catalogue)}"}],
+                "fx": [{"fx_id": f"fx_{rng.randrange(catalogue)}"}],
+                "notes": {"approval": rng.choice([True, False, None])},
+            }
+        )
+    model = ProposalModel()
+    model.update_from_history(history)
+    return model
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 3000])
+    args = parser.parse_args()
+
+    print(f"{'catalogue':>10}{'full ms':>12}{'top-k ms':>12}{'speed-up':>10}")
+    for size in args.sizes:
+        model = _model(size, seed=size)
+        rng = random.Random(size)
+        queries = [
+            ([f"語{rng.randrange(220)}" for _ in range(3)] + ["__global__"], index % 50 + 2)
+            for index in range(args.queries)
+        ]
+        for tokens, _ in queries:
+            for category in _CATEGORIES:
+                model._token_summary(tokens[-1], category)
+
+        started = time.perf_counter()
+        expected = [
+            model._rank_candidates(model._collect_candidates(tokens, category), 3, row, None)
+            for tokens, row in queries
+            for category in _CATEGORIES
+        ]
+        full_ms = (time.perf_counter() - started) * 1000.0
+
+        started = time.perf_counter()
+        actual = [
+            model._top_candidates(tokens, category, 3, row, None)
+            for tokens, row in queries
+            for category in _CATEGORIES
+        ]
+        topk_ms = (time.perf_counter() - started) * 1000.0
+
+        if actual != expected:
+            print(f"{size:>10}  rankings disagree")
+            return 1
+        print(f"{size:>10}{full_ms:>12.2f}{topk_ms:>12.2f}{full_ms / topk_ms:>9.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
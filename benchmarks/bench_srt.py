@@ -0,0 +1,101 @@
+"""Benchmark streaming SRT parsing of multi-hour transcripts.
+
+Synthetic transcripts of growing length (one subtitle every two seconds) are
+written in UTF-8 and CP932, then walked with :func:`auto_movie_edit.srt.iter_srt`
+and read whole as the old reader did (``read_text``, ``splitlines`` and a
+list of entries).  Peak memory is traced for both; the streaming peak should
+stay flat as the transcript grows, and both readers must return the same
+entries.
+
+Usage::
+
+    python benchmarks/bench_srt.py [--hours 1 4 12]
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Iterable
+
+from auto_movie_edit.srt import SrtEntry, _chunks, _parse_block, detect_srt_encoding, iter_srt
+
+
+def _timecode(milliseconds: int) -> str:
+    seconds, millis = divmod(milliseconds, 1000)
+    return f"{seconds // 3600:02d}:{seconds // 60 % 60:02d}:{seconds % 60:02d},{millis:03d}"
+
+
+def _transcript(hours: float) -> str:
+    blocks = []
+    for index in range(int(hours * 1800)):
+        start, end = _timecode(index * 2000), _timecode(index * 2000 + 1800)
+        blocks.append(f"{index + 1}\n{start} --> {end}\n今日は{index % 97}番目の話題を紹介します\nゆっくりしていってね\n")
+    return "\n".join(blocks)
+
+
+def _digest(entries: Iterable[SrtEntry]) -> tuple[int, str]:
+    digest = hashlib.md5()
+    count = 0
+    for entry in entries:
+        digest.update(f"{entry.index}|{entry.start}|{entry.end}|{entry.text}\0".encode("utf-8"))
+        count += 1
+    return count, digest.hexdigest()
+
+
+def _stream(path: Path) -> tuple[int, str]:
+    return _digest(iter_srt(path))
+
+
+def _whole(path: Path) -> tuple[int, str]:
+    # The reader before iter_srt: the whole file decoded, split and parsed into a list.
+    lines = path.read_text(encoding=detect_srt_encoding(path)).splitlines()
+    entries = [_parse_block(chunk) for _, chunk in _chunks(lines)]
+    return _digest(entries)
+
+
+def _measure(run: Callable[[Path], tuple[int, str]], path: Path) -> tuple[float, int, tuple[int, str]]:
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = run(path)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak, result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--hours", type=float, nargs="+", default=[1, 4, 12])
+    args = parser.parse_args()
+
+    identical = True
+    print(f"{'hours':>6}{'encoding':>10}{'entries':>9}{'stream':>12}{'peak':>10}{'whole':>12}{'peak':>10}")
+    with tempfile.TemporaryDirectory() as directory:
+        for hours in args.hours:
+            text = _transcript(hours)
+            for encoding in ("utf-8", "cp932"):
+                path = Path(directory) / f"transcript_{encoding}.srt"
+                path.write_bytes(text.encode(encoding))
+
+                stream_time, stream_peak, streamed = _measure(_stream, path)
+                whole_time, whole_peak, whole = _measure(_whole, path)
+                identical &= streamed == whole
+                print(
+                    f"{hours:>6g}{encoding:>10}{streamed[0]:>9}{stream_time * 1000:>10.1f}ms"
+                    f"{stream_peak / 2**20:>8.1f}MB{whole_time * 1000:>10.1f}ms{whole_peak / 2**20:>8.1f}MB"
+                )
+
+    if not identical:
+        print("the streaming reader returned different entries", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
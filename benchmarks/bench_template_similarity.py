@@ -0,0 +1,83 @@
+"""Benchmark near-duplicate clustering of pack templates.
+
+Families of synthetic group packs are generated; each family member nudges a
+position and adds floating point noise to one keyframe.  The templates are
+clustered with MinHash banding, every member is rebuilt from its
+representative and overrides, and the rebuilt templates are compared with
+the originals.
+
+Usage::
+
+    python benchmarks/bench_template_similarity.py [--families 200] [--variants 8] [--keyframes 30]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+
+from auto_movie_edit.template_similarity import apply_overrides, cluster_templates, template_overrides
+
+
+def _template(family: int, keyframes: int, rng: random.Random | None) -> dict:
+    children = [
+        {
+            "$type": "YukkuriMovieMaker.Project.Items.ShapeItem, YukkuriMovieMaker",
+            "FrameOffset": child * 6,
+            "LengthFrames": 24,
+            "X": {"Values": [{"Value": float(family * 10 + step)} for step in range(keyframes)]},
+            "Y": 0.0,
+            "Zoom": {"Values": [{"Value": 100.0 + family % 17}]},
+        }
+        for child in range(3)
+    ]
+    if rng:
+        # A small nudge and floating point noise on one keyframe.
+        children[0]["Y"] = float(rng.choice((1, 2, -3)))
+        children[rng.randrange(3)]["X"]["Values"][rng.randrange(keyframes)]["Value"] += rng.uniform(-1e-6, 1e-6)
+    return {"$type": "YukkuriMovieMaker.Project.Items.GroupItem, YukkuriMovieMaker", "Items": children, "Family": family}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--families", type=int, default=200)
+    parser.add_argument("--variants", type=int, default=8)
+    parser.add_argument("--keyframes", type=int, default=30)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    templates = []
+    for family in range(args.families):
+        templates.append((f"pack_{family}_0", _template(family, args.keyframes, None)))
+        for variant in range(1, args.variants):
+            templates.append((f"pack_{family}_{variant}", _template(family, args.keyframes, rng)))
+    by_id = dict(templates)
+
+    started = time.perf_counter()
+    clusters = cluster_templates(templates)
+    elapsed = time.perf_counter() - started
+
+    rebuilt = True
+    override_leaves = 0
+    for cluster in clusters:
+        representative = by_id[cluster.representative]
+        for member in cluster.members:
+            overrides = template_overrides(representative, by_id[member])
+            override_leaves += len(overrides)
+            rebuilt &= apply_overrides(representative, overrides) == by_id[member]
+    folded = sum(len(cluster.members) for cluster in clusters)
+    print(f"templates        {len(templates)}")
+    print(f"clustering       {elapsed * 1000:.1f} ms")
+    print(f"rows -> files    {len(templates)} -> {len(templates) - folded}")
+    print(f"override leaves  {override_leaves / max(folded, 1):.1f} per folded pack")
+
+    if not rebuilt:
+        print("a folded template was not rebuilt exactly", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
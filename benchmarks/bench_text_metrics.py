@@ -0,0 +1,80 @@
+"""Benchmark measuring telops with glyph metrics, cold and warm.
+
+Thousands of synthetic telops are measured with a fresh
+:class:`TextMeasurer` (fonts opened with fontTools), then again with a new
+measurer that only reads the on-disk cache, as a later process would.  Both
+runs must agree.  Without ``--font`` a synthetic CJK font is generated.
+
+Usage::
+
+    python benchmarks/bench_text_metrics.py [--telops 5000] [--font-dir DIR --font NAME]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from auto_movie_edit.text_metrics import TextMeasurer
+
+_CHARS = [chr(code) for code in range(0x3041, 0x3097)] + [chr(code) for code in range(0x4E00, 0x4E00 + 400)]
+
+
+def _synthetic_font(directory: Path) -> str:
+    from fontTools.fontBuilder import FontBuilder
+    from fontTools.pens.ttGlyphPen import TTGlyphPen
+
+    names = {char: f"uni{ord(char):04X}" for char in _CHARS}
+    builder = FontBuilder(1000, isTTF=True)
+    builder.setupGlyphOrder([".notdef", *names.values()])
+    builder.setupCharacterMap({ord(char): name for char, name in names.items()})
+    empty = TTGlyphPen(None).glyph()
+    builder.setupGlyf({name: empty for name in [".notdef", *names.values()]})
+    rng = random.Random(0)
+    metrics = {".notdef": (500, 0), **{name: (rng.randrange(700, 1000), 0) for name in names.values()}}
+    builder.setupHorizontalMetrics(metrics)
+    builder.setupHorizontalHeader(ascent=880, descent=-120)
+    builder.setupNameTable({"familyName": "Bench Gothic", "styleName": "Regular"})
+    builder.setupOS2()
+    builder.setupPost()
+    builder.save(str(directory / "bench.ttf"))
+    return "Bench Gothic"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--telops", type=int, default=5000)
+    parser.add_argument("--font-dir", type=Path)
+    parser.add_argument("--font")
+    args = parser.parse_args()
+
+    rng = random.Random(args.telops)
+    telops = ["".join(rng.choice(_CHARS) for _ in range(rng.randrange(6, 24))) for _ in range(args.telops)]
+    with tempfile.TemporaryDirectory() as directory:
+        font_dir, font = args.font_dir, args.font
+        if not font:
+            font_dir, font = Path(directory), _synthetic_font(Path(directory))
+        cache = Path(directory) / "font_metrics.json"
+
+        results = []
+        for name in ("cold", "warm"):
+            started = time.perf_counter()
+            measurer = TextMeasurer(font_dirs=[font_dir], cache_path=cache)
+            widths = [measurer.text_width(text, font, 96) for text in telops]
+            measurer.save()
+            elapsed = time.perf_counter() - started
+            results.append(widths)
+            print(f"{name:>6}{elapsed * 1000:>12.1f} ms  ({args.telops} telops, font found: {measurer.has_font(font)})")
+
+    if results[0] != results[1]:
+        print("cached widths differ from the font metrics", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,79 @@
+"""Benchmark the NumPy tone engine against ``LanguageAnalyzer._compute_tone``.
+
+Synthetic scripts of 100, 1,000 and 10,000 subtitle lines are scored by both
+engines.  Tokenisation is warmed beforehand so the timings compare scoring
+only, and every run checks that both engines return identical tones.
+
+Usage::
+
+    python benchmarks/bench_tone_scoring.py [--repeat 5] [--sizes 100 1000 10000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import sys
+import time
+from functools import lru_cache
+
+from auto_movie_edit.language import _QUESTION_SUFFIXES, _TONE_KEYWORD_SCORES, LanguageAnalyzer
+from auto_movie_edit.tone_vector import VectorToneScorer, numpy_available
+
+_FILLERS = ["これは", "今日", "ゲーム", "とても", "私", "の", "は", "が", "動画", "ちょっと", "みんな"]
+_ENDINGS = ["", "！", "!", "？", "?", "…", "...", "〜", "ー", "！？", "?!", "。"]
+
+
+def _script(size: int, seed: int) -> list[str]:
+    rng = random.Random(seed)
+    keywords = [keyword for table in _TONE_KEYWORD_SCORES.values() for keyword in table]
+    parts = keywords + list(_QUESTION_SUFFIXES) + _FILLERS * 3
+    lines = []
+    for _ in range(size):
+        body = "".join(rng.choice(parts) for _ in range(rng.randint(2, 7)))
+        lines.append(LanguageAnalyzer._normalize_text(body + rng.choice(_ENDINGS)))
+    return lines
+
+
+def _time(callable_, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        callable_()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000.0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    args = parser.parse_args()
+
+    if not numpy_available():
+        print("NumPy is not installed; nothing to compare.")
+        return 1
+
+    print(f"{'lines':>8}{'python ms':>12}{'numpy ms':>12}{'speed-up':>10}")
+    for size in args.sizes:
+        lines = _script(size, seed=size)
+        analyzer = LanguageAnalyzer()
+        analyzer._tokenize_cached = lru_cache(maxsize=None)(analyzer._tokenize_internal)
+        for line in lines:
+            analyzer._tokenize_cached(line)
+        scorer = VectorToneScorer(analyzer)
+
+        expected = [analyzer._compute_tone(line) for line in lines]
+        if scorer.score(lines) != expected:
+            print(f"{size:>8}  engines disagree")
+            return 1
+
+        python_ms = _time(lambda: [analyzer._compute_tone(line) for line in lines], args.repeat)
+        numpy_ms = _time(lambda: scorer.score(lines), args.repeat)
+        print(f"{size:>8}{python_ms:>12.2f}{numpy_ms:>12.2f}{python_ms / numpy_ms:>9.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,421 @@
+"""Extraction of workbook dictionaries from YMMP projects.
+
+``absorb`` turns the timeline items of a raw YMM4 project into telop
+patterns, assets, packs and FX presets.  :func:`extract_dictionaries`
+classifies every item in a single pass: each item is stripped of its runtime
+fields and hashed at most once per template form.  Templates go to the
+content-addressed :class:`~auto_movie_edit.template_store.TemplateStore`,
+which writes the new ones in one batch on a thread pool at the end.  Rows
+whose ``Text`` or ``Layer`` differ from the stored template keep their own
+values as JSON pointer overrides (``{"/Text": ...}``).
+
+:func:`absorb_projects` reads and classifies many projects (raw YMM4 files
+and tool-generated dictionaries) in worker processes and merges their
+candidates, so a whole channel is absorbed with one store flush and one
+workbook save.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from hashlib import md5
+from pathlib import Path
+from itertools import chain
+from typing import Any, Dict, Iterable, Iterator, List
+
+from .template_similarity import (
+    DEFAULT_THRESHOLD,
+    apply_overrides,
+    cluster_templates,
+    is_pointer_overrides,
+    template_overrides,
+)
+from .template_store import OVERRIDE_KEYS, TemplateStore
+
+__all__ = [
+    "ProjectDictionaries",
+    "TEMPLATE_WRITE_WORKERS",
+    "absorb_projects",
+    "extract_dictionaries",
+]
+
+
+TEMPLATE_WRITE_WORKERS = 8
+
+_FX_KEYWORDS = ("effect", "zoom", "shake", "blur", "speedline", "vignette", "filter")
+_PACK_KEYWORDS = ("Group", "Repeat", "Tachie")
+_DICTIONARY_FIELDS = ("telop_patterns", "assets", "packs", "fx_presets")
+
+
+@dataclass(slots=True)
+class ProjectDictionaries:
+    """Dictionary rows extracted from one or more projects, keyed by their IDs."""
+
+    telop_patterns: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    assets: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    packs: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    fx_presets: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    # Template files newly written to the store.
+    stored_templates: int = 0
+    # Packs folded into a similar pack as overrides.
+    near_duplicates: int = 0
+
+
+def extract_dictionaries(
+    project: Dict[str, Any],
+    base_dir: Path | str,
+    *,
+    workers: int = TEMPLATE_WRITE_WORKERS,
+) -> ProjectDictionaries:
+    """Extract the dictionaries of a raw YMM4 ``project`` into the template store of ``base_dir``.
+
+    Items of every timeline are read.  Packs mirrored from FX items are
+    appended after the packs found on the timelines.  Templates already in
+    the store are not written again.
+    """
+
+    store = TemplateStore(base_dir)
+    result = _classify_items(project, store)
+    _settle_alias_overrides(result, store)
+    result.stored_templates = store.flush(workers)
+    return result
+
+
+def absorb_projects(
+    sources: Iterable[Path | str],
+    base_dir: Path | str,
+    *,
+    workers: int | None = None,
+    write_workers: int = TEMPLATE_WRITE_WORKERS,
+    similarity: float | None = DEFAULT_THRESHOLD,
+) -> ProjectDictionaries:
+    """Extract and merge the dictionaries of several project files.
+
+    ``workers`` processes (default: the CPU count; ``1`` runs in this
+    process) read the files.  An ID keeps the row of the first source that
+    defines it, and templates are deduplicated by their store digest before
+    the single batch write.  Packs at least ``similarity`` similar to an
+    earlier pack (see :mod:`auto_movie_edit.template_similarity`) reuse its
+    template with JSON pointer overrides; ``None`` or ``0`` disables this.
+    Unreadable files raise :class:`ValueError` before anything is written.
+    """
+
+    sources = [str(source) for source in sources]
+    base_dir = Path(base_dir)
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(sources) <= 1:
+        extracted = [_extract_file(source, str(base_dir)) for source in sources]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(sources))) as executor:
+            extracted = list(executor.map(_extract_file, sources, [str(base_dir)] * len(sources)))
+
+    store = TemplateStore(base_dir)
+    merged = ProjectDictionaries()
+    for dictionaries, templates in extracted:
+        store.extend(templates)
+        for name in _DICTIONARY_FIELDS:
+            rows = getattr(merged, name)
+            for key, payload in getattr(dictionaries, name).items():
+                rows.setdefault(key, payload)
+    _settle_alias_overrides(merged, store)
+    if similarity:
+        merged.near_duplicates = _fold_near_duplicate_packs(merged, store, similarity)
+    merged.stored_templates = store.flush(write_workers)
+    return merged
+
+
+# ----------------------------------------------------------------------
+# Internal helpers
+# ----------------------------------------------------------------------
+def _extract_file(source: str, base_dir: str) -> tuple[ProjectDictionaries, Dict[str, Any]]:
+    """Classify one file; return its rows and the templates it queued."""
+
+    try:
+        project = json.loads(Path(source).read_text(encoding="utf-8-sig"))
+    except (OSError, UnicodeDecodeError, json.JSONDecodeError) as exc:
+        raise ValueError(f"Error reading YMMP file {source}: {exc}") from None
+    if not isinstance(project, dict):
+        raise ValueError(f"Error reading YMMP file {source}: not a JSON object")
+    store = TemplateStore(base_dir)
+    if any(key in project for key in ("telop_patterns", "assets", "packs", "fx_presets")):
+        dictionaries = _tool_dictionaries(project, store)
+    else:
+        dictionaries = _classify_items(project, store)
+    return dictionaries, store.drain()
+
+
+def _fold_near_duplicate_packs(result: ProjectDictionaries, store: TemplateStore, threshold: float) -> int:
+    """Point near-duplicate packs at their representative's template; return how many."""
+
+    templates: Dict[str, Any] = {}
+    for pack_id, row in result.packs.items():
+        source, overrides = row.get("source"), row.get("overrides")
+        if isinstance(source, str) and (not overrides or is_pointer_overrides(overrides)):
+            template = store.load(source)
+            if isinstance(template, (dict, list)):
+                templates[pack_id] = apply_overrides(template, overrides) if overrides else template
+
+    folded = 0
+    for cluster in cluster_templates(templates.items(), threshold=threshold):
+        source = result.packs[cluster.representative]["source"]
+        # Overrides address the stored file, not the representative's own aliases.
+        stored = store.load(source)
+        for member in cluster.members:
+            row = result.packs[member]
+            row["source"] = source
+            row["overrides"] = template_overrides(stored, templates[member])
+            row["notes"] = f"{row.get('notes') or ''} (near-duplicate of {cluster.representative})".lstrip()
+            folded += 1
+    if folded:
+        # Templates only the folded packs pointed to are no longer needed.
+        references = [
+            row.get(field_name)
+            for rows, field_name in ((result.telop_patterns, "source"), (result.assets, "path"), (result.packs, "source"))
+            for row in rows.values()
+        ]
+        store.retain(reference for reference in references if isinstance(reference, str))
+    return folded
+
+
+def _classify_items(project: Dict[str, Any], store: TemplateStore) -> ProjectDictionaries:
+    source_name = Path(project.get("FilePath") or "source.ymmp").name
+    result = ProjectDictionaries()
+    mirrored_packs: Dict[str, Dict[str, Any]] = {}
+
+    for item in _timeline_items(project):
+        if not isinstance(item, dict):
+            continue
+        item_type = str(item.get("$type", ""))
+        plain: Any = None
+
+        if "TextItem" in item_type:
+            text = item.get("Text", "no_text")
+            pattern_id = f"telop_{text}"
+            if pattern_id not in result.telop_patterns:
+                plain = _strip_runtime_fields(item, {"Layer"})
+                result.telop_patterns[pattern_id] = {
+                    "pattern_id": pattern_id,
+                    "source": store.add(plain),
+                    "overrides": _alias_overrides(plain),
+                    "description": f"「{text}」から自動抽出",
+                }
+
+        asset_id, kind = _asset_identity(item, item_type)
+        if asset_id and asset_id not in result.assets:
+            if plain is None:
+                plain = _strip_runtime_fields(item, {"Layer"})
+            result.assets[asset_id] = {
+                "asset_id": asset_id,
+                "kind": kind,
+                "path": store.add(plain),
+                "notes": f"from {source_name}",
+            }
+
+        is_pack = _looks_like_pack(item)
+        is_fx = _looks_like_fx(item_type)
+        if not (is_pack or is_fx):
+            continue
+        timed = _strip_runtime_fields(item, preserve_timing=True)
+        digest = _hash_template(timed)
+        pack_id = f"pack_{digest[:8]}"
+
+        if is_pack and pack_id not in result.packs:
+            result.packs[pack_id] = {
+                "pack_id": pack_id,
+                "source": store.add(timed),
+                "overrides": _alias_overrides(timed),
+                "notes": f"Extracted from {source_name}",
+            }
+
+        fx_id = f"fx_{digest[:8]}"
+        if is_fx and fx_id not in result.fx_presets:
+            if pack_id not in result.packs and pack_id not in mirrored_packs:
+                mirrored_packs[pack_id] = {
+                    "pack_id": pack_id,
+                    "source": store.add(timed),
+                    "overrides": _alias_overrides(timed),
+                    "notes": "Auto-generated from FX item",
+                }
+            result.fx_presets[fx_id] = {
+                "fx_id": fx_id,
+                "fx_type": _infer_fx_type(item_type),
+                "source": pack_id,
+            }
+
+    for pack_id, payload in mirrored_packs.items():
+        result.packs.setdefault(pack_id, payload)
+    return result
+
+
+def _tool_dictionaries(project: Dict[str, Any], store: TemplateStore) -> ProjectDictionaries:
+    """Read dictionaries written by the tool, moving inline templates into the store."""
+
+    def _rows(value: Any) -> Dict[str, Dict[str, Any]]:
+        return value if isinstance(value, dict) else {}
+
+    result = ProjectDictionaries(
+        telop_patterns=_rows(project.get("telop_patterns", {})),
+        assets=_rows(project.get("assets", {})),
+        packs=_rows(project.get("packs", {})),
+        fx_presets=_rows(project.get("fx_presets", project.get("fx", {}))),
+    )
+    for rows, data_field, path_field in (
+        (result.telop_patterns, "overrides", "source"),
+        (result.assets, "parameters", "path"),
+        (result.packs, "overrides", "source"),
+    ):
+        for payload in rows.values():
+            _persist_template_payload(store, payload, data_field, path_field)
+    return result
+
+
+def _alias_overrides(template: Any) -> Dict[str, Any] | None:
+    """Return the override keys of ``template`` as JSON pointer overrides."""
+
+    if not isinstance(template, dict):
+        return None
+    return {f"/{key}": template[key] for key in sorted(OVERRIDE_KEYS) if key in template} or None
+
+
+def _settle_alias_overrides(result: ProjectDictionaries, store: TemplateStore) -> None:
+    """Keep only the alias overrides that differ from the template stored under the row's digest.
+
+    Rows sharing a store file get it from the first template queued under
+    the digest (or the file already on disk), so the other aliases keep
+    their own ``Text``/``Layer`` as overrides.
+    """
+
+    for rows, path_field, data_field in (
+        (result.telop_patterns, "source", "overrides"),
+        (result.assets, "path", "parameters"),
+        (result.packs, "source", "overrides"),
+    ):
+        for row in rows.values():
+            overrides, reference = row.get(data_field), row.get(path_field)
+            if not is_pointer_overrides(overrides) or not isinstance(reference, str):
+                continue
+            stored = store.load(reference)
+            if not isinstance(stored, dict):
+                continue
+            missing = object()
+            row[data_field] = {
+                pointer: value
+                for pointer, value in overrides.items()
+                if pointer[1:] not in OVERRIDE_KEYS
+                or stored.get(pointer[1:], missing) != value
+                or type(stored[pointer[1:]]) is not type(value)
+            } or None
+
+
+def _timeline_items(project: Dict[str, Any]) -> Iterator[Any]:
+    timelines = project.get("Timelines")
+    if not isinstance(timelines, list):
+        return iter(())
+    return chain.from_iterable(
+        timeline.get("Items") or () for timeline in timelines if isinstance(timeline, dict)
+    )
+
+
+def _asset_identity(item: Dict[str, Any], item_type: str) -> tuple[str | None, str | None]:
+    if "TachieItem" in item_type:
+        char_name = item.get("CharacterName", "unknown")
+        # 表情をファイル名から推測
+        eye_path = Path(item.get("TachieItemParameter", {}).get("Eye", ""))
+        emotion = eye_path.stem.split("】")[-1] if "】" in eye_path.stem else "default"
+        return f"tachie_{char_name}_{emotion}", "tachie"
+    if "ImageItem" in item_type:
+        return f"image_{Path(item.get('FilePath', '')).stem}", "image"
+    return None, None
+
+
+def _persist_template_payload(
+    store: TemplateStore,
+    payload: Dict[str, Any],
+    data_field: str,
+    path_field: str,
+) -> None:
+    if not isinstance(payload, dict):
+        return
+
+    template_data = payload.get(data_field)
+    if not isinstance(template_data, (dict, list)) or not template_data or is_pointer_overrides(template_data):
+        return
+
+    payload[path_field] = store.add(template_data)
+    payload[data_field] = _alias_overrides(template_data)
+
+
+def _strip_runtime_fields(
+    data: Any,
+    extra_keys: Iterable[str] | None = None,
+    *,
+    preserve_timing: bool = False,
+) -> Any:
+    """Drop ``Frame``/``Length`` (and ``extra_keys``) from ``data`` recursively.
+
+    With ``preserve_timing`` they become ``FrameOffset`` relative to the
+    earliest frame and ``LengthFrames``.  The offsets are fixed up after the
+    single traversal, from the dictionaries that received a frame.
+    """
+
+    keys_to_remove = {"Frame", "Length"}
+    if extra_keys:
+        keys_to_remove = keys_to_remove.union(extra_keys)
+    framed: List[tuple[Dict[str, Any], int]] = []
+
+    def _strip(node: Any) -> Any:
+        if isinstance(node, dict):
+            cleaned: dict[str, Any] = {}
+            for key, value in node.items():
+                if key in keys_to_remove:
+                    if not preserve_timing:
+                        continue
+                    if key == "Frame" and isinstance(value, (int, float)):
+                        cleaned["FrameOffset"] = int(value)
+                        framed.append((cleaned, int(value)))
+                    elif key == "Length" and isinstance(value, (int, float)):
+                        cleaned["LengthFrames"] = int(value)
+                    continue
+                cleaned[key] = _strip(value)
+            return cleaned
+        if isinstance(node, list):
+            return [_strip(item) for item in node]
+        return node
+
+    stripped = _strip(data)
+    if framed:
+        base_frame = min(frame for _, frame in framed)
+        for cleaned, frame in framed:
+            cleaned["FrameOffset"] = frame - base_frame
+    return stripped
+
+
+def _hash_template(data: Any) -> str:
+    serialized = json.dumps(data, ensure_ascii=False, sort_keys=True)
+    return md5(serialized.encode("utf-8")).hexdigest()
+
+
+def _looks_like_pack(item: Dict[str, Any]) -> bool:
+    if not isinstance(item, dict):
+        return False
+    if isinstance(item.get("Items"), list) and item["Items"]:
+        return True
+    item_type = item.get("$type", "")
+    return isinstance(item_type, str) and any(keyword in item_type for keyword in _PACK_KEYWORDS)
+
+
+def _looks_like_fx(item_type: str) -> bool:
+    if not isinstance(item_type, str):
+        return False
+    lowered = item_type.lower()
+    return any(keyword in lowered for keyword in _FX_KEYWORDS)
+
+
+def _infer_fx_type(item_type: str) -> str:
+    if not item_type:
+        return "fx"
+    base = item_type.split(",")[0].split(".")[-1]
+    return base.replace("Item", "").lower() or "fx"
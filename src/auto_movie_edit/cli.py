@@ -1,26 +1,23 @@
-"""Command line interface for the auto_movie_edit toolkit."""
+"""Command line interface for the auto_movie_edit toolkit.
+
+Heavy dependencies (openpyxl, Fugashi, the builder and the proposal model) are
+imported inside the commands that need them so that ``--help`` and the
+lightweight commands such as ``filter`` and ``history-feedback`` start quickly.
+"""
 
 from __future__ import annotations
 
 import json
-from hashlib import md5
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional
+from typing import TYPE_CHECKING, Any, Iterable, List, Optional
 
 import typer
-from openpyxl import Workbook, load_workbook
-
-from .history import load_history_entries, summarize_warnings
-from .language import LanguageAnalyzer
-from .srt import SrtParseError, parse_srt
-from .proposals import ProposalModel
-from .workbook import (
-    DEFAULT_TEMPLATE,
-    create_workbook_template,
-    load_workbook_data,
-    save_workbook,
-)
-from .ymmp import apply_hiragana_shrink, build_project, write_outputs
+
+if TYPE_CHECKING:  # pragma: no cover - type checking only
+    from openpyxl import Workbook
+
+    from .filters import FilterPipeline
+    from .history import HistoryFilter
 
 app = typer.Typer(help="Auto Movie Edit CLI utilities")
 
@@ -31,6 +28,11 @@ AUTO_APPLY_THRESHOLDS = {
     "asset": 1.8,
 }
 
+# History entries handed to the proposal model per update in ``model learn``.
+LEARN_BATCH_SIZE = 5000
+# Subtitles analysed and written per batch in ``make-sheet``.
+MAKE_SHEET_BATCH_SIZE = 2000
+
 
 @app.command("make-sheet")
 def make_sheet(
@@ -40,105 +42,146 @@ def make_sheet(
         Path("work/ai/proposal_model.json"),
         dir_okay=False,
         exists=False,
-        help="AI提案モデルのパス。存在する場合は提案結果をTIMELINEに自動入力する。",
+        help="AI提案モデルのパス。存在する場合は提案結果をTIMELINEに自動入力する。同じ場所に .sqlite 版があればそちらを優先し、最新の .snapshot があればそれを読み込む。",
+    ),
+    tone_keywords: Optional[Path] = typer.Option(
+        None,
+        exists=True,
+        dir_okay=False,
+        help="トーン判定キーワードを追加するJSONファイル ({\"トーン\": {\"キーワード\": 重み}})",
     ),
 ) -> None:
     """Create a workbook template populated with SRT subtitles."""
-    try:
-        entries = parse_srt(srt)
-    except SrtParseError as exc:
-        typer.secho(str(exc), fg=typer.colors.RED)
-        raise typer.Exit(code=1) from exc
+    from collections import Counter
+    from itertools import islice
+
+    from .language import load_tone_keywords, shared_analyzer_pool
+    from .proposal_snapshot import open_fresh_snapshot
+    from .proposals import ProposalModel, ProposalSuggestions, resolve_model_path
+    from .srt import SrtParseError, iter_srt
+    from .workbook import DEFAULT_TEMPLATE, create_workbook_template, save_workbook
 
     workbook = create_workbook_template(DEFAULT_TEMPLATE)
     timeline_sheet = workbook["TIMELINE"]
 
-    language_analyzer = LanguageAnalyzer()
-    analysis = language_analyzer.analyze_subtitles([entry.text for entry in entries])
-    context_summary = ", ".join(analysis.global_keywords[:3])
-    context_written = False
+    language_analyzer = shared_analyzer_pool().get(
+        load_tone_keywords(tone_keywords) if tone_keywords else None
+    )
 
     proposal_model: ProposalModel | None = None
-    if knowledge_base and knowledge_base.exists():
-        proposal_model = ProposalModel.load(knowledge_base)
-
-    for row_index, (entry, insight) in enumerate(zip(entries, analysis.insights), start=2):
-        timeline_sheet.cell(row=row_index, column=1, value=entry.start.to_string())
-        timeline_sheet.cell(row=row_index, column=2, value=entry.end.to_string())
-        timeline_sheet.cell(row=row_index, column=3, value=entry.text)
-
-        memo_segments: list[str] = []
-        if proposal_model:
-            suggestions = proposal_model.suggest(
-                entry.text,
-                analyzer=language_analyzer,
-                row_index=row_index,
-                position_seconds=entry.start.to_seconds(),
-            )
-            if suggestions.has_data():
-                suggestion_segments: list[str] = []
-                confirmed_segments: list[str] = []
-
-                def _auto_apply(
-                    category: str,
-                    column: int,
-                    label: str,
-                    limit: int = 3,
-                ) -> List[str]:
-                    candidates = suggestions.top_candidates(category, limit=limit)
-                    if not candidates:
-                        return []
-                    names = [candidate.identifier for candidate in candidates]
-                    threshold = AUTO_APPLY_THRESHOLDS.get(category)
-                    best = candidates[0]
-                    if (
-                        threshold is not None
-                        and best.base_score >= threshold
-                        and column > 0
-                    ):
-                        timeline_sheet.cell(row=row_index, column=column, value=best.identifier)
-                        confirmed_segments.append(
-                            f"{label}:{best.identifier}(信頼度{best.base_score:.2f})"
-                        )
-                    return names
-
-                telop_names = _auto_apply("telop", 4, "テロップ")
-                if telop_names:
-                    suggestion_segments.append(f"テロップ:{', '.join(telop_names)}")
-
-                pack_names = _auto_apply("pack", 9, "パック")
-                if pack_names:
-                    suggestion_segments.append(f"パック:{', '.join(pack_names)}")
-
-                asset_names = _auto_apply("asset", 10, "オブジェクト")
-                if asset_names:
-                    suggestion_segments.append(f"オブジェクト:{', '.join(asset_names)}")
-
-                fx_candidates = suggestions.top_candidates("fx", limit=3)
-                if fx_candidates:
-                    suggestion_segments.append(
-                        "FX:" + ", ".join(candidate.identifier for candidate in fx_candidates)
+    if knowledge_base:
+        knowledge_base = resolve_model_path(knowledge_base)
+        proposal_model = open_fresh_snapshot(knowledge_base)
+        if proposal_model is None and knowledge_base.exists():
+            proposal_model = ProposalModel.load(knowledge_base)
+
+    # Subtitles stream in batches so that long transcripts never sit in
+    # memory as a whole; the topic summary is added to the first row last.
+    entries = iter_srt(srt)
+    keyword_counter: Counter[str] = Counter()
+    row_start = 2
+    try:
+        while batch := list(islice(entries, MAKE_SHEET_BATCH_SIZE)):
+            texts = [entry.text for entry in batch]
+            rows = range(row_start, row_start + len(batch))
+            analysis = language_analyzer.analyze_subtitles(texts)
+            for insight in analysis.insights:
+                keyword_counter.update(insight.keywords)
+
+            batch_suggestions: list[ProposalSuggestions | None] = [None] * len(batch)
+            if proposal_model:
+                batch_suggestions = list(
+                    proposal_model.suggest_many(
+                        texts,
+                        [entry.start.to_seconds() for entry in batch],
+                        analyzer=language_analyzer,
+                        row_indices=rows,
                     )
+                )
+
+            for row_index, entry, insight, suggestions in zip(
+                rows, batch, analysis.insights, batch_suggestions
+            ):
+                timeline_sheet.cell(row=row_index, column=1, value=entry.start.to_string())
+                timeline_sheet.cell(row=row_index, column=2, value=entry.end.to_string())
+                timeline_sheet.cell(row=row_index, column=3, value=entry.text)
+
+                memo_segments: list[str] = []
+                if suggestions is not None:
+                    if suggestions.has_data():
+                        suggestion_segments: list[str] = []
+                        confirmed_segments: list[str] = []
+
+                        def _auto_apply(
+                            category: str,
+                            column: int,
+                            label: str,
+                            limit: int = 3,
+                        ) -> List[str]:
+                            candidates = suggestions.top_candidates(category, limit=limit)
+                            if not candidates:
+                                return []
+                            names = [candidate.identifier for candidate in candidates]
+                            threshold = AUTO_APPLY_THRESHOLDS.get(category)
+                            best = candidates[0]
+                            if (
+                                threshold is not None
+                                and best.base_score >= threshold
+                                and column > 0
+                            ):
+                                timeline_sheet.cell(row=row_index, column=column, value=best.identifier)
+                                confirmed_segments.append(
+                                    f"{label}:{best.identifier}(信頼度{best.base_score:.2f})"
+                                )
+                            return names
+
+                        telop_names = _auto_apply("telop", 4, "テロップ")
+                        if telop_names:
+                            suggestion_segments.append(f"テロップ:{', '.join(telop_names)}")
+
+                        pack_names = _auto_apply("pack", 9, "パック")
+                        if pack_names:
+                            suggestion_segments.append(f"パック:{', '.join(pack_names)}")
+
+                        asset_names = _auto_apply("asset", 10, "オブジェクト")
+                        if asset_names:
+                            suggestion_segments.append(f"オブジェクト:{', '.join(asset_names)}")
+
+                        fx_candidates = suggestions.top_candidates("fx", limit=3)
+                        if fx_candidates:
+                            suggestion_segments.append(
+                                "FX:" + ", ".join(candidate.identifier for candidate in fx_candidates)
+                            )
+
+                        if confirmed_segments:
+                            memo_segments.append("AI確定 " + " / ".join(confirmed_segments))
+                        if suggestion_segments:
+                            memo_segments.append("AI候補 " + " / ".join(suggestion_segments))
+
+                insight_segments: list[str] = []
+                if insight.keywords:
+                    insight_segments.append(f"キーワード:{', '.join(insight.keywords)}")
+                if insight.emphasis:
+                    insight_segments.append(f"トーン:{insight.emphasis}")
+                if insight_segments:
+                    memo_segments.append("AI解析 " + " / ".join(insight_segments))
+
+                if memo_segments:
+                    timeline_sheet.cell(row=row_index, column=16, value=" | ".join(memo_segments))
+
+            row_start += len(batch)
+    except SrtParseError as exc:
+        typer.secho(str(exc), fg=typer.colors.RED)
+        raise typer.Exit(code=1) from exc
+    finally:
+        if proposal_model:
+            proposal_model.close()
 
-                if confirmed_segments:
-                    memo_segments.append("AI確定 " + " / ".join(confirmed_segments))
-                if suggestion_segments:
-                    memo_segments.append("AI候補 " + " / ".join(suggestion_segments))
-
-        insight_segments: list[str] = []
-        if insight.keywords:
-            insight_segments.append(f"キーワード:{', '.join(insight.keywords)}")
-        if insight.emphasis:
-            insight_segments.append(f"トーン:{insight.emphasis}")
-        if insight_segments:
-            memo_segments.append("AI解析 " + " / ".join(insight_segments))
-
-        if context_summary and not context_written:
-            memo_segments.append(f"全体トピック:{context_summary}")
-            context_written = True
-
-        if memo_segments:
-            timeline_sheet.cell(row=row_index, column=16, value=" | ".join(memo_segments))
+    context_summary = ", ".join(word for word, _ in keyword_counter.most_common(3))
+    if context_summary and row_start > 2:
+        memo_cell = timeline_sheet.cell(row=2, column=16)
+        topic = f"全体トピック:{context_summary}"
+        memo_cell.value = f"{memo_cell.value} | {topic}" if memo_cell.value else topic
 
     save_workbook(workbook, out)
     typer.secho(f"Workbook created: {out}", fg=typer.colors.GREEN)
@@ -148,28 +191,130 @@ def make_sheet(
 def build(
     sheet: Path = typer.Option(..., exists=True, dir_okay=False, readable=True, help="Timeline workbook"),
     out: Path = typer.Option(Path("work"), file_okay=False, dir_okay=True, help="Output directory"),
+    tone_keywords: Optional[Path] = typer.Option(
+        None,
+        exists=True,
+        dir_okay=False,
+        help="TONE_KEYWORDSシートに加えて読み込むトーン判定キーワードJSON",
+    ),
+    history_keep_days: Optional[int] = typer.Option(
+        None,
+        min=1,
+        help="履歴を保持する日数 (省略時は無期限。前日以前の履歴は自動で圧縮される)",
+    ),
+    history_level: str = typer.Option(
+        "full",
+        help="履歴の記録内容 (off, minimal, standard, full)。minimal はAI学習に必要なIDと承認のみを記録する",
+    ),
+    filter_specs: Optional[List[str]] = typer.Option(
+        None,
+        "--filter",
+        help="書き出し前に適用するフィルタ (例: hira-shrink:0.85。複数指定可、指定順に適用)",
+    ),
 ) -> None:
     """Build a simplified YMMP project from the workbook."""
+    from .language import load_tone_keywords, merge_tone_keywords
+    from .workbook import load_workbook_data
+    from .ymmp import HISTORY_LEVELS, HistoryWriter, build_project, write_outputs
+
+    if history_level not in HISTORY_LEVELS:
+        raise typer.BadParameter(f"expected one of {', '.join(HISTORY_LEVELS)}", param_hint="--history-level")
+    try:
+        pipeline = _filter_pipeline(filter_specs or [], None)
+    except ValueError as exc:
+        raise typer.BadParameter(str(exc), param_hint="--filter") from exc
     data = load_workbook_data(sheet)
-    project, warnings, history = build_project(data)
-    write_outputs(project, warnings, out, history)
+    if tone_keywords:
+        data.tone_keywords = merge_tone_keywords(data.tone_keywords, load_tone_keywords(tone_keywords))
+    # Rows are written to history.jsonl while the project is being built.
+    writer = HistoryWriter(out) if history_level != "off" else None
+    project, warnings, _ = build_project(data, history_level=history_level, history_writer=writer)
+    # Filters run on the in-memory project, so out.ymmp is serialised once.
+    pipeline.apply(project)
+    write_outputs(project, warnings, out, history_keep_days=history_keep_days, history_writer=writer)
     typer.secho(f"Project generated with {len(warnings)} warnings -> {out}", fg=typer.colors.GREEN)
 
 
 @app.command("filter")
 def filter_command(
-    filter_name: str = typer.Argument(..., help="Filter name"),
-    input_path: Path = typer.Option(..., exists=True, dir_okay=False, help="Input YMMP JSON"),
-    out: Path = typer.Option(..., dir_okay=False, help="Output YMMP JSON"),
-    scale: Optional[float] = typer.Option(0.85, help="Scale applied to telop text"),
+    filter_specs: List[str] = typer.Argument(
+        ..., metavar="FILTER...", help="Filter names, optionally with an argument (e.g. hira-shrink:0.85)"
+    ),
+    input_path: Path = typer.Option(
+        ..., help="Input YMMP JSON, a directory of projects or a glob pattern such as 'projects/*.ymmp'"
+    ),
+    out: Path = typer.Option(..., help="Output YMMP JSON (a directory when filtering several files)"),
+    scale: Optional[float] = typer.Option(None, help="Scale applied to telop text when hira-shrink has no argument"),
+    pattern: str = typer.Option("**/*.ymmp", help="Files selected below a directory input"),
+    workers: int = typer.Option(0, min=0, help="Worker processes for several files (0: CPU count)"),
+    force: bool = typer.Option(False, "--force", help="Filter files even if filter_manifest.json says they are unchanged"),
+    stream: bool = typer.Option(
+        False, "--stream", help="Scan projects incrementally and decode only matching items (for very large files)"
+    ),
+    item_types: Optional[List[str]] = typer.Option(
+        None, "--item-type", help="Item $type decoded in --stream mode (default: TextItem, repeatable)"
+    ),
 ) -> None:
-    """Apply post-processing filters to a project."""
-    filter_name = filter_name.lower()
-    if filter_name == "hira-shrink":
-        apply_hiragana_shrink(input_path, out, scale or 0.85)
-        typer.secho(f"Hiragana shrink applied -> {out}", fg=typer.colors.GREEN)
-    else:
-        typer.secho(f"Unknown filter: {filter_name}", fg=typer.colors.RED)
+    """Apply post-processing filters to a project or a batch of projects.
+
+    All filters run in one pass; each project is parsed and written once.
+    Batches are filtered in parallel and recorded in filter_manifest.json,
+    so unchanged files are skipped on the next run.  --stream keeps memory
+    bounded by the largest item instead of the whole project.
+    """
+    from .filter_stream import DEFAULT_ITEM_TYPES, stream_filter
+    from .filters import apply_filters
+
+    try:
+        pipeline = _filter_pipeline(filter_specs, scale)
+    except ValueError as exc:
+        typer.secho(str(exc), fg=typer.colors.RED)
+        raise typer.Exit(code=1) from exc
+    item_types = tuple(item_types or DEFAULT_ITEM_TYPES)
+    if input_path.is_file():
+        if stream:
+            try:
+                streamed = stream_filter(input_path, out, pipeline, item_types=item_types)
+            except ValueError as exc:
+                typer.secho(f"{input_path}: {exc}", fg=typer.colors.RED)
+                raise typer.Exit(code=1) from exc
+            typer.echo(f"  アイテム {streamed.items} 件 / 解析 {streamed.decoded} 件 / 変更 {streamed.changed_items} 件")
+        else:
+            apply_filters(input_path, out, pipeline)
+        typer.secho(f"Filters applied ({', '.join(pipeline.names)}) -> {out}", fg=typer.colors.GREEN)
+        return
+
+    from .filter_batch import collect_filter_inputs, filter_files
+
+    base_dir, sources = collect_filter_inputs(input_path, pattern)
+    if not sources:
+        typer.secho(f"No YMMP files found: {input_path}", fg=typer.colors.RED)
+        raise typer.Exit(code=1)
+    try:
+        results = filter_files(
+            sources,
+            base_dir,
+            out,
+            pipeline.specs,
+            workers=workers or None,
+            force=force,
+            stream=stream,
+            item_types=item_types,
+        )
+    except ValueError as exc:
+        typer.secho(str(exc), fg=typer.colors.RED)
+        raise typer.Exit(code=1) from exc
+    counts = {status: 0 for status in ("filtered", "skipped", "failed")}
+    for result in results:
+        counts[result.status] += 1
+        detail = result.error if result.error else f"変更アイテム {result.changed_items} 件"
+        typer.echo(f"  [{result.status}] {result.source}: {detail}")
+    colour = typer.colors.RED if counts["failed"] else typer.colors.GREEN
+    typer.secho(
+        f"Filtered {counts['filtered']}, skipped {counts['skipped']}, failed {counts['failed']} -> {out}",
+        fg=colour,
+    )
+    if counts["failed"]:
         raise typer.Exit(code=1)
 
 
@@ -184,25 +329,63 @@ def history_feedback(
     ),
     latest_only: bool = typer.Option(
         True,
-        help="最新の history.jsonl のみを対象に集計する",
+        help="最新の history.jsonl のみを対象に集計する (--since/--until 指定時は期間内の全ファイルが対象)",
     ),
     row_limit: int = typer.Option(
         5,
         help="各警告で表示する行番号の上限",
     ),
+    since: Optional[str] = typer.Option(None, help="集計開始日 (YYYYMMDD または YYYY-MM-DD)"),
+    until: Optional[str] = typer.Option(None, help="集計終了日 (YYYYMMDD または YYYY-MM-DD)"),
+    rows: Optional[List[int]] = typer.Option(None, "--row", help="対象の行番号 (複数指定可)"),
+    telops: Optional[List[str]] = typer.Option(None, "--telop", help="対象のテロップID (複数指定可)"),
+    packs: Optional[List[str]] = typer.Option(None, "--pack", help="対象のパックID (複数指定可)"),
+    fx_ids: Optional[List[str]] = typer.Option(None, "--fx", help="対象のFX ID (複数指定可)"),
+    categories: Optional[List[str]] = typer.Option(
+        None, "--category", help="対象の警告コードまたは分類 (例: pack.not_found, パック未登録。複数指定可)"
+    ),
 ) -> None:
-    """Collect warnings from history.jsonl files and provide remediation hints."""
-
-    result = load_history_entries(history_path, latest_only=latest_only)
-    if result.errors:
-        for error in result.errors:
+    """Collect warnings from history.jsonl files and provide remediation hints.
+
+    When ``history.sqlite`` exists next to the history files (see ``history
+    import``), the summary is read from its per-day aggregates instead.
+    """
+    from .history import WarningAggregator, iter_history_entries, warning_labels
+    from .history_sqlite import SqliteHistoryStore, history_store_path
+
+    history_filter = _history_filter(since, until, rows, telops, packs, fx_ids, categories)
+    latest_only = latest_only and not history_filter.has_date_range
+    # Keep one extra row so that truncated row lists can be marked with "...".
+    sample_limit = max(row_limit, 0) + 1
+
+    store_path = history_store_path(history_path)
+    if store_path is not None:
+        with SqliteHistoryStore.open(store_path) as store:
+            found = store.has_entries(history_filter, latest_only)
+            summaries = store.summarize_warnings(history_filter, latest_only, sample_limit)
+    else:
+        errors: list[str] = []
+        aggregator = WarningAggregator(sample_limit=sample_limit)
+        aggregator.add_all(
+            iter_history_entries(
+                history_path,
+                latest_only=latest_only,
+                history_filter=history_filter,
+                errors=errors,
+            )
+        )
+        for error in errors:
             typer.secho(error, fg=typer.colors.YELLOW)
+        found = aggregator.entries > 0
+        summaries = aggregator.results()
 
-    if not result.entries:
+    if not found:
         typer.secho("履歴エントリが見つかりません。history.jsonl を生成してから実行してください。", fg=typer.colors.RED)
         raise typer.Exit(code=1)
 
-    summaries = summarize_warnings(result.entries)
+    if categories:
+        labels = warning_labels(categories)
+        summaries = [item for item in summaries if item["label"] in labels]
     if not summaries:
         typer.secho("警告は記録されていません。", fg=typer.colors.GREEN)
         return
@@ -220,208 +403,355 @@ def history_feedback(
             sample = item["messages"][0]
             typer.echo(f"  代表メッセージ: {sample}")
 
-def _extract_telops_from_raw_ymmp(project: dict, xlsx_path: Path) -> dict:
-    """Extracts TextItems and saves them as templates."""
-    typer.secho("Extracting telop patterns...", fg=typer.colors.CYAN)
-    extracted = {}
-    template_dir = xlsx_path.parent / "templates" / "telops"
-    template_dir.mkdir(parents=True, exist_ok=True)
-
-    items = project.get("Timelines", [{}])[0].get("Items", [])
-    for item in items:
-        if "TextItem" in item.get("$type", ""):
-            text = item.get("Text", "no_text")
-            pattern_id = f"telop_{text}"
-            if pattern_id in extracted: continue
-
-            sanitized = _strip_runtime_fields(item, {"Layer"})
-            template_file_path = template_dir / f"{pattern_id}.json"
-            template_file_path.write_text(
-                json.dumps(sanitized, ensure_ascii=False, indent=2),
-                encoding="utf-8",
-            )
 
-            extracted[pattern_id] = {
-                "pattern_id": pattern_id,
-                "source": template_file_path.resolve().as_posix(),
-                "description": f"「{text}」から自動抽出",
-            }
-    typer.secho(f"Found {len(extracted)} telop patterns.", fg=typer.colors.GREEN)
-    return extracted
-
-def _extract_assets_from_raw_ymmp(project: dict, xlsx_path: Path) -> dict:
-    """Extracts TachieItems/ImageItems and saves them as templates."""
-    typer.secho("Extracting asset patterns...", fg=typer.colors.CYAN)
-    extracted = {}
-    template_dir = xlsx_path.parent / "templates" / "assets"
-    template_dir.mkdir(parents=True, exist_ok=True)
-
-    items = project.get("Timelines", [{}])[0].get("Items", [])
-    for item in items:
-        item_type = item.get("$type", "")
-        asset_id = None
-        kind = None
-
-        if "TachieItem" in item_type:
-            kind = "tachie"
-            char_name = item.get("CharacterName", "unknown")
-            # 表情をファイル名から推測
-            eye_path = Path(item.get("TachieItemParameter", {}).get("Eye", ""))
-            emotion = eye_path.stem.split("】")[-1] if "】" in eye_path.stem else "default"
-            asset_id = f"tachie_{char_name}_{emotion}"
-            
-        elif "ImageItem" in item_type:
-            kind = "image"
-            file_path = Path(item.get("FilePath", ""))
-            asset_id = f"image_{file_path.stem}"
-
-        if asset_id and asset_id not in extracted:
-            sanitized = _strip_runtime_fields(item, {"Layer"})
-            template_file_path = template_dir / f"{asset_id}.json"
-            template_file_path.write_text(
-                json.dumps(sanitized, ensure_ascii=False, indent=2),
-                encoding="utf-8",
-            )
-            
-            extracted[asset_id] = {
-                "asset_id": asset_id,
-                "kind": kind,
-                "path": template_file_path.resolve().as_posix(),
-                "notes": f"from {Path(project.get('FilePath')).name}",
-            }
-    typer.secho(f"Found {len(extracted)} asset patterns.", fg=typer.colors.GREEN)
-    return extracted
-
-
-def _extract_packs_from_raw_ymmp(project: dict, xlsx_path: Path) -> dict:
-    """Extracts multi-object packs from timeline items."""
-    typer.secho("Extracting pack patterns...", fg=typer.colors.CYAN)
-    extracted: Dict[str, Dict[str, Any]] = {}
-    template_dir = xlsx_path.parent / "templates" / "packs"
-    template_dir.mkdir(parents=True, exist_ok=True)
-
-    seen_hashes: set[str] = set()
-    items = project.get("Timelines", [{}])[0].get("Items", [])
-    for item in items:
-        if not isinstance(item, dict):
-            continue
-        if not _looks_like_pack(item):
-            continue
-
-        sanitized = _strip_runtime_fields(item, preserve_timing=True)
-        digest = _hash_template(sanitized)
-        if digest in seen_hashes:
-            continue
-        seen_hashes.add(digest)
-
-        pack_id = f"pack_{digest[:8]}"
-        template_path = template_dir / f"{_safe_filename(pack_id)}.json"
-        template_path.write_text(json.dumps(sanitized, ensure_ascii=False, indent=2), encoding="utf-8")
-
-        extracted[pack_id] = {
-            "pack_id": pack_id,
-            "source": _relative_template_path(template_path, xlsx_path.parent),
-            "notes": f"Extracted from {Path(project.get('FilePath', 'source.ymmp')).name}",
-        }
-
-    typer.secho(f"Found {len(extracted)} pack patterns.", fg=typer.colors.GREEN)
-    return extracted
-
-
-def _extract_fx_from_raw_ymmp(project: dict, xlsx_path: Path, packs: Dict[str, Dict[str, Any]]) -> dict:
-    """Extracts FX presets by mirroring effect items as packs."""
-    typer.secho("Extracting FX presets...", fg=typer.colors.CYAN)
-    extracted: Dict[str, Dict[str, Any]] = {}
-    fx_dir = xlsx_path.parent / "templates" / "fx"
-    fx_dir.mkdir(parents=True, exist_ok=True)
-    pack_dir = xlsx_path.parent / "templates" / "packs"
-    pack_dir.mkdir(parents=True, exist_ok=True)
-
-    items = project.get("Timelines", [{}])[0].get("Items", [])
-    for item in items:
-        if not isinstance(item, dict):
-            continue
-        item_type = item.get("$type", "")
-        if not _looks_like_fx(item_type):
-            continue
-
-        sanitized = _strip_runtime_fields(item, preserve_timing=True)
-        digest = _hash_template(sanitized)
-        fx_id = f"fx_{digest[:8]}"
-        if fx_id in extracted:
-            continue
-
-        fx_template_path = fx_dir / f"{_safe_filename(fx_id)}.json"
-        fx_template_path.write_text(json.dumps(sanitized, ensure_ascii=False, indent=2), encoding="utf-8")
-
-        pack_id = f"pack_{digest[:8]}"
-        if pack_id not in packs:
-            pack_template_path = pack_dir / f"{_safe_filename(pack_id)}.json"
-            if not pack_template_path.exists():
-                pack_template_path.write_text(json.dumps(sanitized, ensure_ascii=False, indent=2), encoding="utf-8")
-            packs[pack_id] = {
-                "pack_id": pack_id,
-                "source": _relative_template_path(pack_template_path, xlsx_path.parent),
-                "notes": "Auto-generated from FX item",
-            }
-
-        extracted[fx_id] = {
-            "fx_id": fx_id,
-            "fx_type": _infer_fx_type(item_type),
-            "source": pack_id,
-        }
-
-    typer.secho(f"Found {len(extracted)} FX presets.", fg=typer.colors.GREEN)
-    return extracted
+history_app = typer.Typer(help="ビルド履歴の保守・検索コマンド")
+app.add_typer(history_app, name="history")
+
+
+@history_app.command("import")
+def history_import(
+    history_path: Path = typer.Option(
+        Path("work/history"),
+        file_okay=False,
+        help="history.jsonl が保存されるディレクトリ",
+    ),
+    db: Optional[Path] = typer.Option(
+        None,
+        dir_okay=False,
+        help="取り込み先の SQLite ファイル (省略時は履歴ディレクトリの history.sqlite)",
+    ),
+) -> None:
+    """Create or update the SQLite history store from history.jsonl files.
+
+    Once the store exists, builds add their entries to it as well.
+    """
+    from .history_sqlite import HISTORY_DB_NAME, SqliteHistoryStore
+
+    target = db or history_path / HISTORY_DB_NAME
+    with SqliteHistoryStore.open(target) as store:
+        added = store.import_jsonl(history_path) if history_path.is_dir() else 0
+    typer.secho(f"Imported {added} history entries -> {target}", fg=typer.colors.GREEN)
+
+
+@history_app.command("query")
+def history_query(
+    history_path: Path = typer.Option(
+        Path("work/history"),
+        help="履歴ディレクトリ、history.jsonl または history.sqlite",
+    ),
+    since: Optional[str] = typer.Option(None, help="検索開始日 (YYYYMMDD または YYYY-MM-DD)"),
+    until: Optional[str] = typer.Option(None, help="検索終了日 (YYYYMMDD または YYYY-MM-DD)"),
+    rows: Optional[List[int]] = typer.Option(None, "--row", help="対象の行番号 (複数指定可)"),
+    telops: Optional[List[str]] = typer.Option(None, "--telop", help="対象のテロップID (複数指定可)"),
+    packs: Optional[List[str]] = typer.Option(None, "--pack", help="対象のパックID (複数指定可)"),
+    fx_ids: Optional[List[str]] = typer.Option(None, "--fx", help="対象のFX ID (複数指定可)"),
+    categories: Optional[List[str]] = typer.Option(
+        None, "--category", help="対象の警告コードまたは分類 (例: pack.not_found, パック未登録。複数指定可)"
+    ),
+    limit: int = typer.Option(20, help="表示する履歴エントリの上限 (0 で無制限)"),
+    count: bool = typer.Option(False, "--count", help="件数のみを表示する"),
+) -> None:
+    """Print matching history entries as JSON lines."""
+    from itertools import islice
+
+    from .history import iter_history_entries
+    from .history_sqlite import SqliteHistoryStore, history_store_path
+
+    history_filter = _history_filter(since, until, rows, telops, packs, fx_ids, categories)
+    store_path = history_store_path(history_path)
+    if store_path is not None:
+        with SqliteHistoryStore.open(store_path) as store:
+            if count:
+                typer.echo(store.count_entries(history_filter))
+                return
+            for entry in store.iter_entries(history_filter, limit=limit or None):
+                typer.echo(json.dumps(entry, ensure_ascii=False))
+        return
+
+    entries = iter_history_entries(history_path, history_filter=history_filter)
+    if count:
+        typer.echo(sum(1 for _ in entries))
+        return
+    for entry in islice(entries, limit or None):
+        typer.echo(json.dumps(entry, ensure_ascii=False))
+
+
+@history_app.command("rotate")
+def history_rotate(
+    history_path: Path = typer.Option(
+        Path("work/history"),
+        file_okay=False,
+        help="history.jsonl が保存されるディレクトリ",
+    ),
+    keep_days: Optional[int] = typer.Option(
+        None, min=1, help="履歴を保持する日数 (省略時は削除せず圧縮のみ)"
+    ),
+    codec: str = typer.Option("auto", help="圧縮形式 (auto, zstd, gzip。auto は zstandard があれば zstd)"),
+) -> None:
+    """Compress past history days and delete days beyond the retention period."""
+    from .history_archive import rotate_history
+
+    try:
+        result = rotate_history(history_path, keep_days=keep_days, codec=codec)
+    except (ValueError, RuntimeError) as exc:
+        typer.secho(str(exc), fg=typer.colors.RED)
+        raise typer.Exit(code=1) from exc
+    typer.secho(
+        f"Compressed {result.compressed} days, removed {result.removed_days} days -> {history_path}",
+        fg=typer.colors.GREEN,
+    )
+    if result.compressed:
+        typer.echo(f"  圧縮前後のサイズ: {result.bytes_before:,} -> {result.bytes_after:,} bytes")
+
+
+model_app = typer.Typer(help="AI提案モデルの保守コマンド")
+app.add_typer(model_app, name="model")
+
+
+@model_app.command("migrate")
+def model_migrate(
+    source: Path = typer.Option(
+        Path("work/ai/proposal_model.json"),
+        dir_okay=False,
+        help="移行元の JSON 形式の提案モデル",
+    ),
+    target: Optional[Path] = typer.Option(
+        None,
+        dir_okay=False,
+        help="移行先の SQLite ファイル (省略時は移行元と同じ場所の .sqlite)",
+    ),
+) -> None:
+    """Copy a JSON proposal model into the SQLite backend."""
+    from .proposal_sqlite import migrate_json_model
+
+    try:
+        target_path, count = migrate_json_model(source, target)
+    except FileNotFoundError as exc:
+        typer.secho(str(exc), fg=typer.colors.RED)
+        raise typer.Exit(code=1) from exc
+    typer.secho(f"Migrated {count} statistics -> {target_path}", fg=typer.colors.GREEN)
+
+
+@model_app.command("compact")
+def model_compact(
+    model_path: Path = typer.Option(
+        Path("work/ai/proposal_model.json"),
+        "--model",
+        help="圧縮する提案モデル (同じ場所に .sqlite 版があればそちらを対象にする)",
+    ),
+    half_life: float = typer.Option(90.0, help="統計の重みが半減するまでの日数 (0 で減衰なし)"),
+    min_weight: float = typer.Option(0.5, help="減衰後の出現回数がこの値未満の統計を削除する"),
+    max_tokens: int = typer.Option(5000, help="カテゴリごとに保持するトークン数の上限 (0 で無制限)"),
+) -> None:
+    """Decay and prune proposal statistics, reporting the size before and after."""
+    from .proposal_log import compact_model, pending_delta_bytes
+    from .proposals import SQLITE_SUFFIXES, ProposalModel, resolve_model_path
+
+    model_path = resolve_model_path(model_path)
+    size_before = pending_delta_bytes(model_path)
+    if model_path.exists():
+        size_before += model_path.stat().st_size
+    if not size_before:
+        typer.secho(f"Proposal model not found: {model_path}", fg=typer.colors.RED)
+        raise typer.Exit(code=1)
+
+    options = {
+        "half_life_days": half_life,
+        "min_weight": min_weight,
+        "max_tokens_per_category": max_tokens or None,
+    }
+    if model_path.suffix.lower() in SQLITE_SUFFIXES:
+        model = ProposalModel.load(model_path)
+        try:
+            result = model.compact(**options)
+            model.save(model_path)
+        finally:
+            model.close()
+    else:
+        merged, result = compact_model(model_path, **options)
+        if merged:
+            typer.echo(f"  差分ログ {merged} 件を統合しました")
+    size_after = model_path.stat().st_size
+
+    typer.secho(f"Compacted proposal model -> {model_path}", fg=typer.colors.GREEN)
+    typer.echo(f"  統計数: {result.entries_before} -> {result.entries_after} (減衰 {result.decayed})")
+    typer.echo(f"  トークン数: {result.tokens_before} -> {result.tokens_after}")
+    typer.echo(f"  ファイルサイズ (差分ログ含む): {size_before:,} -> {size_after:,} bytes")
+
+
+@model_app.command("snapshot")
+def model_snapshot(
+    model_path: Path = typer.Option(
+        Path("work/ai/proposal_model.json"),
+        "--model",
+        help="書き出す提案モデル (同じ場所に .sqlite 版があればそちらを対象にする)",
+    ),
+    out: Optional[Path] = typer.Option(
+        None,
+        dir_okay=False,
+        help="スナップショットの出力先 (省略時はモデルと同じ場所の .snapshot。make-sheet が自動で使用する)",
+    ),
+) -> None:
+    """Export the proposal model as a memory-mapped read-only snapshot."""
+    from .proposal_log import pending_delta_paths
+    from .proposal_snapshot import snapshot_path, write_snapshot
+    from .proposals import ProposalModel, resolve_model_path
+
+    model_path = resolve_model_path(model_path)
+    if not model_path.exists() and not pending_delta_paths(model_path):
+        typer.secho(f"Proposal model not found: {model_path}", fg=typer.colors.RED)
+        raise typer.Exit(code=1)
+    model = ProposalModel.load(model_path)
+    try:
+        target = write_snapshot(model, out or snapshot_path(model_path))
+        count = model.entry_count()
+    finally:
+        model.close()
+    typer.secho(f"Exported {count} statistics -> {target}", fg=typer.colors.GREEN)
+    typer.echo(f"  ファイルサイズ: {target.stat().st_size:,} bytes")
+
+
+@model_app.command("learn")
+def model_learn(
+    history_path: Path = typer.Option(
+        Path("work/history"),
+        help="学習に使う履歴ディレクトリまたは history.jsonl (圧縮済みの履歴も読み込む)",
+    ),
+    model_path: Path = typer.Option(
+        Path("work/ai/proposal_model.json"),
+        "--model",
+        help="更新する提案モデル (同じ場所に .sqlite 版があればそちらを対象にする)",
+    ),
+    since: Optional[str] = typer.Option(None, help="学習対象の開始日 (YYYYMMDD または YYYY-MM-DD)"),
+    until: Optional[str] = typer.Option(None, help="学習対象の終了日 (YYYYMMDD または YYYY-MM-DD)"),
+) -> None:
+    """Replay build history into the proposal model.
+
+    Entries the model has already learned are skipped, so the command can be
+    re-run after restoring or rotating history.
+    """
+    from itertools import islice
+
+    from .history import iter_history_entries
+    from .proposal_log import compact_deltas
+    from .proposals import SQLITE_SUFFIXES, resolve_model_path, update_proposal_model
+
+    history_filter = _history_filter(since, until, None, None, None, None, None)
+    entries = iter_history_entries(history_path, history_filter=history_filter)
+    model_path = resolve_model_path(model_path)
+    total = 0
+    while batch := list(islice(entries, LEARN_BATCH_SIZE)):
+        update_proposal_model(batch, model_path)
+        total += len(batch)
+    if not total:
+        typer.secho(f"No history entries found: {history_path}", fg=typer.colors.RED)
+        raise typer.Exit(code=1)
+    if model_path.suffix.lower() not in SQLITE_SUFFIXES:
+        compact_deltas(model_path)
+    typer.secho(f"Learned from {total} history entries -> {model_path}", fg=typer.colors.GREEN)
+
+
+def _filter_pipeline(specs: Iterable[str], scale: Optional[float]) -> "FilterPipeline":
+    from .filters import FilterPipeline
+
+    if scale is not None:
+        specs = [f"{spec}:{scale}" if spec.lower() == "hira-shrink" else spec for spec in specs]
+    return FilterPipeline.from_specs(specs)
+
+
+def _history_filter(
+    since: Optional[str],
+    until: Optional[str],
+    rows: Optional[List[int]],
+    telops: Optional[List[str]],
+    packs: Optional[List[str]],
+    fx_ids: Optional[List[str]],
+    categories: Optional[List[str]],
+) -> "HistoryFilter":
+    from .history import HistoryFilter, parse_history_date
+
+    try:
+        start = parse_history_date(since) if since else None
+        end = parse_history_date(until) if until else None
+    except ValueError as exc:
+        raise typer.BadParameter(str(exc)) from exc
+
+    def _selection(values: Optional[List[Any]]) -> frozenset | None:
+        return frozenset(values) if values else None
+
+    return HistoryFilter(
+        since=start,
+        until=end,
+        rows=_selection(rows),
+        telops=_selection(telops),
+        packs=_selection(packs),
+        fx_ids=_selection(fx_ids),
+        warning_categories=_selection(categories),
+    )
 
 
 @app.command("absorb")
 def absorb(
-    ymmp: Path = typer.Option(..., exists=True, dir_okay=False, readable=True, help="Source YMMP JSON"),
+    ymmp: List[Path] = typer.Option(
+        ..., help="Source YMMP JSON, a directory of projects or a glob pattern (repeatable)"
+    ),
     xlsx: Path = typer.Option(..., dir_okay=False, help="Workbook to update"),
+    pattern: str = typer.Option("**/*.ymmp", help="Files selected below a directory input"),
+    workers: int = typer.Option(0, min=0, help="Worker processes for several files (0: CPU count)"),
+    similarity: float = typer.Option(
+        0.8,
+        min=0.0,
+        max=1.0,
+        help="Fold packs at least this similar to an earlier pack into it as overrides (0: off)",
+    ),
 ) -> None:
-    """Absorb a YMMP file into the workbook dictionaries."""
+    """Absorb YMMP files into the workbook dictionaries.
+
+    Several projects are read in parallel and merged; the workbook is opened
+    and saved once.  Near-duplicate packs share one template and keep their
+    differences as overrides.
+    """
+    from openpyxl import load_workbook
+
+    from .absorb import absorb_projects
+    from .filter_batch import collect_filter_inputs
+    from .workbook import DEFAULT_TEMPLATE, create_workbook_template, save_workbook
+
+    sources: List[Path] = []
+    for entry in ymmp:
+        found = collect_filter_inputs(entry, pattern)[1]
+        if not found:
+            typer.secho(f"No YMMP files found: {entry}", fg=typer.colors.RED)
+            raise typer.Exit(code=1)
+        sources.extend(source for source in found if source not in sources)
+
     xlsx = xlsx.resolve()
+    base_dir = xlsx.parent
+    typer.secho(f"Extracting patterns from {len(sources)} file(s)...", fg=typer.colors.CYAN)
     try:
-        project = json.loads(ymmp.read_text(encoding="utf-8-sig"))
-    except (json.JSONDecodeError, UnicodeDecodeError) as e:
-        typer.secho(f"Error reading YMMP file: {e}", fg=typer.colors.RED)
-        raise typer.Exit(code=1)
+        extracted = absorb_projects(sources, base_dir, workers=workers or None, similarity=similarity)
+    except ValueError as exc:
+        typer.secho(str(exc), fg=typer.colors.RED)
+        raise typer.Exit(code=1) from exc
+    typer.secho(
+        f"Found {len(extracted.telop_patterns)} telop patterns, {len(extracted.assets)} asset patterns, "
+        f"{len(extracted.packs)} pack patterns and {len(extracted.fx_presets)} FX presets "
+        f"({extracted.stored_templates} new templates stored).",
+        fg=typer.colors.GREEN,
+    )
+    if extracted.near_duplicates:
+        typer.echo(f"  {extracted.near_duplicates} near-duplicate pack(s) folded into similar packs as overrides")
 
     if xlsx.exists():
         workbook = load_workbook(xlsx)
     else:
         workbook = create_workbook_template(DEFAULT_TEMPLATE)
-        
-    base_dir = xlsx.parent
-    if (
-        "telop_patterns" in project
-        or "assets" in project
-        or "packs" in project
-        or "fx_presets" in project
-    ):  # Tool-generated file
-        telop_raw = project.get("telop_patterns", {})
-        asset_raw = project.get("assets", {})
-        pack_raw = project.get("packs", {})
-        fx_raw = project.get("fx_presets", project.get("fx", {}))
-
-        telop_patterns = telop_raw if isinstance(telop_raw, dict) else {}
-        assets = asset_raw if isinstance(asset_raw, dict) else {}
-        packs = pack_raw if isinstance(pack_raw, dict) else {}
-        fx_presets = fx_raw if isinstance(fx_raw, dict) else {}
-    else:  # Raw YMM4 file
-        telop_patterns = _extract_telops_from_raw_ymmp(project, xlsx)
-        assets = _extract_assets_from_raw_ymmp(project, xlsx)
-        packs = _extract_packs_from_raw_ymmp(project, xlsx)
-        fx_presets = _extract_fx_from_raw_ymmp(project, xlsx, packs)
-
-    _prepare_templates_for_sync(base_dir, telop_patterns, assets, packs)
-
-    _sync_dictionary_sheet(workbook, "TELP_PATTERNS", DEFAULT_TEMPLATE.telp_headers, telop_patterns)
-    _sync_dictionary_sheet(workbook, "ASSETS_SINGLE", DEFAULT_TEMPLATE.asset_headers, assets)
-    _sync_dictionary_sheet(workbook, "PACKS_MULTI", DEFAULT_TEMPLATE.pack_headers, packs)
-    _sync_dictionary_sheet(workbook, "FX", DEFAULT_TEMPLATE.fx_headers, fx_presets)
-    
+
+    _sync_dictionary_sheet(workbook, "TELP_PATTERNS", DEFAULT_TEMPLATE.telp_headers, extracted.telop_patterns)
+    _sync_dictionary_sheet(workbook, "ASSETS_SINGLE", DEFAULT_TEMPLATE.asset_headers, extracted.assets)
+    _sync_dictionary_sheet(workbook, "PACKS_MULTI", DEFAULT_TEMPLATE.pack_headers, extracted.packs)
+    _sync_dictionary_sheet(workbook, "FX", DEFAULT_TEMPLATE.fx_headers, extracted.fx_presets)
+
     save_workbook(workbook, xlsx)
     typer.secho(f"Workbook updated with project dictionaries -> {xlsx}", fg=typer.colors.GREEN)
 
@@ -472,141 +802,5 @@ def _map_header_to_field(header: str) -> str:
     return mapping.get(header, header.lower().replace(" ", "_"))
 
 
-def _prepare_templates_for_sync(
-    base_dir: Path,
-    telops: Dict[str, Dict[str, Any]],
-    assets: Dict[str, Dict[str, Any]],
-    packs: Dict[str, Dict[str, Any]],
-) -> None:
-    for key, payload in telops.items():
-        _persist_template_payload(base_dir, "telops", key, payload, "overrides", "source")
-
-    for key, payload in assets.items():
-        _persist_template_payload(base_dir, "assets", key, payload, "parameters", "path")
-
-    for key, payload in packs.items():
-        _persist_template_payload(base_dir, "packs", key, payload, "overrides", "source")
-
-
-def _persist_template_payload(
-    base_dir: Path,
-    category: str,
-    identifier: str,
-    payload: Dict[str, Any],
-    data_field: str,
-    path_field: str,
-) -> None:
-    if not isinstance(payload, dict):
-        return
-
-    template_data = payload.get(data_field)
-    if not isinstance(template_data, (dict, list)) or not template_data:
-        return
-
-    template_dir = base_dir / "templates" / category
-    template_dir.mkdir(parents=True, exist_ok=True)
-    template_path = template_dir / f"{_safe_filename(identifier)}.json"
-    template_path.write_text(json.dumps(template_data, ensure_ascii=False, indent=2), encoding="utf-8")
-
-    relative_path = _relative_template_path(template_path, base_dir)
-    payload[path_field] = relative_path
-    payload[data_field] = None
-
-
-def _relative_template_path(path: Path, base_dir: Path) -> str:
-    try:
-        return path.relative_to(base_dir).as_posix()
-    except ValueError:
-        return path.resolve().as_posix()
-
-
-def _safe_filename(identifier: str) -> str:
-    sanitized = identifier.replace("\\", "_").replace("/", "_").replace(":", "_")
-    return sanitized or "template"
-
-
-def _strip_runtime_fields(
-    data: Any,
-    extra_keys: set[str] | None = None,
-    *,
-    preserve_timing: bool = False,
-) -> Any:
-    keys_to_remove = {"Frame", "Length"}
-    if extra_keys:
-        keys_to_remove = keys_to_remove.union(extra_keys)
-
-    def _find_min_frame(node: Any) -> int | None:
-        min_frame: int | None = None
-        if isinstance(node, dict):
-            for key, value in node.items():
-                candidate: int | None = None
-                if key == "Frame" and isinstance(value, (int, float)):
-                    candidate = int(value)
-                else:
-                    candidate = _find_min_frame(value)
-                if candidate is None:
-                    continue
-                if min_frame is None or candidate < min_frame:
-                    min_frame = candidate
-        elif isinstance(node, list):
-            for item in node:
-                candidate = _find_min_frame(item)
-                if candidate is None:
-                    continue
-                if min_frame is None or candidate < min_frame:
-                    min_frame = candidate
-        return min_frame
-
-    base_frame = _find_min_frame(data) if preserve_timing else None
-
-    def _strip(node: Any) -> Any:
-        if isinstance(node, dict):
-            cleaned: dict[str, Any] = {}
-            for key, value in node.items():
-                if key in keys_to_remove:
-                    if not preserve_timing:
-                        continue
-                    if key == "Frame" and isinstance(value, (int, float)):
-                        offset_base = base_frame or 0
-                        cleaned["FrameOffset"] = int(value) - int(offset_base)
-                    elif key == "Length" and isinstance(value, (int, float)):
-                        cleaned["LengthFrames"] = int(value)
-                    continue
-                cleaned[key] = _strip(value)
-            return cleaned
-        if isinstance(node, list):
-            return [_strip(item) for item in node]
-        return node
-
-    return _strip(data)
-
-
-def _hash_template(data: Any) -> str:
-    serialized = json.dumps(data, ensure_ascii=False, sort_keys=True)
-    return md5(serialized.encode("utf-8")).hexdigest()
-
-
-def _looks_like_pack(item: Dict[str, Any]) -> bool:
-    if not isinstance(item, dict):
-        return False
-    if isinstance(item.get("Items"), list) and item["Items"]:
-        return True
-    item_type = item.get("$type", "")
-    return any(keyword in item_type for keyword in ("Group", "Repeat", "Tachie"))
-
-
-def _looks_like_fx(item_type: str) -> bool:
-    if not isinstance(item_type, str):
-        return False
-    candidates = ("Effect", "Zoom", "Shake", "Blur", "Speedline", "Vignette", "Filter")
-    return any(keyword.lower() in item_type.lower() for keyword in candidates)
-
-
-def _infer_fx_type(item_type: str) -> str:
-    if not item_type:
-        return "fx"
-    base = item_type.split(",")[0].split(".")[-1]
-    return base.replace("Item", "").lower() or "fx"
-
 if __name__ == "__main__":
     app()
@@ -0,0 +1,242 @@
+"""Apply filter pipelines to many YMMP files in parallel.
+
+:func:`filter_files` spreads files over a process pool; every worker parses,
+filters and writes one file at a time.  The results are recorded in
+``filter_manifest.json`` in the output directory: per source file the SHA-256
+of its content, the filter specs, the SHA-256 of the written output and the
+number of changed items.  A later run skips files whose content, filters and
+output still match the manifest, so re-running a batch after tuning one
+parameter only rewrites what is affected.  The recorded filters include each
+filter's fingerprint (:meth:`FilterPipeline.fingerprint`), so installing a
+font or fontTools re-filters the files whose telop widths may change.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List
+
+from .filter_stream import DEFAULT_ITEM_TYPES, stream_filter
+from .filters import FilterPipeline, is_portable_filter
+from .text_metrics import save_shared_text_measurer
+from .utils import dump_json
+
+__all__ = ["MANIFEST_NAME", "FileFilterResult", "collect_filter_inputs", "filter_files"]
+
+
+MANIFEST_NAME = "filter_manifest.json"
+DEFAULT_PATTERN = "**/*.ymmp"
+
+
+@dataclass(slots=True)
+class FileFilterResult:
+    """Outcome of filtering one file."""
+
+    source: str
+    target: str
+    status: str  # "filtered", "skipped" or "failed"
+    changed_items: int = 0
+    source_sha256: str | None = None
+    output_sha256: str | None = None
+    filters: str | None = None
+    error: str | None = None
+
+
+def collect_filter_inputs(input_path: Path | str, pattern: str = DEFAULT_PATTERN) -> tuple[Path, List[Path]]:
+    """Return the base directory and the files selected by ``input_path``.
+
+    ``input_path`` is a file, a directory searched with ``pattern``, or a glob
+    pattern itself (``projects/*.ymmp``).
+    """
+
+    path = Path(input_path)
+    if path.is_file():
+        return path.parent, [path]
+    if path.is_dir():
+        return path, sorted(candidate for candidate in path.glob(pattern) if candidate.is_file())
+    anchor = Path(path.anchor) if path.is_absolute() else Path()
+    parts = path.parts[1:] if path.is_absolute() else path.parts
+    base_parts: List[str] = []
+    for part in parts:
+        if any(char in part for char in "*?["):
+            break
+        base_parts.append(part)
+    base = anchor.joinpath(*base_parts)
+    if len(base_parts) == len(parts):
+        # A plain path that does not exist.
+        return path.parent, []
+    relative = Path(*parts[len(base_parts):]).as_posix()
+    return base, sorted(candidate for candidate in base.glob(relative) if candidate.is_file())
+
+
+def filter_files(
+    sources: Iterable[Path | str],
+    base_dir: Path | str,
+    output_dir: Path | str,
+    specs: Iterable[str],
+    *,
+    workers: int | None = None,
+    force: bool = False,
+    stream: bool = False,
+    item_types: Iterable[str] = DEFAULT_ITEM_TYPES,
+) -> List[FileFilterResult]:
+    """Filter ``sources`` into ``output_dir``, keeping their paths below ``base_dir``.
+
+    ``workers`` defaults to the CPU count; ``1`` filters in this process, as
+    do specs naming a filter registered at run time (see
+    :func:`~auto_movie_edit.filters.is_portable_filter`), which pool workers
+    may not know.
+    Unchanged files are skipped unless ``force`` is set.  The manifest is
+    updated with every file that was filtered or skipped.  ``stream`` filters
+    each file with :func:`auto_movie_edit.filter_stream.stream_filter`.
+    """
+
+    specs = list(specs)
+    item_types = tuple(item_types) if stream else ()
+    # Validates the specs up front and gives the canonical key.
+    pipeline = FilterPipeline.from_specs(specs)
+    filters_key = _filters_key(pipeline, item_types)
+    base_dir, output_dir = Path(base_dir), Path(output_dir)
+    if output_dir.resolve() == base_dir.resolve():
+        raise ValueError("The output directory must differ from the input directory")
+    manifest_path = output_dir / MANIFEST_NAME
+    manifest = {} if force else _read_manifest(manifest_path)
+
+    results: Dict[str, FileFilterResult] = {}
+    jobs: List[tuple[str, str, str]] = []
+    for source in sources:
+        source = Path(source)
+        key = source.relative_to(base_dir).as_posix()
+        target = output_dir / key
+        source_hash = _sha256(source)
+        previous = manifest.get(key)
+        if (
+            previous is not None
+            and previous.get("source_sha256") == source_hash
+            and previous.get("filters") == filters_key
+            and target.exists()
+            and previous.get("output_sha256") == _sha256(target)
+        ):
+            results[key] = FileFilterResult(
+                source=str(source),
+                target=str(target),
+                status="skipped",
+                changed_items=int(previous.get("changed_items") or 0),
+                source_sha256=source_hash,
+                output_sha256=previous.get("output_sha256"),
+                filters=filters_key,
+            )
+            continue
+        jobs.append((str(source), str(target), key))
+
+    workers = workers or os.cpu_count() or 1
+    if not all(is_portable_filter(name) for name in pipeline.names):
+        workers = 1
+    if workers <= 1 or len(jobs) <= 1:
+        outcomes = [_filter_file(source, target, specs, item_types, filters_key) for source, target, _ in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as executor:
+            outcomes = list(
+                executor.map(
+                    _filter_file,
+                    [source for source, _, _ in jobs],
+                    [target for _, target, _ in jobs],
+                    [specs] * len(jobs),
+                    [item_types] * len(jobs),
+                    [filters_key] * len(jobs),
+                    chunksize=max(1, len(jobs) // (workers * 4)),
+                )
+            )
+    for (_, _, key), result in zip(jobs, outcomes):
+        results[key] = result
+
+    ordered = [results[key] for key in sorted(results)]
+    _write_manifest(manifest_path, manifest, results)
+    return ordered
+
+
+# ----------------------------------------------------------------------
+# Internal helpers
+# ----------------------------------------------------------------------
+def _filter_file(
+    source: str, target: str, specs: List[str], item_types: tuple[str, ...], filters_key: str
+) -> FileFilterResult:
+    """Filter one file; ``item_types`` selects streaming when it is not empty."""
+
+    result = FileFilterResult(source=source, target=target, status="failed", filters=filters_key)
+    target_path = Path(target)
+    try:
+        # Inside the try: a worker that cannot resolve a filter fails this file only.
+        pipeline = FilterPipeline.from_specs(specs)
+        target_path.parent.mkdir(parents=True, exist_ok=True)
+        if item_types:
+            result.source_sha256 = _sha256(Path(source))
+            streamed = stream_filter(source, target_path, pipeline, item_types=item_types)
+            result.changed_items = streamed.changed_items
+        else:
+            data = Path(source).read_bytes()
+            result.source_sha256 = hashlib.sha256(data).hexdigest()
+            project = json.loads(data.decode("utf-8-sig"))
+            result.changed_items = pipeline.run(project)
+            temporary = target_path.with_name(target_path.name + ".tmp")
+            dump_json(temporary, project)
+            os.replace(temporary, target_path)
+        result.output_sha256 = _sha256(target_path)
+    except Exception as exc:  # noqa: BLE001 - a failing filter fails this file, not the batch
+        result.error = f"{type(exc).__name__}: {exc}"
+        return result
+    finally:
+        # Pool workers exit without running atexit handlers.
+        save_shared_text_measurer()
+    result.status = "filtered"
+    return result
+
+
+def _filters_key(pipeline: FilterPipeline, item_types: tuple[str, ...]) -> str:
+    key = f"{pipeline.key} stream={','.join(item_types)}" if item_types else pipeline.key
+    fingerprint = pipeline.fingerprint()
+    return f"{key} [{fingerprint}]" if fingerprint else key
+
+
+def _sha256(path: Path) -> str:
+    with path.open("rb") as handle:
+        return hashlib.file_digest(handle, "sha256").hexdigest()
+
+
+def _read_manifest(path: Path) -> Dict[str, Dict[str, Any]]:
+    try:
+        data = json.loads(path.read_text("utf-8"))
+    except (FileNotFoundError, ValueError):
+        return {}
+    files = data.get("files") if isinstance(data, dict) else None
+    return files if isinstance(files, dict) else {}
+
+
+def _write_manifest(
+    path: Path, previous: Dict[str, Dict[str, Any]], results: Dict[str, FileFilterResult]
+) -> None:
+    files = dict(previous)
+    for key, result in results.items():
+        if result.status == "failed":
+            files.pop(key, None)
+            continue
+        record = asdict(result)
+        for name in ("source", "target", "status", "error"):
+            record.pop(name)
+        files[key] = record
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary = path.with_name(path.name + ".tmp")
+    dump_json(
+        temporary,
+        {
+            "generated_at": datetime.utcnow().isoformat("T") + "Z",
+            "files": dict(sorted(files.items())),
+        },
+    )
+    os.replace(temporary, path)
@@ -0,0 +1,217 @@
+"""Streaming filter for very large YMMP files.
+
+:func:`stream_filter` scans a project incrementally instead of parsing it
+with ``json.loads``.  Only the objects at ``Timelines[*].Items[*]`` are
+buffered; an item is decoded when its bytes mention one of the requested
+item types (``TextItem`` by default) and re-encoded only when a filter
+changed it.  Everything else, including keyframe arrays, is copied through
+byte for byte, so peak memory is bounded by the largest single item plus
+the read chunk.
+
+Re-encoded items use the indentation of the original item, so a file written
+by ``dump_json`` gives the same bytes as the in-memory pipeline.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Callable, Iterable, List
+
+from .filters import FilterPipeline
+
+__all__ = ["DEFAULT_ITEM_TYPES", "StreamFilterResult", "stream_filter"]
+
+
+DEFAULT_ITEM_TYPES = ("TextItem",)
+CHUNK_SIZE = 1 << 20
+
+_STRUCTURE = re.compile(rb'["\[\]{}]')
+_STRING_END = re.compile(rb'["\\]')
+_NON_SPACE = re.compile(rb"[^ \t\r\n]")
+# Longer keys are never ``Timelines`` or ``Items`` and are not kept for decoding.
+_KEY_LIMIT = 64
+
+
+@dataclass(slots=True)
+class StreamFilterResult:
+    """Counts of one :func:`stream_filter` run."""
+
+    items: int = 0
+    decoded: int = 0
+    changed_items: int = 0
+
+
+def stream_filter(
+    source: Path | str,
+    target: Path | str,
+    pipeline: FilterPipeline | Iterable[str],
+    *,
+    item_types: Iterable[str] = DEFAULT_ITEM_TYPES,
+    chunk_size: int = CHUNK_SIZE,
+) -> StreamFilterResult:
+    """Filter the timeline items of ``source`` into ``target`` without loading the project.
+
+    Items whose ``$type`` contains none of ``item_types`` are never decoded.
+    Filters must return ``False`` for items they leave untouched; any other
+    result re-encodes the item.
+    """
+
+    if not isinstance(pipeline, FilterPipeline):
+        pipeline = FilterPipeline.from_specs(pipeline)
+    item_types = tuple(item_types)
+    needles = [item_type.encode("utf-8") for item_type in item_types]
+    result = StreamFilterResult()
+
+    def on_item(raw: bytes) -> bytes:
+        result.items += 1
+        if not any(needle in raw for needle in needles):
+            return raw
+        item = json.loads(raw)
+        if not isinstance(item, dict) or not any(t in str(item.get("$type", "")) for t in item_types):
+            return raw
+        result.decoded += 1
+        if pipeline.run_item(item) is False:
+            return raw
+        result.changed_items += 1
+        return _encode_like(item, raw)
+
+    target = Path(target)
+    temporary = target.with_name(target.name + ".tmp")
+    with Path(source).open("rb") as reader, temporary.open("wb") as writer:
+        _ItemScanner(reader, writer, on_item, chunk_size).run()
+    os.replace(temporary, target)
+    return result
+
+
+# ----------------------------------------------------------------------
+# Internal helpers
+# ----------------------------------------------------------------------
+class _ItemScanner:
+    """Copies ``reader`` to ``writer``, passing each timeline item through ``on_item``.
+
+    ``buf[mark:]`` holds the bytes not yet written; while an item is being
+    captured ``mark`` stays at its opening brace.  ``token`` is the start of
+    a string that may be a tracked key, kept in the buffer until it is decoded.
+    Every refill writes out and drops what is no longer needed.
+    """
+
+    def __init__(
+        self, reader: BinaryIO, writer: BinaryIO, on_item: Callable[[bytes], bytes], chunk_size: int
+    ) -> None:
+        self.reader, self.writer, self.on_item = reader, writer, on_item
+        self.chunk_size = max(1, chunk_size)
+        self.buf = b""
+        self.pos = self.mark = 0
+        self.token: int | None = None
+        self.capturing, self.capture_depth = False, 0
+        # One entry per open container: [kind, key in parent, last key seen].
+        self.stack: List[list] = []
+
+    def run(self) -> None:
+        stack = self.stack
+        while True:
+            match = _STRUCTURE.search(self.buf, self.pos)
+            if match is None:
+                self.pos = len(self.buf)
+                if not self._fill():
+                    break
+                continue
+            start = match.start()
+            char = self.buf[start]
+            self.pos = start + 1
+            if char == 0x22:  # '"'
+                if stack and stack[-1][0] == 0x7B and len(stack) in (1, 3):
+                    self.token = start
+                    self._skip_string()
+                    key = None if self.token is None else self.buf[self.token : self.pos]
+                    self.token = None
+                    if self._peek() == 0x3A:
+                        stack[-1][2] = None if key is None else json.loads(key)
+                else:
+                    self._skip_string()
+            elif char in (0x7B, 0x5B):  # '{', '['
+                parent_key = stack[-1][2] if stack and stack[-1][0] == 0x7B else None
+                if char == 0x7B and not self.capturing and self._at_item():
+                    self.writer.write(self.buf[self.mark : start])
+                    self.mark, self.capturing, self.capture_depth = start, True, len(stack)
+                stack.append([char, parent_key, None])
+            else:  # '}', ']'
+                if not stack:
+                    raise ValueError("Unbalanced JSON: unexpected closing bracket")
+                stack.pop()
+                if self.capturing and len(stack) == self.capture_depth:
+                    self.writer.write(self.on_item(self.buf[self.mark : self.pos]))
+                    self.mark, self.capturing = self.pos, False
+        if self.capturing or stack:
+            raise ValueError("Truncated JSON: unexpected end of file")
+        self.writer.write(self.buf[self.mark :])
+
+    def _at_item(self) -> bool:
+        stack = self.stack
+        return (
+            len(stack) == 4
+            and stack[0][0] == 0x7B
+            and stack[1][0] == 0x5B
+            and stack[1][1] == "Timelines"
+            and stack[2][0] == 0x7B
+            and stack[3][0] == 0x5B
+            and stack[3][1] == "Items"
+        )
+
+    def _fill(self) -> bool:
+        chunk = self.reader.read(self.chunk_size)
+        if not chunk:
+            return False
+        if self.token is not None and self.pos - self.token > _KEY_LIMIT:
+            self.token = None
+        if not self.capturing:
+            keep = self.pos if self.token is None else self.token
+            self.writer.write(self.buf[self.mark : keep])
+            self.mark = keep
+        offset = self.mark
+        self.buf = self.buf[offset:] + chunk
+        self.pos -= offset
+        self.mark = 0
+        if self.token is not None:
+            self.token -= offset
+        return True
+
+    def _skip_string(self) -> None:
+        while True:
+            match = _STRING_END.search(self.buf, self.pos)
+            if match is None:
+                self.pos = len(self.buf)
+                if not self._fill():
+                    raise ValueError("Truncated JSON: unterminated string")
+                continue
+            if self.buf[match.start()] == 0x22:
+                self.pos = match.end()
+                return
+            # Skip the escaped character, which may be in the next chunk.
+            self.pos = match.start() + 2
+            while self.pos > len(self.buf):
+                if not self._fill():
+                    raise ValueError("Truncated JSON: unterminated string")
+
+    def _peek(self) -> int | None:
+        while True:
+            match = _NON_SPACE.search(self.buf, self.pos)
+            if match is not None:
+                return self.buf[match.start()]
+            if not self._fill():
+                return None
+
+
+def _encode_like(item: dict, raw: bytes) -> bytes:
+    """Encode ``item`` with the layout of the original ``raw`` object."""
+
+    closing_line = raw.rfind(b"\n")
+    if closing_line < 0:
+        return json.dumps(item, ensure_ascii=False).encode("utf-8")
+    indent = raw[closing_line + 1 : -1].decode("utf-8")
+    text = json.dumps(item, ensure_ascii=False, indent=2)
+    return text.replace("\n", "\n" + indent).encode("utf-8")
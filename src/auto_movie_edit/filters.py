@@ -0,0 +1,410 @@
+"""Post-processing filters applied to generated YMMP projects.
+
+Filters are registered by name.  A filter factory takes the optional argument
+of a filter spec (``"hira-shrink:0.85"`` → ``"0.85"``) and returns a callable
+that updates one timeline item in place and returns ``True`` when it changed
+the item (the count is only used for summaries).  :class:`FilterPipeline` runs any
+number of filters over the items in a single pass, either on the project of
+a ``build`` before it is written or on a file parsed once by ``filter``.
+
+Third-party packages register filters through the ``auto_movie_edit.filters``
+entry point group; each entry point loads a filter factory.
+
+A filter whose output depends on more than its argument (installed fonts,
+for instance) sets a ``fingerprint`` attribute on the returned callable: a
+function returning a short string that changes with those inputs.  Batch
+runs record it so that changed inputs are not mistaken for unchanged output.
+
+This module only depends on the standard library so that ``filter`` commands
+start without loading the workbook, language or proposal machinery.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+from collections.abc import Callable, Iterable, Mapping
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from .utils import contains_hiragana, count_hiragana, dump_json
+
+if TYPE_CHECKING:  # pragma: no cover - type checking only
+    from .text_metrics import TextMeasurer
+
+__all__ = [
+    "FILTER_ENTRY_POINT_GROUP",
+    "FilterPipeline",
+    "apply_filters",
+    "apply_hiragana_shrink",
+    "available_filters",
+    "get_filter",
+    "hiragana_shrink",
+    "is_portable_filter",
+    "parse_filter_spec",
+    "register_filter",
+]
+
+
+ItemFilter = Callable[[dict[str, Any]], bool | None]
+FilterFactory = Callable[[str | None], ItemFilter]
+
+FILTER_ENTRY_POINT_GROUP = "auto_movie_edit.filters"
+DEFAULT_HIRAGANA_SCALE = 0.85
+
+_REGISTRY: dict[str, FilterFactory] = {}
+# Factories a freshly started process registers too: built-ins and entry points.
+_PORTABLE: dict[str, FilterFactory] = {}
+_entry_points_loaded = False
+
+
+def register_filter(name: str, factory: FilterFactory | None = None) -> Any:
+    """Register ``factory`` under ``name``; usable as a decorator."""
+
+    def _register(factory: FilterFactory) -> FilterFactory:
+        _REGISTRY[name.lower()] = factory
+        return factory
+
+    return _register(factory) if factory is not None else _register
+
+
+def available_filters() -> list[str]:
+    """Return the names of all registered filters, including entry points."""
+
+    _load_entry_points()
+    return sorted(_REGISTRY)
+
+
+def get_filter(name: str) -> FilterFactory:
+    """Return the factory registered as ``name``."""
+
+    key = name.lower()
+    if key not in _REGISTRY:
+        _load_entry_points()
+    try:
+        return _REGISTRY[key]
+    except KeyError:
+        raise ValueError(f"Unknown filter: {name}") from None
+
+
+def is_portable_filter(name: str) -> bool:
+    """Return ``True`` if a new process resolves ``name`` to the same factory.
+
+    Built-in and entry point filters are portable; filters passed to
+    :func:`register_filter` at run time are not, so process pools started
+    with ``spawn`` (the default on Windows and macOS) do not know them.
+    """
+
+    return _PORTABLE.get(name.lower()) is get_filter(name)
+
+
+def _load_entry_points() -> None:
+    global _entry_points_loaded
+    if _entry_points_loaded:
+        return
+    _entry_points_loaded = True
+    from importlib.metadata import entry_points
+
+    for entry_point in entry_points(group=FILTER_ENTRY_POINT_GROUP):
+        # Built-in and explicitly registered filters take precedence.
+        name = entry_point.name.lower()
+        if name not in _REGISTRY:
+            _REGISTRY[name] = _PORTABLE[name] = entry_point.load()
+
+
+def parse_filter_spec(spec: str) -> tuple[str, str | None]:
+    """Split ``"name:argument"`` into the filter name and its argument."""
+
+    name, separator, argument = spec.partition(":")
+    if not name.strip():
+        raise ValueError(f"Invalid filter spec: {spec!r}")
+    return name.strip().lower(), argument.strip() if separator else None
+
+
+class FilterPipeline:
+    """Filters applied to every timeline item of a project in one pass."""
+
+    def __init__(self, filters: Iterable[tuple[str, ItemFilter]] = (), specs: Iterable[str] | None = None) -> None:
+        self.filters = list(filters)
+        self.specs = list(specs) if specs is not None else [name for name, _ in self.filters]
+
+    @classmethod
+    def from_specs(cls, specs: Iterable[str]) -> "FilterPipeline":
+        """Build a pipeline from ``name[:argument]`` specs, in order."""
+
+        filters, canonical = [], []
+        for spec in specs:
+            name, argument = parse_filter_spec(spec)
+            filters.append((name, get_filter(name)(argument)))
+            canonical.append(name if argument is None else f"{name}:{argument}")
+        return cls(filters, canonical)
+
+    @property
+    def names(self) -> list[str]:
+        return [name for name, _ in self.filters]
+
+    def __bool__(self) -> bool:
+        return bool(self.filters)
+
+    @property
+    def key(self) -> str:
+        """Canonical description of the filters and their arguments."""
+
+        return " ".join(self.specs)
+
+    def fingerprint(self) -> str:
+        """Describe the inputs besides the specs that the filters depend on."""
+
+        parts = []
+        for name, item_filter in self.filters:
+            fingerprint = getattr(item_filter, "fingerprint", None)
+            if fingerprint is not None:
+                parts.append(f"{name}={fingerprint()}")
+        return " ".join(parts)
+
+    def apply(self, project: dict[str, Any]) -> dict[str, Any]:
+        """Run the filters over ``project`` in place and return it."""
+
+        self.run(project)
+        return project
+
+    def run(self, project: dict[str, Any]) -> int:
+        """Run the filters over ``project`` in place; return the changed item count."""
+
+        changed = 0
+        if not self.filters:
+            return changed
+        for timeline in project.get("Timelines", []):
+            for item in timeline.get("Items", []):
+                changed += bool(self.run_item(item))
+        return changed
+
+    def run_item(self, item: dict[str, Any]) -> bool | None:
+        """Run the filters over one item.
+
+        Returns ``True`` if a filter changed it, ``False`` if every filter
+        reported it unchanged and ``None`` if a filter did not say.
+        """
+
+        changed: bool | None = False
+        for _, item_filter in self.filters:
+            outcome = item_filter(item)
+            if outcome:
+                changed = True
+            elif outcome is None and changed is False:
+                changed = None
+        return changed
+
+
+def apply_filters(
+    project_path: str | Path, output_path: str | Path, pipeline: FilterPipeline | Iterable[str]
+) -> dict[str, Any]:
+    """Parse ``project_path`` once, run ``pipeline`` and write ``output_path``."""
+
+    if not isinstance(pipeline, FilterPipeline):
+        pipeline = FilterPipeline.from_specs(pipeline)
+    project = json.loads(Path(project_path).read_text("utf-8-sig"))
+    pipeline.apply(project)
+    dump_json(output_path, project)
+    return project
+
+
+def _first_numeric_value(data: Any, default: float = 100.0) -> float:
+    if isinstance(data, Mapping):
+        values = data.get("Values")
+        if isinstance(values, list):
+            for entry in values:
+                if isinstance(entry, Mapping):
+                    candidate = entry.get("Value")
+                    if isinstance(candidate, (int, float)):
+                        return float(candidate)
+        candidate = data.get("Value")
+        if isinstance(candidate, (int, float)):
+            return float(candidate)
+    elif isinstance(data, (int, float)):
+        return float(data)
+    elif isinstance(data, list):
+        for entry in data:
+            if isinstance(entry, Mapping):
+                candidate = entry.get("Value")
+                if isinstance(candidate, (int, float)):
+                    return float(candidate)
+            elif isinstance(entry, (int, float)):
+                return float(entry)
+    return default
+
+
+def _estimate_text_layout(item: Mapping[str, Any]) -> tuple[int, int, int]:
+    text = str(item.get("Text", ""))
+    lines = [line for line in text.splitlines() if line.strip()]
+    if not lines:
+        lines = [text.strip()] if text.strip() else [text]
+    line_count = max(1, len(lines))
+    longest_line = max((len(line) for line in lines), default=len(text))
+    total_chars = sum(len(line) for line in lines) or len(text)
+    return line_count, longest_line, total_chars
+
+
+def _font_name(item: Mapping[str, Any]) -> str | None:
+    font = item.get("Font")
+    return font if isinstance(font, str) and font.strip() else None
+
+
+def _determine_hiragana_scale(
+    item: Mapping[str, Any], base_scale: float, measurer: "TextMeasurer | None" = None
+) -> float:
+    """Return the zoom factor for a telop.
+
+    The line width comes from ``measurer`` (real glyph advances of the item's
+    ``Font``) when given, otherwise from an average advance of 0.62 em.
+    """
+    text = str(item.get("Text", ""))
+    if not text.strip():
+        return min(1.0, max(base_scale, 0.6))
+
+    line_count, longest_line, total_chars = _estimate_text_layout(item)
+    hira_count = count_hiragana(text)
+    effective_chars = max(1, total_chars)
+    hira_ratio = hira_count / effective_chars
+
+    shrink_strength = math.pow(hira_ratio, 0.7)
+    dynamic_scale = 1 - (1 - base_scale) * shrink_strength
+
+    font_size = _first_numeric_value(item.get("FontSize"), default=100.0)
+    base_zoom = _first_numeric_value(item.get("Zoom"), default=100.0)
+    if measurer is not None:
+        text_width = measurer.text_width(text, _font_name(item), font_size)
+    else:
+        text_width = font_size * 0.62 * max(1, longest_line)
+    approx_width = text_width * (base_zoom / 100.0)
+    target_width = 1080 * 0.9  # assume portrait 1080x1920 canvas
+    if target_width > 0:
+        width_ratio = approx_width / target_width
+        if width_ratio > 1.0:
+            dynamic_scale = min(dynamic_scale, 1.0 / width_ratio)
+        else:
+            slack = 1.0 - width_ratio
+            if slack > 0.15:
+                dynamic_scale = min(1.0, dynamic_scale + slack * 0.35)
+
+    if line_count > 2:
+        dynamic_scale *= 0.98 ** (line_count - 2)
+    elif line_count == 1 and longest_line <= 6:
+        dynamic_scale = min(1.0, dynamic_scale + 0.05)
+
+    return max(0.55, min(dynamic_scale, 1.0))
+
+
+def _determine_zoom_base(zoom_data: Any, default: float = 100.0) -> float:
+    if isinstance(zoom_data, Mapping):
+        values = zoom_data.get("Values")
+        if isinstance(values, list) and values:
+            base_value = _first_numeric_value(values, default=default)
+        else:
+            base_value = _first_numeric_value(zoom_data, default=default)
+    elif isinstance(zoom_data, (int, float)):
+        base_value = float(zoom_data)
+    else:
+        base_value = default
+
+    if base_value == 0:
+        return default
+    return base_value
+
+
+def _zoom_entry_ratio(entry: Any, base_value: float) -> float:
+    if not base_value:
+        return 1.0
+
+    candidate: Any
+    if isinstance(entry, Mapping):
+        candidate = entry.get("Value")
+    else:
+        candidate = entry
+
+    if isinstance(candidate, (int, float)) and base_value:
+        return float(candidate) / base_value
+    return 1.0
+
+
+def _scale_zoom_entry(entry: Any, base_value: float, scaled_base: float) -> dict[str, Any]:
+    ratio = _zoom_entry_ratio(entry, base_value)
+    updated = dict(entry) if isinstance(entry, Mapping) else {"Value": entry}
+    updated["Value"] = round(scaled_base * ratio, 4)
+    return updated
+
+
+def _apply_zoom_scale(zoom_data: Any, base_value: float, dynamic_scale: float) -> Any:
+    scaled_base = base_value * dynamic_scale
+
+    if isinstance(zoom_data, Mapping):
+        values = zoom_data.get("Values")
+        if isinstance(values, list) and values:
+            updated = dict(zoom_data)
+            updated["Values"] = [
+                _scale_zoom_entry(entry, base_value, scaled_base) for entry in values
+            ]
+            return updated
+
+        candidate = zoom_data.get("Value")
+        if isinstance(candidate, (int, float)):
+            ratio = _zoom_entry_ratio(candidate, base_value)
+            updated = dict(zoom_data)
+            updated["Value"] = round(scaled_base * ratio, 4)
+            return updated
+
+        return zoom_data
+
+    if isinstance(zoom_data, (int, float)):
+        ratio = _zoom_entry_ratio(zoom_data, base_value)
+        return round(scaled_base * ratio, 4)
+
+    return zoom_data
+
+
+def hiragana_shrink(
+    scale: float = DEFAULT_HIRAGANA_SCALE, measurer: "TextMeasurer | None" = None
+) -> ItemFilter:
+    """Return a filter shrinking the zoom of telops that contain hiragana.
+
+    Widths are measured with ``measurer`` (default: the shared, disk-cached
+    :class:`~auto_movie_edit.text_metrics.TextMeasurer`).
+    """
+
+    if measurer is None:
+        from .text_metrics import shared_text_measurer
+
+        measurer = shared_text_measurer()
+
+    def _shrink(item: dict[str, Any]) -> bool:
+        if "TextItem" in item.get("$type", "") and contains_hiragana(item.get("Text")):
+            zoom_block = item.get("Zoom")
+            if zoom_block is None:
+                return False
+
+            base_value = _determine_zoom_base(zoom_block)
+            dynamic_scale = _determine_hiragana_scale(item, scale, measurer)
+            item["Zoom"] = _apply_zoom_scale(zoom_block, base_value, dynamic_scale)
+            return item["Zoom"] != zoom_block
+        return False
+
+    _shrink.fingerprint = measurer.fingerprint  # type: ignore[attr-defined]
+    return _shrink
+
+
+@register_filter("hira-shrink")
+def _hiragana_shrink_factory(argument: str | None) -> ItemFilter:
+    if not argument:
+        return hiragana_shrink()
+    try:
+        return hiragana_shrink(float(argument))
+    except ValueError:
+        raise ValueError(f"hira-shrink expects a numeric scale, got {argument!r}") from None
+
+
+_PORTABLE.update(_REGISTRY)
+
+
+def apply_hiragana_shrink(project_path: str | Path, output_path: str | Path, scale: float):
+    apply_filters(project_path, output_path, FilterPipeline([("hira-shrink", hiragana_shrink(scale))]))
+
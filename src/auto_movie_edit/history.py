@@ -2,10 +2,20 @@
 
 from __future__ import annotations
 
+import gzip
+import io
 import json
 from dataclasses import dataclass
+from datetime import date, datetime
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Tuple
+from typing import IO, Any, Dict, FrozenSet, Iterable, Iterator, List, Tuple
+
+# Per-day history file and its compressed archives (see :mod:`.history_archive`).
+HISTORY_FILE_NAME = "history.jsonl"
+ARCHIVE_SUFFIXES = (".gz", ".zst")
+HISTORY_FILE_NAMES = (HISTORY_FILE_NAME,) + tuple(HISTORY_FILE_NAME + suffix for suffix in ARCHIVE_SUFFIXES)
+
+_zstd: Any = None
 
 
 @dataclass
@@ -54,6 +64,12 @@ WARNING_HINTS: List[Tuple[str, str, str]] = [
         "立ち絵差分未設定",
         "対象キャラクターに必要な表情差分が登録されていません。差分パスを設定してください。",
     ),
+    (
+        "Tachie expression",
+        "立ち絵差分ファイル欠損",
+        "指定した表情差分のファイルが見つからず、代替の差分を使用したか省略しました。"
+        " 差分ファイル名とキャラクターの素材フォルダを確認してください。",
+    ),
     (
         "Unknown tachie part",
         "未知の立ち絵パーツ",
@@ -107,92 +123,441 @@ WARNING_HINTS: List[Tuple[str, str, str]] = [
 ]
 
 
+# Stable warning codes emitted by ``ProjectBuilder`` -> (category label, message
+# template).  History stores a warning as its code and structured fields; the
+# message is rebuilt from the template (``None`` means the message is stored).
+WARNING_CODES: Dict[str, Tuple[str, str | None]] = {
+    "template.unresolved_path": (
+        "未解決テンプレートパス",
+        "Unresolved template path for role '{role}': {identifier}",
+    ),
+    "layer.band_overflow": (
+        "レイヤ帯オーバーフロー",
+        "Layer band overflow at band {band} for role '{role}'",
+    ),
+    "telop.not_found": ("未登録テロップID", "Telop pattern not found: {identifier}"),
+    "telop.build_error": ("テロップ生成エラー", None),
+    "character.not_found": ("キャラクター未登録", "Character not found: {identifier}"),
+    "character.no_expressions": (
+        "立ち絵差分未設定",
+        "No expressions provided for character '{identifier}'",
+    ),
+    "tachie.expression_fallback": ("立ち絵差分ファイル欠損", None),
+    "tachie.expression_reused": ("立ち絵差分ファイル欠損", None),
+    "tachie.expression_missing": ("立ち絵差分ファイル欠損", None),
+    "tachie.unknown_part": ("未知の立ち絵パーツ", "Unknown tachie part: {part}"),
+    "tachie.base_path_missing": (
+        "立ち絵テンプレート欠損",
+        "Tachie base path missing for part '{part}' of character '{identifier}'",
+    ),
+    "tachie.build_error": ("立ち絵生成エラー", None),
+    "pack.not_found": ("パック未登録", "Pack not found: {identifier}"),
+    "pack.no_template": ("パックテンプレート不備", "Pack '{identifier}' has no template data"),
+    "pack.unsupported_format": (
+        "パックテンプレート不備",
+        "Unsupported pack template format for '{identifier}'",
+    ),
+    "pack.no_items": ("パックテンプレート不備", "Pack '{identifier}' has no items"),
+    "pack.build_error": ("パックテンプレート不備", None),
+    "asset.not_found": ("オブジェクト未登録", "Asset not found: {identifier}"),
+    "asset.no_parameters": (
+        "オブジェクトテンプレート不備",
+        "Asset '{identifier}' has no template parameters",
+    ),
+    "asset.build_error": ("オブジェクトテンプレート不備", None),
+    "fx.preset_not_found": ("FXプリセット未登録", "FX preset not found: {identifier}"),
+    "fx.missing_pack": ("FXプリセット設定不備", None),
+    "fx.asset_unresolved": ("FXプリセット設定不備", None),
+    "fx.no_source": ("FXプリセット設定不備", "FX preset '{identifier}' has no source or asset"),
+    "fx.unknown_override": ("FX上書き不整合", None),
+    "fx.no_base_parameters": (
+        "FX上書き不整合",
+        "FX '{identifier}' has no base parameters but overrides were provided",
+    ),
+}
+
+# Structured fields a warning may carry besides its code and message.
+WARNING_FIELDS = ("identifier", "part", "role", "band")
+
+OTHER_WARNING_CODE = "other"
+OTHER_WARNING_LABEL = "その他の警告"
+OTHER_WARNING_HINT = "詳細は history.jsonl のメッセージを直接確認してください。"
+
+# Reversed so that the first hint listed for a label wins.
+_HINTS_BY_LABEL: Dict[str, str] = {label: hint for _, label, hint in reversed(WARNING_HINTS)}
+
+
+@dataclass(frozen=True)
+class HistoryFilter:
+    """Selects history entries while they are streamed.
+
+    ``since`` and ``until`` are inclusive and compared with the ``YYYYMMDD``
+    directory a ``history.jsonl`` lives in, so files outside the range are
+    never opened.  The other criteria match entry fields; an entry must satisfy
+    every criterion that is set, and any of the values given for it.
+    ``warning_categories`` takes warning codes or category labels.
+    """
+
+    since: date | None = None
+    until: date | None = None
+    rows: FrozenSet[int] | None = None
+    telops: FrozenSet[str] | None = None
+    packs: FrozenSet[str] | None = None
+    fx_ids: FrozenSet[str] | None = None
+    warning_categories: FrozenSet[str] | None = None
+
+    @property
+    def has_date_range(self) -> bool:
+        return self.since is not None or self.until is not None
+
+    def accepts_day(self, day: date | None) -> bool:
+        """Return ``True`` if history recorded on ``day`` may match."""
+
+        if not self.has_date_range:
+            return True
+        if day is None:
+            return False
+        if self.since is not None and day < self.since:
+            return False
+        if self.until is not None and day > self.until:
+            return False
+        return True
+
+    def matches(self, entry: Dict[str, Any]) -> bool:
+        """Return ``True`` if ``entry`` satisfies every configured criterion."""
+
+        if self.rows is not None:
+            try:
+                row_index = int(_entry_row(entry))
+            except (TypeError, ValueError):
+                return False
+            if row_index not in self.rows:
+                return False
+        if self.telops is not None and entry.get("telop") not in self.telops:
+            return False
+        if self.packs is not None:
+            packs = entry.get("packs") or []
+            if not isinstance(packs, list) or self.packs.isdisjoint(packs):
+                return False
+        if self.fx_ids is not None:
+            fx_ids = {fx.get("fx_id") for fx in entry.get("fx") or [] if isinstance(fx, dict)}
+            if self.fx_ids.isdisjoint(fx_ids):
+                return False
+        if self.warning_categories is not None:
+            keys = set()
+            for code, label, _ in _entry_warnings(entry):
+                keys.update((code, label))
+            if self.warning_categories.isdisjoint(keys):
+                return False
+        return True
+
+
+def parse_history_date(value: str) -> date:
+    """Parse ``YYYYMMDD`` or ``YYYY-MM-DD`` into a :class:`~datetime.date`."""
+
+    text = value.strip()
+    for pattern in ("%Y%m%d", "%Y-%m-%d"):
+        try:
+            return datetime.strptime(text, pattern).date()
+        except ValueError:
+            continue
+    raise ValueError(f"Invalid date (expected YYYYMMDD or YYYY-MM-DD): {value}")
+
+
+def iter_history_files(
+    history_path: Path,
+    latest_only: bool = False,
+    history_filter: HistoryFilter | None = None,
+) -> Iterator[Path]:
+    """Yield the ``history.jsonl`` files below ``history_path`` in date order.
+
+    Compressed archives (``history.jsonl.gz`` / ``.zst``) are included and
+    come before a plain file of the same day.  A file path is yielded as is.
+    Directories whose ``YYYYMMDD`` name falls outside the filter's date range
+    are skipped without being read.
+    """
+
+    if history_path.is_file():
+        yield history_path
+        return
+    history_filter = history_filter or HistoryFilter()
+    jsonl_files = sorted(
+        (
+            path
+            for path in history_path.glob(f"**/{HISTORY_FILE_NAME}*")
+            if path.name in HISTORY_FILE_NAMES and history_filter.accepts_day(_history_day(path))
+        ),
+        key=lambda path: (path.parent, path.name == HISTORY_FILE_NAME, path.name),
+    )
+    if latest_only and jsonl_files:
+        jsonl_files = [max(jsonl_files, key=lambda path: path.stat().st_mtime)]
+    yield from jsonl_files
+
+
+def iter_history_entries(
+    history_path: Path,
+    latest_only: bool = False,
+    history_filter: HistoryFilter | None = None,
+    errors: List[str] | None = None,
+) -> Iterator[Dict[str, Any]]:
+    """Stream the entries of ``history_path`` line by line.
+
+    Only one line is held in memory at a time.  Entries rejected by
+    ``history_filter`` are dropped; unreadable files and malformed lines are
+    reported through ``errors`` when a list is given.
+    """
+
+    if not history_path.exists():
+        if errors is not None:
+            errors.append(f"History path not found: {history_path}")
+        return
+
+    for jsonl_file in iter_history_files(history_path, latest_only, history_filter):
+        try:
+            handle = open_history_file(jsonl_file)
+        except (OSError, RuntimeError) as exc:
+            if errors is not None:
+                errors.append(f"{jsonl_file}: {exc}")
+            continue
+        with handle:
+            for line_number, line in enumerate(_read_lines(handle, jsonl_file, errors), start=1):
+                stripped = line.strip()
+                if not stripped:
+                    continue
+                try:
+                    entry = json.loads(stripped)
+                except json.JSONDecodeError as exc:
+                    if errors is not None:
+                        errors.append(f"{jsonl_file}:{line_number} JSON decode error: {exc}")
+                    continue
+                if history_filter is None or history_filter.matches(entry):
+                    yield entry
+
+
+def open_history_file(path: Path) -> IO[str]:
+    """Open a history file for reading text, decompressing archives on the fly."""
+
+    if path.suffix == ".gz":
+        return gzip.open(path, "rt", encoding="utf-8")
+    if path.suffix == ".zst":
+        zstandard = _load_zstandard()
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read .zst history archives")
+        raw = path.open("rb")
+        try:
+            reader = zstandard.ZstdDecompressor().stream_reader(raw, closefd=True)
+        except Exception:
+            raw.close()
+            raise
+        return io.TextIOWrapper(reader, encoding="utf-8")
+    return path.open("r", encoding="utf-8")
+
+
 def load_history_entries(history_path: Path, latest_only: bool = False) -> HistoryLoadResult:
     """Load history entries from ``history_path``.
 
     ``history_path`` can be either a directory containing dated folders or a jsonl file.
     When ``latest_only`` is ``True``, only the most recently modified jsonl file is read.
+    Prefer :func:`iter_history_entries` for large histories.
     """
 
-    entries: List[Dict[str, Any]] = []
     errors: List[str] = []
+    entries = list(iter_history_entries(history_path, latest_only=latest_only, errors=errors))
+    return HistoryLoadResult(entries=entries, errors=errors)
 
-    if not history_path.exists():
-        return HistoryLoadResult(entries=[], errors=[f"History path not found: {history_path}"])
 
-    jsonl_files: List[Path]
-    if history_path.is_file():
-        jsonl_files = [history_path]
-    else:
-        jsonl_files = sorted(history_path.glob("**/history.jsonl"))
-        if latest_only and jsonl_files:
-            latest_file = max(jsonl_files, key=lambda path: path.stat().st_mtime)
-            jsonl_files = [latest_file]
-
-    for jsonl_file in jsonl_files:
-        try:
-            text = jsonl_file.read_text(encoding="utf-8")
-        except OSError as exc:  # pragma: no cover - unlikely, but defensive.
-            errors.append(f"{jsonl_file}: {exc}")
-            continue
+def warning_hint(label: str) -> str:
+    """Return the remediation hint for a warning category label."""
 
-        for line_number, line in enumerate(text.splitlines(), start=1):
-            stripped = line.strip()
-            if not stripped:
-                continue
-            try:
-                entries.append(json.loads(stripped))
-            except json.JSONDecodeError as exc:
-                errors.append(f"{jsonl_file}:{line_number} JSON decode error: {exc}")
+    return _HINTS_BY_LABEL.get(label, OTHER_WARNING_HINT)
 
-    return HistoryLoadResult(entries=entries, errors=errors)
+
+def warning_labels(keys: Iterable[str]) -> FrozenSet[str]:
+    """Map warning codes in ``keys`` to their category labels; labels pass through."""
+
+    return frozenset(WARNING_CODES[key][0] if key in WARNING_CODES else key for key in keys)
+
+
+def warning_record(code: str, message: str, **fields: Any) -> Dict[str, Any]:
+    """Return the compact history form of a warning.
+
+    Only the code and the fields that are set are kept; the message is added
+    when it cannot be rebuilt from the code's template.
+    """
+
+    record: Dict[str, Any] = {"code": code}
+    record.update((name, value) for name, value in fields.items() if value is not None)
+    if render_warning(record) != message:
+        record["message"] = message
+    return record
+
+
+def render_warning(record: Dict[str, Any]) -> str:
+    """Return the message of a structured warning ``record``."""
+
+    message = record.get("message")
+    if isinstance(message, str):
+        return message
+    _, template = WARNING_CODES.get(record.get("code"), (None, None))
+    if template is None:
+        return ""
+    try:
+        return template.format(**{name: record[name] for name in WARNING_FIELDS if name in record})
+    except KeyError:
+        return ""
+
+
+def describe_warning(warning: Any) -> Tuple[str | None, str, str] | None:
+    """Return ``(code, category label, message)`` for a history warning.
+
+    Structured records are resolved through :data:`WARNING_CODES`; plain
+    strings from older history files (and uncoded warnings) fall back to
+    :func:`classify_warning`.  Returns ``None`` for values that are not warnings.
+    """
+
+    if isinstance(warning, dict):
+        code = warning.get("code")
+        if not isinstance(code, str):
+            return None
+        message = render_warning(warning)
+        if code in WARNING_CODES:
+            return code, WARNING_CODES[code][0], message
+        return code, classify_warning(message)[0], message
+    if isinstance(warning, str):
+        return None, classify_warning(warning)[0], warning
+    return None
 
 
 def classify_warning(message: str) -> Tuple[str, str]:
-    """Return a tuple of (label, hint) for the provided warning message."""
+    """Return a tuple of (label, hint) for the provided warning message.
+
+    Only needed for history written before warnings carried codes.
+    """
 
     lowered = message.lower()
     for keyword, label, hint in WARNING_HINTS:
         if keyword.lower() in lowered:
             return label, hint
-    return "その他の警告", "詳細は history.jsonl のメッセージを直接確認してください。"
+    return OTHER_WARNING_LABEL, OTHER_WARNING_HINT
 
 
-def summarize_warnings(entries: Iterable[Dict[str, Any]]) -> List[WarningSummary]:
-    """Aggregate warning counts and provide hints for remediation."""
+class WarningAggregator:
+    """Accumulates warning counts from streamed history entries.
 
-    summary: Dict[str, Dict[str, Any]] = {}
+    Memory does not grow with the number of entries: per category only the
+    count, the number of entries and ``sample_limit`` row numbers and messages
+    (the smallest ones, as they sort in the summary) are kept.  ``None`` keeps
+    every distinct row and message.
+    """
 
-    for entry in entries:
-        warnings = entry.get("warnings") or []
-        if not isinstance(warnings, list):
-            continue
-        row_index = entry.get("row_index") or entry.get("row") or entry.get("rowIndex")
-        for warning in warnings:
-            if not isinstance(warning, str):
-                continue
-            label, hint = classify_warning(warning)
-            data = summary.setdefault(
-                label,
-                {"label": label, "count": 0, "hint": hint, "rows": set(), "messages": set()},
-            )
+    def __init__(self, sample_limit: int | None = None) -> None:
+        self.sample_limit = sample_limit
+        self.entries = 0
+        self._summary: Dict[str, Dict[str, Any]] = {}
+
+    def add(self, entry: Dict[str, Any]) -> None:
+        """Count the warnings of one history entry."""
+
+        self.entries += 1
+        row_index = _entry_row(entry)
+        for _, label, warning in _entry_warnings(entry):
+            data = self._summary.get(label)
+            if data is None:
+                data = self._summary[label] = {
+                    "label": label,
+                    "count": 0,
+                    "hint": warning_hint(label),
+                    "rows": set(),
+                    "messages": set(),
+                }
             data["count"] += 1
-            data["messages"].add(warning)
+            self._sample(data["messages"], warning)
             if row_index is not None:
-                data["rows"].add(str(row_index))
-
-    ordered: List[WarningSummary] = []
-    for data in summary.values():
-        ordered.append(
-            {
-                "label": data["label"],
-                "count": data["count"],
-                "hint": data["hint"],
-                "rows": sorted(data["rows"]),
-                "messages": sorted(data["messages"]),
-            }
-        )
-
-    ordered.sort(key=lambda item: item["count"], reverse=True)
-    return ordered
+                self._sample(data["rows"], str(row_index))
+
+    def add_all(self, entries: Iterable[Dict[str, Any]]) -> "WarningAggregator":
+        """Count every entry of ``entries`` and return ``self``."""
+
+        for entry in entries:
+            self.add(entry)
+        return self
+
+    def results(self) -> List[WarningSummary]:
+        """Return the summaries ordered by descending count."""
+
+        ordered: List[WarningSummary] = []
+        for data in self._summary.values():
+            ordered.append(
+                {
+                    "label": data["label"],
+                    "count": data["count"],
+                    "hint": data["hint"],
+                    "rows": sorted(data["rows"])[: self.sample_limit],
+                    "messages": sorted(data["messages"])[: self.sample_limit],
+                }
+            )
+
+        ordered.sort(key=lambda item: item["count"], reverse=True)
+        return ordered
+
+    def _sample(self, values: set, value: str) -> None:
+        values.add(value)
+        limit = self.sample_limit
+        if limit is not None and len(values) > 2 * limit + 1:
+            kept = sorted(values)[:limit]
+            values.clear()
+            values.update(kept)
+
+
+def summarize_warnings(
+    entries: Iterable[Dict[str, Any]], sample_limit: int | None = None
+) -> List[WarningSummary]:
+    """Aggregate warning counts and provide hints for remediation.
+
+    ``entries`` is consumed as a stream (see :class:`WarningAggregator`).
+    """
+
+    return WarningAggregator(sample_limit).add_all(entries).results()
+
+
+# ----------------------------------------------------------------------
+# Internal helpers
+# ----------------------------------------------------------------------
+def _entry_row(entry: Dict[str, Any]) -> Any:
+    return entry.get("row_index") or entry.get("row") or entry.get("rowIndex")
+
+
+def _entry_warnings(entry: Dict[str, Any]) -> List[Tuple[str | None, str, str]]:
+    warnings = entry.get("warnings") or []
+    if not isinstance(warnings, list):
+        return []
+    described = (describe_warning(warning) for warning in warnings)
+    return [item for item in described if item is not None]
+
+
+def _read_lines(handle: IO[str], path: Path, errors: List[str] | None) -> Iterator[str]:
+    try:
+        yield from handle
+    except (OSError, EOFError, UnicodeDecodeError) as exc:
+        # A truncated or damaged archive keeps the entries read so far.
+        if errors is not None:
+            errors.append(f"{path}: {exc}")
+
+
+def _load_zstandard() -> Any:
+    global _zstd
+    if _zstd is None:
+        try:
+            import zstandard
+        except ImportError:  # pragma: no cover - optional dependency
+            _zstd = False
+        else:  # pragma: no cover - optional dependency
+            _zstd = zstandard
+    return _zstd or None
+
 
+def _history_day(path: Path) -> date | None:
+    try:
+        return datetime.strptime(path.parent.name, "%Y%m%d").date()
+    except ValueError:
+        return None
@@ -0,0 +1,161 @@
+"""Compression and retention of past history days.
+
+Builds append to ``history/<YYYYMMDD>/history.jsonl``.  :func:`rotate_history`
+compresses the files of days before today into ``history.jsonl.zst`` (when
+the optional ``zstandard`` package is installed) or ``history.jsonl.gz`` and
+removes days older than the retention period.  Readers
+(:func:`auto_movie_edit.history.iter_history_entries`) decompress archives
+transparently, so rotation is invisible to ``history-feedback``, ``history
+import`` and ``model learn``.
+
+Compression runs under the same lock builds use to append, so no entry is
+lost when a late build writes to a day that is being archived; its lines are
+added to the archive by the next rotation.
+"""
+
+from __future__ import annotations
+
+import gzip
+import os
+import shutil
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+from .history import HISTORY_FILE_NAME, HISTORY_FILE_NAMES, _history_day, _load_zstandard
+from .locking import LockTimeout, file_lock
+
+__all__ = ["CODECS", "HistoryRotation", "compress_history_file", "resolve_codec", "rotate_history"]
+
+
+CODECS = ("auto", "zstd", "gzip")
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 10
+
+_SUFFIXES = {"gzip": ".gz", "zstd": ".zst"}
+_CHUNK = 1 << 20
+
+
+@dataclass(slots=True)
+class HistoryRotation:
+    """Summary of one :func:`rotate_history` run."""
+
+    compressed: int = 0
+    removed_days: int = 0
+    bytes_before: int = 0
+    bytes_after: int = 0
+
+
+def resolve_codec(codec: str = "auto") -> str:
+    """Return the codec to use: ``auto`` prefers zstd when it is installed."""
+
+    if codec not in CODECS:
+        raise ValueError(f"Unknown history codec: {codec} (expected one of {', '.join(CODECS)})")
+    if codec == "auto":
+        return "zstd" if _load_zstandard() is not None else "gzip"
+    if codec == "zstd" and _load_zstandard() is None:
+        raise RuntimeError("zstandard is required for zstd history archives")
+    return codec
+
+
+def compress_history_file(path: Path | str, codec: str = "auto") -> Path:
+    """Move the plain ``history.jsonl`` at ``path`` into its compressed archive.
+
+    An existing archive of the same day is kept and the new data is added as
+    another compressed member, which both formats read as one stream.
+    Returns the archive path.
+    """
+
+    path = Path(path)
+    codec = resolve_codec(codec)
+    archive = path.with_name(path.name + _SUFFIXES[codec])
+    with file_lock(path):
+        if not path.exists():
+            return archive
+        temporary = archive.with_name(archive.name + ".tmp")
+        with temporary.open("wb") as target:
+            if archive.exists():
+                with archive.open("rb") as existing:
+                    shutil.copyfileobj(existing, target, _CHUNK)
+            with path.open("rb") as source:
+                _compress(source, target, codec)
+        os.replace(temporary, archive)
+        path.unlink()
+    return archive
+
+
+def rotate_history(
+    history_root: Path | str,
+    *,
+    keep_days: int | None = None,
+    codec: str = "auto",
+    today: date | None = None,
+) -> HistoryRotation:
+    """Compress past days below ``history_root`` and apply the retention policy.
+
+    Days older than ``keep_days`` days (counting today) are deleted, together
+    with their rows in an SQLite history store.  ``None`` keeps everything.
+    Concurrent callers skip instead of waiting for each other.
+    """
+
+    history_root = Path(history_root)
+    result = HistoryRotation()
+    if not history_root.is_dir():
+        return result
+    today = today or datetime.utcnow().date()
+    cutoff = today - timedelta(days=keep_days - 1) if keep_days else None
+    try:
+        with file_lock(history_root / ".rotate", timeout=0):
+            for directory in sorted(history_root.iterdir()):
+                day = _history_day(directory / HISTORY_FILE_NAME)
+                if day is None or not directory.is_dir() or day >= today:
+                    continue
+                if cutoff is not None and day < cutoff:
+                    result.bytes_before += _history_bytes(directory)
+                    shutil.rmtree(directory, ignore_errors=True)
+                    result.removed_days += 1
+                    continue
+                plain = directory / HISTORY_FILE_NAME
+                if plain.exists():
+                    before = _history_bytes(directory)
+                    compress_history_file(plain, codec)
+                    result.compressed += 1
+                    result.bytes_before += before
+                    result.bytes_after += _history_bytes(directory)
+            if cutoff is not None and result.removed_days:
+                _prune_store(history_root, cutoff)
+    except LockTimeout:
+        pass
+    return result
+
+
+# ----------------------------------------------------------------------
+# Internal helpers
+# ----------------------------------------------------------------------
+def _compress(source: Any, target: Any, codec: str) -> None:
+    if codec == "zstd":  # pragma: no cover - optional dependency
+        compressor = _load_zstandard().ZstdCompressor(level=ZSTD_LEVEL)
+        compressor.copy_stream(source, target, read_size=_CHUNK)
+        return
+    with gzip.GzipFile(fileobj=target, mode="wb", compresslevel=GZIP_LEVEL, mtime=0) as stream:
+        shutil.copyfileobj(source, stream, _CHUNK)
+
+
+def _history_bytes(directory: Path) -> int:
+    total = 0
+    for name in HISTORY_FILE_NAMES:
+        try:
+            total += (directory / name).stat().st_size
+        except FileNotFoundError:
+            continue
+    return total
+
+
+def _prune_store(history_root: Path, cutoff: date) -> None:
+    from .history_sqlite import SqliteHistoryStore, history_store_path
+
+    store_path = history_store_path(history_root)
+    if store_path is not None:
+        with SqliteHistoryStore.open(store_path) as store:
+            store.prune(before=cutoff)
@@ -0,0 +1,450 @@
+"""SQLite store for build history with indexed queries.
+
+``history.jsonl`` files have to be globbed and every warning re-classified on
+each ``history-feedback`` run.  :class:`SqliteHistoryStore` keeps the same
+entries in ``history/history.sqlite``:
+
+* ``entries`` holds one row per history entry (day, row, telop and the entry
+  JSON), indexed by day, row and telop;
+* ``entry_identifiers`` and ``entry_warnings`` index pack/FX/asset IDs and
+  classified warnings per entry;
+* ``warning_daily`` and its row/message samples are updated as entries are
+  written, so a summary over any date range reads a few aggregate rows
+  instead of the entries themselves.
+
+The store is optional: builds write to it when the database exists (create it
+with ``history import``), in addition to ``history.jsonl``.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+from collections import Counter
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+from .history import (
+    HistoryFilter,
+    WarningSummary,
+    _entry_row,
+    _entry_warnings,
+    _history_day,
+    iter_history_files,
+    iter_history_entries,
+    warning_hint,
+    warning_labels,
+)
+
+__all__ = ["HISTORY_DB_NAME", "SqliteHistoryStore", "history_store_path"]
+
+
+HISTORY_DB_NAME = "history.sqlite"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    id INTEGER PRIMARY KEY,
+    digest TEXT NOT NULL UNIQUE,
+    day TEXT NOT NULL,
+    timestamp TEXT,
+    row_index INTEGER,
+    telop TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_day ON entries (day);
+CREATE INDEX IF NOT EXISTS entries_row ON entries (row_index, day);
+CREATE INDEX IF NOT EXISTS entries_telop ON entries (telop, day);
+CREATE TABLE IF NOT EXISTS entry_identifiers (
+    entry_id INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    identifier TEXT NOT NULL,
+    PRIMARY KEY (entry_id, kind, identifier)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS entry_identifiers_lookup
+    ON entry_identifiers (kind, identifier, entry_id);
+CREATE TABLE IF NOT EXISTS entry_warnings (
+    entry_id INTEGER NOT NULL,
+    seq INTEGER NOT NULL,
+    category TEXT NOT NULL,
+    message TEXT NOT NULL,
+    code TEXT,
+    PRIMARY KEY (entry_id, seq)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS entry_warnings_category ON entry_warnings (category, entry_id);
+CREATE TABLE IF NOT EXISTS warning_daily (
+    category TEXT NOT NULL,
+    day TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (category, day)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS warning_daily_rows (
+    category TEXT NOT NULL,
+    row TEXT NOT NULL,
+    day TEXT NOT NULL,
+    PRIMARY KEY (category, row, day)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS warning_daily_messages (
+    category TEXT NOT NULL,
+    message TEXT NOT NULL,
+    day TEXT NOT NULL,
+    PRIMARY KEY (category, message, day)
+) WITHOUT ROWID;
+"""
+
+_AGGREGATE = """
+INSERT INTO warning_daily (category, day, count) VALUES (?, ?, ?)
+ON CONFLICT (category, day) DO UPDATE SET count = count + excluded.count
+"""
+
+# Seconds a writer waits for a concurrent transaction to finish.
+_BUSY_TIMEOUT = 60.0
+
+
+def history_store_path(history_path: Path | str) -> Path | None:
+    """Return the history database for ``history_path`` if there is one.
+
+    ``history_path`` may be the database itself or the ``history`` directory.
+    """
+
+    history_path = Path(history_path)
+    if history_path.suffix.lower() in (".sqlite", ".sqlite3", ".db"):
+        return history_path if history_path.exists() else None
+    candidate = history_path / HISTORY_DB_NAME
+    return candidate if candidate.is_file() else None
+
+
+class SqliteHistoryStore:
+    """History entries and warning aggregates persisted in SQLite."""
+
+    def __init__(self, path: Path | str) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), timeout=_BUSY_TIMEOUT)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # Safe with WAL: a crash can lose the last commit but not corrupt the store.
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._migrate()
+
+    @classmethod
+    def open(cls, path: Path | str) -> "SqliteHistoryStore":
+        """Open (or create) the database at ``path``."""
+
+        return cls(path)
+
+    def close(self) -> None:
+        """Close the database connection."""
+
+        self._conn.close()
+
+    def __enter__(self) -> "SqliteHistoryStore":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+    def add_entries(self, entries: Iterable[Dict[str, Any]], day: date | str | None = None) -> int:
+        """Store ``entries`` recorded on ``day`` (default: today, UTC).
+
+        Entries already stored on the same day with identical content are
+        ignored, so importing the same file twice is harmless.  Returns the number of new entries.
+        """
+
+        if day is None:
+            day = datetime.utcnow().date()
+        day_key = day.strftime("%Y%m%d") if isinstance(day, date) else str(day)
+        with self._conn:
+            return self._insert(entries, day_key)
+
+    def import_jsonl(self, history_path: Path | str) -> int:
+        """Import every ``history.jsonl`` below ``history_path``."""
+
+        added = 0
+        for path in iter_history_files(Path(history_path)):
+            day = _history_day(path)
+            if day is None:
+                day = datetime.utcfromtimestamp(path.stat().st_mtime).date()
+            with self._conn:
+                added += self._insert(iter_history_entries(path), day.strftime("%Y%m%d"))
+        return added
+
+    def prune(self, before: date | str) -> int:
+        """Delete entries and aggregates of days before ``before``.
+
+        Returns the number of deleted entries.
+        """
+
+        day_key = before.strftime("%Y%m%d") if isinstance(before, date) else str(before)
+        stale = "SELECT id FROM entries WHERE day < ?"
+        with self._conn:
+            self._conn.execute(f"DELETE FROM entry_identifiers WHERE entry_id IN ({stale})", (day_key,))
+            self._conn.execute(f"DELETE FROM entry_warnings WHERE entry_id IN ({stale})", (day_key,))
+            for table in ("warning_daily", "warning_daily_rows", "warning_daily_messages"):
+                self._conn.execute(f"DELETE FROM {table} WHERE day < ?", (day_key,))
+            return self._conn.execute("DELETE FROM entries WHERE day < ?", (day_key,)).rowcount
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+    def latest_day(self) -> str | None:
+        """Return the most recent ``YYYYMMDD`` day with entries."""
+
+        (day,) = self._conn.execute("SELECT MAX(day) FROM entries").fetchone()
+        return day
+
+    def has_entries(self, history_filter: HistoryFilter | None = None, latest_only: bool = False) -> bool:
+        """Return ``True`` if at least one entry matches."""
+
+        where, parameters = self._where(history_filter, latest_only)
+        row = self._conn.execute(
+            f"SELECT 1 FROM entries e WHERE {where} LIMIT 1", parameters
+        ).fetchone()
+        return row is not None
+
+    def count_entries(self, history_filter: HistoryFilter | None = None, latest_only: bool = False) -> int:
+        """Return the number of matching entries."""
+
+        where, parameters = self._where(history_filter, latest_only)
+        (count,) = self._conn.execute(
+            f"SELECT COUNT(*) FROM entries e WHERE {where}", parameters
+        ).fetchone()
+        return count
+
+    def iter_entries(
+        self,
+        history_filter: HistoryFilter | None = None,
+        latest_only: bool = False,
+        limit: int | None = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """Yield matching entries in the order they were written."""
+
+        where, parameters = self._where(history_filter, latest_only)
+        sql = f"SELECT data FROM entries e WHERE {where} ORDER BY e.id"
+        if limit is not None:
+            sql += " LIMIT ?"
+            parameters.append(limit)
+        for (data,) in self._conn.execute(sql, parameters):
+            yield json.loads(data)
+
+    def summarize_warnings(
+        self,
+        history_filter: HistoryFilter | None = None,
+        latest_only: bool = False,
+        sample_limit: int | None = None,
+    ) -> List[WarningSummary]:
+        """Return the same summaries as :func:`~auto_movie_edit.history.summarize_warnings`.
+
+        Date-only filters are answered from the per-day aggregates; other
+        criteria join the indexed entry tables.
+        """
+
+        history_filter = history_filter or HistoryFilter()
+        categories = history_filter.warning_categories
+        category_clause = ""
+        category_parameters: List[Any] = []
+        if categories is not None:
+            # The aggregates are kept per category label.
+            labels = warning_labels(categories)
+            category_clause = f" AND category IN ({_placeholders(labels)})"
+            category_parameters = sorted(labels)
+        limit_clause = "" if sample_limit is None else " LIMIT ?"
+        limit_parameters = [] if sample_limit is None else [sample_limit]
+
+        entry_criteria = (
+            history_filter.rows,
+            history_filter.telops,
+            history_filter.packs,
+            history_filter.fx_ids,
+        )
+        if all(criterion is None for criterion in entry_criteria):
+            days, parameters = self._day_clause(history_filter, latest_only)
+            counts_sql = (
+                f"SELECT category, SUM(count) FROM warning_daily WHERE {days}{category_clause}"
+                " GROUP BY category"
+            )
+            rows_sql = (
+                f"SELECT DISTINCT row FROM warning_daily_rows WHERE {days} AND category = ?"
+                f" ORDER BY row{limit_clause}"
+            )
+            messages_sql = (
+                f"SELECT DISTINCT message FROM warning_daily_messages WHERE {days}"
+                f" AND category = ? ORDER BY message{limit_clause}"
+            )
+        else:
+            where, parameters = self._where(history_filter, latest_only, warnings=False)
+            joined = f"FROM entry_warnings w JOIN entries e ON e.id = w.entry_id WHERE {where}"
+            counts_sql = (
+                f"SELECT w.category, COUNT(*) {joined}"
+                f"{category_clause.replace('category', 'w.category')} GROUP BY w.category"
+            )
+            rows_sql = (
+                f"SELECT DISTINCT CAST(e.row_index AS TEXT) AS value {joined}"
+                f" AND w.category = ? AND e.row_index IS NOT NULL ORDER BY value{limit_clause}"
+            )
+            messages_sql = (
+                f"SELECT DISTINCT w.message AS value {joined}"
+                f" AND w.category = ? ORDER BY value{limit_clause}"
+            )
+
+        def samples(sql: str, category: str) -> List[str]:
+            cursor = self._conn.execute(sql, parameters + [category] + limit_parameters)
+            return [value for (value,) in cursor]
+
+        counts = self._conn.execute(counts_sql, parameters + category_parameters).fetchall()
+        ordered: List[WarningSummary] = [
+            {
+                "label": category,
+                "count": count,
+                "hint": warning_hint(category),
+                "rows": samples(rows_sql, category),
+                "messages": samples(messages_sql, category),
+            }
+            for category, count in counts
+            if count
+        ]
+        ordered.sort(key=lambda item: item["count"], reverse=True)
+        return ordered
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+    def _migrate(self) -> None:
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(entry_warnings)")}
+        if "code" not in columns:
+            self._conn.execute("ALTER TABLE entry_warnings ADD COLUMN code TEXT")
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS entry_warnings_code ON entry_warnings (code, entry_id)"
+        )
+
+    def _insert(self, entries: Iterable[Dict[str, Any]], day: str) -> int:
+        added = 0
+        identifiers: List[Tuple[int, str, str]] = []
+        warnings: List[Tuple[int, int, str, str, str | None]] = []
+        daily: Counter[str] = Counter()
+        sample_rows: set[Tuple[str, str, str]] = set()
+        sample_messages: set[Tuple[str, str, str]] = set()
+        for entry in entries:
+            data = json.dumps(entry, ensure_ascii=False, sort_keys=True)
+            digest = hashlib.sha1(f"{day}\n{data}".encode("utf-8")).hexdigest()
+            row_index = _int_or_none(_entry_row(entry))
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO entries (digest, day, timestamp, row_index, telop, data)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (digest, day, entry.get("timestamp"), row_index, _text_or_none(entry.get("telop")), data),
+            )
+            if not cursor.rowcount:
+                continue
+            added += 1
+            entry_id = cursor.lastrowid
+            identifiers.extend((entry_id, kind, identifier) for kind, identifier in _identifiers(entry))
+            for seq, (code, category, message) in enumerate(_entry_warnings(entry)):
+                warnings.append((entry_id, seq, category, message, code))
+                daily[category] += 1
+                sample_messages.add((category, message, day))
+                if row_index is not None:
+                    sample_rows.add((category, str(row_index), day))
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO entry_identifiers (entry_id, kind, identifier) VALUES (?, ?, ?)",
+            identifiers,
+        )
+        self._conn.executemany(
+            "INSERT INTO entry_warnings (entry_id, seq, category, message, code)"
+            " VALUES (?, ?, ?, ?, ?)",
+            warnings,
+        )
+        self._conn.executemany(_AGGREGATE, [(category, day, count) for category, count in daily.items()])
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO warning_daily_rows (category, row, day) VALUES (?, ?, ?)",
+            sorted(sample_rows),
+        )
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO warning_daily_messages (category, message, day) VALUES (?, ?, ?)",
+            sorted(sample_messages),
+        )
+        return added
+
+    def _day_clause(
+        self, history_filter: HistoryFilter, latest_only: bool, column: str = "day"
+    ) -> Tuple[str, List[Any]]:
+        clauses = ["1"]
+        parameters: List[Any] = []
+        if latest_only and not history_filter.has_date_range:
+            clauses.append(f"{column} = ?")
+            parameters.append(self.latest_day() or "")
+        if history_filter.since is not None:
+            clauses.append(f"{column} >= ?")
+            parameters.append(history_filter.since.strftime("%Y%m%d"))
+        if history_filter.until is not None:
+            clauses.append(f"{column} <= ?")
+            parameters.append(history_filter.until.strftime("%Y%m%d"))
+        return " AND ".join(clauses), parameters
+
+    def _where(
+        self,
+        history_filter: HistoryFilter | None,
+        latest_only: bool,
+        warnings: bool = True,
+    ) -> Tuple[str, List[Any]]:
+        history_filter = history_filter or HistoryFilter()
+        days, parameters = self._day_clause(history_filter, latest_only, column="e.day")
+        clauses = [days]
+        if history_filter.rows is not None:
+            clauses.append(f"e.row_index IN ({_placeholders(history_filter.rows)})")
+            parameters.extend(sorted(history_filter.rows))
+        if history_filter.telops is not None:
+            clauses.append(f"e.telop IN ({_placeholders(history_filter.telops)})")
+            parameters.extend(sorted(history_filter.telops))
+        for kind, values in (("pack", history_filter.packs), ("fx", history_filter.fx_ids)):
+            if values is None:
+                continue
+            clauses.append(
+                "e.id IN (SELECT entry_id FROM entry_identifiers"
+                f" WHERE kind = ? AND identifier IN ({_placeholders(values)}))"
+            )
+            parameters.append(kind)
+            parameters.extend(sorted(values))
+        if warnings and history_filter.warning_categories is not None:
+            categories = history_filter.warning_categories
+            clauses.append(
+                "e.id IN (SELECT entry_id FROM entry_warnings"
+                f" WHERE category IN ({_placeholders(categories)})"
+                f" UNION SELECT entry_id FROM entry_warnings WHERE code IN ({_placeholders(categories)}))"
+            )
+            parameters.extend(sorted(categories) * 2)
+        return " AND ".join(clauses), parameters
+
+
+def _placeholders(values: Iterable[Any]) -> str:
+    return ", ".join("?" for _ in values)
+
+
+def _identifiers(entry: Dict[str, Any]) -> Iterator[Tuple[str, str]]:
+    packs = entry.get("packs") or []
+    if isinstance(packs, list):
+        for pack in packs:
+            if pack:
+                yield "pack", str(pack)
+    for fx in entry.get("fx") or []:
+        if isinstance(fx, dict) and fx.get("fx_id"):
+            yield "fx", str(fx["fx_id"])
+    for obj in entry.get("objects") or []:
+        if isinstance(obj, dict):
+            asset = obj.get("resolved_asset") or obj.get("identifier")
+            if asset:
+                yield "asset", str(asset)
+
+
+def _int_or_none(value: Any) -> int | None:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _text_or_none(value: Any) -> str | None:
+    return None if value is None else str(value)
@@ -2,19 +2,29 @@
 
 from __future__ import annotations
 
-from collections import Counter, defaultdict
+from collections import Counter, defaultdict, deque
 from dataclasses import dataclass
+import json
 import math
 import re
+import threading
 from functools import lru_cache
-from typing import Dict, List, Sequence
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Mapping, Sequence, Tuple
 
-try:  # pragma: no cover - optional dependency loading
+if TYPE_CHECKING:  # pragma: no cover - type checking only
     from fugashi import Tagger  # type: ignore
-except Exception:  # pragma: no cover - defensive
-    Tagger = None  # type: ignore
 
-__all__ = ["LanguageAnalyzer", "SubtitleAnalysis", "SubtitleInsight"]
+__all__ = [
+    "LanguageAnalyzer",
+    "LanguageAnalyzerPool",
+    "SubtitleAnalysis",
+    "SubtitleInsight",
+    "ToneKeywordMatcher",
+    "load_tone_keywords",
+    "merge_tone_keywords",
+    "shared_analyzer_pool",
+]
 
 
 _WORD_PATTERN = re.compile(r"[A-Za-z0-9ぁ-んァ-ヶ一-龯ー]+")
@@ -130,6 +140,147 @@ _CATEGORY_PRIORITY = [
 ]
 
 
+ToneKeywordTable = Dict[str, Dict[str, float]]
+
+
+class ToneKeywordMatcher:
+    """Aho-Corasick automaton scoring every tone keyword table in one scan.
+
+    Each keyword is stored once even when several categories share it (such
+    as ``かな`` or ``ほんと``).  Matching a token walks the automaton once, so
+    the cost is linear in the token length regardless of vocabulary size.
+    """
+
+    __slots__ = ("_goto", "_fail", "_outputs", "_entries")
+
+    def __init__(self, tables: Mapping[str, Mapping[str, float]]) -> None:
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        node_outputs: List[set[int]] = [set()]
+        # Entries keep the table order (category-major, keyword-minor) so the
+        # scores accumulate in exactly the same order as the nested loops did.
+        self._entries: List[Tuple[str, float]] = []
+        for category, keyword_map in tables.items():
+            for keyword, weight in keyword_map.items():
+                if not keyword:
+                    continue
+                entry_index = len(self._entries)
+                self._entries.append((category, float(weight)))
+                node = 0
+                for char in keyword:
+                    next_node = self._goto[node].get(char)
+                    if next_node is None:
+                        next_node = len(self._goto)
+                        self._goto[node][char] = next_node
+                        self._goto.append({})
+                        self._fail.append(0)
+                        node_outputs.append(set())
+                    node = next_node
+                node_outputs[node].add(entry_index)
+
+        queue: deque[int] = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[child] = target if target != child else 0
+                node_outputs[child] |= node_outputs[self._fail[child]]
+
+        self._outputs: List[Tuple[int, ...]] = [tuple(sorted(found)) for found in node_outputs]
+
+    def match(self, text: str) -> List[Tuple[str, float]]:
+        """Return ``(category, weight)`` pairs for every keyword contained in ``text``.
+
+        A keyword contributes once per text even if it occurs several times,
+        mirroring the original ``keyword in token`` substring test.
+        """
+
+        goto, fail, outputs = self._goto, self._fail, self._outputs
+        matched: set[int] = set()
+        node = 0
+        for char in text:
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            if outputs[node]:
+                matched.update(outputs[node])
+        if not matched:
+            return []
+        entries = self._entries
+        return [entries[index] for index in sorted(matched)]
+
+
+def merge_tone_keywords(
+    base: Mapping[str, Mapping[str, float]],
+    extra: Mapping[str, Mapping[str, float]] | None,
+) -> ToneKeywordTable:
+    """Return ``base`` extended with ``extra``.
+
+    Weights from ``extra`` replace existing ones for the same keyword; new
+    keywords and categories are appended after the existing entries.
+    """
+
+    merged: ToneKeywordTable = {category: dict(keywords) for category, keywords in base.items()}
+    for category, keywords in (extra or {}).items():
+        target = merged.setdefault(str(category), {})
+        for keyword, weight in keywords.items():
+            target[str(keyword)] = float(weight)
+    return merged
+
+
+def load_tone_keywords(path: str | Path) -> ToneKeywordTable:
+    """Load tone keyword tables from a JSON file.
+
+    The document is either ``{"<tone>": {"<keyword>": weight}}`` or the same
+    mapping nested under a ``"tone_keywords"`` key.  Entries whose weight is
+    not numeric are ignored.
+    """
+
+    raw: Any = json.loads(Path(path).read_text(encoding="utf-8-sig"))
+    if isinstance(raw, dict) and isinstance(raw.get("tone_keywords"), dict):
+        raw = raw["tone_keywords"]
+    if not isinstance(raw, dict):
+        return {}
+
+    tables: ToneKeywordTable = {}
+    for category, keywords in raw.items():
+        if not isinstance(keywords, dict):
+            continue
+        for keyword, weight in keywords.items():
+            text = str(keyword).strip()
+            if not text:
+                continue
+            try:
+                tables.setdefault(str(category).strip(), {})[text] = float(weight)
+            except (TypeError, ValueError):
+                continue
+    return tables
+
+
+_DEFAULT_TONE_MATCHER: ToneKeywordMatcher | None = None
+
+
+def _load_tagger_class() -> Any:
+    """Import Fugashi on demand so that importing this module stays cheap."""
+
+    try:  # pragma: no cover - optional dependency loading
+        from fugashi import Tagger as tagger_class  # type: ignore
+    except Exception:  # pragma: no cover - defensive
+        return None
+    return tagger_class
+
+
+def _default_tone_matcher() -> ToneKeywordMatcher:
+    global _DEFAULT_TONE_MATCHER
+    if _DEFAULT_TONE_MATCHER is None:
+        _DEFAULT_TONE_MATCHER = ToneKeywordMatcher(_TONE_KEYWORD_SCORES)
+    return _DEFAULT_TONE_MATCHER
+
+
 @dataclass(slots=True)
 class SubtitleInsight:
     """Lightweight description of a subtitle line extracted from analysis."""
@@ -149,12 +300,27 @@ class SubtitleAnalysis:
 class LanguageAnalyzer:
     """High quality text analyzer backed by Fugashi and UniDic-lite."""
 
-    def __init__(self) -> None:
+    def __init__(self, tone_keywords: Mapping[str, Mapping[str, float]] | None = None) -> None:
+        """Create an analyzer.
+
+        ``tone_keywords`` extends the built-in tone keyword tables, e.g. with
+        rows loaded from the ``TONE_KEYWORDS`` sheet or :func:`load_tone_keywords`.
+        """
+
         self._tagger: Tagger | None = None  # type: ignore[assignment]
         self._tagger_error: Exception | None = None
         self._tokenize_cached = lru_cache(maxsize=1024)(self._tokenize_internal)
         self._keywords_cached = lru_cache(maxsize=512)(self._extract_keywords_internal)
         self._tone_cached = lru_cache(maxsize=512)(self._compute_tone)
+        self._vector_scorer: Any = None
+        if tone_keywords:
+            self._tone_tables: Mapping[str, Mapping[str, float]] = merge_tone_keywords(
+                _TONE_KEYWORD_SCORES, tone_keywords
+            )
+            self._tone_matcher = ToneKeywordMatcher(self._tone_tables)
+        else:
+            self._tone_tables = _TONE_KEYWORD_SCORES
+            self._tone_matcher = _default_tone_matcher()
 
     # ------------------------------------------------------------------
     # Public API
@@ -175,11 +341,11 @@ class LanguageAnalyzer:
         insights: List[SubtitleInsight] = []
         global_counter: Counter[str] = Counter()
 
-        for text in subtitles:
+        tones = self.detect_tones(subtitles)
+        for text, emphasis in zip(subtitles, tones):
             keywords = self.extract_keywords(text, limit=keyword_limit)
             if keywords:
                 global_counter.update(keywords)
-            emphasis = self._detect_emphasis(text)
             insights.append(SubtitleInsight(keywords=keywords, emphasis=emphasis))
 
         global_keywords = [word for word, _ in global_counter.most_common(global_limit)]
@@ -198,6 +364,28 @@ class LanguageAnalyzer:
             return keywords[:limit]
         return keywords
 
+    def detect_tones(self, texts: Iterable[str | None], engine: str = "auto") -> List[str | None]:
+        """Classify the tone of every entry in ``texts`` in one batch.
+
+        Each distinct normalised line is scored once; the result list is
+        aligned with ``texts``.  ``engine`` selects ``"python"`` (per-line
+        scoring), ``"numpy"`` (the batched matrix scorer in
+        :mod:`auto_movie_edit.tone_vector`) or ``"auto"``, which uses NumPy
+        for large batches when it is installed.  Both engines return the
+        same tones.
+        """
+
+        normalized_texts = [self._normalize_text(text) for text in texts]
+        distinct = list(dict.fromkeys(text for text in normalized_texts if text))
+
+        resolved: Dict[str, str | None]
+        scorer = self._get_vector_scorer(engine, len(distinct))
+        if scorer is not None:
+            resolved = dict(zip(distinct, scorer.score(distinct)))
+        else:
+            resolved = {text: self._tone_cached(text) for text in distinct}
+        return [resolved[text] if text else None for text in normalized_texts]
+
     def tokenize(self, text: str | None) -> List[str]:
         """Tokenize ``text`` using Fugashi, falling back to regex segmentation."""
 
@@ -217,14 +405,28 @@ class LanguageAnalyzer:
             return None
         return self._tone_cached(normalized)
 
+    def _get_vector_scorer(self, engine: str, batch_size: int) -> Any:
+        if engine == "python":
+            return None
+        from . import tone_vector
+
+        if engine == "auto" and (
+            batch_size < tone_vector.AUTO_BATCH_THRESHOLD or not tone_vector.numpy_available()
+        ):
+            return None
+        if self._vector_scorer is None:
+            self._vector_scorer = tone_vector.VectorToneScorer(self)
+        return self._vector_scorer
+
     def _ensure_tagger(self) -> None:
         if self._tagger or self._tagger_error is not None:
             return
-        if Tagger is None:
+        tagger_class = _load_tagger_class()
+        if tagger_class is None:
             self._tagger_error = RuntimeError("Fugashi is not available")
             return
         try:
-            self._tagger = Tagger()
+            self._tagger = tagger_class()
         except Exception as exc:  # pragma: no cover - defensive
             self._tagger_error = exc
 
@@ -315,11 +517,10 @@ class LanguageAnalyzer:
             scores["余韻"] += 0.6
 
         # Keyword-based weighting from morphological tokens
+        matcher = self._tone_matcher
         for token, count in counter.items():
-            for category, keyword_map in _TONE_KEYWORD_SCORES.items():
-                for keyword, weight in keyword_map.items():
-                    if keyword in token:
-                        scores[category] += weight * count
+            for category, weight in matcher.match(token):
+                scores[category] += weight * count
 
         # Soft sentiment modifier based on positive/negative balance
         positive = scores.get("喜び", 0.0)
@@ -348,3 +549,43 @@ class LanguageAnalyzer:
                     return category
         return best_category[0]
 
+
+class LanguageAnalyzerPool:
+    """Shares :class:`LanguageAnalyzer` instances, and therefore their caches.
+
+    Analyzers are keyed by their tone keyword extensions so that builds using
+    different ``TONE_KEYWORDS`` tables never see each other's tone results.
+    """
+
+    def __init__(self) -> None:
+        self._analyzers: Dict[Tuple[Tuple[str, Tuple[Tuple[str, float], ...]], ...], LanguageAnalyzer] = {}
+        self._lock = threading.Lock()
+
+    def get(self, tone_keywords: Mapping[str, Mapping[str, float]] | None = None) -> LanguageAnalyzer:
+        """Return the analyzer for ``tone_keywords``, creating it on first use."""
+
+        key = tuple(
+            (str(category), tuple((str(keyword), float(weight)) for keyword, weight in keywords.items()))
+            for category, keywords in (tone_keywords or {}).items()
+        )
+        with self._lock:
+            analyzer = self._analyzers.get(key)
+            if analyzer is None:
+                analyzer = LanguageAnalyzer(tone_keywords=tone_keywords)
+                self._analyzers[key] = analyzer
+            return analyzer
+
+    def clear(self) -> None:
+        """Drop every pooled analyzer."""
+
+        with self._lock:
+            self._analyzers.clear()
+
+
+_SHARED_ANALYZER_POOL = LanguageAnalyzerPool()
+
+
+def shared_analyzer_pool() -> LanguageAnalyzerPool:
+    """Return the process-wide analyzer pool."""
+
+    return _SHARED_ANALYZER_POOL
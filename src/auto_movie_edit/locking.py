@@ -0,0 +1,92 @@
+"""Cross-process advisory file locks.
+
+:func:`file_lock` guards a file shared by concurrent builds (the proposal
+model, its delta log, ``history.jsonl``) with a sibling ``<name>.lock`` file.
+POSIX systems use ``fcntl.flock`` (shared or exclusive); Windows uses
+``msvcrt.locking``, which only supports exclusive locks, so shared requests
+are taken exclusively there.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import IO, Iterator
+
+__all__ = ["LockTimeout", "file_lock", "lock_path"]
+
+
+_POLL_INTERVAL = 0.01
+
+
+class LockTimeout(TimeoutError):
+    """Raised when a lock could not be acquired within the timeout."""
+
+
+def lock_path(path: Path | str) -> Path:
+    """Return the lock file used for ``path``."""
+
+    path = Path(path)
+    return path.with_name(path.name + ".lock")
+
+
+@contextmanager
+def file_lock(
+    path: Path | str, *, shared: bool = False, timeout: float | None = None
+) -> Iterator[None]:
+    """Hold an advisory lock on ``path`` for the duration of the block.
+
+    ``timeout`` is in seconds; ``None`` waits indefinitely.
+    """
+
+    target = lock_path(path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    with open(target, "a+b") as handle:
+        _acquire(handle, shared, timeout, target)
+        try:
+            yield
+        finally:
+            _release(handle)
+
+
+# ----------------------------------------------------------------------
+# Internal helpers
+# ----------------------------------------------------------------------
+if os.name == "nt":  # pragma: no cover - exercised on Windows only
+    import msvcrt
+
+    def _try_lock(handle: IO[bytes], shared: bool) -> bool:
+        handle.seek(0)
+        try:
+            msvcrt.locking(handle.fileno(), msvcrt.LK_NBLCK, 1)
+        except OSError:
+            return False
+        return True
+
+    def _release(handle: IO[bytes]) -> None:
+        handle.seek(0)
+        msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
+
+else:
+    import fcntl
+
+    def _try_lock(handle: IO[bytes], shared: bool) -> bool:
+        mode = fcntl.LOCK_SH if shared else fcntl.LOCK_EX
+        try:
+            fcntl.flock(handle.fileno(), mode | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return False
+        return True
+
+    def _release(handle: IO[bytes]) -> None:
+        fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+
+
+def _acquire(handle: IO[bytes], shared: bool, timeout: float | None, target: Path) -> None:
+    deadline = None if timeout is None else time.monotonic() + timeout
+    while not _try_lock(handle, shared):
+        if deadline is not None and time.monotonic() >= deadline:
+            raise LockTimeout(f"Timed out waiting for lock: {target}")
+        time.sleep(_POLL_INTERVAL)
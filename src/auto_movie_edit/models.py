@@ -121,4 +121,5 @@ class WorkbookData:
     layers: Dict[str, LayerBand] = field(default_factory=dict)
     timeline: List[TimelineRow] = field(default_factory=list)
     schema_map: Dict[str, Dict[str, List[str]]] = field(default_factory=dict)
+    tone_keywords: Dict[str, Dict[str, float]] = field(default_factory=dict)  # tone -> keyword -> weight
 
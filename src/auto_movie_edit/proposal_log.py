@@ -0,0 +1,286 @@
+"""Append-only delta log for the JSON proposal model.
+
+Builds no longer rewrite ``proposal_model.json``.  :func:`append_deltas` adds
+one small JSON line per learnable history entry to
+``proposal_model.json.delta.jsonl`` and returns immediately, so build latency
+does not depend on the size of the model.
+
+The log is merged into the base snapshot LSM-style by :func:`compact_deltas`:
+the active log is sealed (renamed to ``*.delta.<ns>.sealed``), replayed on
+top of the base model and the new base is written atomically before the
+sealed segments are removed.  :func:`start_background_compaction` runs that
+step on a worker thread once the pending log grows past
+:data:`COMPACT_THRESHOLD_BYTES`.
+
+Readers (:meth:`ProposalModel.load`) replay the sealed segments and the active
+log on top of the base, so they always see base plus pending deltas.  Replays
+are idempotent because the model skips history entries it has already
+processed.
+
+Concurrent builds are safe across processes (:mod:`auto_movie_edit.locking`):
+appends and sealing share the log's lock, merges are serialised by a
+``.compact`` lock, and the log is sealed and the base swapped under an
+exclusive model lock while readers hold it shared.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, Tuple
+
+from .locking import file_lock
+
+if TYPE_CHECKING:  # pragma: no cover - type checking only
+    from .proposals import ProposalCompaction, ProposalModel
+
+__all__ = [
+    "COMPACT_THRESHOLD_BYTES",
+    "append_deltas",
+    "apply_pending_deltas",
+    "compact_deltas",
+    "compact_model",
+    "delta_log_path",
+    "iter_deltas",
+    "pending_delta_paths",
+    "pending_delta_bytes",
+    "start_background_compaction",
+]
+
+
+# Pending deltas beyond this size are merged into the base in the background.
+COMPACT_THRESHOLD_BYTES = 1 << 20
+
+_DELTA_SUFFIX = ".delta.jsonl"
+_SEALED_SUFFIX = ".sealed"
+
+_merge_lock = threading.Lock()
+_registry_lock = threading.Lock()
+_running: Dict[Path, threading.Thread] = {}
+
+
+def delta_log_path(model_path: Path | str) -> Path:
+    """Return the active delta log that belongs to ``model_path``."""
+
+    model_path = Path(model_path)
+    return model_path.with_name(model_path.name + _DELTA_SUFFIX)
+
+
+def pending_delta_paths(model_path: Path | str) -> List[Path]:
+    """Return sealed segments (oldest first) followed by the active log."""
+
+    model_path = Path(model_path)
+    prefix = model_path.name + ".delta."
+    paths: List[Path] = []
+    if model_path.parent.is_dir():
+        sealed = [
+            path
+            for path in model_path.parent.iterdir()
+            if path.name.startswith(prefix) and path.name.endswith(_SEALED_SUFFIX)
+        ]
+        paths.extend(sorted(sealed, key=_segment_order))
+    active = delta_log_path(model_path)
+    if active.exists():
+        paths.append(active)
+    return paths
+
+
+def pending_delta_bytes(model_path: Path | str) -> int:
+    """Return the size of all pending delta segments."""
+
+    total = 0
+    for path in pending_delta_paths(model_path):
+        try:
+            total += path.stat().st_size
+        except FileNotFoundError:
+            continue
+    return total
+
+
+def append_deltas(model_path: Path | str, history: Iterable[Dict[str, Any]]) -> int:
+    """Append the learnable part of ``history`` to the delta log.
+
+    Returns the number of records written.  Entries without any telop, pack,
+    asset or FX identifier teach the model nothing and are skipped.
+    """
+
+    lines = []
+    for entry in history:
+        record = _delta_record(entry)
+        if record is not None:
+            lines.append(json.dumps(record, ensure_ascii=False) + "\n")
+    if not lines:
+        return 0
+    path = delta_log_path(model_path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    payload = "".join(lines).encode("utf-8")
+    with file_lock(path), path.open("ab") as handle:
+        handle.write(payload)
+    return len(lines)
+
+
+def iter_deltas(path: Path | str) -> Iterator[Dict[str, Any]]:
+    """Yield the records of one delta segment, skipping damaged lines."""
+
+    try:
+        handle = Path(path).open("r", encoding="utf-8")
+    except FileNotFoundError:
+        return
+    with handle:
+        for line in handle:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(record, dict):
+                yield record
+
+
+def apply_pending_deltas(model: "ProposalModel", model_path: Path | str) -> bool:
+    """Replay every pending segment of ``model_path`` into ``model``.
+
+    Callers hold the shared lock of ``model_path`` so that no segment is
+    sealed or removed between listing and reading.
+    """
+
+    changed = False
+    for path in pending_delta_paths(model_path):
+        changed |= model.update_from_history(iter_deltas(path))
+    return changed
+
+
+def compact_deltas(model_path: Path | str) -> int:
+    """Merge all pending deltas into the base model and return how many were read."""
+
+    records, _ = _merge(Path(model_path), None)
+    return records
+
+
+def compact_model(
+    model_path: Path | str, **options: Any
+) -> Tuple[int, "ProposalCompaction"]:
+    """Merge pending deltas, then run :meth:`ProposalModel.compact` with ``options``.
+
+    Returns the number of merged delta records and the compaction summary.
+    """
+
+    records, result = _merge(Path(model_path), options)
+    assert result is not None
+    return records, result
+
+
+def start_background_compaction(
+    model_path: Path | str, threshold: int | None = None
+) -> threading.Thread | None:
+    """Compact ``model_path`` on a worker thread once enough deltas are pending.
+
+    ``threshold`` defaults to :data:`COMPACT_THRESHOLD_BYTES`.  The thread is
+    not a daemon, so a CLI process finishes the merge before it exits.
+    Returns the started thread, or ``None`` when nothing was started.
+    """
+
+    model_path = Path(model_path)
+    if threshold is None:
+        threshold = COMPACT_THRESHOLD_BYTES
+    if pending_delta_bytes(model_path) < threshold:
+        return None
+    key = model_path.resolve()
+    with _registry_lock:
+        running = _running.get(key)
+        if running is not None and running.is_alive():
+            return None
+        thread = threading.Thread(
+            target=compact_deltas,
+            args=(model_path,),
+            name=f"proposal-compaction:{model_path.name}",
+        )
+        _running[key] = thread
+        thread.start()
+    return thread
+
+
+# ----------------------------------------------------------------------
+# Internal helpers
+# ----------------------------------------------------------------------
+def _segment_order(path: Path) -> int:
+    stamp = path.name[: -len(_SEALED_SUFFIX)].rsplit(".", 1)[-1]
+    try:
+        return int(stamp)
+    except ValueError:
+        return 0
+
+
+def _merge(
+    model_path: Path, compact_options: Dict[str, Any] | None
+) -> Tuple[int, "ProposalCompaction" | None]:
+    from .proposal_snapshot import snapshot_path, write_snapshot
+    from .proposals import AUTO_COMPACT_ENTRIES, ProposalModel
+
+    # One merge at a time per model, across threads and processes.
+    with _merge_lock, file_lock(model_path.with_name(model_path.name + ".compact")):
+        active = delta_log_path(model_path)
+        if active.exists():
+            sealed = active.with_name(f"{model_path.name}.delta.{time.time_ns()}{_SEALED_SUFFIX}")
+            # Writers append under the log's lock, so no record lands in a
+            # sealed segment; readers list and read the segments under the
+            # shared model lock, so none sees the log vanish mid-read (and on
+            # Windows no reader keeps it open while it is replaced).
+            with file_lock(model_path), file_lock(active):
+                os.replace(active, sealed)
+        segments = [path for path in pending_delta_paths(model_path) if path != active]
+        if not segments and compact_options is None:
+            return 0, None
+
+        model = ProposalModel.load(model_path, include_deltas=False)
+        records = 0
+        for path in segments:
+            deltas = list(iter_deltas(path))
+            records += len(deltas)
+            model.update_from_history(deltas)
+        result = None
+        if compact_options is not None:
+            result = model.compact(**compact_options)
+        elif model.entry_count() > AUTO_COMPACT_ENTRIES:
+            model.compact()
+
+        temporary = model_path.with_name(model_path.name + ".tmp")
+        model.save(temporary)
+        # Readers hold the shared model lock while they combine base and segments.
+        with file_lock(model_path):
+            os.replace(temporary, model_path)
+            for path in segments:
+                path.unlink(missing_ok=True)
+            # Keep an exported snapshot current instead of leaving it stale.
+            snapshot = snapshot_path(model_path)
+            if snapshot.exists():
+                write_snapshot(model, snapshot)
+        return records, result
+
+
+def _delta_record(entry: Dict[str, Any]) -> Dict[str, Any] | None:
+    from .proposals import ProposalModel
+
+    assets = ProposalModel._resolve_assets(entry.get("objects", []))
+    fx_ids = [fx.get("fx_id") for fx in entry.get("fx", []) if isinstance(fx, dict)]
+    packs = list(entry.get("packs", []) or [])
+    telop = entry.get("telop")
+    if not (telop or packs or assets or any(fx_ids)):
+        return None
+    notes = entry.get("notes") or {}
+    return {
+        "timestamp": entry.get("timestamp"),
+        "row_index": entry.get("row_index"),
+        "start": entry.get("start"),
+        "subtitle": entry.get("subtitle"),
+        "telop": telop,
+        "packs": packs,
+        "objects": [{"identifier": asset} for asset in assets],
+        "fx": [{"fx_id": fx_id} for fx_id in fx_ids],
+        "notes": {"approval": notes.get("approval") if isinstance(notes, dict) else None},
+    }
@@ -0,0 +1,212 @@
+"""Batched proposal ranking for whole subtitle scripts with NumPy.
+
+:func:`rank_many` reproduces ``ProposalModel._top_candidates`` for many rows at
+once.  For each category the script is described by two sparse matrices in
+coordinate form:
+
+* ``rows x tokens`` — how often each token occurs in each subtitle;
+* ``tokens x candidates`` — the stored wins / losses / totals and the latest
+  row, position and timestamp of every candidate.
+
+Their product (sums for the counters, maxima for the "last" fields) gives the
+aggregated statistics of every ``(row, candidate)`` pair in a handful of
+vectorised operations.  Context weights are applied afterwards, per pair.
+
+Scores are only used to prune: the surviving pairs of each row are scored and
+ordered again with the model's own Python helpers, so the result is identical
+to calling ``suggest`` row by row.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, Dict, List, Sequence
+
+from .tone_vector import _load_numpy
+
+if TYPE_CHECKING:  # pragma: no cover - type checking only
+    from .proposals import ProposalCandidate, ProposalModel
+
+__all__ = ["rank_many"]
+
+
+# Pairs whose vectorised score lies this close to a row's k-th best score are
+# re-ranked in Python, which absorbs rounding to 4 decimals and float noise.
+_PRUNE_MARGIN = 1e-3
+
+
+def rank_many(
+    model: "ProposalModel",
+    token_rows: Sequence[List[str]],
+    category: str,
+    limit: int,
+    row_indices: Sequence[int | None],
+    positions: Sequence[float | None],
+) -> List[List["ProposalCandidate"]] | None:
+    """Return ranked candidates of ``category`` for each row of ``token_rows``.
+
+    Returns ``None`` when NumPy is not available.
+    """
+
+    np = _load_numpy()
+    if np is None:
+        return None
+    results: List[List["ProposalCandidate"]] = [[] for _ in token_rows]
+    if limit <= 0 or not token_rows:
+        return results
+
+    # rows x tokens, restricted to tokens that have statistics.
+    vocabulary: Dict[str, int] = {}
+    token_stats: List[Dict[str, Dict[str, Any]]] = []
+    row_ids: List[int] = []
+    token_ids: List[int] = []
+    counts: List[int] = []
+    for row, tokens in enumerate(token_rows):
+        per_row: Dict[int, int] = {}
+        for token in tokens:
+            token_id = vocabulary.get(token)
+            if token_id is None:
+                stats = model._token_stats(token, category)
+                if not stats:
+                    continue
+                token_id = vocabulary[token] = len(token_stats)
+                token_stats.append(stats)
+            per_row[token_id] = per_row.get(token_id, 0) + 1
+        for token_id, count in per_row.items():
+            row_ids.append(row)
+            token_ids.append(token_id)
+            counts.append(count)
+    if not counts:
+        return results
+
+    # tokens x candidates in CSR form.
+    candidates: Dict[str, int] = {}
+    timestamps: Dict[str, int] = {}
+    indptr = [0]
+    entry_candidate: List[int] = []
+    entry_values: List[tuple] = []
+    row_sentinel = np.iinfo(np.int64).min
+    for stats_by_identifier in token_stats:
+        for identifier, stats in stats_by_identifier.items():
+            entry_candidate.append(candidates.setdefault(identifier, len(candidates)))
+            last_seen = stats.get("last_seen")
+            last_row = model._int_value(stats.get("last_row_index"))
+            last_position = model._float_value(stats.get("last_position"))
+            entry_values.append(
+                (
+                    int(stats.get("wins", 0)),
+                    int(stats.get("losses", 0)),
+                    int(stats.get("total", 0)),
+                    timestamps.setdefault(last_seen, len(timestamps)) if last_seen else -1,
+                    row_sentinel if last_row is None else last_row,
+                    -np.inf if last_position is None else last_position,
+                )
+            )
+        indptr.append(len(entry_candidate))
+
+    # Timestamps are compared as strings, like ``_merge_stats``; map them to ranks.
+    ordered_timestamps = sorted(timestamps)
+    timestamp_rank = np.empty(len(timestamps) + 1, dtype=np.int64)
+    timestamp_rank[-1] = -1
+    for rank, value in enumerate(ordered_timestamps):
+        timestamp_rank[timestamps[value]] = rank
+
+    columns = list(zip(*entry_values))
+    entry_wins = np.asarray(columns[0], dtype=np.int64)
+    entry_losses = np.asarray(columns[1], dtype=np.int64)
+    entry_total = np.asarray(columns[2], dtype=np.int64)
+    entry_seen = timestamp_rank[np.asarray(columns[3], dtype=np.int64)]
+    entry_row = np.asarray(columns[4], dtype=np.int64)
+    entry_position = np.asarray(columns[5], dtype=float)
+    entry_candidate_arr = np.asarray(entry_candidate, dtype=np.int64)
+    indptr_arr = np.asarray(indptr, dtype=np.int64)
+
+    # Expand every (row, token) pair into the token's entries.
+    pair_rows = np.asarray(row_ids, dtype=np.int64)
+    pair_tokens = np.asarray(token_ids, dtype=np.int64)
+    pair_counts = np.asarray(counts, dtype=np.int64)
+    starts = indptr_arr[pair_tokens]
+    lengths = indptr_arr[pair_tokens + 1] - starts
+    offsets = np.cumsum(lengths) - lengths
+    entries = np.repeat(starts - offsets, lengths) + np.arange(int(lengths.sum()))
+    rows = np.repeat(pair_rows, lengths)
+    multiplicity = np.repeat(pair_counts, lengths)
+
+    # Group by (row, candidate).
+    keys = rows * len(candidates) + entry_candidate_arr[entries]
+    unique_keys, group = np.unique(keys, return_inverse=True)
+    size = len(unique_keys)
+    wins = np.zeros(size, dtype=np.int64)
+    losses = np.zeros(size, dtype=np.int64)
+    total = np.zeros(size, dtype=np.int64)
+    np.add.at(wins, group, entry_wins[entries] * multiplicity)
+    np.add.at(losses, group, entry_losses[entries] * multiplicity)
+    np.add.at(total, group, entry_total[entries] * multiplicity)
+    seen = np.full(size, -1, dtype=np.int64)
+    last_row = np.full(size, row_sentinel, dtype=np.int64)
+    last_position = np.full(size, -np.inf)
+    np.maximum.at(seen, group, entry_seen[entries])
+    np.maximum.at(last_row, group, entry_row[entries])
+    np.maximum.at(last_position, group, entry_position[entries])
+    group_rows = unique_keys // len(candidates)
+    group_candidates = unique_keys % len(candidates)
+
+    # Base score and context weight, as in ``_score_candidate``/``_context_weight``.
+    wins_f = wins.astype(float)
+    total_f = total.astype(float)
+    confidence = np.divide(wins_f, total_f, out=np.zeros(size), where=total_f > 0)
+    base = np.where(total_f > 0, wins_f - losses + confidence, 0.0)
+    weight = np.ones(size)
+    query_positions = np.asarray(
+        [np.nan if value is None else float(value) for value in positions], dtype=float
+    )[group_rows]
+    has_position = ~np.isnan(query_positions) & np.isfinite(last_position)
+    gap = np.abs(np.where(has_position, query_positions, 0.0) - np.where(has_position, last_position, 0.0))
+    weight = np.where(has_position & (gap < 30.0), weight * np.maximum(0.2, gap / 30.0), weight)
+    query_rows = np.asarray(
+        [row_sentinel if value is None else int(value) for value in row_indices], dtype=np.int64
+    )[group_rows]
+    has_row = (query_rows != row_sentinel) & (last_row != row_sentinel)
+    row_gap = np.abs(np.where(has_row, query_rows, 0) - np.where(has_row, last_row, 0)).astype(float)
+    weight = np.where(has_row & (row_gap <= 3), weight * np.maximum(0.3, row_gap / 3.0), weight)
+    score = base * weight
+
+    valid = (base > 0) & (score > 0)
+    order = np.lexsort((-score, group_rows))
+    order = order[valid[order]]
+    if not len(order):
+        return results
+    sorted_rows = group_rows[order]
+    row_start = np.searchsorted(sorted_rows, np.arange(len(token_rows)), side="left")
+    row_end = np.searchsorted(sorted_rows, np.arange(len(token_rows)), side="right")
+    kth = np.where(
+        row_end - row_start >= limit,
+        score[order][np.minimum(row_start + limit - 1, len(order) - 1)],
+        -np.inf,
+    )
+    keep = order[score[order] >= kth[sorted_rows] - _PRUNE_MARGIN]
+
+    identifiers = list(candidates)
+    shortlisted: List[List[tuple]] = [[] for _ in token_rows]
+    for index in keep.tolist():
+        row = int(group_rows[index])
+        stats = {
+            "wins": int(wins[index]),
+            "losses": int(losses[index]),
+            "total": int(total[index]),
+            "last_seen": ordered_timestamps[seen[index]] if seen[index] >= 0 else None,
+            "last_row_index": None if last_row[index] == row_sentinel else int(last_row[index]),
+            "last_position": None if last_position[index] == -np.inf else float(last_position[index]),
+        }
+        entry = model._score_candidate_entry(
+            identifiers[int(group_candidates[index])],
+            stats,
+            row_indices[row],
+            positions[row],
+        )
+        if entry is not None:
+            shortlisted[row].append(entry)
+
+    for row, entries_for_row in enumerate(shortlisted):
+        entries_for_row.sort(key=lambda item: model._rank_key(*item), reverse=True)
+        results[row] = [candidate for candidate, _ in entries_for_row[:limit]]
+    return results
@@ -0,0 +1,535 @@
+"""Memory-mapped, read-only snapshots of the proposal model.
+
+``ProposalModel.load`` parses the whole JSON document into nested dicts.
+:func:`write_snapshot` exports the statistics once into a flat binary file
+that :class:`ProposalSnapshot` maps into memory and queries in place:
+
+* a sorted UTF-8 string table (tokens, identifiers, timestamps);
+* a token table with, per category, the entry range and the range of its
+  ranking summary (identifiers with wins, best ``wins - losses`` first);
+* packed columns for identifier, wins, losses, total, last row, last
+  position and last seen.
+
+Because strings are stored in sorted order, string ids compare like the
+strings themselves, so lookups are binary searches and no part of the file is
+deserialised up front.  Opening a snapshot costs the same regardless of model
+size, and processes that map the same file share its pages.
+
+Deltas learned after the export (see :mod:`auto_movie_edit.proposal_log`) are
+replayed into a small in-memory overlay that is combined with the mapped
+statistics on lookup, exactly like replaying them into the full model.
+"""
+
+from __future__ import annotations
+
+import heapq
+import math
+import mmap
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+from .proposals import ProposalModel
+
+__all__ = [
+    "SNAPSHOT_SUFFIX",
+    "ProposalSnapshot",
+    "open_fresh_snapshot",
+    "snapshot_path",
+    "write_snapshot",
+]
+
+
+SNAPSHOT_SUFFIX = ".snapshot"
+CATEGORIES = ("telop", "pack", "asset", "fx")
+
+_MAGIC = b"AMEPSNP1"
+_FORMAT_VERSION = 1
+_NONE = 0xFFFFFFFF
+_NO_ROW = -(2**63)
+# magic, little-endian flag, format, model version, strings, tokens, entries,
+# summary entries, processed ids, compacted_at string id
+_HEADER = struct.Struct("=8sBxxxIIIIIIII")
+_SECTIONS = (
+    ("string_offsets", "Q"),
+    ("string_bytes", "B"),
+    ("tokens", "I"),
+    ("token_ranges", "I"),
+    ("identifiers", "I"),
+    ("wins", "q"),
+    ("losses", "q"),
+    ("totals", "q"),
+    ("last_rows", "q"),
+    ("last_positions", "d"),
+    ("last_seen", "I"),
+    ("summary", "I"),
+    ("processed", "I"),
+)
+
+
+def snapshot_path(model_path: Path | str) -> Path:
+    """Return the snapshot file that belongs to ``model_path``."""
+
+    return Path(model_path).with_suffix(SNAPSHOT_SUFFIX)
+
+
+def write_snapshot(model: ProposalModel, path: Path | str) -> Path:
+    """Export ``model`` (including any replayed deltas) to ``path``."""
+
+    path = Path(path)
+    rows = [row for row in model.iter_stats() if row[1] in CATEGORIES]
+
+    strings = {token for token, *_ in rows}
+    strings.update(identifier for _, _, identifier, _ in rows)
+    strings.update(stats["last_seen"] for *_, stats in rows if stats.get("last_seen"))
+    processed = model._processed_order[-model.max_history :]
+    strings.update(processed)
+    if model.compacted_at:
+        strings.add(model.compacted_at)
+    ordered = sorted(strings)
+    string_ids = {value: index for index, value in enumerate(ordered)}
+
+    grouped: Dict[int, Dict[int, List[Tuple[int, Dict[str, Any]]]]] = {}
+    for token, category, identifier, stats in rows:
+        grouped.setdefault(string_ids[token], {}).setdefault(
+            CATEGORIES.index(category), []
+        ).append((string_ids[identifier], stats))
+
+    columns: Dict[str, array] = {name: array(code) for name, code in _SECTIONS}
+    offset = 0
+    columns["string_offsets"].append(0)
+    for value in ordered:
+        encoded = value.encode("utf-8")
+        columns["string_bytes"].frombytes(encoded)
+        offset += len(encoded)
+        columns["string_offsets"].append(offset)
+
+    for token_id in sorted(grouped):
+        columns["tokens"].append(token_id)
+        for category_index in range(len(CATEGORIES)):
+            entries = sorted(grouped[token_id].get(category_index, []), key=lambda item: item[0])
+            entry_start = len(columns["identifiers"])
+            ranked = []
+            for position, (identifier_id, stats) in enumerate(entries, start=entry_start):
+                wins = int(stats.get("wins", 0))
+                losses = int(stats.get("losses", 0))
+                last_row = model._int_value(stats.get("last_row_index"))
+                last_position = model._float_value(stats.get("last_position"))
+                last_seen = stats.get("last_seen")
+                columns["identifiers"].append(identifier_id)
+                columns["wins"].append(wins)
+                columns["losses"].append(losses)
+                columns["totals"].append(int(stats.get("total", 0)))
+                columns["last_rows"].append(_NO_ROW if last_row is None else last_row)
+                columns["last_positions"].append(math.nan if last_position is None else last_position)
+                columns["last_seen"].append(string_ids[last_seen] if last_seen else _NONE)
+                if wins > 0:
+                    ranked.append((wins - losses, identifier_id, position))
+            ranked.sort(reverse=True)
+            summary_start = len(columns["summary"])
+            columns["summary"].extend(position for _, _, position in ranked)
+            columns["token_ranges"].extend(
+                (entry_start, len(columns["identifiers"]), summary_start, len(columns["summary"]))
+            )
+    columns["processed"].extend(string_ids[entry_id] for entry_id in processed)
+
+    header = _HEADER.pack(
+        _MAGIC,
+        1 if sys.byteorder == "little" else 0,
+        _FORMAT_VERSION,
+        int(model.version),
+        len(ordered),
+        len(columns["tokens"]),
+        len(columns["identifiers"]),
+        len(columns["summary"]),
+        len(columns["processed"]),
+        string_ids[model.compacted_at] if model.compacted_at else _NONE,
+    )
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary = path.with_name(path.name + ".tmp")
+    with temporary.open("wb") as handle:
+        handle.write(header)
+        position = len(header)
+        for name, _ in _SECTIONS:
+            padding = -position % 8
+            handle.write(b"\0" * padding)
+            data = columns[name].tobytes()
+            handle.write(data)
+            position += padding + len(data)
+    os.replace(temporary, path)
+    return path
+
+
+def open_fresh_snapshot(model_path: Path | str) -> "ProposalSnapshot | None":
+    """Open the snapshot next to ``model_path`` unless the model changed after it.
+
+    Pending delta log records of a JSON model are overlaid on the snapshot.
+    Returns ``None`` when there is no usable snapshot.
+    """
+
+    model_path = Path(model_path)
+    path = snapshot_path(model_path)
+    try:
+        exported = path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+    for source in (model_path, model_path.with_name(model_path.name + "-wal")):
+        try:
+            if source.stat().st_mtime_ns > exported:
+                return None
+        except FileNotFoundError:
+            continue
+    try:
+        snapshot = ProposalSnapshot.open(path)
+    except (OSError, ValueError):
+        return None
+    if model_path.suffix.lower() == ".json":
+        from .locking import file_lock
+        from .proposal_log import apply_pending_deltas
+
+        with file_lock(model_path, shared=True):
+            apply_pending_deltas(snapshot, model_path)
+    return snapshot
+
+
+class ProposalSnapshot(ProposalModel):
+    """Read-only proposal model served from a memory-mapped snapshot.
+
+    ``update_from_history`` only fills an in-memory overlay; ``save`` writes
+    a new snapshot containing the mapped statistics plus the overlay.
+    """
+
+    def __init__(self, path: Path | str) -> None:
+        super().__init__()
+        self.path = Path(path)
+        self._strings: Dict[int, str] = {}
+        self._string_ids: Dict[str, int | None] = {}
+        with self.path.open("rb") as handle:
+            self._mmap = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self._map_sections()
+        except Exception:
+            self.close()
+            raise
+        # Decoded strings and lookups, filled as queries touch them.
+        self._ranges: Dict[Tuple[str, str], Tuple[int, int, int, int] | None] = {}
+        self._mapped: Dict[Tuple[str, str], Mapping[str, Dict[str, Any]]] = {}
+        # Learned after the export; combined with the mapped statistics on lookup.
+        self._overlay = ProposalModel()
+        self._overlay._processed = self._processed
+        self._overlay._processed_order = self._processed_order
+
+    @classmethod
+    def open(cls, path: Path | str) -> "ProposalSnapshot":
+        """Map the snapshot at ``path``."""
+
+        return cls(path)
+
+    @classmethod
+    def load(cls, path: Path | str, include_deltas: bool = True) -> "ProposalSnapshot":
+        """Map the snapshot at ``path`` (``include_deltas`` is accepted for compatibility)."""
+
+        return cls(path)
+
+    def save(self, path: Path | str) -> None:
+        """Write the mapped statistics plus the overlay as a new snapshot."""
+
+        write_snapshot(self, path)
+
+    def close(self) -> None:
+        """Release the memory map."""
+
+        for view in getattr(self, "_views", []):
+            view.release()
+        self._views = []
+        if not self._mmap.closed:
+            self._mmap.close()
+
+    def __enter__(self) -> "ProposalSnapshot":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def update_from_history(self, history: Iterable[Dict[str, Any]]) -> bool:
+        """Learn ``history`` into the in-memory overlay."""
+
+        changed = self._overlay.update_from_history(history)
+        if changed:
+            self._summaries.clear()
+        return changed
+
+    def iter_stats(self) -> Iterator[Tuple[str, str, str, Dict[str, Any]]]:
+        """Yield every ``(token, category, identifier, stats)`` entry."""
+
+        seen: set[Tuple[str, str]] = set()
+        for index in range(len(self._tokens)):
+            token = self._string(self._tokens[index])
+            for category_index, category in enumerate(CATEGORIES):
+                stats = self._token_stats(token, category)
+                for identifier, values in stats.items():
+                    yield token, category, identifier, values
+                seen.add((token, category))
+        for token, categories in self._overlay.stats.items():
+            for category, identifiers in categories.items():
+                if (token, category) in seen:
+                    continue
+                for identifier, values in identifiers.items():
+                    yield token, category, identifier, values
+
+    def entry_count(self) -> int:
+        """Return the number of statistics, including overlay-only entries."""
+
+        return sum(1 for _ in self.iter_stats())
+
+    def compact(self, **options: Any) -> Any:
+        raise TypeError("Proposal snapshots are read-only; compact the source model instead")
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+    def _map_sections(self) -> None:
+        buffer = memoryview(self._mmap)
+        self._views: List[memoryview] = [buffer]
+        (
+            magic,
+            little_endian,
+            format_version,
+            model_version,
+            n_strings,
+            n_tokens,
+            n_entries,
+            n_summary,
+            n_processed,
+            compacted_at,
+        ) = _HEADER.unpack_from(buffer, 0)
+        if magic != _MAGIC or format_version != _FORMAT_VERSION:
+            raise ValueError(f"Not a proposal snapshot: {self.path}")
+        if little_endian != (1 if sys.byteorder == "little" else 0):
+            raise ValueError(f"Snapshot byte order does not match this machine: {self.path}")
+
+        lengths = {
+            "string_offsets": n_strings + 1,
+            "tokens": n_tokens,
+            "token_ranges": n_tokens * len(CATEGORIES) * 4,
+            "summary": n_summary,
+            "processed": n_processed,
+        }
+        position = _HEADER.size
+        for name, code in _SECTIONS:
+            position += -position % 8
+            if name == "string_bytes":
+                count = self._string_offsets[-1]
+            else:
+                count = lengths.get(name, n_entries)
+            size = count * struct.calcsize(code)
+            view = buffer[position : position + size]
+            if code != "B":
+                view = view.cast(code)
+            self._views.append(view)
+            setattr(self, f"_{name}", view)
+            position += size
+
+        self.version = model_version
+        self.compacted_at = None if compacted_at == _NONE else self._string(compacted_at)
+        self._processed_order = [self._string(index) for index in self._processed]
+        self._processed = set(self._processed_order)
+
+    def _string(self, index: int) -> str:
+        value = self._strings.get(index)
+        if value is None:
+            start = self._string_offsets[index]
+            end = self._string_offsets[index + 1]
+            value = self._strings[index] = bytes(self._string_bytes[start:end]).decode("utf-8")
+            self._string_ids[value] = index
+        return value
+
+    def _string_id(self, value: str) -> int | None:
+        try:
+            return self._string_ids[value]
+        except KeyError:
+            pass
+        index = self._string_ids[value] = self._search_string(value)
+        return index
+
+    def _search_string(self, value: str) -> int | None:
+        # UTF-8 byte order equals code point order, so bytes compare like strings.
+        encoded = value.encode("utf-8")
+        offsets = self._string_offsets
+        strings = self._string_bytes
+        low, high = 0, len(offsets) - 1
+        while low < high:
+            middle = (low + high) // 2
+            if bytes(strings[offsets[middle] : offsets[middle + 1]]) < encoded:
+                low = middle + 1
+            else:
+                high = middle
+        if low < len(offsets) - 1 and bytes(strings[offsets[low] : offsets[low + 1]]) == encoded:
+            return low
+        return None
+
+    def _ranges_for(self, token: str, category: str) -> Tuple[int, int, int, int] | None:
+        key = (token, category)
+        if key in self._ranges:
+            return self._ranges[key]
+        ranges = None
+        token_id = self._string_id(token)
+        if token_id is not None:
+            index = bisect_left(self._tokens, token_id)
+            if index < len(self._tokens) and self._tokens[index] == token_id:
+                base = (index * len(CATEGORIES) + CATEGORIES.index(category)) * 4
+                ranges = tuple(self._token_ranges[base : base + 4])
+        self._ranges[key] = ranges  # type: ignore[assignment]
+        return ranges  # type: ignore[return-value]
+
+    def _entry_stats(self, index: int) -> Dict[str, Any]:
+        last_row = self._last_rows[index]
+        last_position = self._last_positions[index]
+        last_seen = self._last_seen[index]
+        return {
+            "wins": self._wins[index],
+            "losses": self._losses[index],
+            "total": self._totals[index],
+            "last_seen": None if last_seen == _NONE else self._string(last_seen),
+            "last_row_index": None if last_row == _NO_ROW else last_row,
+            "last_position": None if math.isnan(last_position) else last_position,
+        }
+
+    def _token_stats(self, token: str, category: str) -> Mapping[str, Dict[str, Any]]:
+        if category not in CATEGORIES:
+            return {}
+        key = (token, category)
+        mapped = self._mapped.get(key)
+        if mapped is None:
+            ranges = self._ranges_for(token, category)
+            mapped = self._mapped[key] = (
+                _MappedStats(self, ranges[0], ranges[1]) if ranges else {}
+            )
+        overlay = self._overlay.stats.get(token, {}).get(category)
+        if overlay:
+            return _OverlaidStats(mapped, overlay)
+        return mapped
+
+    def _iter_token_stats(
+        self, tokens: List[str], category: str
+    ) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        for token in tokens:
+            yield from self._token_stats(token, category).items()
+
+    def _token_summary(self, token: str, category: str) -> Iterable[Tuple[int, str]]:
+        if category not in CATEGORIES:
+            return ()
+        ranges = self._ranges_for(token, category)
+        mapped = self._iter_summary(ranges[2], ranges[3]) if ranges else iter(())
+        overlay = self._overlay.stats.get(token, {}).get(category)
+        if not overlay:
+            return mapped
+        stats = self._token_stats(token, category)
+        changed = []
+        for identifier in overlay:
+            merged = stats[identifier]
+            wins = int(merged["wins"])
+            if wins > 0:
+                changed.append((wins - int(merged["losses"]), identifier))
+        changed.sort(reverse=True)
+        untouched = (item for item in mapped if item[1] not in overlay)
+        return heapq.merge(untouched, changed, reverse=True)
+
+    def _iter_summary(self, start: int, end: int) -> Iterator[Tuple[int, str]]:
+        for position in range(start, end):
+            index = self._summary[position]
+            yield self._wins[index] - self._losses[index], self._string(self._identifiers[index])
+
+    def _record(self, *args: Any) -> bool:  # pragma: no cover - overlay records instead
+        raise TypeError("Proposal snapshots are read-only")
+
+
+class _MappedStats(Mapping):
+    """``identifier -> stats`` view over one entry range of a snapshot."""
+
+    def __init__(self, snapshot: ProposalSnapshot, start: int, end: int) -> None:
+        self._snapshot = snapshot
+        self._start = start
+        self._end = end
+
+    def __len__(self) -> int:
+        return self._end - self._start
+
+    def __iter__(self) -> Iterator[str]:
+        snapshot = self._snapshot
+        for index in range(self._start, self._end):
+            yield snapshot._string(snapshot._identifiers[index])
+
+    def __getitem__(self, identifier: str) -> Dict[str, Any]:
+        stats = self.get(identifier)
+        if stats is None:
+            raise KeyError(identifier)
+        return stats
+
+    def __contains__(self, identifier: object) -> bool:
+        return isinstance(identifier, str) and self.get(identifier) is not None
+
+    def get(self, identifier: str, default: Any = None) -> Any:
+        snapshot = self._snapshot
+        identifier_id = snapshot._string_id(identifier)
+        if identifier_id is not None:
+            index = bisect_left(snapshot._identifiers, identifier_id, self._start, self._end)
+            if index < self._end and snapshot._identifiers[index] == identifier_id:
+                return snapshot._entry_stats(index)
+        return default
+
+    def items(self) -> Iterator[Tuple[str, Dict[str, Any]]]:  # type: ignore[override]
+        snapshot = self._snapshot
+        for index in range(self._start, self._end):
+            yield snapshot._string(snapshot._identifiers[index]), snapshot._entry_stats(index)
+
+
+class _OverlaidStats(Mapping):
+    """Mapped statistics with overlay updates applied as ``_record`` would."""
+
+    def __init__(self, mapped: Mapping[str, Dict[str, Any]], overlay: Dict[str, Dict[str, Any]]) -> None:
+        self._mapped = mapped
+        self._overlay = overlay
+
+    def __len__(self) -> int:
+        return len(self._mapped) + sum(1 for key in self._overlay if key not in self._mapped)
+
+    def __iter__(self) -> Iterator[str]:
+        for identifier, _ in self.items():
+            yield identifier
+
+    def __getitem__(self, identifier: str) -> Dict[str, Any]:
+        update = self._overlay.get(identifier)
+        base = self._mapped.get(identifier)
+        if base is None:
+            if update is None:
+                raise KeyError(identifier)
+            return update
+        return base if update is None else _combine(base, update)
+
+    def items(self) -> Iterator[Tuple[str, Dict[str, Any]]]:  # type: ignore[override]
+        for identifier, base in self._mapped.items():
+            update = self._overlay.get(identifier)
+            yield identifier, base if update is None else _combine(base, update)
+        for identifier, update in self._overlay.items():
+            if identifier not in self._mapped:
+                yield identifier, update
+
+
+def _combine(base: Dict[str, Any], update: Dict[str, Any]) -> Dict[str, Any]:
+    combined = dict(base)
+    combined["wins"] = int(base.get("wins", 0)) + int(update.get("wins", 0))
+    combined["losses"] = int(base.get("losses", 0)) + int(update.get("losses", 0))
+    combined["total"] = int(base.get("total", 0)) + int(update.get("total", 0))
+    if update.get("last_seen"):
+        combined["last_seen"] = update["last_seen"]
+    for key in ("last_row_index", "last_position"):
+        value = update.get(key)
+        if value is not None and (combined.get(key) is None or value >= combined[key]):
+            combined[key] = value
+    return combined
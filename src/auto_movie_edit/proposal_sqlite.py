@@ -0,0 +1,370 @@
+"""SQLite storage backend for :class:`~auto_movie_edit.proposals.ProposalModel`.
+
+The JSON model keeps every ``token -> category -> identifier`` statistic in a
+single document that has to be parsed and rewritten on each build.  This
+backend stores one row per statistic in an indexed table so that
+
+* ``suggest`` only reads the rows for the tokens of the current subtitle, and
+* ``update_from_history`` upserts the touched rows instead of rewriting the
+  whole model.
+
+Scoring and ranking are inherited unchanged from :class:`ProposalModel`.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+from .proposals import ProposalModel
+
+__all__ = ["SqliteProposalModel", "migrate_json_model"]
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS proposal_stats (
+    token TEXT NOT NULL,
+    category TEXT NOT NULL,
+    identifier TEXT NOT NULL,
+    wins INTEGER NOT NULL DEFAULT 0,
+    losses INTEGER NOT NULL DEFAULT 0,
+    total INTEGER NOT NULL DEFAULT 0,
+    last_seen TEXT,
+    last_row_index INTEGER,
+    last_position REAL,
+    decayed_at TEXT,
+    PRIMARY KEY (token, category, identifier)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS processed (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    entry_id TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# Mirrors ``ProposalModel._record``: counters are incremented, ``last_seen`` is
+# replaced when a timestamp is given and the row/position keep their maximum.
+_UPSERT = """
+INSERT INTO proposal_stats (
+    token, category, identifier, wins, losses, total,
+    last_seen, last_row_index, last_position
+) VALUES (?, ?, ?, ?, ?, 1, ?, ?, ?)
+ON CONFLICT (token, category, identifier) DO UPDATE SET
+    wins = wins + excluded.wins,
+    losses = losses + excluded.losses,
+    total = total + 1,
+    last_seen = COALESCE(excluded.last_seen, last_seen),
+    last_row_index = CASE
+        WHEN excluded.last_row_index IS NULL THEN last_row_index
+        WHEN last_row_index IS NULL OR excluded.last_row_index >= last_row_index
+            THEN excluded.last_row_index
+        ELSE last_row_index
+    END,
+    last_position = CASE
+        WHEN excluded.last_position IS NULL THEN last_position
+        WHEN last_position IS NULL OR excluded.last_position >= last_position
+            THEN excluded.last_position
+        ELSE last_position
+    END
+"""
+
+_INSERT_STATS = """
+INSERT OR REPLACE INTO proposal_stats (
+    token, category, identifier, wins, losses, total,
+    last_seen, last_row_index, last_position, decayed_at
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+# Seconds a writer waits for a concurrent transaction to finish.
+_BUSY_TIMEOUT = 60.0
+
+# SQLite limits the number of bound parameters per statement.
+_QUERY_CHUNK = 500
+
+
+class SqliteProposalModel(ProposalModel):
+    """Proposal model persisted in an SQLite database."""
+
+    def __init__(self, path: Path | str, version: int = 1) -> None:
+        super().__init__(version=version)
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # WAL lets readers work while another process writes; writers wait
+        # for each other instead of failing with "database is locked".
+        self._conn = sqlite3.connect(str(self.path), timeout=_BUSY_TIMEOUT)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(proposal_stats)")}
+        if "decayed_at" not in columns:
+            # Databases created before compaction kept per-entry anchors.
+            self._conn.execute("ALTER TABLE proposal_stats ADD COLUMN decayed_at TEXT")
+        self._pending: List[Tuple[Any, ...]] = []
+        self._new_processed: List[str] = []
+        self._token_cache: Dict[Tuple[str, str], Dict[str, Dict[str, Any]]] = {}
+
+        self._needs_vacuum = False
+        self.compacted_at = self._meta("compacted_at")
+
+        stored_version = self._meta("version")
+        if stored_version is not None:
+            try:
+                self.version = int(stored_version)
+            except ValueError:  # pragma: no cover - defensive
+                pass
+        rows = self._conn.execute(
+            "SELECT entry_id FROM processed ORDER BY seq DESC LIMIT ?",
+            (self.max_history,),
+        ).fetchall()
+        self._processed_order = [entry_id for (entry_id,) in reversed(rows)]
+        self._processed = set(self._processed_order)
+
+    @classmethod
+    def load(cls, path: Path | str) -> "SqliteProposalModel":
+        """Open (or create) the database at ``path``."""
+
+        return cls(path)
+
+    def save(self, path: Path | str | None = None) -> None:
+        """Commit pending statistics.
+
+        ``path`` is accepted for compatibility with :meth:`ProposalModel.save`;
+        a different path exports a copy of the database there.
+        """
+
+        self._flush()
+        if self._new_processed:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO processed (entry_id) VALUES (?)",
+                [(entry_id,) for entry_id in self._new_processed],
+            )
+            self._new_processed.clear()
+            self._conn.execute(
+                "DELETE FROM processed WHERE seq <= (SELECT MAX(seq) FROM processed) - ?",
+                (self.max_history,),
+            )
+        self._set_meta("version", str(self.version))
+        if self.compacted_at:
+            self._set_meta("compacted_at", self.compacted_at)
+        self._set_meta(
+            "updated_at", datetime.utcnow().replace(microsecond=0).isoformat() + "Z"
+        )
+        self._conn.commit()
+        if self._needs_vacuum:
+            self._conn.execute("VACUUM")
+            self._needs_vacuum = False
+
+        if path is not None and Path(path).resolve() != self.path.resolve():
+            target = Path(path)
+            target.parent.mkdir(parents=True, exist_ok=True)
+            with sqlite3.connect(str(target)) as destination:
+                self._conn.backup(destination)
+            destination.close()
+
+    def close(self) -> None:
+        """Close the underlying connection, discarding uncommitted changes."""
+
+        self._conn.close()
+
+    def __enter__(self) -> "SqliteProposalModel":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def update_from_history(self, history: Iterable[Dict[str, Any]]) -> bool:
+        """Update statistics using ``history``; call :meth:`save` to commit."""
+
+        changed = super().update_from_history(history)
+        self._flush()
+        return changed
+
+    def iter_stats(self) -> Iterator[Tuple[str, str, str, Dict[str, Any]]]:
+        """Yield every ``(token, category, identifier, stats)`` row."""
+
+        self._flush()
+        cursor = self._conn.execute(
+            "SELECT token, category, identifier, wins, losses, total,"
+            " last_seen, last_row_index, last_position, decayed_at FROM proposal_stats"
+        )
+        for token, category, identifier, *values in cursor:
+            yield token, category, identifier, self._stats_dict(values)
+
+    def entry_count(self) -> int:
+        """Return the number of stored statistics rows."""
+
+        self._flush()
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM proposal_stats").fetchone()
+        return int(count)
+
+    def import_stats(
+        self,
+        rows: Iterable[Tuple[str, str, str, Dict[str, Any]]],
+        processed: Iterable[str] = (),
+    ) -> int:
+        """Insert ``rows`` as-is (replacing existing rows) and return the count."""
+
+        count = 0
+        batch: List[Tuple[Any, ...]] = []
+        for token, category, identifier, stats in rows:
+            batch.append(
+                (
+                    token,
+                    category,
+                    identifier,
+                    int(stats.get("wins", 0)),
+                    int(stats.get("losses", 0)),
+                    int(stats.get("total", 0)),
+                    stats.get("last_seen") or None,
+                    self._int_value(stats.get("last_row_index")),
+                    self._float_value(stats.get("last_position")),
+                    stats.get("decayed_at") or None,
+                )
+            )
+            if len(batch) >= 10000:
+                self._conn.executemany(_INSERT_STATS, batch)
+                count += len(batch)
+                batch.clear()
+        if batch:
+            self._conn.executemany(_INSERT_STATS, batch)
+            count += len(batch)
+        self._token_cache.clear()
+        self._summaries.clear()
+        for entry_id in processed:
+            self._register_processed(entry_id)
+        return count
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+    def _record(
+        self,
+        token: str,
+        category: str,
+        identifier: str,
+        approved: bool | None,
+        timestamp: str | None,
+        row_index: int | None,
+        position: float | None,
+    ) -> bool:
+        self._pending.append(
+            (
+                token,
+                category,
+                identifier,
+                1 if approved is True else 0,
+                1 if approved is False else 0,
+                timestamp or None,
+                self._int_value(row_index),
+                self._float_value(position),
+            )
+        )
+        return True
+
+    def _replace_stats(self, rows: Iterable[Tuple[str, str, str, Dict[str, Any]]]) -> None:
+        self._flush()
+        self._conn.execute("DELETE FROM proposal_stats")
+        self.import_stats(rows)
+        self._needs_vacuum = True
+
+    def _flush(self) -> None:
+        if self._pending:
+            self._conn.executemany(_UPSERT, self._pending)
+            self._pending.clear()
+            self._token_cache.clear()
+            self._summaries.clear()
+
+    def _token_stats(self, token: str, category: str) -> Dict[str, Dict[str, Any]]:
+        key = (token, category)
+        cached = self._token_cache.get(key)
+        if cached is None:
+            cursor = self._conn.execute(
+                "SELECT identifier, wins, losses, total, last_seen,"
+                " last_row_index, last_position, decayed_at FROM proposal_stats"
+                " WHERE token = ? AND category = ?",
+                key,
+            )
+            cached = {identifier: self._stats_dict(values) for identifier, *values in cursor}
+            self._token_cache[key] = cached
+        return cached
+
+    def _register_processed(self, entry_id: str) -> None:
+        if entry_id in self._processed:
+            return
+        super()._register_processed(entry_id)
+        self._new_processed.append(entry_id)
+
+    def _iter_token_stats(
+        self, tokens: List[str], category: str
+    ) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        # Repeated tokens contribute once per occurrence, as in the JSON model.
+        counts = Counter(tokens)
+        unique = list(counts)
+        for start in range(0, len(unique), _QUERY_CHUNK):
+            chunk = unique[start : start + _QUERY_CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            cursor = self._conn.execute(
+                "SELECT token, identifier, wins, losses, total, last_seen,"
+                " last_row_index, last_position, decayed_at FROM proposal_stats"
+                f" WHERE category = ? AND token IN ({placeholders})",
+                (category, *chunk),
+            )
+            for token, identifier, *values in cursor:
+                stats = self._stats_dict(values)
+                for _ in range(counts[token]):
+                    yield identifier, stats
+
+    @staticmethod
+    def _stats_dict(values: List[Any]) -> Dict[str, Any]:
+        wins, losses, total, last_seen, last_row_index, last_position, decayed_at = values
+        stats = {
+            "wins": wins,
+            "losses": losses,
+            "total": total,
+            "last_seen": last_seen,
+            "last_row_index": last_row_index,
+            "last_position": last_position,
+        }
+        if decayed_at:
+            stats["decayed_at"] = decayed_at
+        return stats
+
+    def _meta(self, key: str) -> str | None:
+        row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key: str, value: str) -> None:
+        self._conn.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value)
+        )
+
+
+def migrate_json_model(
+    source: Path | str, target: Path | str | None = None
+) -> Tuple[Path, int]:
+    """Copy the JSON model at ``source`` into an SQLite database.
+
+    Pending delta log records of the JSON model are included.  ``target``
+    defaults to ``source`` with a ``.sqlite`` suffix.  Existing rows
+    in the target are replaced.  Returns the database path and the number of
+    migrated statistics rows.
+    """
+
+    from .proposal_log import pending_delta_paths
+
+    source = Path(source)
+    if not source.exists() and not pending_delta_paths(source):
+        raise FileNotFoundError(f"Proposal model not found: {source}")
+    target = Path(target) if target is not None else source.with_suffix(".sqlite")
+
+    legacy = ProposalModel.load(source)
+    with SqliteProposalModel(target) as model:
+        model.version = legacy.version
+        count = model.import_stats(legacy.iter_stats(), legacy._processed_order)
+        model.save()
+    return target, count
@@ -2,12 +2,15 @@
 
 from __future__ import annotations
 
+import heapq
 import json
+import math
 import re
+from collections import Counter
 from dataclasses import dataclass, field
-from datetime import datetime
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Tuple
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, Sequence, Tuple
 
 if TYPE_CHECKING:  # pragma: no cover - type checking only
     from .language import LanguageAnalyzer
@@ -15,12 +18,28 @@ if TYPE_CHECKING:  # pragma: no cover - type checking only
 from .utils import TimecodeError, parse_timecode
 
 __all__ = [
+    "ProposalCompaction",
     "ProposalModel",
     "ProposalSuggestions",
     "ProposalCandidate",
+    "resolve_model_path",
     "update_proposal_model",
 ]
 
+# Model files with these suffixes are opened with the SQLite backend.
+SQLITE_SUFFIXES = (".sqlite", ".sqlite3", ".db")
+
+# Compaction defaults: statistics lose half their weight every 90 days, entries
+# whose decayed total falls below half an observation are dropped, and each
+# category keeps its 5,000 heaviest tokens.
+DEFAULT_HALF_LIFE_DAYS = 90.0
+DEFAULT_MIN_WEIGHT = 0.5
+DEFAULT_MAX_TOKENS_PER_CATEGORY = 5000
+# ``update_proposal_model`` compacts automatically beyond this many entries.
+AUTO_COMPACT_ENTRIES = 200_000
+
+_GLOBAL_TOKEN = "__global__"
+
 
 _TOKEN_PATTERN = re.compile(r"[A-Za-z0-9ぁ-んァ-ヶ一-龯ー]+")
 _APPROVAL_POSITIVE = {
@@ -60,6 +79,17 @@ class ProposalCandidate:
     last_position: float | None = None
 
 
+@dataclass(slots=True)
+class ProposalCompaction:
+    """Summary of a :meth:`ProposalModel.compact` run."""
+
+    entries_before: int
+    entries_after: int
+    tokens_before: int
+    tokens_after: int
+    decayed: int = 0
+
+
 @dataclass(slots=True)
 class ProposalSuggestions:
     """Container for ranked proposal candidates by category."""
@@ -98,18 +128,52 @@ class ProposalModel:
         stats: Dict[str, Dict[str, Dict[str, Dict[str, Any]]]] | None = None,
         processed: Iterable[str] | None = None,
         version: int = 1,
+        compacted_at: str | None = None,
     ) -> None:
         self.version = version
+        self.compacted_at = compacted_at
         self.stats: Dict[str, Dict[str, Dict[str, Dict[str, Any]]]] = stats or {}
         self._processed_order: List[str] = list(processed or [])
         self._processed: set[str] = set(self._processed_order)
         self.max_history = 5000
+        # (token, category) -> [(wins - losses, identifier)] sorted best first.
+        self._summaries: Dict[Tuple[str, str], List[Tuple[int, str]]] = {}
 
     @classmethod
-    def load(cls, path: Path | str) -> "ProposalModel":
-        """Load a model from ``path`` if it exists, otherwise return an empty model."""
+    def load(cls, path: Path | str, include_deltas: bool = True) -> "ProposalModel":
+        """Load a model from ``path`` if it exists, otherwise return an empty model.
+
+        Pending records of the delta log (see :mod:`auto_movie_edit.proposal_log`)
+        are replayed on top of the stored snapshot unless ``include_deltas`` is
+        false.  Paths ending in one of :data:`SQLITE_SUFFIXES` are opened with
+        :class:`~auto_movie_edit.proposal_sqlite.SqliteProposalModel`, and
+        ``.snapshot`` files are memory-mapped read-only by
+        :class:`~auto_movie_edit.proposal_snapshot.ProposalSnapshot`.
+        """
 
         path = Path(path)
+        if cls is ProposalModel and path.suffix.lower() in SQLITE_SUFFIXES:
+            from .proposal_sqlite import SqliteProposalModel
+
+            return SqliteProposalModel.load(path)
+        if cls is ProposalModel and path.suffix.lower() == ".snapshot":
+            from .proposal_snapshot import ProposalSnapshot
+
+            return ProposalSnapshot.load(path)
+        if not path.parent.is_dir():
+            return cls()
+        from .locking import file_lock
+
+        with file_lock(path, shared=True):
+            model = cls._load_snapshot(path)
+            if include_deltas:
+                from .proposal_log import apply_pending_deltas
+
+                apply_pending_deltas(model, path)
+        return model
+
+    @classmethod
+    def _load_snapshot(cls, path: Path) -> "ProposalModel":
         if not path.exists():
             return cls()
         try:
@@ -120,6 +184,7 @@ class ProposalModel:
             stats=raw.get("keywords", {}),
             processed=raw.get("processed", []),
             version=raw.get("version", 1),
+            compacted_at=raw.get("compacted_at"),
         )
 
     def save(self, path: Path | str) -> None:
@@ -133,8 +198,132 @@ class ProposalModel:
             "keywords": self.stats,
             "processed": self._processed_order[-self.max_history :],
         }
+        if self.compacted_at:
+            document["compacted_at"] = self.compacted_at
         path.write_text(json.dumps(document, ensure_ascii=False, indent=2), encoding="utf-8")
 
+    def close(self) -> None:
+        """Release resources held by the storage backend."""
+
+    def iter_stats(self) -> Iterator[Tuple[str, str, str, Dict[str, Any]]]:
+        """Yield every ``(token, category, identifier, stats)`` entry."""
+
+        for token, categories in self.stats.items():
+            for category, identifiers in categories.items():
+                for identifier, stats in identifiers.items():
+                    yield token, category, identifier, stats
+
+    def entry_count(self) -> int:
+        """Return the number of ``(token, category, identifier)`` statistics."""
+
+        return sum(
+            len(identifiers)
+            for categories in self.stats.values()
+            for identifiers in categories.values()
+        )
+
+    # ------------------------------------------------------------------
+    # Maintenance
+    # ------------------------------------------------------------------
+    def compact(
+        self,
+        *,
+        now: datetime | None = None,
+        half_life_days: float = DEFAULT_HALF_LIFE_DAYS,
+        min_weight: float = DEFAULT_MIN_WEIGHT,
+        max_tokens_per_category: int | None = DEFAULT_MAX_TOKENS_PER_CATEGORY,
+    ) -> ProposalCompaction:
+        """Decay, prune and cap the statistics in place.
+
+        Counters decay exponentially with the age of ``last_seen``, or of the
+        entry's ``decayed_at`` anchor once it has been decayed, and are rounded
+        back to whole observations.  The anchor is set to the instant at which
+        the exact decay equals the rounded total, so small counts keep
+        decaying across repeated compactions instead of being rounded back up.
+        Entries whose decayed total falls below ``min_weight`` are dropped,
+        then each category keeps the ``max_tokens_per_category`` tokens with
+        the largest total weight.  The ``__global__`` token is never capped.
+        """
+
+        reference = (now or datetime.now(timezone.utc)).timestamp()
+        reference_text = self._format_timestamp(reference)
+        rows = list(self.iter_stats())
+        tokens_before = len({token for token, *_ in rows})
+
+        kept: List[Tuple[str, str, str, Dict[str, Any]]] = []
+        decayed = 0
+        for token, category, identifier, stats in rows:
+            # Entries of models compacted before anchors were recorded fall
+            # back to the model-wide ``compacted_at``.
+            anchor = stats.get("decayed_at") or self.compacted_at
+            seen_at = max(self._timestamp_value(stats.get("last_seen")), self._timestamp_value(anchor))
+            factor = 1.0
+            if half_life_days > 0 and seen_at > 0:
+                age_days = max(0.0, reference - seen_at) / 86400.0
+                factor = 0.5 ** (age_days / half_life_days)
+            total = int(stats.get("total", 0)) * factor
+            if total < min_weight:
+                continue
+            if factor < 1.0:
+                previous = int(stats.get("total", 0))
+                wins = round(int(stats.get("wins", 0)) * factor)
+                losses = round(int(stats.get("losses", 0)) * factor)
+                rounded = max(round(total), wins + losses, 1)
+                if (wins, losses, rounded) != (
+                    int(stats.get("wins", 0)),
+                    int(stats.get("losses", 0)),
+                    previous,
+                ):
+                    decayed += 1
+                # Anchor the counters at the instant their exact decay equals
+                # the rounded total, so rounding neither restarts the decay
+                # clock nor loses the remainder.
+                anchor_at = seen_at
+                if 0 < rounded < previous:
+                    anchor_at += math.log2(previous / rounded) * half_life_days * 86400.0
+                stats = {
+                    **stats,
+                    "wins": wins,
+                    "losses": losses,
+                    "total": rounded,
+                    "decayed_at": self._format_timestamp(anchor_at),
+                }
+            kept.append((token, category, identifier, stats))
+
+        if max_tokens_per_category is not None:
+            weights: Dict[Tuple[str, str], int] = {}
+            for token, category, _, stats in kept:
+                key = (category, token)
+                weights[key] = weights.get(key, 0) + int(stats["total"])
+            allowed: set[Tuple[str, str]] = set()
+            by_category: Dict[str, List[Tuple[int, str]]] = {}
+            for (category, token), weight in weights.items():
+                if token == _GLOBAL_TOKEN:
+                    allowed.add((category, token))
+                else:
+                    by_category.setdefault(category, []).append((weight, token))
+            for category, ranked in by_category.items():
+                ranked.sort(key=lambda item: (-item[0], item[1]))
+                allowed.update((category, token) for _, token in ranked[:max_tokens_per_category])
+            kept = [row for row in kept if (row[1], row[0]) in allowed]
+
+        self._replace_stats(kept)
+        self.compacted_at = reference_text
+        return ProposalCompaction(
+            entries_before=len(rows),
+            entries_after=len(kept),
+            tokens_before=tokens_before,
+            tokens_after=len({token for token, *_ in kept}),
+            decayed=decayed,
+        )
+
+    def _replace_stats(self, rows: Iterable[Tuple[str, str, str, Dict[str, Any]]]) -> None:
+        stats: Dict[str, Dict[str, Dict[str, Dict[str, Any]]]] = {}
+        for token, category, identifier, values in rows:
+            stats.setdefault(token, {}).setdefault(category, {})[identifier] = dict(values)
+        self.stats = stats
+        self._summaries.clear()
+
     # ------------------------------------------------------------------
     # Learning
     # ------------------------------------------------------------------
@@ -147,7 +336,7 @@ class ProposalModel:
             if entry_id in self._processed:
                 continue
             tokens = self._tokenize(entry.get("subtitle"))
-            tokens.append("__global__")
+            tokens.append(_GLOBAL_TOKEN)
             approved = self._normalize_approval(entry.get("notes", {}).get("approval"))
             timestamp = entry.get("timestamp")
             row_index = self._int_value(entry.get("row_index"))
@@ -210,12 +399,12 @@ class ProposalModel:
         """Return ranked proposal candidates for a subtitle."""
 
         tokens = self._tokenize(subtitle, analyzer=analyzer)
-        tokens.append("__global__")
+        tokens.append(_GLOBAL_TOKEN)
         suggestions: Dict[str, List[ProposalCandidate]] = {}
         for category in ("telop", "pack", "asset", "fx"):
-            aggregated = self._collect_candidates(tokens, category)
-            ranked = self._rank_candidates(
-                aggregated,
+            ranked = self._top_candidates(
+                tokens,
+                category,
                 limit,
                 row_index=row_index,
                 position=position_seconds,
@@ -224,6 +413,52 @@ class ProposalModel:
                 suggestions[category] = ranked
         return ProposalSuggestions(items=suggestions)
 
+    def suggest_many(
+        self,
+        subtitles: Sequence[str | None],
+        positions: Sequence[float | None] | None = None,
+        limit: int = 3,
+        analyzer: "LanguageAnalyzer" | None = None,
+        row_indices: Sequence[int | None] | None = None,
+    ) -> List[ProposalSuggestions]:
+        """Return :meth:`suggest` results for every subtitle of a script.
+
+        ``positions`` and ``row_indices`` give the timeline position (seconds)
+        and row of each subtitle for context weighting.  With NumPy installed
+        all rows of a category are scored together through sparse matrices
+        (:mod:`auto_movie_edit.proposal_matrix`); otherwise each row is ranked
+        on its own.  The results are identical either way.
+        """
+
+        subtitles = list(subtitles)
+        positions = list(positions) if positions is not None else [None] * len(subtitles)
+        row_indices = (
+            list(row_indices) if row_indices is not None else [None] * len(subtitles)
+        )
+        if not (len(subtitles) == len(positions) == len(row_indices)):
+            raise ValueError("subtitles, positions and row_indices must have the same length")
+
+        token_rows = []
+        for subtitle in subtitles:
+            tokens = self._tokenize(subtitle, analyzer=analyzer)
+            tokens.append(_GLOBAL_TOKEN)
+            token_rows.append(tokens)
+
+        from .proposal_matrix import rank_many
+
+        items: List[Dict[str, List[ProposalCandidate]]] = [{} for _ in subtitles]
+        for category in ("telop", "pack", "asset", "fx"):
+            ranked_rows = rank_many(self, token_rows, category, limit, row_indices, positions)
+            if ranked_rows is None:
+                ranked_rows = [
+                    self._top_candidates(tokens, category, limit, row_index=row, position=position)
+                    for tokens, row, position in zip(token_rows, row_indices, positions)
+                ]
+            for target, ranked in zip(items, ranked_rows):
+                if ranked:
+                    target[category] = ranked
+        return [ProposalSuggestions(items=row_items) for row_items in items]
+
     # ------------------------------------------------------------------
     # Internal helpers
     # ------------------------------------------------------------------
@@ -265,6 +500,7 @@ class ProposalModel:
         row_index: int | None,
         position: float | None,
     ) -> bool:
+        self._summaries.pop((token, category), None)
         keyword_stats = self.stats.setdefault(token, {})
         category_stats = keyword_stats.setdefault(category, {})
         item_stats = category_stats.setdefault(
@@ -306,45 +542,157 @@ class ProposalModel:
                     item_stats["last_position"] = current_position
         return True
 
+    def _iter_token_stats(
+        self, tokens: List[str], category: str
+    ) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Yield ``(identifier, stats)`` pairs recorded for ``tokens`` in ``category``."""
+
+        for token in tokens:
+            category_stats = self.stats.get(token, {}).get(category, {})
+            yield from category_stats.items()
+
+    def _token_stats(self, token: str, category: str) -> Dict[str, Dict[str, Any]]:
+        """Return the ``identifier -> stats`` mapping of ``token`` in ``category``."""
+
+        return self.stats.get(token, {}).get(category, {})
+
+    def _token_summary(self, token: str, category: str) -> Iterable[Tuple[int, str]]:
+        """Return ``(wins - losses, identifier)`` pairs of ``token`` sorted best first.
+
+        Only identifiers with at least one win are listed: a candidate without
+        wins never scores above zero, so it cannot enter the ranking.
+        """
+
+        key = (token, category)
+        summary = self._summaries.get(key)
+        if summary is None:
+            summary = []
+            for identifier, stats in self._token_stats(token, category).items():
+                wins = int(stats.get("wins", 0))
+                if wins > 0:
+                    summary.append((wins - int(stats.get("losses", 0)), identifier))
+            summary.sort(reverse=True)
+            self._summaries[key] = summary
+        return summary
+
+    def _top_candidates(
+        self,
+        tokens: List[str],
+        category: str,
+        limit: int,
+        row_index: int | None,
+        position: float | None,
+    ) -> List[ProposalCandidate]:
+        """Return the best ``limit`` candidates without ranking the whole catalogue.
+
+        Threshold-style merge over the per-token summaries: identifiers are
+        visited in descending ``wins - losses`` order of every token and scored
+        exactly.  An identifier not visited yet scores at most the sum of the
+        current (non-negative) summary values plus ``1`` for the confidence
+        term, scaled by a context weight of at most ``1``, so the walk stops
+        once ``limit`` candidates beat that bound.  The result equals
+        ``_rank_candidates(_collect_candidates(...))``.
+        """
+
+        if limit <= 0:
+            return []
+        counts = Counter(tokens)
+        cursors = [
+            (count, iter(self._token_summary(token, category)))
+            for token, count in counts.items()
+        ]
+
+        seen: set[str] = set()
+        best: List[Tuple[Tuple[Any, ...], ProposalCandidate]] = []
+        while cursors:
+            bound = 1.0
+            exhausted = []
+            for cursor in cursors:
+                count, summary = cursor
+                item = next(summary, None)
+                if item is None:
+                    exhausted.append(cursor)
+                    continue
+                net, identifier = item
+                bound += count * max(net, 0)
+                if identifier in seen:
+                    continue
+                seen.add(identifier)
+                stats = self._aggregate_identifier(counts, category, identifier)
+                scored = self._score_candidate_entry(identifier, stats, row_index, position)
+                if scored is None:
+                    continue
+                entry = (self._rank_key(*scored), scored[0])
+                if len(best) < limit:
+                    heapq.heappush(best, entry)
+                elif entry[0] > best[0][0]:
+                    heapq.heapreplace(best, entry)
+            for cursor in exhausted:
+                cursors.remove(cursor)
+            # Scores are rounded to 4 decimals; keep a margin so that an unseen
+            # identifier cannot tie with the current k-th candidate.
+            if len(best) >= limit and best[0][1].score > bound + 1e-4:
+                break
+
+        best.sort(key=lambda item: item[0], reverse=True)
+        return [candidate for _, candidate in best]
+
+    def _aggregate_identifier(
+        self, counts: Counter[str], category: str, identifier: str
+    ) -> Dict[str, Any]:
+        aggregated = self._empty_aggregate()
+        for token, count in counts.items():
+            stats = self._token_stats(token, category).get(identifier)
+            if stats is None:
+                continue
+            for _ in range(count):
+                self._merge_stats(aggregated, stats)
+        return aggregated
+
     def _collect_candidates(
         self, tokens: List[str], category: str
     ) -> Dict[str, Dict[str, Any]]:
         aggregated: Dict[str, Dict[str, Any]] = {}
-        for token in tokens:
-            category_stats = self.stats.get(token, {}).get(category, {})
-            for identifier, stats in category_stats.items():
-                target = aggregated.setdefault(
-                    identifier,
-                    {
-                        "wins": 0,
-                        "losses": 0,
-                        "total": 0,
-                        "last_seen": None,
-                        "last_row_index": None,
-                        "last_position": None,
-                    },
-                )
-                target["wins"] += int(stats.get("wins", 0))
-                target["losses"] += int(stats.get("losses", 0))
-                target["total"] += int(stats.get("total", 0))
-                timestamp = stats.get("last_seen")
-                if timestamp and (
-                    not target["last_seen"]
-                    or timestamp > target["last_seen"]
-                ):
-                    target["last_seen"] = timestamp
-                row_index = self._int_value(stats.get("last_row_index"))
-                if row_index is not None:
-                    existing_row = target.get("last_row_index")
-                    if existing_row is None or row_index > existing_row:
-                        target["last_row_index"] = row_index
-                position = self._float_value(stats.get("last_position"))
-                if position is not None:
-                    existing_position = target.get("last_position")
-                    if existing_position is None or position > existing_position:
-                        target["last_position"] = position
+        for identifier, stats in self._iter_token_stats(tokens, category):
+            target = aggregated.get(identifier)
+            if target is None:
+                target = aggregated[identifier] = self._empty_aggregate()
+            self._merge_stats(target, stats)
         return aggregated
 
+    @staticmethod
+    def _empty_aggregate() -> Dict[str, Any]:
+        return {
+            "wins": 0,
+            "losses": 0,
+            "total": 0,
+            "last_seen": None,
+            "last_row_index": None,
+            "last_position": None,
+        }
+
+    @classmethod
+    def _merge_stats(cls, target: Dict[str, Any], stats: Dict[str, Any]) -> None:
+        target["wins"] += int(stats.get("wins", 0))
+        target["losses"] += int(stats.get("losses", 0))
+        target["total"] += int(stats.get("total", 0))
+        timestamp = stats.get("last_seen")
+        if timestamp and (
+            not target["last_seen"]
+            or timestamp > target["last_seen"]
+        ):
+            target["last_seen"] = timestamp
+        row_index = cls._int_value(stats.get("last_row_index"))
+        if row_index is not None:
+            existing_row = target.get("last_row_index")
+            if existing_row is None or row_index > existing_row:
+                target["last_row_index"] = row_index
+        position = cls._float_value(stats.get("last_position"))
+        if position is not None:
+            existing_position = target.get("last_position")
+            if existing_position is None or position > existing_position:
+                target["last_position"] = position
+
     def _rank_candidates(
         self,
         candidates: Dict[str, Dict[str, Any]],
@@ -354,39 +702,52 @@ class ProposalModel:
     ) -> List[ProposalCandidate]:
         scored: List[Tuple[ProposalCandidate, Dict[str, Any]]] = []
         for identifier, stats in candidates.items():
-            base_score = self._score_candidate(stats)
-            if base_score <= 0:
-                continue
-            weight = self._context_weight(stats, row_index=row_index, position=position)
-            adjusted_score = base_score * weight
-            if adjusted_score <= 0:
-                continue
-            candidate = ProposalCandidate(
-                identifier=identifier,
-                score=round(adjusted_score, 4),
-                base_score=round(base_score, 4),
-                wins=int(stats.get("wins", 0)),
-                losses=int(stats.get("losses", 0)),
-                last_seen=stats.get("last_seen"),
-                last_row_index=self._int_value(stats.get("last_row_index")),
-                last_position=self._float_value(stats.get("last_position")),
-            )
-            scored.append((candidate, stats))
-
-        scored.sort(
-            key=lambda item: (
-                item[0].score,
-                item[0].base_score,
-                item[0].wins,
-                -item[0].losses,
-                self._timestamp_value(item[1].get("last_seen")),
-                item[0].identifier,
-            ),
-            reverse=True,
-        )
+            entry = self._score_candidate_entry(identifier, stats, row_index, position)
+            if entry is not None:
+                scored.append(entry)
+
+        scored.sort(key=lambda item: self._rank_key(*item), reverse=True)
 
         return [candidate for candidate, _ in scored[:limit]]
 
+    def _score_candidate_entry(
+        self,
+        identifier: str,
+        stats: Dict[str, Any],
+        row_index: int | None,
+        position: float | None,
+    ) -> Tuple[ProposalCandidate, Dict[str, Any]] | None:
+        base_score = self._score_candidate(stats)
+        if base_score <= 0:
+            return None
+        weight = self._context_weight(stats, row_index=row_index, position=position)
+        adjusted_score = base_score * weight
+        if adjusted_score <= 0:
+            return None
+        candidate = ProposalCandidate(
+            identifier=identifier,
+            score=round(adjusted_score, 4),
+            base_score=round(base_score, 4),
+            wins=int(stats.get("wins", 0)),
+            losses=int(stats.get("losses", 0)),
+            last_seen=stats.get("last_seen"),
+            last_row_index=self._int_value(stats.get("last_row_index")),
+            last_position=self._float_value(stats.get("last_position")),
+        )
+        return candidate, stats
+
+    def _rank_key(
+        self, candidate: ProposalCandidate, stats: Dict[str, Any]
+    ) -> Tuple[Any, ...]:
+        return (
+            candidate.score,
+            candidate.base_score,
+            candidate.wins,
+            -candidate.losses,
+            self._timestamp_value(stats.get("last_seen")),
+            candidate.identifier,
+        )
+
     def _context_weight(
         self,
         stats: Dict[str, Any],
@@ -432,6 +793,12 @@ class ProposalModel:
         except (TypeError, ValueError):
             return None
 
+    @staticmethod
+    def _format_timestamp(value: float) -> str:
+        return datetime.fromtimestamp(value, timezone.utc).replace(
+            microsecond=0, tzinfo=None
+        ).isoformat() + "Z"
+
     @staticmethod
     def _timestamp_value(value: Any) -> float:
         if not value:
@@ -523,21 +890,58 @@ class ProposalModel:
             self._processed.discard(oldest)
 
 
+def resolve_model_path(path: Path | str) -> Path:
+    """Return the proposal model file for ``path``.
+
+    A directory resolves to ``ai/proposal_model.json`` inside it.  When a JSON
+    model has an SQLite sibling (``proposal_model.sqlite``), the sibling wins.
+    """
+
+    path = Path(path)
+    if path.is_dir():
+        path = path / "ai" / "proposal_model.json"
+    if path.suffix.lower() == ".json":
+        sqlite_path = path.with_suffix(".sqlite")
+        if sqlite_path.exists():
+            return sqlite_path
+    return path
+
+
 def update_proposal_model(
     history: Iterable[Dict[str, Any]], base_path: Path | str
 ) -> Path | None:
-    """Update the proposal model stored under ``base_path`` using ``history``."""
+    """Record ``history`` as learning input for the model under ``base_path``.
+
+    JSON models only get the new records appended to their delta log; the
+    merge into ``proposal_model.json`` happens on a background thread once
+    enough deltas are pending (see :mod:`auto_movie_edit.proposal_log`), so
+    the cost does not grow with the model.  SQLite models are updated in
+    place.  Models that grow beyond :data:`AUTO_COMPACT_ENTRIES` statistics
+    are compacted with the default policy when they are merged.
+    """
 
     history = list(history)
     if not history:
         return None
 
-    base_path = Path(base_path)
-    model_path = base_path / "ai" / "proposal_model.json" if base_path.is_dir() else base_path
+    model_path = resolve_model_path(base_path)
+    if model_path.suffix.lower() not in SQLITE_SUFFIXES:
+        from .proposal_log import append_deltas, delta_log_path, start_background_compaction
+
+        if append_deltas(model_path, history):
+            start_background_compaction(model_path)
+            return model_path
+        if model_path.exists() or delta_log_path(model_path).exists():
+            return model_path
+        return None
 
     model = ProposalModel.load(model_path)
-    if model.update_from_history(history):
-        model.save(model_path)
-        return model_path
+    try:
+        if model.update_from_history(history):
+            if model.entry_count() > AUTO_COMPACT_ENTRIES:
+                model.compact()
+            model.save(model_path)
+            return model_path
+    finally:
+        model.close()
     return model_path if model_path.exists() else None
-
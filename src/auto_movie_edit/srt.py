@@ -1,13 +1,36 @@
-"""SRT (SubRip) subtitle parser used for timeline scaffolding."""
+"""SRT (SubRip) subtitle parser used for timeline scaffolding.
+
+:func:`iter_srt` reads a file through a buffered text stream and yields one
+entry per block, so multi-hour transcripts parse in constant memory.  The
+encoding is detected from the first bytes (:func:`detect_srt_encoding`):
+UTF-8 and UTF-16 byte order marks, BOM-less UTF-16, UTF-8 and CP932 (the
+Shift_JIS variant Windows tools write).
+"""
 
 from __future__ import annotations
 
+import codecs
+import io
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Iterable, Iterator, List
 
 from .utils import Timecode, TimecodeError, parse_timecode
 
+__all__ = ["SrtEntry", "SrtParseError", "detect_srt_encoding", "iter_srt", "parse_srt"]
+
+
+# Bytes inspected by :func:`detect_srt_encoding` and read per buffer refill.
+SAMPLE_SIZE = 64 * 1024
+BUFFER_SIZE = 64 * 1024
+
+_BOMS = (
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+_FALLBACK_ENCODINGS = ("utf-8", "cp932")
+
 
 @dataclass(slots=True)
 class SrtEntry:
@@ -23,50 +46,117 @@ class SrtParseError(RuntimeError):
     """Raised when an SRT file cannot be parsed."""
 
 
-def _chunks(lines: Iterable[str]) -> Iterator[list[str]]:
+def detect_srt_encoding(path: str | Path) -> str:
+    """Return the text encoding of the SRT file at ``path``."""
+
+    path = Path(path)
+    try:
+        with path.open("rb") as handle:
+            sample = handle.read(SAMPLE_SIZE)
+    except FileNotFoundError as exc:
+        raise SrtParseError(f"SRT file not found: {path}") from exc
+
+    for bom, encoding in _BOMS:
+        if sample.startswith(bom):
+            return encoding
+    utf16 = _utf16_without_bom(sample)
+    if utf16:
+        return utf16
+    for encoding in _FALLBACK_ENCODINGS:
+        try:
+            # A multi-byte character may be cut at the end of the sample.
+            codecs.getincrementaldecoder(encoding)().decode(sample, final=len(sample) < SAMPLE_SIZE)
+        except UnicodeDecodeError:
+            continue
+        return encoding
+    raise SrtParseError(f"Cannot detect the encoding of {path} (tried UTF-8, UTF-16 and CP932)")
+
+
+def iter_srt(path: str | Path, encoding: str | None = None) -> Iterator[SrtEntry]:
+    """Yield the entries of an SRT file one block at a time.
+
+    ``encoding`` skips detection.  Malformed blocks raise
+    :class:`SrtParseError` with the file name and the line of the block.
+    """
+
+    path = Path(path)
+    encoding = encoding or detect_srt_encoding(path)
+    try:
+        raw = path.open("rb", buffering=BUFFER_SIZE)
+    except FileNotFoundError as exc:
+        raise SrtParseError(f"SRT file not found: {path}") from exc
+
+    with io.TextIOWrapper(raw, encoding=encoding, newline=None) as stream:
+        line_number = 0
+        try:
+            for start_line, chunk in _chunks(stream):
+                line_number = start_line
+                yield _parse_block(chunk)
+        except UnicodeDecodeError as exc:
+            raise SrtParseError(f"{path.name}: cannot decode the file as {encoding} after line {line_number}") from exc
+        except SrtParseError as exc:
+            raise SrtParseError(f"{path.name}:{line_number}: {exc}") from exc
+
+
+def parse_srt(path: str | Path) -> List[SrtEntry]:
+    """Parse an SRT file and return a list of entries."""
+
+    return list(iter_srt(path))
+
+
+# ----------------------------------------------------------------------
+# Internal helpers
+# ----------------------------------------------------------------------
+def _chunks(lines: Iterable[str]) -> Iterator[tuple[int, list[str]]]:
+    """Yield ``(first line number, lines)`` for every blank-line separated block."""
+
     chunk: list[str] = []
-    for line in lines:
+    start = 0
+    for number, line in enumerate(lines, start=1):
         stripped = line.rstrip("\n")
         if stripped == "":
             if chunk:
-                yield chunk
+                yield start, chunk
                 chunk = []
             continue
+        if not chunk:
+            start = number
         chunk.append(stripped)
     if chunk:
-        yield chunk
+        yield start, chunk
 
 
-def parse_srt(path: str | Path) -> List[SrtEntry]:
-    """Parse an SRT file and return a list of entries."""
-
-    path = Path(path)
+def _parse_block(raw_chunk: list[str]) -> SrtEntry:
     try:
-        text = path.read_text(encoding="utf-8")
-    except FileNotFoundError as exc:
-        raise SrtParseError(f"SRT file not found: {path}") from exc
+        index = int(raw_chunk[0])
+    except ValueError as exc:
+        raise SrtParseError(f"Invalid SRT index line: {raw_chunk[0]!r}") from exc
+    if len(raw_chunk) < 2:
+        raise SrtParseError(f"Missing timecode line for index {index}")
+    times = raw_chunk[1]
+    if "-->" not in times:
+        raise SrtParseError(f"Invalid timecode line for index {index}: {times!r}")
+    start_text, end_text = [part.strip() for part in times.split("-->", 1)]
+    try:
+        start = parse_timecode(start_text)
+        end = parse_timecode(end_text)
+    except TimecodeError as exc:
+        raise SrtParseError(str(exc)) from exc
+    if start is None or end is None:
+        raise SrtParseError(f"Incomplete timecode for index {index}")
+    return SrtEntry(index=index, start=start, end=end, text="\n".join(raw_chunk[2:]))
 
-    entries: list[SrtEntry] = []
-    for raw_chunk in _chunks(text.splitlines()):
-        if not raw_chunk:
-            continue
-        try:
-            index = int(raw_chunk[0])
-        except ValueError as exc:
-            raise SrtParseError(f"Invalid SRT index line: {raw_chunk[0]!r}") from exc
-        if len(raw_chunk) < 2:
-            raise SrtParseError(f"Missing timecode line for index {index}")
-        times = raw_chunk[1]
-        if "-->" not in times:
-            raise SrtParseError(f"Invalid timecode line for index {index}: {times!r}")
-        start_text, end_text = [part.strip() for part in times.split("-->")]
-        try:
-            start = parse_timecode(start_text)
-            end = parse_timecode(end_text)
-        except TimecodeError as exc:
-            raise SrtParseError(str(exc)) from exc
-        if start is None or end is None:
-            raise SrtParseError(f"Incomplete timecode for index {index}")
-        text_lines = raw_chunk[2:]
-        entries.append(SrtEntry(index=index, start=start, end=end, text="\n".join(text_lines)))
-    return entries
+
+def _utf16_without_bom(sample: bytes) -> str | None:
+    """Recognise BOM-less UTF-16 from the NUL bytes of mostly ASCII text."""
+
+    pairs = len(sample) // 2
+    if pairs < 4:
+        return None
+    even_nuls = sample[0 : pairs * 2 : 2].count(0)
+    odd_nuls = sample[1 : pairs * 2 : 2].count(0)
+    if odd_nuls > pairs * 0.3 and even_nuls < pairs * 0.05:
+        return "utf-16-le"
+    if even_nuls > pairs * 0.3 and odd_nuls < pairs * 0.05:
+        return "utf-16-be"
+    return None
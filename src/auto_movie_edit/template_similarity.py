@@ -0,0 +1,207 @@
+"""Near-duplicate detection for extracted pack templates.
+
+Packs absorbed from real projects often differ only by a nudged ``X``/``Y``
+or a keyframe value with floating point noise, and exact hashing turns each
+of them into another ``pack_<hash>``.  :func:`cluster_templates` groups such
+templates so that every near-duplicate can be expressed as its cluster's
+representative plus a few overrides.
+
+A template is flattened into leaves addressed by JSON pointers
+(``/Items/0/X/Values/3/Value``).  Its *structure key* hashes the sorted
+pointers; only templates with the same structure are compared, since only
+they can be rebuilt by overriding leaves.  Numbers are quantised to
+:data:`SIGNIFICANT_DIGITS` significant digits, and ``pointer=value``
+shingles feed a one-permutation MinHash signature (each shingle hash lands
+in one of :data:`NUM_PERMUTATIONS` bins, which keep their minimum), so a
+signature costs one hash per leaf.  Locality-sensitive banding of the
+signatures yields candidate representatives, and the similarity that
+decides is the exact share of leaves whose quantised values agree.
+Clustering is greedy in input
+order: a template joins the most similar earlier representative or becomes
+one itself, so clusters do not drift through chains of small changes.
+
+:func:`template_overrides` computes the exact (unquantised) leaves that
+differ from the representative, and :func:`apply_overrides` applies them
+when the workbook is loaded.
+"""
+
+from __future__ import annotations
+
+import copy
+import hashlib
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Tuple
+
+__all__ = [
+    "DEFAULT_THRESHOLD",
+    "SIGNIFICANT_DIGITS",
+    "TemplateCluster",
+    "apply_overrides",
+    "cluster_templates",
+    "is_pointer_overrides",
+    "template_overrides",
+]
+
+
+DEFAULT_THRESHOLD = 0.8
+SIGNIFICANT_DIGITS = 3
+NUM_PERMUTATIONS = 64
+BANDS = 16
+
+_ROWS = NUM_PERMUTATIONS // BANDS
+_EMPTY_BIN = 1 << 64
+
+
+@dataclass(slots=True)
+class TemplateCluster:
+    """A representative template ID and the near-duplicate IDs folded into it."""
+
+    representative: str
+    members: List[str] = field(default_factory=list)
+
+
+def cluster_templates(
+    templates: Iterable[Tuple[str, Any]],
+    *,
+    threshold: float = DEFAULT_THRESHOLD,
+    significant_digits: int = SIGNIFICANT_DIGITS,
+) -> List[TemplateCluster]:
+    """Group ``(identifier, template)`` pairs into clusters of near-duplicates.
+
+    Returns only clusters with at least one member, in the order their
+    representatives appeared.
+    """
+
+    clusters: Dict[str, TemplateCluster] = {}
+    shingle_sets: Dict[str, frozenset[str]] = {}
+    # (structure key, band index, band values) -> representatives
+    buckets: Dict[Tuple[str, int, Tuple[int, ...]], List[str]] = {}
+
+    for identifier, template in templates:
+        leaves = dict(_leaves(template))
+        structure = hashlib.sha1("\0".join(sorted(leaves)).encode("utf-8")).hexdigest()
+        shingles = frozenset(
+            f"{pointer}={_quantise(value, significant_digits)}" for pointer, value in leaves.items()
+        )
+        signature = _minhash(shingles)
+        bands = [
+            (structure, band, tuple(signature[band * _ROWS : (band + 1) * _ROWS])) for band in range(BANDS)
+        ]
+
+        best: str | None = None
+        best_similarity = threshold
+        seen: set[str] = set()
+        for key in bands:
+            for candidate in buckets.get(key, ()):
+                if candidate in seen:
+                    continue
+                seen.add(candidate)
+                similarity = _agreement(shingles, shingle_sets[candidate])
+                if similarity >= best_similarity:
+                    best, best_similarity = candidate, similarity
+        if best is not None:
+            clusters[best].members.append(identifier)
+            continue
+        clusters[identifier] = TemplateCluster(identifier)
+        shingle_sets[identifier] = shingles
+        for key in bands:
+            buckets.setdefault(key, []).append(identifier)
+
+    return [cluster for cluster in clusters.values() if cluster.members]
+
+
+def template_overrides(representative: Any, template: Any) -> Dict[str, Any]:
+    """Return the leaves of ``template`` that differ from ``representative`` by JSON pointer."""
+
+    base = dict(_leaves(representative))
+    overrides = {}
+    for pointer, value in _leaves(template):
+        if pointer not in base or base[pointer] != value or type(base[pointer]) is not type(value):
+            overrides[pointer] = value
+    return overrides
+
+
+def is_pointer_overrides(overrides: Any) -> bool:
+    """Return ``True`` for a non-empty mapping whose keys are all JSON pointers."""
+
+    return isinstance(overrides, dict) and bool(overrides) and all(
+        isinstance(key, str) and key.startswith("/") for key in overrides
+    )
+
+
+def apply_overrides(template: Any, overrides: Dict[str, Any]) -> Any:
+    """Return a copy of ``template`` with the JSON pointer ``overrides`` applied.
+
+    Raises :class:`ValueError` for a pointer that does not address a leaf.
+    """
+
+    result = copy.deepcopy(template)
+    for pointer, value in overrides.items():
+        tokens = [_unescape(token) for token in pointer.split("/")[1:]]
+        if not tokens:
+            raise ValueError(f"Invalid override pointer: {pointer!r}")
+        parent = result
+        try:
+            for token in tokens[:-1]:
+                parent = parent[int(token)] if isinstance(parent, list) else parent[token]
+            if isinstance(parent, list):
+                parent[int(tokens[-1])] = value
+            elif isinstance(parent, dict):
+                parent[tokens[-1]] = value
+            else:
+                raise TypeError(type(parent).__name__)
+        except (KeyError, IndexError, TypeError, ValueError) as exc:
+            raise ValueError(f"Invalid override pointer: {pointer!r}") from exc
+    return result
+
+
+# ----------------------------------------------------------------------
+# Internal helpers
+# ----------------------------------------------------------------------
+def _leaves(template: Any) -> List[Tuple[str, Any]]:
+    """Flatten ``template`` into ``(JSON pointer, leaf)`` pairs in document order."""
+
+    leaves: List[Tuple[str, Any]] = []
+    stack: List[Tuple[str, Any]] = [("", template)]
+    while stack:
+        pointer, node = stack.pop()
+        if isinstance(node, dict) and node:
+            stack.extend((f"{pointer}/{_escape(str(key))}", value) for key, value in reversed(node.items()))
+        elif isinstance(node, list) and node:
+            stack.extend((f"{pointer}/{index}", node[index]) for index in range(len(node) - 1, -1, -1))
+        else:
+            leaves.append((pointer, node))
+    return leaves
+
+
+def _escape(token: str) -> str:
+    if "~" not in token and "/" not in token:
+        return token
+    return token.replace("~", "~0").replace("/", "~1")
+
+
+def _unescape(token: str) -> str:
+    return token.replace("~1", "/").replace("~0", "~")
+
+
+def _quantise(value: Any, significant_digits: int) -> str:
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return repr(value)
+    return f"{float(value):.{significant_digits}g}"
+
+
+def _minhash(shingles: Iterable[str]) -> List[int]:
+    signature = [_EMPTY_BIN] * NUM_PERMUTATIONS
+    for shingle in shingles:
+        value = int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "little")
+        bin_index, rest = value % NUM_PERMUTATIONS, value // NUM_PERMUTATIONS
+        if rest < signature[bin_index]:
+            signature[bin_index] = rest
+    return signature
+
+
+def _agreement(left: frozenset[str], right: frozenset[str]) -> float:
+    # Both sets hold one shingle per pointer of the same structure.
+    if not left:
+        return 1.0
+    return len(left & right) / len(left)
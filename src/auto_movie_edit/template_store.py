@@ -0,0 +1,130 @@
+"""Content-addressed storage for absorbed templates.
+
+Templates are saved as ``templates/store/<digest>.json`` below the workbook
+directory.  The digest is the SHA-256 of the canonical JSON of a template
+without its override keys (:data:`OVERRIDE_KEYS`, the top-level values the
+builder replaces for every row), so telops that only differ in ``Text`` share
+one file and the workbook IDs (``telop_<text>``, ``pack_<hash>``, ...) become
+aliases pointing to it.  The first template stored under a digest keeps its
+override values as defaults; aliases with other values carry them as JSON
+pointer overrides in their rows.
+
+A digest that already has a file is never written again, so repeated absorbs
+leave unchanged templates (and their modification times) alone.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable
+
+__all__ = ["OVERRIDE_KEYS", "STORE_DIR", "TemplateStore", "template_digest"]
+
+
+STORE_DIR = Path("templates") / "store"
+OVERRIDE_KEYS = frozenset({"Text", "Layer"})
+
+
+def template_digest(template: Any) -> str:
+    """Return the store digest of ``template``, ignoring its override keys."""
+
+    if isinstance(template, dict):
+        template = {key: value for key, value in template.items() if key not in OVERRIDE_KEYS}
+    serialized = json.dumps(template, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+
+
+class TemplateStore:
+    """Collects templates for one workbook directory and writes the new ones in a batch."""
+
+    def __init__(self, base_dir: Path | str) -> None:
+        self.base_dir = Path(base_dir)
+        self.root = self.base_dir / STORE_DIR
+        self._pending: Dict[str, Any] = {}
+
+    def add(self, template: Any) -> str:
+        """Queue ``template`` and return its path relative to the workbook directory."""
+
+        digest = template_digest(template)
+        self._pending.setdefault(digest, template)
+        return (STORE_DIR / f"{digest}.json").as_posix()
+
+    def drain(self) -> Dict[str, Any]:
+        """Return and forget the queued templates by digest (to hand them to another store)."""
+
+        pending, self._pending = self._pending, {}
+        return pending
+
+    def extend(self, templates: Dict[str, Any]) -> None:
+        """Queue templates returned by :meth:`drain`; the first one per digest wins."""
+
+        for digest, template in templates.items():
+            self._pending.setdefault(digest, template)
+
+    def retain(self, references: Iterable[str]) -> None:
+        """Forget queued templates that none of ``references`` points to."""
+
+        keep = {Path(reference).stem for reference in references if Path(reference).parent == STORE_DIR}
+        self._pending = {digest: template for digest, template in self._pending.items() if digest in keep}
+
+    def load(self, reference: str) -> Any:
+        """Return the template behind ``reference``: the stored file, else the queued one.
+
+        Returns ``None`` when neither exists or the file cannot be read.
+        """
+
+        path = self.path(reference)
+        if path.exists():
+            try:
+                return json.loads(path.read_text(encoding="utf-8-sig"))
+            except (OSError, ValueError):
+                return None
+        if Path(reference).parent == STORE_DIR:
+            return self._pending.get(Path(reference).stem)
+        return None
+
+    def path(self, reference: str) -> Path:
+        """Return the file of a reference returned by :meth:`add`."""
+
+        return self.base_dir / reference
+
+    def flush(self, workers: int = 8) -> int:
+        """Write the queued templates whose digest has no file yet; return the count."""
+
+        pending = [(digest, template) for digest, template in self._pending.items() if not self._exists(digest)]
+        self._pending.clear()
+        if not pending:
+            return 0
+        self.root.mkdir(parents=True, exist_ok=True)
+        if workers <= 1 or len(pending) <= 1:
+            written = [self._write(job) for job in pending]
+        else:
+            with ThreadPoolExecutor(max_workers=min(workers, len(pending))) as executor:
+                written = list(executor.map(self._write, pending))
+        return sum(written)
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+    def _exists(self, digest: str) -> bool:
+        return (self.root / f"{digest}.json").exists()
+
+    def _write(self, job: tuple[str, Any]) -> bool:
+        digest, template = job
+        target = self.root / f"{digest}.json"
+        temporary = target.with_name(f"{target.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        temporary.write_text(json.dumps(template, ensure_ascii=False, indent=2), encoding="utf-8")
+        try:
+            # Linking fails if a concurrent absorb stored the digest first, and
+            # readers never see a partially written file.
+            os.link(temporary, target)
+        except FileExistsError:
+            return False
+        finally:
+            temporary.unlink()
+        return True
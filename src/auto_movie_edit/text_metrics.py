@@ -0,0 +1,303 @@
+"""Text width measurement from the glyph metrics of local fonts.
+
+:class:`TextMeasurer` resolves the ``Font`` name of a telop to a font file in
+the system and user font directories and reads the advance width of each
+character from its ``hmtx`` table.  Widths are cached per (font file,
+character) in memory and in a JSON file, together with the font name index,
+so warm runs answer from dictionaries without opening any font.
+
+fontTools (the ``fonts`` extra) is only imported when a font or character
+is missing from the cache.  Without it, or when a font is not installed,
+every character falls back to :data:`FALLBACK_ADVANCE` em, the estimate the
+shrink filter has always used.
+"""
+
+from __future__ import annotations
+
+import atexit
+import hashlib
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Any, Dict, Iterable, List
+
+__all__ = [
+    "FALLBACK_ADVANCE",
+    "TextMeasurer",
+    "default_cache_path",
+    "default_font_dirs",
+    "save_shared_text_measurer",
+    "shared_text_measurer",
+]
+
+
+FALLBACK_ADVANCE = 0.62
+FONT_SUFFIXES = (".ttf", ".otf", ".ttc", ".otc")
+CACHE_VERSION = 1
+
+# Name IDs indexed for lookups: family, full name, PostScript name and
+# typographic family, in every language the font provides.
+_NAME_IDS = (1, 4, 6, 16)
+
+_fonttools: Any = None
+_shared: "TextMeasurer | None" = None
+
+
+def default_font_dirs() -> List[Path]:
+    """Return the font directories searched by default.
+
+    ``AUTO_MOVIE_EDIT_FONT_DIRS`` (separated by :data:`os.pathsep`) is
+    searched first.
+    """
+
+    directories = [Path(entry) for entry in os.environ.get("AUTO_MOVIE_EDIT_FONT_DIRS", "").split(os.pathsep) if entry]
+    home = Path.home()
+    if sys.platform == "win32":  # pragma: no cover - platform specific
+        directories.append(Path(os.environ.get("WINDIR", r"C:\Windows")) / "Fonts")
+        if local := os.environ.get("LOCALAPPDATA"):
+            directories.append(Path(local) / "Microsoft" / "Windows" / "Fonts")
+    elif sys.platform == "darwin":  # pragma: no cover - platform specific
+        directories += [Path("/System/Library/Fonts"), Path("/Library/Fonts"), home / "Library" / "Fonts"]
+    else:
+        directories += [Path("/usr/share/fonts"), Path("/usr/local/share/fonts"), home / ".local" / "share" / "fonts", home / ".fonts"]
+    return directories
+
+
+def default_cache_path() -> Path:
+    """Return the on-disk metric cache (``AUTO_MOVIE_EDIT_CACHE_DIR`` overrides the directory)."""
+
+    directory = os.environ.get("AUTO_MOVIE_EDIT_CACHE_DIR")
+    base = Path(directory) if directory else Path.home() / ".cache" / "auto_movie_edit"
+    return base / "font_metrics.json"
+
+
+class TextMeasurer:
+    """Measures text with real advance widths, caching them in memory and on disk."""
+
+    def __init__(
+        self,
+        font_dirs: Iterable[Path | str] | None = None,
+        cache_path: Path | str | None = None,
+        fallback_advance: float = FALLBACK_ADVANCE,
+    ) -> None:
+        self.font_dirs = [Path(path) for path in (font_dirs if font_dirs is not None else default_font_dirs())]
+        self.cache_path = Path(cache_path) if cache_path is not None else None
+        self.fallback_advance = fallback_advance
+        # font file -> {"mtime_ns": int, "names": [...], "widths": {char: em or None}}
+        self._fonts: Dict[str, Dict[str, Any]] = {}
+        self._names: Dict[str, str] | None = None
+        self._resolved: Dict[str, Dict[str, float | None] | None] = {}
+        self._open_fonts: Dict[str, tuple[Dict[int, str], Dict[str, tuple[int, int]], int]] = {}
+        self._dirty = False
+        self._load_cache()
+
+    # ------------------------------------------------------------------
+    # Measuring
+    # ------------------------------------------------------------------
+    def advance(self, font: str | None, char: str) -> float:
+        """Return the advance width of ``char`` in ``font`` as a fraction of the em."""
+
+        widths = self._widths(font)
+        if widths is None:
+            return self.fallback_advance
+        try:
+            width = widths[char]
+        except KeyError:
+            width = self._measure(font, char)
+        return self.fallback_advance if width is None else width
+
+    def line_width(self, text: str, font: str | None, font_size: float) -> float:
+        """Return the width of one line of ``text`` at ``font_size``."""
+
+        widths = self._widths(font)
+        if widths is None:
+            return len(text) * self.fallback_advance * font_size
+        total = 0.0
+        for char in text:
+            width = widths[char] if char in widths else self._measure(font, char)
+            total += self.fallback_advance if width is None else width
+        return total * font_size
+
+    def text_width(self, text: str, font: str | None, font_size: float) -> float:
+        """Return the width of the widest non-blank line of ``text``."""
+
+        lines = [line for line in text.splitlines() if line.strip()] or [text]
+        return max(self.line_width(line, font, font_size) for line in lines)
+
+    def has_font(self, font: str | None) -> bool:
+        """Return ``True`` if ``font`` resolves to a font file with metrics."""
+
+        return self._widths(font) is not None
+
+    def fingerprint(self) -> str:
+        """Return a digest of the inputs the measured widths depend on.
+
+        It covers fontTools availability, the fallback advance and every
+        indexed font file with its modification time, so it changes when a
+        font is installed, updated or removed or when fontTools is added.
+        """
+
+        digest = hashlib.sha256(
+            f"fonttools={_load_fonttools() is not None} fallback={self.fallback_advance}".encode("utf-8")
+        )
+        for path in sorted(set(self._font_index().values())):
+            digest.update(f"\0{path}\0{self._fonts[path]['mtime_ns']}".encode("utf-8"))
+        return digest.hexdigest()[:16]
+
+    # ------------------------------------------------------------------
+    # Cache
+    # ------------------------------------------------------------------
+    def save(self) -> None:
+        """Write new measurements to the cache file, merging concurrent writers."""
+
+        if not self._dirty or self.cache_path is None:
+            return
+        fonts = dict(self._read_cache().get("fonts", {}))
+        for path, record in self._fonts.items():
+            previous = fonts.get(path)
+            if previous and previous.get("mtime_ns") == record["mtime_ns"]:
+                record["widths"] = {**previous.get("widths", {}), **record["widths"]}
+            fonts[path] = record
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        temporary = self.cache_path.with_name(f"{self.cache_path.name}.{os.getpid()}.tmp")
+        payload = {"version": CACHE_VERSION, "fonts": fonts}
+        temporary.write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
+        os.replace(temporary, self.cache_path)
+        self._dirty = False
+
+    def _read_cache(self) -> Dict[str, Any]:
+        if self.cache_path is None:
+            return {}
+        try:
+            data = json.loads(self.cache_path.read_text("utf-8"))
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(data, dict) or data.get("version") != CACHE_VERSION:
+            return {}
+        return data
+
+    def _load_cache(self) -> None:
+        for path, record in self._read_cache().get("fonts", {}).items():
+            if isinstance(record, dict) and isinstance(record.get("widths"), dict):
+                self._fonts[path] = record
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+    def _widths(self, font: str | None) -> Dict[str, float | None] | None:
+        if not font:
+            return None
+        key = font.strip().casefold()
+        try:
+            return self._resolved[key]
+        except KeyError:
+            pass
+        path = self._font_index().get(key)
+        widths = self._fonts[path]["widths"] if path is not None else None
+        self._resolved[key] = widths
+        return widths
+
+    def _font_index(self) -> Dict[str, str]:
+        """Map font names to files, reading name tables only for new or changed files."""
+
+        if self._names is not None:
+            return self._names
+        names: Dict[str, str] = {}
+        for directory in self.font_dirs:
+            if not directory.is_dir():
+                continue
+            for path in sorted(directory.rglob("*")):
+                if path.suffix.lower() not in FONT_SUFFIXES:
+                    continue
+                key = str(path)
+                try:
+                    mtime_ns = path.stat().st_mtime_ns
+                except OSError:
+                    continue
+                record = self._fonts.get(key)
+                if record is None or record.get("mtime_ns") != mtime_ns:
+                    font_names = self._read_names(path)
+                    if font_names is None:
+                        continue
+                    record = {"mtime_ns": mtime_ns, "names": font_names, "widths": {}}
+                    self._fonts[key] = record
+                    self._dirty = True
+                for name in [path.stem, *record.get("names", [])]:
+                    names.setdefault(name.casefold(), key)
+        self._names = names
+        return names
+
+    def _read_names(self, path: Path) -> List[str] | None:
+        ttlib = _load_fonttools()
+        if ttlib is None:
+            # Only fonts already in the cache can be used without fontTools.
+            return None
+        try:
+            font = ttlib.TTFont(path, lazy=True, fontNumber=0)
+            table = font["name"]
+        except Exception:  # noqa: BLE001 - unreadable fonts are skipped
+            return None
+        names = {str(record.toUnicode()).strip() for record in table.names if record.nameID in _NAME_IDS}
+        return sorted(name for name in names if name)
+
+    def _measure(self, font: str | None, char: str) -> float | None:
+        path = self._font_index().get(font.strip().casefold()) if font else None
+        if path is None:
+            return None
+        opened = self._open_font(path)
+        width: float | None = None
+        if opened is not None:
+            cmap, metrics, units_per_em = opened
+            glyph = cmap.get(ord(char))
+            if glyph is not None and glyph in metrics:
+                width = round(metrics[glyph][0] / units_per_em, 5)
+        elif _load_fonttools() is None:
+            # Without fontTools nothing is measured or cached.
+            return None
+        self._fonts[path]["widths"][char] = width
+        self._dirty = True
+        return width
+
+    def _open_font(self, path: str) -> tuple[Dict[int, str], Dict[str, tuple[int, int]], int] | None:
+        if path in self._open_fonts:
+            return self._open_fonts[path]
+        ttlib = _load_fonttools()
+        opened = None
+        if ttlib is not None:
+            try:
+                font = ttlib.TTFont(path, lazy=True, fontNumber=0)
+                opened = (font.getBestCmap() or {}, font["hmtx"].metrics, font["head"].unitsPerEm or 1000)
+            except Exception:  # noqa: BLE001 - unreadable fonts fall back to the estimate
+                opened = None
+        self._open_fonts[path] = opened
+        return opened
+
+
+def shared_text_measurer() -> TextMeasurer:
+    """Return the process-wide measurer using the default directories and cache."""
+
+    global _shared
+    if _shared is None:
+        _shared = TextMeasurer(cache_path=default_cache_path())
+        atexit.register(_shared.save)
+    return _shared
+
+
+def save_shared_text_measurer() -> None:
+    """Persist the shared measurer's new widths, if it was used."""
+
+    if _shared is not None:
+        _shared.save()
+
+
+def _load_fonttools() -> Any:
+    global _fonttools
+    if _fonttools is None:
+        try:
+            from fontTools import ttLib
+        except ImportError:  # pragma: no cover - optional dependency
+            _fonttools = False
+        else:
+            _fonttools = ttLib
+    return _fonttools or None
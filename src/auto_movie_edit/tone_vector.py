@@ -0,0 +1,231 @@
+"""Batched NumPy tone scoring for whole subtitle scripts.
+
+:class:`VectorToneScorer` reproduces :meth:`LanguageAnalyzer._compute_tone`
+with matrices instead of per-line ``Counter`` loops:
+
+* punctuation and sentence-tail cues become a ``lines x features`` matrix
+  multiplied by a ``features x categories`` weight matrix;
+* keyword weights become a ``vocabulary x categories`` matrix built once per
+  batch with the Aho-Corasick matcher, combined with the sparse
+  ``lines x vocabulary`` token counts stored as coordinate arrays.
+
+Summation order differs from the per-line scorer, so a line whose decision
+sits within floating point noise of the ``1.0`` threshold or the ``0.25`` tie
+window is re-scored with ``_compute_tone``.  The returned tones are therefore
+identical to the Python engine.
+
+NumPy is optional; :func:`numpy_available` reports whether it can be used.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, Dict, List, Sequence
+
+from .language import _CATEGORY_PRIORITY, _QUESTION_SUFFIXES, _WORD_PATTERN
+
+if TYPE_CHECKING:  # pragma: no cover - type checking only
+    from .language import LanguageAnalyzer
+
+__all__ = ["AUTO_BATCH_THRESHOLD", "VectorToneScorer", "numpy_available"]
+
+
+# ``detect_tones(engine="auto")`` switches to NumPy from this many distinct lines.
+AUTO_BATCH_THRESHOLD = 256
+
+_TAIL_CHARS = " 。．.！!？?〜ー…"
+_DECISION_EPSILON = 1e-9
+
+# Punctuation and tail features.  Each entry is (feature name, category weights);
+# the columns built by ``_feature_matrix`` follow the same order.
+_FEATURES: List[tuple[str, Dict[str, float]]] = [
+    ("has_question", {"質問調": 2.5}),
+    ("ends_question", {"質問調": 1.5}),
+    ("exclaim_boost", {"強調": 1.0, "驚き": 0.3}),
+    ("ellipsis", {"余韻": 1.2}),
+    ("trailing_tilde", {"余韻": 0.8}),
+    ("interrobang", {"驚き": 1.4, "強調": 0.6}),
+    *[(f"suffix:{suffix}", {"質問調": 0.9 + 0.15 * len(suffix)}) for suffix in _QUESTION_SUFFIXES],
+    ("lingering_tail", {"余韻": 0.6}),
+]
+
+_np: Any = None
+
+
+def _load_numpy() -> Any:
+    global _np
+    if _np is None:
+        try:
+            import numpy
+        except ImportError:  # pragma: no cover - optional dependency
+            _np = False
+        else:
+            _np = numpy
+    return _np or None
+
+
+def numpy_available() -> bool:
+    """Return ``True`` when NumPy can be imported."""
+
+    return _load_numpy() is not None
+
+
+def _feature_matrix(np: Any, texts: Sequence[str]) -> Any:
+    """Return the ``lines x features`` matrix for ``texts`` using string ufuncs.
+
+    Lines are already normalised (whitespace collapsed to single spaces), so
+    stripping ``_TAIL_CHARS`` matches the tail regex used by ``_compute_tone``.
+    """
+
+    chars = np.char
+    lines = np.asarray(texts, dtype=str)
+    tails = chars.rstrip(lines, _TAIL_CHARS)
+
+    def contains(*needles: str) -> Any:
+        found = chars.find(lines, needles[0]) >= 0
+        for needle in needles[1:]:
+            found |= chars.find(lines, needle) >= 0
+        return found
+
+    def ends(values: Any, *suffixes: str) -> Any:
+        found = chars.endswith(values, suffixes[0])
+        for suffix in suffixes[1:]:
+            found |= chars.endswith(values, suffix)
+        return found
+
+    exclaims = chars.count(lines, "！") + chars.count(lines, "!")
+    columns = [
+        contains("？", "?"),
+        ends(lines, "？", "?"),
+        np.where(exclaims > 0, 1.2 + 0.3 * exclaims, 0.0),
+        contains("...", "…"),
+        ends(lines, "〜", "ー"),
+        contains("！？", "?!"),
+    ]
+    columns.extend(ends(tails, suffix) for suffix in _QUESTION_SUFFIXES)
+    columns.append(ends(tails, "かな", "かも"))
+    return np.column_stack([np.asarray(column, dtype=float) for column in columns])
+
+
+class VectorToneScorer:
+    """Score the tone of many normalised subtitle lines with NumPy."""
+
+    def __init__(self, analyzer: "LanguageAnalyzer") -> None:
+        np = _load_numpy()
+        if np is None:
+            raise RuntimeError("NumPy is required for the vectorised tone engine")
+        self._np = np
+        self._analyzer = analyzer
+        self._matcher = analyzer._tone_matcher
+
+        categories = list(analyzer._tone_tables)
+        for _, weights in _FEATURES:
+            for category in weights:
+                if category not in categories:
+                    categories.append(category)
+        self.categories: List[str] = categories
+        self._column = {category: index for index, category in enumerate(categories)}
+
+        self._feature_weights = np.zeros((len(_FEATURES), len(categories)))
+        for row, (_, weights) in enumerate(_FEATURES):
+            for category, weight in weights.items():
+                self._feature_weights[row, self._column[category]] = weight
+
+        unranked = len(_CATEGORY_PRIORITY)
+        self._priority_rank = np.array(
+            [
+                _CATEGORY_PRIORITY.index(category) if category in _CATEGORY_PRIORITY else unranked
+                for category in categories
+            ]
+        )
+        self._unranked = unranked
+
+    def score(self, texts: Sequence[str]) -> List[str | None]:
+        """Return the tone of each normalised line in ``texts`` (``None`` if none)."""
+
+        if not texts:
+            return []
+        np = self._np
+        scores = self._raw_scores(texts)
+        scores = self._apply_sentiment(scores)
+
+        best = scores.max(axis=1)
+        distance = np.abs(scores - best[:, None])
+        tied = distance < 0.25
+        tie_count = tied.sum(axis=1)
+        ranks = np.where(tied, self._priority_rank[None, :], self._unranked)
+        best_rank = ranks.min(axis=1)
+        by_priority = np.where(best_rank < self._unranked, best_rank, -1)
+        argmax = scores.argmax(axis=1)
+
+        # Decisions that depend on float noise are delegated to the reference scorer.
+        ambiguous = (np.abs(best - 1.0) < _DECISION_EPSILON) | (
+            np.abs(distance - 0.25) < _DECISION_EPSILON
+        ).any(axis=1)
+        ambiguous |= (tie_count > 1) & (by_priority < 0)
+
+        results: List[str | None] = []
+        priority_names = _CATEGORY_PRIORITY
+        for index, text in enumerate(texts):
+            if ambiguous[index]:
+                results.append(self._analyzer._compute_tone(text))
+            elif best[index] < 1.0:
+                results.append(None)
+            elif tie_count[index] > 1:
+                results.append(priority_names[int(by_priority[index])])
+            else:
+                results.append(self.categories[int(argmax[index])])
+        return results
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+    def _raw_scores(self, texts: Sequence[str]) -> Any:
+        np = self._np
+        analyzer = self._analyzer
+
+        vocabulary: Dict[str, int] = {}
+        line_ids: List[int] = []
+        token_ids: List[int] = []
+        counts: List[int] = []
+        for line, text in enumerate(texts):
+            tokens = analyzer._tokenize_cached(text)
+            if not tokens:
+                tokens = tuple(token.lower() for token in _WORD_PATTERN.findall(text))
+            per_line: Dict[int, int] = {}
+            for token in tokens:
+                token_id = vocabulary.setdefault(token, len(vocabulary))
+                per_line[token_id] = per_line.get(token_id, 0) + 1
+            for token_id, count in per_line.items():
+                line_ids.append(line)
+                token_ids.append(token_id)
+                counts.append(count)
+
+        scores = _feature_matrix(np, texts) @ self._feature_weights
+
+        if vocabulary:
+            token_weights = np.zeros((len(vocabulary), len(self.categories)))
+            column = self._column
+            for token, token_id in vocabulary.items():
+                for category, weight in self._matcher.match(token):
+                    token_weights[token_id, column[category]] += weight
+            rows = np.asarray(line_ids)
+            contributions = np.asarray(counts, dtype=float)[:, None] * token_weights[np.asarray(token_ids)]
+            np.add.at(scores, rows, contributions)
+        return scores
+
+    def _apply_sentiment(self, scores: Any) -> Any:
+        np = self._np
+        joy = self._column["喜び"]
+        sadness = self._column["悲しみ"]
+        anger = self._column["怒り"]
+
+        positive = scores[:, joy].copy()
+        negative = scores[:, sadness] + scores[:, anger]
+        boost = (positive > 0) & (positive > negative)
+        scores[boost, joy] += np.log1p(positive[boost])
+
+        damp = negative > 0
+        for column in (sadness, anger):
+            current = scores[damp, column]
+            scores[damp, column] = current + np.log1p(current) * 0.5
+        return scores
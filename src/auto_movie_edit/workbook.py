@@ -4,7 +4,7 @@ from __future__ import annotations
 
 import copy
 import json
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
 from itertools import chain
 from typing import Any, Dict, Iterable, Iterator, List
@@ -24,6 +24,7 @@ from .models import (
     TimelineRow,
     WorkbookData,
 )
+from .template_similarity import apply_overrides, is_pointer_overrides
 from .utils import ensure_list, iter_nonempty, parse_mapping, parse_timecode
 
 
@@ -51,6 +52,7 @@ CHARACTERS_HEADERS = ["キャラクター名", "パーツ名", "ベースパス"
 EXPR_PRESET_HEADERS = [
     "プリセットID", "トーン", "キャラクター", "目", "眉", "口", "顔色", "他1", "他2", "他3", "備考",
 ]
+TONE_KEYWORD_HEADERS = ["トーン", "キーワード", "重み"]
 
 EXPR_PART_SCHEMA = [
     ("parts.eye", "目"),
@@ -68,12 +70,13 @@ class WorkbookTemplate:
     telp_headers: List[str]; asset_headers: List[str]; pack_headers: List[str]
     layer_headers: List[str]; fx_headers: List[str]; timeline_headers: List[str]
     schema_headers: List[str]; characters_headers: List[str]; expression_headers: List[str]
+    tone_keyword_headers: List[str] = field(default_factory=lambda: list(TONE_KEYWORD_HEADERS))
 
 DEFAULT_TEMPLATE = WorkbookTemplate(
     telp_headers=TELP_HEADERS, asset_headers=ASSET_HEADERS, pack_headers=PACK_HEADERS,
     layer_headers=LAYER_HEADERS, fx_headers=FX_HEADERS, timeline_headers=TIMELINE_HEADERS,
     schema_headers=SCHEMA_HEADERS, characters_headers=CHARACTERS_HEADERS,
-    expression_headers=EXPR_PRESET_HEADERS,
+    expression_headers=EXPR_PRESET_HEADERS, tone_keyword_headers=TONE_KEYWORD_HEADERS,
 )
 
 
@@ -96,6 +99,7 @@ def create_workbook_template(template: WorkbookTemplate = DEFAULT_TEMPLATE) -> W
     _write_headers(wb.create_sheet("SCHEMA_MAP"), template.schema_headers)
     _write_headers(wb.create_sheet("CHARACTERS"), template.characters_headers)
     _write_headers(wb.create_sheet("EXPRESSION_PRESETS"), template.expression_headers)
+    _write_headers(wb.create_sheet("TONE_KEYWORDS"), template.tone_keyword_headers)
     return wb
 
 def save_workbook(workbook: Workbook, path: str | Path) -> None:
@@ -253,6 +257,7 @@ def load_workbook_data(path: str | Path) -> WorkbookData:
         fx_schema = data.schema_map.get("FX", {})
         character_schema = data.schema_map.get("CHARACTERS", {})
         expr_preset_schema = data.schema_map.get("EXPRESSION_PRESETS", {})
+        tone_keyword_schema = data.schema_map.get("TONE_KEYWORDS", {})
 
         if "TELP_PATTERNS" in wb.sheetnames:
             for r in iter_nonempty(load_sheet_dictionaries(wb["TELP_PATTERNS"])):
@@ -321,6 +326,17 @@ def load_workbook_data(path: str | Path) -> WorkbookData:
                     notes=notes,
                 )
 
+        if "TONE_KEYWORDS" in wb.sheetnames:
+            for r in iter_nonempty(load_sheet_dictionaries(wb["TONE_KEYWORDS"])):
+                tone = _string_or_none(_row_value(r, tone_keyword_schema, "tone", "トーン"))
+                weight = _safe_float(_row_value(r, tone_keyword_schema, "weight", "重み"))
+                keywords = _split_tokens(_row_value(r, tone_keyword_schema, "keyword", "キーワード"))
+                if not tone or weight is None:
+                    continue
+                table = data.tone_keywords.setdefault(tone, {})
+                for keyword in keywords:
+                    table[keyword] = weight
+
         if "LAYERS" in wb.sheetnames:
             for r in iter_nonempty(load_sheet_dictionaries(wb["LAYERS"])):
                 role = _string_or_none(_row_value(r, layer_schema, "role", "役割"))
@@ -524,8 +540,13 @@ def _resolve_template_path(item: TelopPattern | Asset | Pack, wb_path: Path, pat
             source_path = wb_path.parent / source_path
         if source_path.exists():
             try:
-                setattr(item, param_field, _load_template_json(source_path))
-            except (json.JSONDecodeError, IOError) as e:
+                template = _load_template_json(source_path)
+                # Near-duplicates folded by absorb keep their differences as JSON pointer overrides.
+                overrides = getattr(item, param_field)
+                if is_pointer_overrides(overrides):
+                    template = apply_overrides(template, overrides)
+                setattr(item, param_field, template)
+            except (json.JSONDecodeError, IOError, ValueError) as e:
                 print(f"Warning: Failed to load template {source_path}: {e}")
         else:
             print(f"Warning: Template file not found: {source_path}")
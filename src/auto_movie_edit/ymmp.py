@@ -4,13 +4,14 @@ from __future__ import annotations
 import copy
 import hashlib
 import json
-import math
 from pathlib import Path
 from collections.abc import Mapping, Sequence
 from typing import Any, Dict, List, NamedTuple, Set, Tuple
 from datetime import datetime
 
-from .language import LanguageAnalyzer
+from .filters import _determine_hiragana_scale, apply_hiragana_shrink  # noqa: F401 - re-exported
+from .history import OTHER_WARNING_CODE, WARNING_FIELDS, warning_record
+from .language import LanguageAnalyzerPool, shared_analyzer_pool
 from .models import (
     ExpressionPreset,
     FxPreset,
@@ -20,8 +21,9 @@ from .models import (
     TimelineRow,
     WorkbookData,
 )
+from .locking import file_lock
 from .proposals import update_proposal_model
-from .utils import dump_json, contains_hiragana, count_hiragana, ensure_list
+from .utils import dump_json, ensure_list
 
 
 _SCAFFOLD_CACHE: Dict[Path, tuple[float, int, dict[str, Any]]] = {}
@@ -32,6 +34,13 @@ _TACHIE_FALLBACK_NAMES: tuple[str, ...] = ("default", "base", "normal", "通常"
 
 _TACHIE_DIRECTORY_INDEX: Dict[Path, tuple[int | None, dict[str, Path]]] = {}
 
+# Detail recorded per row in history.jsonl.  ``minimal`` keeps the IDs and the
+# approval the proposal model learns from; ``full`` adds the generated items.
+HISTORY_LEVELS: tuple[str, ...] = ("off", "minimal", "standard", "full")
+DEFAULT_HISTORY_LEVEL = "full"
+# Rows buffered by HistoryWriter before they are appended to history.jsonl.
+HISTORY_FLUSH_ROWS = 500
+
 
 class TachieExpressionResolution(NamedTuple):
     path: Path | None
@@ -193,22 +202,69 @@ def _load_scaffold_project(scaffold_path: Path) -> dict[str, Any]:
     return copy.deepcopy(project)
 
 class BuildWarning:
-    """Represents a warning produced during project build."""
-    def __init__(self, row_index: int | None, message: str) -> None:
-        self.row_index, self.message = row_index, message
-    def to_dict(self) -> dict[str, Any]: return {"row": self.row_index, "message": self.message}
+    """Represents a warning produced during project build.
+
+    ``code`` is a stable key of :data:`auto_movie_edit.history.WARNING_CODES`;
+    ``identifier``, ``part``, ``role`` and ``band`` carry the structured
+    context the message was formatted from.
+    """
+
+    __slots__ = ("row_index", "message", "code", "identifier", "part", "role", "band")
+
+    def __init__(
+        self,
+        row_index: int | None,
+        message: str,
+        code: str = OTHER_WARNING_CODE,
+        *,
+        identifier: str | None = None,
+        part: str | None = None,
+        role: str | None = None,
+        band: int | None = None,
+    ) -> None:
+        self.row_index, self.message, self.code = row_index, message, code
+        self.identifier, self.part, self.role, self.band = identifier, part, role, band
+
+    def fields(self) -> dict[str, Any]:
+        """Return the structured fields that are set."""
+        return {name: getattr(self, name) for name in WARNING_FIELDS if getattr(self, name) is not None}
+
+    def to_dict(self) -> dict[str, Any]:
+        return {"row": self.row_index, "code": self.code, "message": self.message, **self.fields()}
+
+    def to_history(self) -> dict[str, Any]:
+        """Return the compact record stored in ``history.jsonl``."""
+        return warning_record(self.code, self.message, **self.fields())
 
 class ProjectBuilder:
     """Transforms workbook data into a YMM4-compatible project by updating a scaffold."""
 
-    def __init__(self, data: WorkbookData, fps: float = 60.0) -> None:
+    def __init__(
+        self,
+        data: WorkbookData,
+        fps: float = 60.0,
+        analyzer_pool: LanguageAnalyzerPool | None = None,
+        history_level: str = DEFAULT_HISTORY_LEVEL,
+        history_writer: "HistoryWriter | None" = None,
+    ) -> None:
+        if history_level not in HISTORY_LEVELS:
+            raise ValueError(f"Unknown history level: {history_level} (expected one of {', '.join(HISTORY_LEVELS)})")
         self.data, self.warnings, self.fps = data, [], fps
         project_root = Path(__file__).resolve().parent.parent.parent
         self.scaffold_path = project_root / "scaffold.ymmp"
         self.characters_in_use: Set[str] = set()
         self.band_width = 10
         self.history_entries: List[Dict[str, Any]] = []
-        self.language_analyzer = LanguageAnalyzer()
+        self.history_level, self.history_writer = history_level, history_writer
+        # One timestamp per build; rows only differ by row_index.
+        self.history_timestamp = (
+            history_writer.timestamp if history_writer is not None else _history_timestamp(datetime.utcnow())
+        )
+        self._history_warning_cursor = 0
+        self._history_row_warnings: Dict[int, List[BuildWarning]] = {}
+        pool = analyzer_pool if analyzer_pool is not None else shared_analyzer_pool()
+        self.language_analyzer = pool.get(data.tone_keywords)
+        self._row_tones: Dict[int, str | None] = {}
         self.expression_presets_by_tone: Dict[str, List[ExpressionPreset]] = {}
         self.default_expression_presets: List[ExpressionPreset] = []
         self._template_cache: Dict[tuple[str, Any], tuple[Mapping[str, Any], Tuple[tuple[str, Any], ...]]] = {}
@@ -240,6 +296,8 @@ class ProjectBuilder:
         if not self.scaffold_path.exists(): raise FileNotFoundError(f"Scaffold file not found: '{self.scaffold_path}'")
         project = _load_scaffold_project(self.scaffold_path)
 
+        self._classify_row_tones(self.data.timeline)
+
         timeline_items: List[dict[str, Any]] = []
         for row in self.data.timeline:
             timeline_items.extend(self._build_row_items(row))
@@ -269,6 +327,20 @@ class ProjectBuilder:
             return None
         return text
 
+    def _classify_row_tones(self, rows: Sequence[TimelineRow]) -> None:
+        """Detect the tone of every row that can use it before building items.
+
+        Only rows with a character and without ``tone:none`` consult the tone,
+        so the batch skips everything else.
+        """
+        pending = [
+            row
+            for row in rows
+            if row.character and not self._resolve_tone_hints(row.notes or {})[0]
+        ]
+        tones = self.language_analyzer.detect_tones(row.subtitle for row in pending)
+        self._row_tones = {row.index: tone for row, tone in zip(pending, tones)}
+
     def _resolve_tone_hints(self, notes: Dict[str, Any]) -> tuple[bool, List[str]]:
         disable_auto = False
         tone_hints: List[str] = []
@@ -335,7 +407,10 @@ class ProjectBuilder:
             if normalized and normalized not in tone_candidates:
                 tone_candidates.append(normalized)
 
-        detected = self.language_analyzer.detect_tone(row.subtitle)
+        if row.index in self._row_tones:
+            detected = self._row_tones[row.index]
+        else:
+            detected = self.language_analyzer.detect_tone(row.subtitle)
         normalized_detected = self._normalize_tone(detected)
         if normalized_detected and normalized_detected not in tone_candidates:
             tone_candidates.append(normalized_detected)
@@ -380,7 +455,7 @@ class ProjectBuilder:
         if row.telop:
             pattern = self.data.telop_patterns.get(row.telop)
             if not pattern:
-                self._warn(row, f"Telop pattern not found: {row.telop}")
+                self._warn(row, f"Telop pattern not found: {row.telop}", "telop.not_found", identifier=row.telop)
             else:
                 try:
                     telop_item = self._create_item_from_template(pattern.overrides, row)
@@ -390,16 +465,21 @@ class ProjectBuilder:
                         telop_item["Text"] = row.subtitle
                     register([telop_item], "テロップ", order_counter, self._infer_layer_band("テロップ"))
                 except Exception as exc:  # pragma: no cover - defensive path
-                    self._warn(row, f"Telop build error for '{row.telop}': {exc}")
+                    self._warn(row, f"Telop build error for '{row.telop}': {exc}", "telop.build_error", identifier=row.telop)
             order_counter += 1
 
         # Dynamic Tachie logic
         if row.character:
             char_def = self.data.characters.get(row.character)
             if not char_def:
-                self._warn(row, f"Character not found: {row.character}")
+                self._warn(row, f"Character not found: {row.character}", "character.not_found", identifier=row.character)
             elif not row.expressions:
-                self._warn(row, f"No expressions provided for character '{row.character}'")
+                self._warn(
+                    row,
+                    f"No expressions provided for character '{row.character}'",
+                    "character.no_expressions",
+                    identifier=row.character,
+                )
             else:
                 try:
                     self.characters_in_use.add(char_def.name)
@@ -424,6 +504,9 @@ class ProjectBuilder:
                                     self._warn(
                                         row,
                                         f"Tachie expression '{expr_fn}' missing for part '{part_jp}'. Fallback to '{resolution.path.name}'",
+                                        "tachie.expression_fallback",
+                                        identifier=char_def.name,
+                                        part=part_jp,
                                     )
                             else:
                                 reused = key and self._tachie_last_paths.get(key)
@@ -432,6 +515,9 @@ class ProjectBuilder:
                                     self._warn(
                                         row,
                                         f"Tachie expression '{expr_fn}' missing for part '{part_jp}'. Reusing previous '{Path(reused).name}'",
+                                        "tachie.expression_reused",
+                                        identifier=char_def.name,
+                                        part=part_jp,
                                     )
                                 else:
                                     attempted_names = [p.name for p in resolution.attempts if p and p.name]
@@ -440,14 +526,23 @@ class ProjectBuilder:
                                     self._warn(
                                         row,
                                         f"Tachie expression file not found for part '{part_jp}' of '{char_def.name}' (expr '{expr_fn}').{detail}",
+                                        "tachie.expression_missing",
+                                        identifier=char_def.name,
+                                        part=part_jp,
                                     )
                         elif not part_en:
-                            self._warn(row, f"Unknown tachie part: {part_jp}")
+                            self._warn(row, f"Unknown tachie part: {part_jp}", "tachie.unknown_part", part=part_jp)
                         else:
-                            self._warn(row, f"Tachie base path missing for part '{part_jp}' of character '{char_def.name}'")
+                            self._warn(
+                                row,
+                                f"Tachie base path missing for part '{part_jp}' of character '{char_def.name}'",
+                                "tachie.base_path_missing",
+                                identifier=char_def.name,
+                                part=part_jp,
+                            )
                     register([tachie_item], "立ち絵", order_counter, self._infer_layer_band("立ち絵"))
                 except Exception as exc:  # pragma: no cover - defensive path
-                    self._warn(row, f"Dynamic Tachie build error: {exc}")
+                    self._warn(row, f"Dynamic Tachie build error: {exc}", "tachie.build_error", identifier=row.character)
             order_counter += 1
 
         # Packs applied on the row
@@ -456,7 +551,7 @@ class ProjectBuilder:
                 pack_items = self._instantiate_pack(pack, row)
                 register(pack_items, "パック", order_counter, self._infer_layer_band("パック"))
             else:
-                self._warn(row, f"Pack not found: {pack_id}")
+                self._warn(row, f"Pack not found: {pack_id}", "pack.not_found", identifier=pack_id)
             order_counter += 1
 
         # Static assets and direct objects
@@ -551,18 +646,32 @@ class ProjectBuilder:
         items: List[dict[str, Any]] = []
         asset = self.data.assets.get(obj.identifier)
         if not asset:
-            self._warn(row, f"Asset not found: {obj.identifier}")
+            self._warn(
+                row, f"Asset not found: {obj.identifier}", "asset.not_found", identifier=obj.identifier, role=obj.role
+            )
             return items
         obj.resolved = asset
         if not asset.parameters:
-            self._warn(row, f"Asset '{asset.asset_id}' has no template parameters")
+            self._warn(
+                row,
+                f"Asset '{asset.asset_id}' has no template parameters",
+                "asset.no_parameters",
+                identifier=asset.asset_id,
+                role=obj.role,
+            )
             return items
         templates = asset.parameters if isinstance(asset.parameters, list) else [asset.parameters]
         for template in templates:
             try:
                 item = self._create_item_from_template(template, row)
             except Exception as exc:  # pragma: no cover - defensive path
-                self._warn(row, f"Asset build error for '{obj.identifier}': {exc}")
+                self._warn(
+                    row,
+                    f"Asset build error for '{obj.identifier}': {exc}",
+                    "asset.build_error",
+                    identifier=obj.identifier,
+                    role=obj.role,
+                )
                 continue
             if asset.path and "FilePath" not in item:
                 item["FilePath"] = asset.path
@@ -584,7 +693,7 @@ class ProjectBuilder:
     def _instantiate_pack(self, pack: Pack, row: TimelineRow) -> List[dict[str, Any]]:
         template = pack.overrides
         if template is None:
-            self._warn(row, f"Pack '{pack.pack_id}' has no template data")
+            self._warn(row, f"Pack '{pack.pack_id}' has no template data", "pack.no_template", identifier=pack.pack_id)
             return []
         if isinstance(template, dict):
             if "Items" in template and isinstance(template["Items"], list):
@@ -596,17 +705,22 @@ class ProjectBuilder:
         elif isinstance(template, list):
             source_items = template
         else:
-            self._warn(row, f"Unsupported pack template format for '{pack.pack_id}'")
+            self._warn(
+                row,
+                f"Unsupported pack template format for '{pack.pack_id}'",
+                "pack.unsupported_format",
+                identifier=pack.pack_id,
+            )
             return []
         if not source_items:
-            self._warn(row, f"Pack '{pack.pack_id}' has no items")
+            self._warn(row, f"Pack '{pack.pack_id}' has no items", "pack.no_items", identifier=pack.pack_id)
             return []
         instantiated: List[dict[str, Any]] = []
         for base_item in source_items:
             try:
                 item = self._create_item_from_template(base_item, row)
             except Exception as exc:  # pragma: no cover - defensive path
-                self._warn(row, f"Pack '{pack.pack_id}' build error: {exc}")
+                self._warn(row, f"Pack '{pack.pack_id}' build error: {exc}", "pack.build_error", identifier=pack.pack_id)
                 continue
             instantiated.append(item)
         return instantiated
@@ -614,7 +728,7 @@ class ProjectBuilder:
     def _instantiate_fx(self, fx: TimelineFx, row: TimelineRow) -> List[dict[str, Any]]:
         preset = self.data.fx_presets.get(fx.fx_id)
         if not preset:
-            self._warn(row, f"FX preset not found: {fx.fx_id}")
+            self._warn(row, f"FX preset not found: {fx.fx_id}", "fx.preset_not_found", identifier=fx.fx_id)
             return []
         fx.resolved = preset
         items: List[dict[str, Any]] = []
@@ -623,17 +737,27 @@ class ProjectBuilder:
             if pack:
                 items.extend(self._instantiate_pack(pack, row))
             else:
-                self._warn(row, f"FX preset '{fx.fx_id}' references missing pack '{preset.source}'")
+                self._warn(
+                    row,
+                    f"FX preset '{fx.fx_id}' references missing pack '{preset.source}'",
+                    "fx.missing_pack",
+                    identifier=fx.fx_id,
+                )
         elif preset.asset:
             asset_items = self._instantiate_object(
                 TimelineObject(role=preset.fx_type or "FX", identifier=preset.asset, layer=None, resolved=None),
                 row,
             )
             if not asset_items:
-                self._warn(row, f"FX preset '{fx.fx_id}' asset not resolved: {preset.asset}")
+                self._warn(
+                    row,
+                    f"FX preset '{fx.fx_id}' asset not resolved: {preset.asset}",
+                    "fx.asset_unresolved",
+                    identifier=fx.fx_id,
+                )
             items.extend(asset_items)
         else:
-            self._warn(row, f"FX preset '{fx.fx_id}' has no source or asset")
+            self._warn(row, f"FX preset '{fx.fx_id}' has no source or asset", "fx.no_source", identifier=fx.fx_id)
 
         self._validate_fx_parameters(fx, preset, row)
         combined_params = self._deep_copy(preset.parameters) if preset.parameters else {}
@@ -656,9 +780,16 @@ class ProjectBuilder:
                 self._warn(
                     row,
                     f"FX '{fx.fx_id}' overrides unknown parameter(s): {', '.join(sorted(unknown))}",
+                    "fx.unknown_override",
+                    identifier=fx.fx_id,
                 )
         else:
-            self._warn(row, f"FX '{fx.fx_id}' has no base parameters but overrides were provided")
+            self._warn(
+                row,
+                f"FX '{fx.fx_id}' has no base parameters but overrides were provided",
+                "fx.no_base_parameters",
+                identifier=fx.fx_id,
+            )
 
     def _flatten_structure_keys(self, data: Any, prefix: str = "") -> Set[str]:
         keys: Set[str] = set()
@@ -707,7 +838,13 @@ class ProjectBuilder:
             for offset, placement in enumerate(items):
                 if offset >= self.band_width:
                     placement["item"]["Layer"] = band + self.band_width - 1
-                    self._warn(placement["row"], f"Layer band overflow at band {band} for role '{placement['role']}'")
+                    self._warn(
+                        placement["row"],
+                        f"Layer band overflow at band {band} for role '{placement['role']}'",
+                        "layer.band_overflow",
+                        role=placement["role"],
+                        band=band,
+                    )
                 else:
                     placement["item"]["Layer"] = band + (self.band_width - offset - 1)
 
@@ -738,7 +875,13 @@ class ProjectBuilder:
         file_path = item.get("FilePath")
         if isinstance(file_path, str) and file_path.startswith("template://"):
             context = f" for role '{role}'" if role else ""
-            self._warn(row, f"Unresolved template path{context}: {file_path}")
+            self._warn(
+                row,
+                f"Unresolved template path{context}: {file_path}",
+                "template.unresolved_path",
+                identifier=file_path,
+                role=role,
+            )
 
     def _resolve_template_dict(self, template: dict | list | None) -> Mapping[str, Any]:
         if template is None:
@@ -795,12 +938,67 @@ class ProjectBuilder:
     def _deep_copy(self, data: Any) -> Any:
         return copy.deepcopy(data)
 
-    def _warn(self, row: TimelineRow, message: str): self.warnings.append(BuildWarning(row.index, message))
+    def _warn(self, row: TimelineRow, message: str, code: str = OTHER_WARNING_CODE, **fields: Any) -> None:
+        self.warnings.append(BuildWarning(row.index, message, code, **fields))
 
     def _record_history(self, row: TimelineRow, placements: List[dict[str, Any]]) -> None:
-        timestamp = datetime.utcnow().replace(microsecond=0).isoformat() + "Z"
+        if self.history_level == "off":
+            return
+        if self.history_level == "minimal":
+            entry = self._minimal_history_entry(row)
+        else:
+            entry = self._history_entry(row, placements, full=self.history_level == "full")
+        if self.history_writer is None:
+            self.history_entries.append(entry)
+        else:
+            self.history_writer.write(entry, self._take_row_warnings(row.index))
+
+    def _take_row_warnings(self, row_index: int) -> List[BuildWarning]:
+        """Return the warnings of ``row_index`` not yet handed to the history writer."""
+        for warning in self.warnings[self._history_warning_cursor:]:
+            if warning.row_index is not None:
+                self._history_row_warnings.setdefault(warning.row_index, []).append(warning)
+        self._history_warning_cursor = len(self.warnings)
+        return self._history_row_warnings.pop(row_index, [])
+
+    def _minimal_history_entry(self, row: TimelineRow) -> Dict[str, Any]:
+        return {
+            "timestamp": self.history_timestamp,
+            "row_index": row.index,
+            "start": row.start.to_string() if row.start else None,
+            "subtitle": row.subtitle,
+            "telop": row.telop,
+            "packs": list(row.packs),
+            "objects": [
+                {
+                    "identifier": obj.identifier,
+                    "resolved_asset": obj.resolved.asset_id if obj.resolved else None,
+                }
+                for obj in row.objects
+            ],
+            "fx": [{"fx_id": fx.fx_id} for fx in row.fxs],
+            "notes": {"approval": row.notes.get("approval")} if "approval" in row.notes else {},
+        }
+
+    def _history_entry(self, row: TimelineRow, placements: List[dict[str, Any]], full: bool) -> Dict[str, Any]:
+        fx_entries: List[Dict[str, Any]] = []
+        for fx in row.fxs:
+            fx_entry: Dict[str, Any] = {
+                "fx_id": fx.fx_id,
+                "source_column": fx.source_column,
+                "source_key": fx.source_key,
+                "parameters": fx.parameters,
+            }
+            if full:
+                fx_entry["applied_parameters"] = fx.applied_parameters
+                fx_entry["preset"] = {
+                    "type": fx.resolved.fx_type if fx.resolved else None,
+                    "source": fx.resolved.source if fx.resolved else None,
+                    "asset": fx.resolved.asset if fx.resolved else None,
+                }
+            fx_entries.append(fx_entry)
         history_entry: Dict[str, Any] = {
-            "timestamp": timestamp,
+            "timestamp": self.history_timestamp,
             "row_index": row.index,
             "start": row.start.to_string() if row.start else None,
             "end": row.end.to_string() if row.end else None,
@@ -819,35 +1017,34 @@ class ProjectBuilder:
                 }
                 for obj in row.objects
             ],
-            "fx": [
-                {
-                    "fx_id": fx.fx_id,
-                    "source_column": fx.source_column,
-                    "source_key": fx.source_key,
-                    "parameters": fx.parameters,
-                    "applied_parameters": fx.applied_parameters,
-                    "preset": {
-                        "type": fx.resolved.fx_type if fx.resolved else None,
-                        "source": fx.resolved.source if fx.resolved else None,
-                        "asset": fx.resolved.asset if fx.resolved else None,
-                    },
-                }
-                for fx in row.fxs
-            ],
+            "fx": fx_entries,
             "notes": dict(row.notes),
         }
-        history_entry["generated_items"] = [
-            {
-                "role": placement.get("role"),
-                "layer": placement.get("item", {}).get("Layer"),
-                "type": placement.get("item", {}).get("$type"),
-            }
-            for placement in placements
-        ]
-        self.history_entries.append(history_entry)
-
-def build_project(data: WorkbookData) -> Tuple[dict, List, List[Dict[str, Any]]]:
-    builder = ProjectBuilder(data)
+        if full:
+            history_entry["generated_items"] = [
+                {
+                    "role": placement.get("role"),
+                    "layer": placement.get("item", {}).get("Layer"),
+                    "type": placement.get("item", {}).get("$type"),
+                }
+                for placement in placements
+            ]
+        return history_entry
+
+def build_project(
+    data: WorkbookData,
+    analyzer_pool: LanguageAnalyzerPool | None = None,
+    history_level: str = DEFAULT_HISTORY_LEVEL,
+    history_writer: "HistoryWriter | None" = None,
+) -> Tuple[dict, List, List[Dict[str, Any]]]:
+    """Build the project for ``data``.
+
+    With a ``history_writer`` the history entries are streamed to it as rows
+    complete and the returned history list is empty.
+    """
+    builder = ProjectBuilder(
+        data, analyzer_pool=analyzer_pool, history_level=history_level, history_writer=history_writer
+    )
     project = builder.build()
     return project, builder.warnings, builder.history_entries
 
@@ -857,6 +1054,8 @@ def write_outputs(
     output_dir: str | Path,
     history: List[Dict[str, Any]] | None = None,
     persistent_root: Path | str | None = None,
+    history_keep_days: int | None = None,
+    history_writer: "HistoryWriter | None" = None,
 ):
     output_path = Path(output_dir)
     output_path.mkdir(parents=True, exist_ok=True)
@@ -869,10 +1068,20 @@ def write_outputs(
         "generated_at": datetime.utcnow().isoformat("T") + "Z",
         "warnings": [w.to_dict() for w in warnings],
     }
-    history_entries = history or []
-    history_count = _write_history_entries(history_entries, warnings, storage_root)
-    model_path = update_proposal_model(history_entries, storage_root)
+    if history_writer is not None:
+        # Entries (and their learning input) were streamed during the build.
+        storage_root = history_writer.base_path
+        history_count = history_writer.close()
+        model_path = history_writer.model_path
+    else:
+        history_entries = history or []
+        history_count = _write_history_entries(history_entries, warnings, storage_root)
+        model_path = update_proposal_model(history_entries, storage_root)
     if history_count:
+        # Past days are compressed (and expired) as a side effect of building.
+        from .history_archive import rotate_history
+
+        rotate_history(storage_root / "history", keep_days=history_keep_days)
         report["history"] = {
             "count": history_count,
             "directory": str((storage_root / "history").resolve()),
@@ -881,180 +1090,81 @@ def write_outputs(
         report.setdefault("ai", {})["proposal_model"] = str(Path(model_path).resolve())
     dump_json(output_path / "report.json", report)
 
-def _write_history_entries(history: List[Dict[str, Any]], warnings: List[BuildWarning], base_path: Path) -> int:
-    if not history:
-        return 0
-    warning_map: Dict[int, List[str]] = {}
-    for warning in warnings:
-        if warning.row_index is None:
-            continue
-        warning_map.setdefault(warning.row_index, []).append(warning.message)
-
-    enriched: List[Dict[str, Any]] = []
-    for entry in history:
-        row_index = entry.get("row_index")
-        enriched_entry = dict(entry)
-        if row_index in warning_map:
-            enriched_entry["warnings"] = warning_map[row_index]
-        enriched.append(enriched_entry)
-
-    date_dir = base_path / "history" / datetime.utcnow().strftime("%Y%m%d")
-    date_dir.mkdir(parents=True, exist_ok=True)
-    history_path = date_dir / "history.jsonl"
-    with history_path.open("a", encoding="utf-8") as fh:
-        for entry in enriched:
-            fh.write(json.dumps(entry, ensure_ascii=False) + "\n")
-    return len(enriched)
-
-
-def _first_numeric_value(data: Any, default: float = 100.0) -> float:
-    if isinstance(data, Mapping):
-        values = data.get("Values")
-        if isinstance(values, list):
-            for entry in values:
-                if isinstance(entry, Mapping):
-                    candidate = entry.get("Value")
-                    if isinstance(candidate, (int, float)):
-                        return float(candidate)
-        candidate = data.get("Value")
-        if isinstance(candidate, (int, float)):
-            return float(candidate)
-    elif isinstance(data, (int, float)):
-        return float(data)
-    elif isinstance(data, list):
-        for entry in data:
-            if isinstance(entry, Mapping):
-                candidate = entry.get("Value")
-                if isinstance(candidate, (int, float)):
-                    return float(candidate)
-            elif isinstance(entry, (int, float)):
-                return float(entry)
-    return default
-
-
-def _estimate_text_layout(item: Mapping[str, Any]) -> tuple[int, int, int]:
-    text = str(item.get("Text", ""))
-    lines = [line for line in text.splitlines() if line.strip()]
-    if not lines:
-        lines = [text.strip()] if text.strip() else [text]
-    line_count = max(1, len(lines))
-    longest_line = max((len(line) for line in lines), default=len(text))
-    total_chars = sum(len(line) for line in lines) or len(text)
-    return line_count, longest_line, total_chars
-
-
-def _determine_hiragana_scale(item: Mapping[str, Any], base_scale: float) -> float:
-    text = str(item.get("Text", ""))
-    if not text.strip():
-        return min(1.0, max(base_scale, 0.6))
-
-    line_count, longest_line, total_chars = _estimate_text_layout(item)
-    hira_count = count_hiragana(text)
-    effective_chars = max(1, total_chars)
-    hira_ratio = hira_count / effective_chars
-
-    shrink_strength = math.pow(hira_ratio, 0.7)
-    dynamic_scale = 1 - (1 - base_scale) * shrink_strength
-
-    font_size = _first_numeric_value(item.get("FontSize"), default=100.0)
-    base_zoom = _first_numeric_value(item.get("Zoom"), default=100.0)
-    char_width = font_size * 0.62
-    approx_width = char_width * max(1, longest_line) * (base_zoom / 100.0)
-    target_width = 1080 * 0.9  # assume portrait 1080x1920 canvas
-    if target_width > 0:
-        width_ratio = approx_width / target_width
-        if width_ratio > 1.0:
-            dynamic_scale = min(dynamic_scale, 1.0 / width_ratio)
-        else:
-            slack = 1.0 - width_ratio
-            if slack > 0.15:
-                dynamic_scale = min(1.0, dynamic_scale + slack * 0.35)
 
-    if line_count > 2:
-        dynamic_scale *= 0.98 ** (line_count - 2)
-    elif line_count == 1 and longest_line <= 6:
-        dynamic_scale = min(1.0, dynamic_scale + 0.05)
+class HistoryWriter:
+    """Streams the history entries of one build to ``history/<day>/history.jsonl``.
 
-    return max(0.55, min(dynamic_scale, 1.0))
+    Entries are buffered up to ``flush_rows`` and then appended under the
+    history lock, added to an existing SQLite history store and, with
+    ``learn``, recorded as learning input for the proposal model.  The day
+    and the entry timestamp are fixed when the writer is created.
+    """
 
+    def __init__(
+        self,
+        base_path: Path | str,
+        *,
+        learn: bool = True,
+        flush_rows: int = HISTORY_FLUSH_ROWS,
+        started: datetime | None = None,
+    ) -> None:
+        started = started or datetime.utcnow()
+        self.base_path = Path(base_path)
+        self.path = self.base_path / "history" / started.strftime("%Y%m%d") / "history.jsonl"
+        self.timestamp = _history_timestamp(started)
+        self.learn, self.flush_rows = learn, max(1, flush_rows)
+        self.count = 0
+        self.model_path: Path | None = None
+        self._pending: List[Dict[str, Any]] = []
+
+    def write(self, entry: Dict[str, Any], warnings: Sequence[BuildWarning] = ()) -> None:
+        """Queue ``entry`` with the warnings of its row."""
+        if warnings:
+            entry = {**entry, "warnings": [warning.to_history() for warning in warnings]}
+        self._pending.append(entry)
+        if len(self._pending) >= self.flush_rows:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._pending:
+            return
+        entries, self._pending = self._pending, []
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # One locked write per batch keeps lines from parallel builds intact.
+        payload = "".join(json.dumps(entry, ensure_ascii=False) + "\n" for entry in entries)
+        with file_lock(self.path), self.path.open("ab") as fh:
+            fh.write(payload.encode("utf-8"))
 
-def _determine_zoom_base(zoom_data: Any, default: float = 100.0) -> float:
-    if isinstance(zoom_data, Mapping):
-        values = zoom_data.get("Values")
-        if isinstance(values, list) and values:
-            base_value = _first_numeric_value(values, default=default)
-        else:
-            base_value = _first_numeric_value(zoom_data, default=default)
-    elif isinstance(zoom_data, (int, float)):
-        base_value = float(zoom_data)
-    else:
-        base_value = default
-
-    if base_value == 0:
-        return default
-    return base_value
-
-
-def _zoom_entry_ratio(entry: Any, base_value: float) -> float:
-    if not base_value:
-        return 1.0
-
-    candidate: Any
-    if isinstance(entry, Mapping):
-        candidate = entry.get("Value")
-    else:
-        candidate = entry
-
-    if isinstance(candidate, (int, float)) and base_value:
-        return float(candidate) / base_value
-    return 1.0
-
-
-def _scale_zoom_entry(entry: Any, base_value: float, scaled_base: float) -> dict[str, Any]:
-    ratio = _zoom_entry_ratio(entry, base_value)
-    updated = dict(entry) if isinstance(entry, Mapping) else {"Value": entry}
-    updated["Value"] = round(scaled_base * ratio, 4)
-    return updated
-
-
-def _apply_zoom_scale(zoom_data: Any, base_value: float, dynamic_scale: float) -> Any:
-    scaled_base = base_value * dynamic_scale
-
-    if isinstance(zoom_data, Mapping):
-        values = zoom_data.get("Values")
-        if isinstance(values, list) and values:
-            updated = dict(zoom_data)
-            updated["Values"] = [
-                _scale_zoom_entry(entry, base_value, scaled_base) for entry in values
-            ]
-            return updated
+        from .history_sqlite import SqliteHistoryStore, history_store_path
 
-        candidate = zoom_data.get("Value")
-        if isinstance(candidate, (int, float)):
-            ratio = _zoom_entry_ratio(candidate, base_value)
-            updated = dict(zoom_data)
-            updated["Value"] = round(scaled_base * ratio, 4)
-            return updated
+        store_path = history_store_path(self.base_path / "history")
+        if store_path is not None:
+            with SqliteHistoryStore.open(store_path) as store:
+                store.add_entries(entries, day=self.path.parent.name)
+        if self.learn:
+            self.model_path = update_proposal_model(entries, self.base_path) or self.model_path
+        self.count += len(entries)
 
-        return zoom_data
+    def close(self) -> int:
+        """Flush the remaining entries and return how many were written."""
+        self.flush()
+        return self.count
 
-    if isinstance(zoom_data, (int, float)):
-        ratio = _zoom_entry_ratio(zoom_data, base_value)
-        return round(scaled_base * ratio, 4)
 
-    return zoom_data
+def _history_timestamp(moment: datetime) -> str:
+    return moment.replace(microsecond=0).isoformat() + "Z"
 
 
-def apply_hiragana_shrink(project_path: str | Path, output_path: str | Path, scale: float):
-    project = json.loads(Path(project_path).read_text("utf-8-sig"))
-    for timeline in project.get("Timelines", []):
-        for item in timeline.get("Items", []):
-            if "TextItem" in item.get("$type", "") and contains_hiragana(item.get("Text")):
-                zoom_block = item.get("Zoom")
-                if zoom_block is None:
-                    continue
+def _write_history_entries(history: List[Dict[str, Any]], warnings: List[BuildWarning], base_path: Path) -> int:
+    if not history:
+        return 0
+    warning_map: Dict[int, List[BuildWarning]] = {}
+    for warning in warnings:
+        if warning.row_index is None:
+            continue
+        warning_map.setdefault(warning.row_index, []).append(warning)
 
-                base_value = _determine_zoom_base(zoom_block)
-                dynamic_scale = _determine_hiragana_scale(item, scale)
-                item["Zoom"] = _apply_zoom_scale(zoom_block, base_value, dynamic_scale)
-    dump_json(output_path, project)
+    writer = HistoryWriter(base_path, learn=False, flush_rows=len(history))
+    for entry in history:
+        writer.write(entry, warning_map.get(entry.get("row_index"), ()))
+    return writer.close()
@@ -0,0 +1,18 @@
+"""Shared fixtures for the test suite."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from auto_movie_edit import text_metrics
+
+
+@pytest.fixture(autouse=True)
+def isolated_text_measurer(tmp_path_factory: pytest.TempPathFactory, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Keep filters away from the installed fonts and the user's metric cache."""
+
+    cache_dir: Path = tmp_path_factory.mktemp("metrics")
+    monkeypatch.setenv("AUTO_MOVIE_EDIT_CACHE_DIR", str(cache_dir))
+    monkeypatch.setattr(text_metrics, "_shared", text_metrics.TextMeasurer(font_dirs=[], cache_path=None))
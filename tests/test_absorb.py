@@ -0,0 +1,203 @@
+"""Tests for extracting workbook dictionaries from raw YMMP projects."""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+from openpyxl import load_workbook
+from typer.testing import CliRunner
+
+from auto_movie_edit import absorb
+from auto_movie_edit.absorb import extract_dictionaries
+from auto_movie_edit.cli import app
+from auto_movie_edit.template_store import STORE_DIR, TemplateStore
+from auto_movie_edit.workbook import load_workbook_data
+
+_PREFIX = "YukkuriMovieMaker.Project.Items."
+
+
+def _project() -> dict:
+    text = {"$type": f"{_PREFIX}TextItem, YukkuriMovieMaker", "Text": "強調/黄", "Frame": 30, "Length": 60, "Layer": 8}
+    tachie = {
+        "$type": f"{_PREFIX}TachieItem, YukkuriMovieMaker",
+        "CharacterName": "霊夢",
+        "TachieItemParameter": {"Eye": "C:/tachie/【目】笑顔.png"},
+        "Frame": 0,
+        "Length": 90,
+    }
+    group = {
+        "$type": f"{_PREFIX}GroupItem, YukkuriMovieMaker",
+        "Items": [{"Frame": 120, "Length": 10}, {"Frame": 135, "Length": 5}],
+        "Frame": 120,
+        "Length": 20,
+    }
+    zoom = {"$type": f"{_PREFIX}ZoomEffectItem, YukkuriMovieMaker", "Zoom": 1.2, "Frame": 40, "Length": 10}
+    return {
+        "FilePath": "C:/projects/sample.ymmp",
+        "Timelines": [{"Items": [text, dict(text, Frame=200), tachie, group, zoom, dict(zoom, Frame=300)]}],
+    }
+
+
+def test_extract_dictionaries_classifies_items_in_one_pass(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    calls: list[bool] = []
+    strip = absorb._strip_runtime_fields
+
+    def _counting_strip(data, extra_keys=None, *, preserve_timing=False):
+        calls.append(preserve_timing)
+        return strip(data, extra_keys, preserve_timing=preserve_timing)
+
+    monkeypatch.setattr(absorb, "_strip_runtime_fields", _counting_strip)
+    result = extract_dictionaries(_project(), tmp_path, workers=4)
+
+    assert list(result.telop_patterns) == ["telop_強調/黄"]
+    assert list(result.assets) == ["tachie_霊夢_笑顔"]
+    assert len(result.fx_presets) == 1
+    fx = next(iter(result.fx_presets.values()))
+    assert fx["fx_type"] == "zoomeffect"
+    # The tachie and the group are packs; the FX item is mirrored after them.
+    assert len(result.packs) == 3
+    assert list(result.packs.values())[-1]["pack_id"] == fx["source"]
+    assert list(result.packs.values())[-1]["notes"] == "Auto-generated from FX item"
+    # One plain strip for the telop and the tachie asset, one timed strip per
+    # pack or FX item; the duplicate telop is skipped before stripping.
+    assert calls.count(False) == 2
+    assert calls.count(True) == 4
+
+    telop_file = tmp_path / result.telop_patterns["telop_強調/黄"]["source"]
+    assert json.loads(telop_file.read_text("utf-8")) == {"$type": f"{_PREFIX}TextItem, YukkuriMovieMaker", "Text": "強調/黄"}
+    templates = [json.loads((tmp_path / value["source"]).read_text("utf-8")) for value in result.packs.values()]
+    group_template = next(template for template in templates if "Items" in template)
+    assert [child["FrameOffset"] for child in group_template["Items"]] == [0, 15]
+    assert group_template["FrameOffset"] == 0
+
+
+def test_mirrored_fx_pack_keeps_an_existing_template(tmp_path: Path) -> None:
+    result = extract_dictionaries(_project(), tmp_path)
+    pack_path = tmp_path / result.packs[next(iter(result.fx_presets.values()))["source"]]["source"]
+    pack_path.write_text('{"edited": true}', encoding="utf-8")
+
+    extract_dictionaries(_project(), tmp_path)
+
+    assert json.loads(pack_path.read_text("utf-8")) == {"edited": True}
+
+
+def test_absorb_command_fills_the_dictionary_sheets(tmp_path: Path) -> None:
+    source = tmp_path / "sample.ymmp"
+    source.write_text(json.dumps(_project(), ensure_ascii=False), encoding="utf-8")
+    xlsx = tmp_path / "sheet.xlsx"
+
+    completed = CliRunner().invoke(app, ["absorb", "--ymmp", str(source), "--xlsx", str(xlsx)])
+
+    assert completed.exit_code == 0, completed.output
+    workbook = load_workbook(xlsx)
+    assert workbook["TELP_PATTERNS"].cell(row=2, column=1).value == "telop_強調/黄"
+    assert workbook["PACKS_MULTI"].max_row == 4
+    assert workbook["FX"].max_row == 2
+    data = load_workbook_data(xlsx)
+    assert data.telop_patterns["telop_強調/黄"].overrides["Text"] == "強調/黄"
+
+
+def test_template_store_shares_files_between_aliases(tmp_path: Path) -> None:
+    project = _project()
+    telop = project["Timelines"][0]["Items"][0]
+    project["Timelines"][0]["Items"].append(dict(telop, Text="別の字幕", Layer=3))
+    source = tmp_path / "sample.ymmp"
+    source.write_text(json.dumps(project, ensure_ascii=False), encoding="utf-8")
+    xlsx = tmp_path / "sheet.xlsx"
+
+    completed = CliRunner().invoke(app, ["absorb", "--ymmp", str(source), "--xlsx", str(xlsx)])
+    assert completed.exit_code == 0, completed.output
+
+    result = extract_dictionaries(project, tmp_path)
+    assert len({value["source"] for value in result.telop_patterns.values()}) == 1
+    assert result.telop_patterns["telop_強調/黄"]["overrides"] is None
+    assert result.telop_patterns["telop_別の字幕"]["overrides"] == {"/Text": "別の字幕"}
+    data = load_workbook_data(xlsx)
+    assert data.telop_patterns["telop_強調/黄"].overrides["Text"] == "強調/黄"
+    assert data.telop_patterns["telop_別の字幕"].overrides["Text"] == "別の字幕"
+
+
+def test_packs_that_differ_in_layer_keep_their_own_layer(tmp_path: Path) -> None:
+    group = _project()["Timelines"][0]["Items"][3]
+    project = {"Timelines": [{"Items": [dict(group, Layer=5), dict(group, Layer=9)]}]}
+    source = tmp_path / "sample.ymmp"
+    source.write_text(json.dumps(project, ensure_ascii=False), encoding="utf-8")
+    xlsx = tmp_path / "sheet.xlsx"
+
+    completed = CliRunner().invoke(app, ["absorb", "--ymmp", str(source), "--xlsx", str(xlsx)])
+    assert completed.exit_code == 0, completed.output
+
+    data = load_workbook_data(xlsx)
+    assert len(data.packs) == 2
+    assert sorted(pack.overrides["Layer"] for pack in data.packs.values()) == [5, 9]
+    assert len(list((tmp_path / STORE_DIR).iterdir())) == 1
+
+
+def test_template_store_never_rewrites_stored_templates(tmp_path: Path) -> None:
+    extract_dictionaries(_project(), tmp_path)
+    files = sorted((tmp_path / STORE_DIR).iterdir())
+    mtimes = [path.stat().st_mtime_ns for path in files]
+
+    store = TemplateStore(tmp_path)
+    extract_dictionaries(_project(), tmp_path)
+    for path in files:
+        store.add(json.loads(path.read_text("utf-8")))
+
+    assert store.flush() == 0
+    assert sorted((tmp_path / STORE_DIR).iterdir()) == files
+    assert [path.stat().st_mtime_ns for path in files] == mtimes
+
+
+def test_absorb_projects_merges_files_and_reads_every_timeline(tmp_path: Path) -> None:
+    first = _project()
+    second = _project()
+    extra_telop = dict(first["Timelines"][0]["Items"][0], Text="二枚目")
+    second["Timelines"].append({"Items": [extra_telop]})
+    sources = []
+    for index, project in enumerate((first, second)):
+        source = tmp_path / "projects" / f"{index}.ymmp"
+        source.parent.mkdir(exist_ok=True)
+        source.write_text(json.dumps(project, ensure_ascii=False), encoding="utf-8")
+        sources.append(source)
+
+    serial = absorb.absorb_projects(sources, tmp_path / "serial", workers=1)
+    pooled = absorb.absorb_projects(sources, tmp_path / "pooled", workers=2)
+
+    assert list(serial.telop_patterns) == ["telop_強調/黄", "telop_二枚目"]
+    assert len(serial.packs) == 3
+    assert serial == pooled
+    assert sorted(path.name for path in (tmp_path / "serial" / STORE_DIR).iterdir()) == sorted(
+        path.name for path in (tmp_path / "pooled" / STORE_DIR).iterdir()
+    )
+
+
+def test_absorb_command_saves_the_workbook_once(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    import auto_movie_edit.workbook as workbook_module
+
+    for index in range(3):
+        (tmp_path / "projects").mkdir(exist_ok=True)
+        (tmp_path / "projects" / f"{index}.ymmp").write_text(json.dumps(_project(), ensure_ascii=False), encoding="utf-8")
+    saves: list[Path] = []
+    save = workbook_module.save_workbook
+    monkeypatch.setattr(workbook_module, "save_workbook", lambda workbook, path: (saves.append(path), save(workbook, path)))
+    xlsx = tmp_path / "sheet.xlsx"
+
+    completed = CliRunner().invoke(app, ["absorb", "--ymmp", str(tmp_path / "projects"), "--xlsx", str(xlsx), "--workers", "2"])
+
+    assert completed.exit_code == 0, completed.output
+    assert saves == [xlsx.resolve()]
+    assert load_workbook(xlsx)["TELP_PATTERNS"].max_row == 2
+
+
+def test_absorb_command_rejects_unreadable_projects(tmp_path: Path) -> None:
+    broken = tmp_path / "broken.ymmp"
+    broken.write_text("{", encoding="utf-8")
+    xlsx = tmp_path / "sheet.xlsx"
+
+    completed = CliRunner().invoke(app, ["absorb", "--ymmp", str(broken), "--xlsx", str(xlsx)])
+
+    assert completed.exit_code == 1
+    assert "broken.ymmp" in completed.output
+    assert not xlsx.exists()
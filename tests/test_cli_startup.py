@@ -0,0 +1,37 @@
+"""Tests guarding the lazy-import structure of the command line."""
+
+from __future__ import annotations
+
+import subprocess
+import sys
+
+from auto_movie_edit.language import LanguageAnalyzer
+
+_HEAVY_MODULES = (
+    "openpyxl",
+    "fugashi",
+    "auto_movie_edit.workbook",
+    "auto_movie_edit.ymmp",
+    "auto_movie_edit.proposals",
+    "auto_movie_edit.language",
+)
+
+
+def test_cli_import_does_not_load_heavy_modules() -> None:
+    code = (
+        "import sys\n"
+        "import auto_movie_edit.cli\n"
+        "import auto_movie_edit.filters\n"
+        "import auto_movie_edit.history\n"
+        f"print(','.join(sorted(name for name in {_HEAVY_MODULES!r} if name in sys.modules)))\n"
+    )
+    completed = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert completed.stdout.strip() == ""
+
+
+def test_tagger_is_created_on_first_tokenisation() -> None:
+    analyzer = LanguageAnalyzer()
+    assert analyzer._tagger is None
+    assert analyzer._tagger_error is None
+    analyzer.tokenize("テスト")
+    assert analyzer._tagger is not None or analyzer._tagger_error is not None
@@ -0,0 +1,86 @@
+"""Tests for concurrent proposal learning and history writes."""
+
+from __future__ import annotations
+
+import json
+import multiprocessing
+from pathlib import Path
+
+import pytest
+
+from auto_movie_edit import proposal_log
+from auto_movie_edit.proposal_log import compact_deltas, pending_delta_paths
+from auto_movie_edit.proposals import ProposalModel, update_proposal_model
+from auto_movie_edit.ymmp import _write_history_entries
+
+_WORKERS = 4
+_BUILDS = 40
+_ROWS = 20
+
+
+def _history(worker: int, build: int) -> list[dict]:
+    return [
+        {
+            "timestamp": f"2024-05-01T{worker:02d}:{build:02d}:00Z",
+            "row_index": row + 2,
+            "subtitle": f"語{row}",
+            "telop": f"telop_{worker}",
+            "notes": {"approval": True},
+        }
+        for row in range(_ROWS)
+    ]
+
+
+def _worker(root: str, worker: int, backend: str) -> None:
+    base = Path(root)
+    if backend == "sqlite":
+        base = base / "ai" / "proposal_model.sqlite"
+    else:
+        # Merge after every build so that appends race with sealing and swapping.
+        proposal_log.COMPACT_THRESHOLD_BYTES = 0
+    for build in range(_BUILDS):
+        history = _history(worker, build)
+        _write_history_entries(history, [], Path(root))
+        update_proposal_model(history, base)
+        thread = proposal_log._running.get(
+            (Path(root) / "ai" / "proposal_model.json").resolve()
+        )
+        if thread is not None:
+            thread.join()
+
+
+@pytest.mark.skipif(
+    "fork" not in multiprocessing.get_all_start_methods(), reason="requires fork"
+)
+@pytest.mark.parametrize("backend", ["json", "sqlite"])
+def test_parallel_builds_do_not_lose_updates(tmp_path: Path, backend: str) -> None:
+    (tmp_path / "ai").mkdir()
+    context = multiprocessing.get_context("fork")
+    processes = [
+        context.Process(target=_worker, args=(str(tmp_path), worker, backend))
+        for worker in range(_WORKERS)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(timeout=120)
+        assert process.exitcode == 0
+
+    if backend == "sqlite":
+        model = ProposalModel.load(tmp_path / "ai" / "proposal_model.sqlite")
+    else:
+        model_path = tmp_path / "ai" / "proposal_model.json"
+        compact_deltas(model_path)
+        assert pending_delta_paths(model_path) == []
+        model = ProposalModel.load(model_path)
+    global_stats = model._token_stats("__global__", "telop")
+    for worker in range(_WORKERS):
+        assert global_stats[f"telop_{worker}"]["total"] == _BUILDS * _ROWS
+    model.close()
+
+    lines = [
+        json.loads(line)
+        for path in (tmp_path / "history").rglob("history.jsonl")
+        for line in path.read_text(encoding="utf-8").splitlines()
+    ]
+    assert len(lines) == _WORKERS * _BUILDS * _ROWS
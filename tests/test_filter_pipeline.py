@@ -0,0 +1,231 @@
+"""Tests for the filter registry and the single-pass filter pipeline."""
+
+from __future__ import annotations
+
+import copy
+import importlib.metadata
+import json
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+
+from auto_movie_edit import filter_stream, filters
+from auto_movie_edit.cli import app
+from auto_movie_edit.filter_batch import MANIFEST_NAME, _filter_file, collect_filter_inputs, filter_files
+from auto_movie_edit.filter_stream import stream_filter
+from auto_movie_edit.filters import (
+    FilterPipeline,
+    apply_filters,
+    apply_hiragana_shrink,
+    get_filter,
+    is_portable_filter,
+    parse_filter_spec,
+    register_filter,
+)
+from auto_movie_edit.utils import dump_json
+
+_SAMPLE = Path(__file__).resolve().parent / "data" / "hiragana_shrink_sample.ymmp"
+
+
+@pytest.fixture
+def registry(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(filters, "_REGISTRY", dict(filters._REGISTRY))
+    monkeypatch.setattr(filters, "_PORTABLE", dict(filters._PORTABLE))
+    monkeypatch.setattr(filters, "_entry_points_loaded", False)
+
+
+def _mark(argument: str | None):
+    def _apply(item: dict) -> None:
+        item.setdefault("Marks", []).append(argument)
+
+    return _apply
+
+
+def _picky(argument: str | None):
+    def _apply(item: dict) -> None:
+        if not isinstance(item.get("Text"), str):
+            item["Marks"]  # noqa: B018 - raises KeyError like a buggy third-party filter
+
+    return _apply
+
+
+def test_parse_filter_spec() -> None:
+    assert parse_filter_spec("Hira-Shrink:0.8") == ("hira-shrink", "0.8")
+    assert parse_filter_spec("mark") == ("mark", None)
+    with pytest.raises(ValueError):
+        parse_filter_spec(":0.8")
+    with pytest.raises(ValueError):
+        get_filter("hira-shrink")("large")
+
+
+def test_pipeline_matches_file_filter(tmp_path: Path, registry: None) -> None:
+    register_filter("mark", _mark)
+    project = json.loads(_SAMPLE.read_text("utf-8"))
+    pipeline = FilterPipeline.from_specs(["hira-shrink:0.8", "mark:a", "mark"])
+    filtered = pipeline.apply(copy.deepcopy(project))
+
+    apply_hiragana_shrink(_SAMPLE, tmp_path / "shrink.ymmp", 0.8)
+    expected = json.loads((tmp_path / "shrink.ymmp").read_text("utf-8"))
+    for item in filtered["Timelines"][0]["Items"]:
+        assert item.pop("Marks") == ["a", None]
+    assert filtered == expected
+
+
+def test_entry_point_filters_are_loaded(monkeypatch: pytest.MonkeyPatch, registry: None) -> None:
+    entry_point = importlib.metadata.EntryPoint(
+        name="mark", value="test_filter_pipeline:_mark", group=filters.FILTER_ENTRY_POINT_GROUP
+    )
+    monkeypatch.setattr(importlib.metadata, "entry_points", lambda group: [entry_point])
+    assert "mark" in filters.available_filters()
+    assert get_filter("MARK").__name__ == "_mark"
+    assert filters.is_portable_filter("mark")
+
+
+def test_filter_command_applies_several_filters(tmp_path: Path, registry: None) -> None:
+    register_filter("mark", _mark)
+    runner = CliRunner()
+    out = tmp_path / "out.ymmp"
+    result = runner.invoke(
+        app, ["filter", "hira-shrink", "mark:x", "--input-path", str(_SAMPLE), "--out", str(out), "--scale", "0.8"]
+    )
+    assert result.exit_code == 0, result.output
+    items = json.loads(out.read_text("utf-8"))["Timelines"][0]["Items"]
+    assert all(item["Marks"] == ["x"] for item in items)
+
+    result = runner.invoke(app, ["filter", "missing", "--input-path", str(_SAMPLE), "--out", str(out)])
+    assert result.exit_code == 1
+    assert "Unknown filter: missing" in result.output
+
+
+def test_batch_filter_skips_unchanged_files(tmp_path: Path) -> None:
+    source_dir = tmp_path / "projects"
+    (source_dir / "season1").mkdir(parents=True)
+    for name in ("a.ymmp", "season1/b.ymmp"):
+        (source_dir / name).write_bytes(_SAMPLE.read_bytes())
+    (source_dir / "broken.ymmp").write_text("{", encoding="utf-8")
+
+    base, sources = collect_filter_inputs(source_dir)
+    assert base == source_dir and len(sources) == 3
+    assert collect_filter_inputs(f"{source_dir}/season1/*.ymmp")[1] == [source_dir / "season1" / "b.ymmp"]
+
+    out = tmp_path / "out"
+    results = filter_files(sources, base, out, ["hira-shrink:0.8"], workers=2)
+    assert [(result.status, result.changed_items) for result in results] == [
+        ("filtered", 2), ("failed", 0), ("filtered", 2)
+    ]
+    expected = tmp_path / "expected.ymmp"
+    apply_hiragana_shrink(_SAMPLE, expected, 0.8)
+    assert (out / "season1" / "b.ymmp").read_bytes() == expected.read_bytes()
+    manifest = json.loads((out / MANIFEST_NAME).read_text("utf-8"))["files"]
+    assert sorted(manifest) == ["a.ymmp", "season1/b.ymmp"]
+
+    def statuses(specs: list[str]) -> list[str]:
+        return [result.status for result in filter_files(sources, base, out, specs, workers=2)]
+
+    assert statuses(["hira-shrink:0.8"]) == ["skipped", "failed", "skipped"]
+    (source_dir / "a.ymmp").write_text(_SAMPLE.read_text("utf-8") + "\n", encoding="utf-8")
+    assert statuses(["hira-shrink:0.8"]) == ["filtered", "failed", "skipped"]
+    assert statuses(["hira-shrink:0.7"]) == ["filtered", "failed", "filtered"]
+    streamed = filter_files(sources, base, out, ["hira-shrink:0.7"], workers=1, stream=True)
+    assert [result.status for result in streamed] == ["filtered", "failed", "filtered"]
+    assert (out / "season1" / "b.ymmp").read_bytes() != expected.read_bytes()
+
+    runner = CliRunner()
+    result = runner.invoke(
+        app,
+        ["filter", "hira-shrink", "--scale", "0.7", "--input-path", str(source_dir / "season1"), "--out", str(out / "season1")],
+    )
+    assert result.exit_code == 0, result.output
+    assert "Filtered 1, skipped 0, failed 0" in result.output
+
+
+def test_runtime_filters_are_applied_in_process(tmp_path: Path, registry: None) -> None:
+    register_filter("mark", _mark)
+    assert is_portable_filter("hira-shrink") and not is_portable_filter("mark")
+    sources = []
+    for name in ("a.ymmp", "b.ymmp"):
+        sources.append(tmp_path / "projects" / name)
+        sources[-1].parent.mkdir(exist_ok=True)
+        sources[-1].write_bytes(_SAMPLE.read_bytes())
+
+    results = filter_files(sources, tmp_path / "projects", tmp_path / "out", ["mark:x"], workers=2)
+    assert [result.status for result in results] == ["filtered", "filtered"]
+    project = json.loads((tmp_path / "out" / "a.ymmp").read_text("utf-8"))
+    assert all(item["Marks"] == ["x"] for item in project["Timelines"][0]["Items"])
+
+    # A filter that raises fails that file only; the others are still recorded.
+    register_filter("picky", _picky)
+    odd = tmp_path / "projects" / "c.ymmp"
+    odd.write_text(json.dumps({"Timelines": [{"Items": [{"Text": 1}]}]}), encoding="utf-8")
+    results = filter_files([*sources, odd], tmp_path / "projects", tmp_path / "picky", ["picky"], workers=2)
+    assert [result.status for result in results] == ["filtered", "filtered", "failed"]
+    assert results[2].error == "KeyError: 'Marks'"
+    manifest = json.loads((tmp_path / "picky" / MANIFEST_NAME).read_text("utf-8"))["files"]
+    assert sorted(manifest) == ["a.ymmp", "b.ymmp"]
+
+    # A worker that does not know a filter fails that file instead of the batch.
+    failed = _filter_file(str(sources[0]), str(tmp_path / "c.ymmp"), ["missing"], (), "missing")
+    assert failed.status == "failed" and failed.error == "ValueError: Unknown filter: missing"
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 1 << 20])
+def test_stream_filter_matches_in_memory_pipeline(tmp_path: Path, chunk_size: int) -> None:
+    project = json.loads(_SAMPLE.read_text("utf-8"))
+    items = project["Timelines"][0]["Items"]
+    items.append({"$type": "ImageItem", "Text": "ひらがな {\"[", "Zoom": 100.0, "Path": "C:\\\\a\\\"b"})
+    items.append({"$type": "TextItem", "Text": "ABC", "Zoom": 100.0})
+    project["Timelines"].append({"Items": [], "Note": "Items: {"})
+    source = tmp_path / "source.ymmp"
+    dump_json(source, project)
+
+    expected = tmp_path / "expected.ymmp"
+    apply_filters(source, expected, ["hira-shrink:0.8"])
+    result = stream_filter(source, tmp_path / "streamed.ymmp", ["hira-shrink:0.8"], chunk_size=chunk_size)
+    assert (tmp_path / "streamed.ymmp").read_bytes() == expected.read_bytes()
+    assert (result.items, result.decoded, result.changed_items) == (len(items), len(items) - 1, 2)
+
+
+def test_stream_filter_buffers_one_item_at_a_time(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    items = [
+        {"$type": "TextItem" if index % 2 else "ImageItem", "Text": "ゆっくり" * 300, "Frame": index, "Zoom": 100.0}
+        for index in range(200)
+    ]
+    project = {"Note": "n" * 50_000, "Timelines": [{"Items": items, "Keys": ["k" * 20_000]}], "Tail": "t" * 50_000}
+    source = tmp_path / "source.ymmp"
+    dump_json(source, project)
+
+    peak = 0
+    fill = filter_stream._ItemScanner._fill
+
+    def _fill(self) -> bool:
+        nonlocal peak
+        peak = max(peak, len(self.buf))
+        filled = fill(self)
+        peak = max(peak, len(self.buf))
+        return filled
+
+    monkeypatch.setattr(filter_stream._ItemScanner, "_fill", _fill)
+    chunk_size = 4096
+    stream_filter(source, tmp_path / "streamed.ymmp", ["hira-shrink:0.8"], chunk_size=chunk_size)
+
+    expected = tmp_path / "expected.ymmp"
+    apply_filters(source, expected, ["hira-shrink:0.8"])
+    assert (tmp_path / "streamed.ymmp").read_bytes() == expected.read_bytes()
+    largest = max(len(json.dumps(item, ensure_ascii=False, indent=2).encode("utf-8")) for item in items)
+    assert peak <= largest + 2 * chunk_size
+
+
+def test_stream_filter_copies_untouched_bytes(tmp_path: Path) -> None:
+    source = tmp_path / "compact.ymmp"
+    text = '\ufeff{"Timelines":[{"Items":[{"$type":"TextItem","Text":"ひらがなばかりのながいぶんしょうです","Zoom":100.0},{"$type":"X","K":[1, 2,3]}]}],"Z" : 1}'
+    source.write_text(text, encoding="utf-8")
+    stream_filter(source, tmp_path / "out.ymmp", ["hira-shrink"])
+    output = (tmp_path / "out.ymmp").read_text("utf-8")
+    assert output.startswith('\ufeff{"Timelines":[{"Items":[{"$type": "TextItem"')
+    assert output.endswith('{"$type":"X","K":[1, 2,3]}]}],"Z" : 1}')
+    assert json.loads(output.lstrip("\ufeff"))["Timelines"][0]["Items"][0]["Zoom"] < 100.0
+
+    source.write_text(text[:40], encoding="utf-8")
+    with pytest.raises(ValueError):
+        stream_filter(source, tmp_path / "out.ymmp", ["hira-shrink"])
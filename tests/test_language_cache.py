@@ -2,7 +2,9 @@
 
 from __future__ import annotations
 
-from auto_movie_edit.language import LanguageAnalyzer
+from unittest.mock import patch
+
+from auto_movie_edit.language import LanguageAnalyzer, LanguageAnalyzerPool
 from auto_movie_edit.proposals import ProposalModel
 from auto_movie_edit.ymmp import ProjectBuilder
 from auto_movie_edit.models import TimelineRow, WorkbookData
@@ -61,3 +63,29 @@ def test_proposal_model_tokenize_uses_language_cache() -> None:
     assert after_first.misses == initial_info.misses + 1
     assert after_second.misses == after_first.misses
     assert after_second.hits >= after_first.hits + 1
+
+
+def test_project_builders_share_pooled_analyzer() -> None:
+    pool = LanguageAnalyzerPool()
+    first = ProjectBuilder(WorkbookData(), analyzer_pool=pool)
+    second = ProjectBuilder(WorkbookData(), analyzer_pool=pool)
+    extended = ProjectBuilder(
+        WorkbookData(tone_keywords={"強調": {"ガチ": 2.0}}),
+        analyzer_pool=pool,
+    )
+
+    assert first.language_analyzer is second.language_analyzer
+    assert extended.language_analyzer is not first.language_analyzer
+
+
+def test_build_classifies_tones_before_row_loop() -> None:
+    rows = [
+        TimelineRow(index=1, start=None, end=None, subtitle="これは何ですか？", telop=None, character="hero"),
+        TimelineRow(index=2, start=None, end=None, subtitle="本当にすごい！", telop=None),
+    ]
+    builder = ProjectBuilder(WorkbookData(timeline=rows), analyzer_pool=LanguageAnalyzerPool())
+
+    with patch.object(builder.language_analyzer, "detect_tone", side_effect=AssertionError):
+        builder.build()
+
+    assert builder._row_tones == {1: "質問調"}
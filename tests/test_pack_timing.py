@@ -4,7 +4,7 @@ from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
 
-from auto_movie_edit.cli import _strip_runtime_fields
+from auto_movie_edit.absorb import _strip_runtime_fields
 from auto_movie_edit.models import Pack, TimelineRow, WorkbookData
 from auto_movie_edit.utils import Timecode
 from auto_movie_edit.ymmp import ProjectBuilder
@@ -0,0 +1,108 @@
+"""Tests for proposal model decay and compaction."""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from auto_movie_edit.proposal_sqlite import SqliteProposalModel
+from auto_movie_edit.proposals import ProposalModel
+
+_NOW = datetime(2024, 6, 1, tzinfo=timezone.utc)
+
+
+def _entry(token: str, telop: str, days_ago: int, index: int, approved: bool = True) -> dict:
+    seen = (_NOW - timedelta(days=days_ago)).strftime("%Y-%m-%dT%H:%M:%SZ")
+    return {
+        "timestamp": seen,
+        "row_index": index,
+        "subtitle": token,
+        "telop": telop,
+        "notes": {"approval": approved},
+    }
+
+
+def _history() -> list[dict]:
+    entries = [_entry("猫", "telop_recent", 0, index) for index in range(4)]
+    entries += [_entry("猫", "telop_old", 90, index + 10) for index in range(4)]
+    entries += [_entry("犬", "telop_stale", 400, 30)]
+    entries += [_entry(f"語{index}", "telop_rare", 1, 40 + index) for index in range(5)]
+    return entries
+
+
+def test_compact_decays_and_prunes() -> None:
+    model = ProposalModel()
+    model.update_from_history(_history())
+
+    result = model.compact(now=_NOW, half_life_days=90.0, max_tokens_per_category=None)
+
+    assert result.entries_before > result.entries_after
+    assert model.stats["猫"]["telop"]["telop_recent"]["wins"] == 4
+    assert model.stats["猫"]["telop"]["telop_old"]["wins"] == 2
+    assert model.stats["猫"]["telop"]["telop_old"]["total"] == 2
+    assert "犬" not in model.stats
+    assert "telop_stale" not in model.stats["__global__"]["telop"]
+    assert model.suggest("猫").top("telop") == ["telop_recent"]
+
+    # A second run at the same instant must not decay again.
+    model.compact(now=_NOW, half_life_days=90.0, max_tokens_per_category=None)
+    assert model.stats["猫"]["telop"]["telop_old"]["wins"] == 2
+
+
+def test_compact_caps_tokens_per_category(tmp_path: Path) -> None:
+    model = ProposalModel()
+    model.update_from_history(_history())
+    model.compact(now=_NOW, half_life_days=0, max_tokens_per_category=1)
+
+    assert set(model.stats) == {"猫", "__global__"}
+
+    path = tmp_path / "model.json"
+    model.save(path)
+    assert ProposalModel.load(path).compacted_at == model.compacted_at
+
+
+def test_sqlite_compaction_matches_json(tmp_path: Path) -> None:
+    expected = ProposalModel()
+    expected.update_from_history(_history())
+    expected.compact(now=_NOW, max_tokens_per_category=2)
+
+    with SqliteProposalModel(tmp_path / "model.sqlite") as model:
+        model.update_from_history(_history())
+        before = model.entry_count()
+        result = model.compact(now=_NOW, max_tokens_per_category=2)
+        model.save()
+        assert result.entries_before == before
+        assert model.entry_count() == result.entries_after == expected.entry_count()
+        assert sorted(model.iter_stats()) == sorted(expected.iter_stats())
+
+
+def test_repeated_compaction_keeps_decaying_small_counts(tmp_path: Path) -> None:
+    history = [_entry("猫", "telop_once", 0, 2)]
+    json_model = ProposalModel()
+    json_model.update_from_history(history)
+    path = tmp_path / "model.json"
+    json_model.save(path)
+    sqlite_model = SqliteProposalModel(tmp_path / "model.sqlite")
+    sqlite_model.update_from_history(history)
+
+    # Daily compactions; each reloads the model as 'model compact' would.
+    pruned_after = {}
+    for day in range(1, 400):
+        now = _NOW + timedelta(days=day)
+        json_model = ProposalModel.load(path)
+        json_model.compact(now=now)
+        json_model.save(path)
+        sqlite_model.compact(now=now)
+        sqlite_model.save()
+        for name, model in (("json", json_model), ("sqlite", sqlite_model)):
+            if name not in pruned_after and not any(row[2] == "telop_once" for row in model.iter_stats()):
+                pruned_after[name] = day
+    sqlite_model.close()
+
+    # A single observation decays below the default min_weight (0.5) after
+    # one half-life (90 days), exactly as a single compaction would prune it.
+    single = ProposalModel()
+    single.update_from_history(history)
+    single.compact(now=_NOW + timedelta(days=91))
+    assert not any(row[2] == "telop_once" for row in single.iter_stats())
+    assert pruned_after == {"json": 91, "sqlite": 91}
@@ -0,0 +1,112 @@
+"""Tests for the proposal model delta log."""
+
+from __future__ import annotations
+
+import shutil
+import threading
+from pathlib import Path
+
+from auto_movie_edit.locking import file_lock
+from auto_movie_edit.proposal_log import (
+    compact_deltas,
+    apply_pending_deltas,
+    delta_log_path,
+    pending_delta_paths,
+    start_background_compaction,
+)
+from auto_movie_edit.proposals import ProposalModel, update_proposal_model
+
+
+def _history(offset: int, count: int) -> list[dict]:
+    return [
+        {
+            "timestamp": f"2024-04-01T00:{offset:02d}:{index:02d}Z",
+            "row_index": index + 2,
+            "start": f"00:00:{index:02d}.000",
+            "subtitle": "猫 ニュース" if index % 2 else "今日 挨拶",
+            "telop": f"telop_{index % 3}",
+            "packs": [],
+            "objects": [{"identifier": "cat", "resolved_asset": "asset_cat"}],
+            "fx": [{"fx_id": "zoom"}],
+            "notes": {"approval": index % 4 != 0},
+            "warnings": ["ignored"],
+        }
+        for index in range(count)
+    ]
+
+
+def _expected(*histories: list[dict]) -> ProposalModel:
+    model = ProposalModel()
+    for history in histories:
+        model.update_from_history(history)
+    return model
+
+
+def test_updates_are_appended_and_visible_to_readers(tmp_path: Path) -> None:
+    model_path = tmp_path / "ai" / "proposal_model.json"
+    first, second = _history(0, 20), _history(1, 10)
+
+    assert update_proposal_model(first, tmp_path) == model_path
+    assert update_proposal_model(second, tmp_path) == model_path
+    assert not model_path.exists()
+    assert delta_log_path(model_path).exists()
+
+    loaded = ProposalModel.load(model_path)
+    assert loaded.stats == _expected(first, second).stats
+    assert ProposalModel.load(model_path, include_deltas=False).stats == {}
+
+
+def test_compaction_merges_deltas_into_the_base(tmp_path: Path) -> None:
+    model_path = tmp_path / "ai" / "proposal_model.json"
+    first, second = _history(0, 20), _history(1, 10)
+    update_proposal_model(first, tmp_path)
+
+    assert compact_deltas(model_path) == 20
+    assert model_path.exists()
+    assert pending_delta_paths(model_path) == []
+
+    update_proposal_model(second, tmp_path)
+    # A sealed segment replayed twice (e.g. after an interrupted merge) is a no-op.
+    sealed = delta_log_path(model_path).with_name("proposal_model.json.delta.1.sealed")
+    shutil.copy(delta_log_path(model_path), sealed)
+    update_proposal_model(first, tmp_path)
+
+    expected = _expected(first, second)
+    assert ProposalModel.load(model_path).stats == expected.stats
+    compact_deltas(model_path)
+    assert ProposalModel.load(model_path, include_deltas=False).stats == expected.stats
+
+
+def test_background_compaction(tmp_path: Path) -> None:
+    model_path = tmp_path / "ai" / "proposal_model.json"
+    update_proposal_model(_history(0, 5), tmp_path)
+
+    assert start_background_compaction(model_path, threshold=1 << 30) is None
+    thread = start_background_compaction(model_path, threshold=0)
+    assert thread is not None
+    thread.join()
+    assert pending_delta_paths(model_path) == []
+    assert ProposalModel.load(model_path).stats == _expected(_history(0, 5)).stats
+
+
+def test_sealing_waits_for_readers(tmp_path: Path) -> None:
+    model_path = tmp_path / "ai" / "proposal_model.json"
+    history = _history(0, 20)
+    update_proposal_model(history, tmp_path)
+    active = delta_log_path(model_path)
+
+    reader = ProposalModel()
+    with file_lock(model_path, shared=True):
+        merge = threading.Thread(target=compact_deltas, args=(model_path,))
+        merge.start()
+        merge.join(timeout=0.3)
+        # The merge may not rename the log while a reader is between listing
+        # the segments and reading them.
+        assert merge.is_alive()
+        assert pending_delta_paths(model_path) == [active]
+        apply_pending_deltas(reader, model_path)
+    merge.join()
+
+    assert reader.stats == _expected(history).stats
+    assert not active.exists()
+    assert ProposalModel.load(model_path).stats == reader.stats
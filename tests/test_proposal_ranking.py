@@ -0,0 +1,94 @@
+"""Tests for the top-k proposal ranking."""
+
+from __future__ import annotations
+
+import random
+from unittest.mock import patch
+
+from auto_movie_edit.proposals import ProposalModel
+
+
+def _model(seed: int, identifiers: int, rows: int) -> ProposalModel:
+    rng = random.Random(seed)
+    words = [f"語{index}" for index in range(30)]
+    history = []
+    for index in range(rows):
+        history.append(
+            {
+                "timestamp": f"2024-02-{1 + index % 28:02d}T10:{index % 60:02d}:00Z",
+                "row_index": rng.randint(2, 40),
+                "start": f"00:00:{rng.randint(0, 59):02d}.000",
+                "subtitle": " ".join(rng.choices(words, k=rng.randint(1, 4))),
+                "telop": f"telop_{rng.randint(0, identifiers)}",
+                "packs": [f"pack_{rng.randint(0, identifiers // 4)}"],
+                "objects": [],
+                "fx": [],
+                "notes": {"approval": rng.choice([True, True, False, None, None])},
+            }
+        )
+    model = ProposalModel()
+    model.update_from_history(history)
+    return model
+
+
+def test_top_candidates_match_full_ranking() -> None:
+    model = _model(7, identifiers=200, rows=800)
+    rng = random.Random(11)
+    for _ in range(60):
+        tokens = [f"語{rng.randint(0, 35)}" for _ in range(rng.randint(0, 4))] + ["__global__"]
+        row_index = rng.choice([None, rng.randint(2, 40)])
+        position = rng.choice([None, float(rng.randint(0, 59))])
+        for category in ("telop", "pack"):
+            for limit in (1, 3, 10):
+                expected = model._rank_candidates(
+                    model._collect_candidates(tokens, category),
+                    limit,
+                    row_index=row_index,
+                    position=position,
+                )
+                actual = model._top_candidates(
+                    tokens, category, limit, row_index=row_index, position=position
+                )
+                assert actual == expected
+
+
+def test_summaries_refresh_after_learning() -> None:
+    model = ProposalModel()
+    entry = {
+        "timestamp": "2024-03-01T00:00:00Z",
+        "row_index": 2,
+        "subtitle": "猫",
+        "telop": "telop_cat",
+        "notes": {"approval": True},
+    }
+    model.update_from_history([entry])
+    assert model.suggest("猫").top("telop") == ["telop_cat"]
+
+    model.update_from_history(
+        [
+            {**entry, "timestamp": f"2024-03-02T00:00:0{index}Z", "telop": "telop_dog"}
+            for index in range(3)
+        ]
+    )
+    assert model.suggest("猫").top("telop") == ["telop_dog"]
+
+
+def test_suggest_many_matches_suggest() -> None:
+    model = _model(3, identifiers=120, rows=600)
+    rng = random.Random(5)
+    subtitles = [
+        " ".join(f"語{rng.randint(0, 35)}" for _ in range(rng.randint(0, 4))) or None
+        for _ in range(80)
+    ]
+    positions = [rng.choice([None, float(rng.randint(0, 59))]) for _ in subtitles]
+    row_indices = list(range(2, 2 + len(subtitles)))
+
+    batched = model.suggest_many(subtitles, positions, row_indices=row_indices, limit=4)
+    expected = [
+        model.suggest(subtitle, limit=4, row_index=row, position_seconds=position)
+        for subtitle, position, row in zip(subtitles, positions, row_indices)
+    ]
+    assert batched == expected
+
+    with patch("auto_movie_edit.proposal_matrix._load_numpy", return_value=None):
+        assert model.suggest_many(subtitles, positions, row_indices=row_indices, limit=4) == expected
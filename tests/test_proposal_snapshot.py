@@ -0,0 +1,112 @@
+"""Tests for memory-mapped proposal model snapshots."""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+from auto_movie_edit.proposal_log import compact_deltas
+from auto_movie_edit.proposal_snapshot import (
+    ProposalSnapshot,
+    open_fresh_snapshot,
+    snapshot_path,
+    write_snapshot,
+)
+from auto_movie_edit.proposals import ProposalModel, update_proposal_model
+
+
+def _history(offset: int, count: int) -> list[dict]:
+    return [
+        {
+            "timestamp": f"2024-06-{offset + 1:02d}T00:00:{index:02d}Z",
+            "row_index": index + 2,
+            "start": f"00:00:{index:02d}.000",
+            "subtitle": ["猫 ニュース", "今日 挨拶", "猫 挨拶 ニュース"][index % 3],
+            "telop": f"telop_{(index + offset) % 5}",
+            "packs": [f"pack_{index % 2}"],
+            "objects": [{"identifier": "cat", "resolved_asset": f"asset_{index % 4}"}],
+            "fx": [{"fx_id": "zoom"}, {"fx_id": f"fx_{index % 3}"}],
+            "notes": {"approval": (index + offset) % 3 != 0},
+        }
+        for index in range(count)
+    ]
+
+
+_SUBTITLES = ["猫", "今日 の 挨拶", "ニュース 猫 猫", "関係ない 言葉", None]
+
+
+def _suggestions(model: ProposalModel) -> list:
+    single = [
+        model.suggest(subtitle, row_index=row, position_seconds=float(row)).items
+        for row, subtitle in enumerate(_SUBTITLES, start=2)
+    ]
+    batch = model.suggest_many(
+        _SUBTITLES,
+        [float(row) for row in range(2, len(_SUBTITLES) + 2)],
+        row_indices=range(2, len(_SUBTITLES) + 2),
+    )
+    assert [suggestions.items for suggestions in batch] == single
+    return single
+
+
+def test_snapshot_matches_source_model(tmp_path: Path) -> None:
+    model = ProposalModel()
+    model.update_from_history(_history(0, 30))
+    model.compacted_at = "2024-06-30T00:00:00Z"
+    path = write_snapshot(model, tmp_path / "model.snapshot")
+
+    snapshot = ProposalModel.load(path)
+    try:
+        assert isinstance(snapshot, ProposalSnapshot)
+        assert _suggestions(snapshot) == _suggestions(model)
+        assert sorted(snapshot.iter_stats()) == sorted(model.iter_stats())
+        assert snapshot.compacted_at == model.compacted_at
+        # Already learned entries stay ignored.
+        assert not snapshot.update_from_history(_history(0, 30))
+    finally:
+        snapshot.close()
+
+
+def test_snapshot_overlays_new_history(tmp_path: Path) -> None:
+    model = ProposalModel()
+    model.update_from_history(_history(0, 20))
+    snapshot = ProposalSnapshot.open(write_snapshot(model, tmp_path / "model.snapshot"))
+    try:
+        model.update_from_history(_history(1, 25))
+        assert snapshot.update_from_history(_history(1, 25))
+        assert _suggestions(snapshot) == _suggestions(model)
+        assert sorted(snapshot.iter_stats()) == sorted(model.iter_stats())
+
+        snapshot.save(tmp_path / "merged.snapshot")
+    finally:
+        snapshot.close()
+    with ProposalSnapshot.open(tmp_path / "merged.snapshot") as merged:
+        assert _suggestions(merged) == _suggestions(model)
+
+
+def test_fresh_snapshot_follows_the_model(tmp_path: Path) -> None:
+    model_path = tmp_path / "ai" / "proposal_model.json"
+    update_proposal_model(_history(0, 20), tmp_path)
+    compact_deltas(model_path)
+    assert open_fresh_snapshot(model_path) is None
+
+    write_snapshot(ProposalModel.load(model_path), snapshot_path(model_path))
+    # Pending deltas are overlaid on the snapshot.
+    update_proposal_model(_history(1, 10), tmp_path)
+    snapshot = open_fresh_snapshot(model_path)
+    assert snapshot is not None
+    try:
+        assert _suggestions(snapshot) == _suggestions(ProposalModel.load(model_path))
+    finally:
+        snapshot.close()
+
+    # Merging rewrites the snapshot, so it stays usable.
+    compact_deltas(model_path)
+    snapshot = open_fresh_snapshot(model_path)
+    assert snapshot is not None
+    snapshot.close()
+
+    # A model rewritten behind the snapshot's back makes it stale.
+    stamp = snapshot_path(model_path).stat().st_mtime_ns + 10**9
+    os.utime(model_path, ns=(stamp, stamp))
+    assert open_fresh_snapshot(model_path) is None
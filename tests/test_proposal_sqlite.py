@@ -0,0 +1,81 @@
+"""Tests for the SQLite proposal model backend."""
+
+from __future__ import annotations
+
+import random
+from pathlib import Path
+
+from auto_movie_edit.proposal_sqlite import SqliteProposalModel, migrate_json_model
+from auto_movie_edit.proposals import ProposalModel, resolve_model_path, update_proposal_model
+
+_WORDS = ["挨拶", "今日", "ニュース", "猫", "速報", "驚き", "まとめ", "質問", "猫"]
+
+
+def _history(seed: int, count: int) -> list[dict]:
+    rng = random.Random(seed)
+    entries = []
+    for index in range(count):
+        words = rng.sample(_WORDS, 3)
+        entries.append(
+            {
+                "timestamp": f"2024-01-{1 + index % 28:02d}T00:00:{index % 60:02d}Z",
+                "row_index": index + 2,
+                "start": f"00:00:{index % 60:02d}.000",
+                "subtitle": " ".join(words + [words[0]]),
+                "telop": rng.choice(["telop_a", "telop_b", "telop_c"]),
+                "packs": [rng.choice(["pack_x", "pack_y"])],
+                "objects": [{"identifier": rng.choice(["cat", "dog"])}],
+                "fx": [{"fx_id": "zoom"}] if index % 3 == 0 else [],
+                "notes": {"approval": rng.choice(["承認", "却下", None])},
+            }
+        )
+    return entries
+
+
+def _suggestions(model: ProposalModel) -> list:
+    results = []
+    for index, subtitle in enumerate(["猫 ニュース 猫", "今日 挨拶", "まとめ", None]):
+        suggestions = model.suggest(subtitle, limit=5, row_index=index * 4, position_seconds=index * 7.0)
+        results.append(suggestions.items)
+    return results
+
+
+def test_sqlite_backend_matches_json(tmp_path: Path) -> None:
+    history = _history(1, 60)
+    json_model = ProposalModel()
+    json_model.update_from_history(history)
+
+    with SqliteProposalModel(tmp_path / "model.sqlite") as sqlite_model:
+        assert sqlite_model.update_from_history(history)
+        sqlite_model.save()
+        assert not sqlite_model.update_from_history(history)
+        assert _suggestions(sqlite_model) == _suggestions(json_model)
+
+    reopened = ProposalModel.load(tmp_path / "model.sqlite")
+    assert isinstance(reopened, SqliteProposalModel)
+    assert _suggestions(reopened) == _suggestions(json_model)
+    subtitles = ["猫 ニュース 猫", "今日 挨拶", None]
+    assert reopened.suggest_many(subtitles, [0.0, 5.0, None]) == json_model.suggest_many(
+        subtitles, [0.0, 5.0, None]
+    )
+    reopened.close()
+
+
+def test_migrate_json_model_and_continue_learning(tmp_path: Path) -> None:
+    json_path = tmp_path / "ai" / "proposal_model.json"
+    first, second = _history(2, 40), _history(3, 30)
+    assert update_proposal_model(first, tmp_path) == json_path
+
+    sqlite_path, count = migrate_json_model(json_path)
+    assert sqlite_path == json_path.with_suffix(".sqlite")
+    assert count > 0
+    assert resolve_model_path(tmp_path) == sqlite_path
+
+    assert update_proposal_model(second, tmp_path) == sqlite_path
+
+    expected = ProposalModel()
+    expected.update_from_history(first)
+    expected.update_from_history(second)
+    model = ProposalModel.load(resolve_model_path(tmp_path))
+    assert _suggestions(model) == _suggestions(expected)
+    model.close()
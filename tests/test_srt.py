@@ -0,0 +1,136 @@
+"""Tests for the streaming SRT reader."""
+
+from __future__ import annotations
+
+import codecs
+from pathlib import Path
+
+import pytest
+from openpyxl import load_workbook
+from typer.testing import CliRunner
+
+from auto_movie_edit import cli
+from auto_movie_edit.cli import app
+from auto_movie_edit.proposals import ProposalModel
+from auto_movie_edit.srt import SrtParseError, detect_srt_encoding, iter_srt, parse_srt
+
+_SRT = (
+    "1\n00:00:01,000 --> 00:00:02,500\nこんにちは、ゆっくり霊夢です\n\n"
+    "2\n00:00:03,000 --> 00:00:04,000\n今日は驚きの発見を紹介します\n二行目\n\n"
+    "3\n00:00:05,000 --> 00:00:06,000\n発見の続きです\n"
+)
+
+
+@pytest.mark.parametrize(
+    ("raw", "encoding"),
+    [
+        (_SRT.encode("utf-8"), "utf-8"),
+        (codecs.BOM_UTF8 + _SRT.encode("utf-8"), "utf-8-sig"),
+        (_SRT.replace("\n", "\r\n").encode("cp932"), "cp932"),
+        (_SRT.encode("utf-16"), "utf-16"),
+        (_SRT.encode("utf-16-le"), "utf-16-le"),
+        (_SRT.encode("utf-16-be"), "utf-16-be"),
+    ],
+)
+def test_encodings_are_detected(tmp_path: Path, raw: bytes, encoding: str) -> None:
+    path = tmp_path / "subtitles.srt"
+    path.write_bytes(raw)
+
+    assert detect_srt_encoding(path) == encoding
+    entries = list(iter_srt(path))
+    assert [entry.index for entry in entries] == [1, 2, 3]
+    assert entries[0].text == "こんにちは、ゆっくり霊夢です"
+    assert entries[1].text == "今日は驚きの発見を紹介します\n二行目"
+    assert entries[2].end.to_string() == "00:00:06.000"
+    assert parse_srt(path) == entries
+
+
+def test_entries_are_yielded_before_the_file_is_read_to_the_end(tmp_path: Path) -> None:
+    path = tmp_path / "broken.srt"
+    path.write_text(_SRT + "\n\nfour\n00:00:07,000 --> 00:00:08,000\n壊れた番号\n", encoding="utf-8")
+
+    entries = iter_srt(path)
+    assert [next(entries).index for _ in range(3)] == [1, 2, 3]
+    with pytest.raises(SrtParseError, match=r"broken\.srt:15: Invalid SRT index line: 'four'"):
+        next(entries)
+
+
+@pytest.mark.parametrize(
+    ("block", "message"),
+    [
+        ("4\n", "Missing timecode line for index 4"),
+        ("4\n00:00:07,000 00:00:08,000\n", "Invalid timecode line for index 4"),
+        ("4\n00:00:07,000 --> \n", "Incomplete timecode for index 4"),
+    ],
+)
+def test_malformed_blocks_name_the_line(tmp_path: Path, block: str, message: str) -> None:
+    path = tmp_path / "broken.srt"
+    path.write_text(_SRT + "\n" + block, encoding="utf-8")
+
+    with pytest.raises(SrtParseError, match=rf"broken\.srt:14: {message}"):
+        parse_srt(path)
+
+
+def test_undecodable_files_are_reported(tmp_path: Path) -> None:
+    path = tmp_path / "subtitles.srt"
+    path.write_bytes(_SRT.encode("cp932"))
+    with pytest.raises(SrtParseError, match="cannot decode the file as utf-8"):
+        list(iter_srt(path, encoding="utf-8"))
+    with pytest.raises(SrtParseError, match="SRT file not found"):
+        list(iter_srt(tmp_path / "missing.srt"))
+
+
+def test_make_sheet_streams_in_batches(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    source = tmp_path / "subtitles.srt"
+    source.write_bytes(codecs.BOM_UTF8 + _SRT.encode("utf-8"))
+
+    def _make_sheet(out: Path) -> list[tuple]:
+        arguments = ["make-sheet", "--srt", str(source), "--out", str(out), "--knowledge-base", str(tmp_path / "none.json")]
+        completed = CliRunner().invoke(app, arguments)
+        assert completed.exit_code == 0, completed.output
+        sheet = load_workbook(out)["TIMELINE"]
+        return [tuple(cell.value for cell in row) for row in sheet.iter_rows(min_row=2, max_row=4)]
+
+    whole = _make_sheet(tmp_path / "whole.xlsx")
+    monkeypatch.setattr(cli, "MAKE_SHEET_BATCH_SIZE", 2)
+    batched = _make_sheet(tmp_path / "batched.xlsx")
+
+    assert batched == whole
+    assert [row[2] for row in whole] == [entry.text for entry in parse_srt(source)]
+    assert "全体トピック:" in whole[0][15]
+
+
+def test_make_sheet_writes_a_memo_per_row(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    source = tmp_path / "subtitles.srt"
+    source.write_text(_SRT, encoding="utf-8")
+    model = ProposalModel()
+    model.update_from_history(
+        [
+            {
+                "timestamp": "2024-03-01T00:00:00Z",
+                "row_index": row,
+                "start": "00:00:01.000",
+                "subtitle": text,
+                "telop": "telop_intro",
+                "packs": ["pack_surprise"],
+                "objects": [],
+                "fx": [],
+                "notes": {"approval": True},
+            }
+            for row, text in enumerate(["こんにちは、ゆっくり霊夢です", "驚きの発見", "発見の続きです"], start=2)
+        ]
+    )
+    knowledge_base = tmp_path / "proposal_model.json"
+    model.save(knowledge_base)
+    monkeypatch.setattr(cli, "MAKE_SHEET_BATCH_SIZE", 2)
+
+    out = tmp_path / "sheet.xlsx"
+    arguments = ["make-sheet", "--srt", str(source), "--out", str(out), "--knowledge-base", str(knowledge_base)]
+    completed = CliRunner().invoke(app, arguments)
+    assert completed.exit_code == 0, completed.output
+
+    sheet = load_workbook(out)["TIMELINE"]
+    memos = [sheet.cell(row=row, column=16).value for row in range(2, 5)]
+    assert all(memo and "AI候補 " in memo and "AI解析 " in memo for memo in memos)
+    assert memos[0].split(" | ")[-1].startswith("全体トピック:")
+    assert all("全体トピック:" not in memo for memo in memos[1:])
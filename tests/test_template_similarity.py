@@ -0,0 +1,93 @@
+"""Tests for near-duplicate detection of pack templates."""
+
+from __future__ import annotations
+
+import copy
+import json
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+
+from auto_movie_edit.absorb import absorb_projects
+from auto_movie_edit.cli import app
+from auto_movie_edit.template_similarity import apply_overrides, cluster_templates, template_overrides
+from auto_movie_edit.workbook import load_workbook_data
+
+
+def _group(x: float, zoom: float = 100.0) -> dict:
+    return {
+        "$type": "YukkuriMovieMaker.Project.Items.GroupItem, YukkuriMovieMaker",
+        "Items": [
+            {"FrameOffset": 0, "LengthFrames": 30, "X": x, "Y": 0.0, "Zoom": {"Values": [{"Value": zoom}, {"Value": 120.0}]}},
+            {"FrameOffset": 15, "LengthFrames": 10, "Opacity": 80.0, "Text": "ドン"},
+        ],
+        "FrameOffset": 0,
+        "LengthFrames": 30,
+    }
+
+
+def test_near_duplicates_cluster_and_rebuild_exactly() -> None:
+    base = _group(100.0)
+    nudged = _group(104.0)
+    noisy = _group(100.0, zoom=100.0000001)
+    different = _group(-380.0, zoom=10.0)
+    different["Items"][1].update(Opacity=20.0, Text="バン")
+    reshaped = copy.deepcopy(base)
+    reshaped["Items"].append({"FrameOffset": 20})
+
+    clusters = cluster_templates(
+        [("base", base), ("nudged", nudged), ("noisy", noisy), ("different", different), ("reshaped", reshaped)]
+    )
+
+    assert [(cluster.representative, cluster.members) for cluster in clusters] == [("base", ["nudged", "noisy"])]
+    overrides = template_overrides(base, nudged)
+    assert overrides == {"/Items/0/X": 104.0}
+    assert apply_overrides(base, overrides) == nudged
+    assert apply_overrides(base, template_overrides(base, noisy)) == noisy
+    assert base == _group(100.0)
+
+
+def test_threshold_controls_folding() -> None:
+    templates = [("a", _group(1.0)), ("b", _group(2.0, zoom=50.0))]
+
+    assert cluster_templates(templates, threshold=0.95) == []
+    assert len(cluster_templates(templates, threshold=0.7)) == 1
+
+
+def test_apply_overrides_rejects_unknown_pointers() -> None:
+    with pytest.raises(ValueError):
+        apply_overrides(_group(0.0), {"/Items/5/X": 1})
+
+
+def test_absorb_folds_near_duplicate_packs_into_overrides(tmp_path: Path) -> None:
+    items = []
+    for index, x in enumerate((100.0, 101.0, 102.5)):
+        item = copy.deepcopy(_group(x))
+        item.pop("FrameOffset"), item.pop("LengthFrames")
+        item.update(Frame=index * 100, Length=30)
+        for child in item["Items"]:
+            child["Frame"] = index * 100 + child.pop("FrameOffset")
+            child["Length"] = child.pop("LengthFrames")
+        items.append(item)
+    source = tmp_path / "project.ymmp"
+    source.write_text(json.dumps({"Timelines": [{"Items": items}]}, ensure_ascii=False), encoding="utf-8")
+
+    folded = absorb_projects([source], tmp_path, workers=1)
+    plain = absorb_projects([source], tmp_path / "plain", workers=1, similarity=0)
+
+    assert folded.near_duplicates == 2
+    assert plain.near_duplicates == 0
+    assert len({row["source"] for row in folded.packs.values()}) == 1
+    assert len(list((tmp_path / "templates" / "store").iterdir())) == 1
+    representative, *members = folded.packs.values()
+    assert [row["overrides"] for row in members] == [{"/Items/0/X": 101.0}, {"/Items/0/X": 102.5}]
+    assert members[0]["notes"].endswith(f"(near-duplicate of {representative['pack_id']})")
+
+    xlsx = tmp_path / "sheet.xlsx"
+    completed = CliRunner().invoke(app, ["absorb", "--ymmp", str(source), "--xlsx", str(xlsx)])
+    assert completed.exit_code == 0, completed.output
+    data = load_workbook_data(xlsx)
+    for pack_id, row in plain.packs.items():
+        template = json.loads((tmp_path / "plain" / row["source"]).read_text("utf-8"))
+        assert data.packs[pack_id].overrides == template
@@ -0,0 +1,96 @@
+"""Tests for glyph-metric text measurement and its disk cache."""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+
+from auto_movie_edit import text_metrics
+from auto_movie_edit.filter_batch import filter_files
+from auto_movie_edit.filters import _determine_hiragana_scale
+from auto_movie_edit.text_metrics import FALLBACK_ADVANCE, TextMeasurer
+
+
+def _build_font(path: Path, family: str, widths: dict[str, int]) -> None:
+    font_builder = pytest.importorskip("fontTools.fontBuilder")
+    pen_module = pytest.importorskip("fontTools.pens.ttGlyphPen")
+
+    glyph_names = [".notdef", *(f"uni{ord(char):04X}" for char in widths)]
+    builder = font_builder.FontBuilder(1000, isTTF=True)
+    builder.setupGlyphOrder(glyph_names)
+    builder.setupCharacterMap({ord(char): f"uni{ord(char):04X}" for char in widths})
+    empty = pen_module.TTGlyphPen(None).glyph()
+    builder.setupGlyf({name: empty for name in glyph_names})
+    metrics = {".notdef": (500, 0)}
+    metrics.update({f"uni{ord(char):04X}": (width, 0) for char, width in widths.items()})
+    builder.setupHorizontalMetrics(metrics)
+    builder.setupHorizontalHeader(ascent=800, descent=-200)
+    builder.setupNameTable({"familyName": family, "styleName": "Regular"})
+    builder.setupOS2()
+    builder.setupPost()
+    builder.save(str(path))
+
+
+def test_measurer_reads_advances_and_caches_them(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    fonts = tmp_path / "fonts"
+    fonts.mkdir()
+    _build_font(fonts / "wide.ttf", "Wide Gothic", {"あ": 1000, "A": 500})
+    cache = tmp_path / "cache" / "font_metrics.json"
+
+    measurer = TextMeasurer(font_dirs=[fonts], cache_path=cache)
+    assert measurer.has_font("wide gothic") and measurer.has_font("wide")
+    assert measurer.advance("Wide Gothic", "あ") == 1.0
+    assert measurer.advance("Wide Gothic", "漢") == FALLBACK_ADVANCE
+    assert measurer.advance("Missing Font", "あ") == FALLBACK_ADVANCE
+    assert measurer.text_width("Aあ\nA", "Wide Gothic", 100) == pytest.approx(150.0)
+    measurer.save()
+
+    # A warm run answers from the cache file without fontTools.
+    monkeypatch.setattr(text_metrics, "_fonttools", False)
+    warm = TextMeasurer(font_dirs=[fonts], cache_path=cache)
+    assert warm.line_width("ああA", "Wide Gothic", 10) == pytest.approx(25.0)
+    assert warm.advance("Wide Gothic", "漢") == FALLBACK_ADVANCE
+
+
+def test_shrink_uses_measured_widths(tmp_path: Path) -> None:
+    fonts = tmp_path / "fonts"
+    fonts.mkdir()
+    _build_font(fonts / "narrow.ttf", "Narrow", {char: 400 for char in "あいうえおかきく"})
+    measurer = TextMeasurer(font_dirs=[fonts], cache_path=None)
+    item = {"Text": "あいうえおかきくあいうえおかきく", "FontSize": 96, "Zoom": 100.0}
+
+    estimated = _determine_hiragana_scale(item, 0.8)
+    assert _determine_hiragana_scale(item, 0.8, measurer) == estimated
+    narrow = _determine_hiragana_scale({**item, "Font": "Narrow"}, 0.8, measurer)
+    assert narrow > estimated
+
+
+def test_batch_filter_reruns_when_fonts_change(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    fonts = tmp_path / "fonts"
+    fonts.mkdir()
+    projects = tmp_path / "projects"
+    projects.mkdir()
+    item = {
+        "$type": "YukkuriMovieMaker.Project.Items.TextItem, YukkuriMovieMaker",
+        "Text": "あいうえおかきくあいうえおかきく",
+        "Font": "Narrow",
+        "FontSize": 96,
+        "Zoom": 100.0,
+    }
+    (projects / "a.ymmp").write_text(json.dumps({"Timelines": [{"Items": [item]}]}), encoding="utf-8")
+
+    def statuses() -> list[str]:
+        # Every run builds its own measurer, as a new process would.
+        monkeypatch.setattr(text_metrics, "_shared", TextMeasurer(font_dirs=[fonts], cache_path=None))
+        results = filter_files([projects / "a.ymmp"], projects, tmp_path / "out", ["hira-shrink:0.8"], workers=1)
+        return [result.status for result in results]
+
+    assert statuses() == ["filtered"]
+    assert statuses() == ["skipped"]
+    _build_font(fonts / "narrow.ttf", "Narrow", {char: 400 for char in "あいうえおかきく"})
+    assert statuses() == ["filtered"]
+    assert statuses() == ["skipped"]
+    monkeypatch.setattr(text_metrics, "_fonttools", False)
+    assert statuses() == ["filtered"]
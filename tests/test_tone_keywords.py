@@ -0,0 +1,82 @@
+"""Tests for the Aho-Corasick tone keyword matcher and its extension points."""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from auto_movie_edit.language import (
+    _TONE_KEYWORD_SCORES,
+    LanguageAnalyzer,
+    ToneKeywordMatcher,
+    load_tone_keywords,
+    merge_tone_keywords,
+)
+
+
+def _naive_matches(tables, token):
+    return [
+        (category, weight)
+        for category, keyword_map in tables.items()
+        for keyword, weight in keyword_map.items()
+        if keyword in token
+    ]
+
+
+def test_matcher_matches_substring_scan_for_builtin_tables() -> None:
+    matcher = ToneKeywordMatcher(_TONE_KEYWORD_SCORES)
+    tokens = [
+        "かなぁ",
+        "かもしれない",
+        "ほんとう",
+        "信じられない",
+        "なんでなんで",
+        "すごくすごい",
+        "泣きそう",
+        "テスト",
+        "",
+    ]
+    for token in tokens:
+        assert matcher.match(token) == _naive_matches(_TONE_KEYWORD_SCORES, token)
+
+
+def test_extension_tables_override_and_extend() -> None:
+    merged = merge_tone_keywords(_TONE_KEYWORD_SCORES, {"強調": {"ガチ": 2.0, "超": 0.1}, "独自": {"謎": 1.0}})
+    assert merged["強調"]["ガチ"] == 2.0
+    assert merged["強調"]["超"] == 0.1
+    assert list(merged)[-1] == "独自"
+    assert _TONE_KEYWORD_SCORES["強調"]["超"] == 1.1
+
+    plain = LanguageAnalyzer()
+    extended = LanguageAnalyzer(tone_keywords={"強調": {"ガチ": 2.0}})
+    assert plain.detect_tone("ガチ") is None
+    assert extended.detect_tone("ガチ") == "強調"
+
+
+def test_load_tone_keywords_from_json() -> None:
+    with TemporaryDirectory() as tmpdir:
+        path = Path(tmpdir) / "tones.json"
+        path.write_text(
+            json.dumps({"tone_keywords": {"喜び": {"神": 1.5, "bad": "x"}}}, ensure_ascii=False),
+            encoding="utf-8",
+        )
+        assert load_tone_keywords(path) == {"喜び": {"神": 1.5}}
+
+
+def test_template_includes_tone_keyword_sheet(tmp_path: Path) -> None:
+    from auto_movie_edit.workbook import (
+        TONE_KEYWORD_HEADERS,
+        create_workbook_template,
+        load_workbook_data,
+        save_workbook,
+    )
+
+    workbook = create_workbook_template()
+    sheet = workbook["TONE_KEYWORDS"]
+    assert [cell.value for cell in sheet[1]] == TONE_KEYWORD_HEADERS
+    sheet.append(["驚き", "まさか", 2.5])
+    path = tmp_path / "sheet.xlsx"
+    save_workbook(workbook, path)
+
+    assert load_workbook_data(path).tone_keywords == {"驚き": {"まさか": 2.5}}
@@ -0,0 +1,54 @@
+"""Tests for the optional NumPy tone engine."""
+
+from __future__ import annotations
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from auto_movie_edit.language import LanguageAnalyzer
+from auto_movie_edit.tone_vector import VectorToneScorer
+
+_SAMPLES = [
+    "これはテストですか？",
+    "本当にすごい！",
+    "マジ!?",
+    "まさか…嘘でしょ?!",
+    "嬉しいかもね…",
+    "許せない、ひどい",
+    "悲しいし辛い",
+    "そうかな〜",
+    "絶対に必ずやる！！！",
+    "なんでなの",
+    "普通の文章",
+    "か",
+    "！",
+]
+
+
+def test_vector_engine_matches_python_engine() -> None:
+    analyzer = LanguageAnalyzer()
+    expected = [analyzer._compute_tone(analyzer._normalize_text(text)) for text in _SAMPLES]
+
+    assert VectorToneScorer(analyzer).score([analyzer._normalize_text(t) for t in _SAMPLES]) == expected
+    assert analyzer.detect_tones(_SAMPLES, engine="numpy") == expected
+    assert analyzer.detect_tones(_SAMPLES, engine="python") == expected
+
+
+def test_vector_engine_supports_extended_tables() -> None:
+    analyzer = LanguageAnalyzer(tone_keywords={"独自": {"ふむ": 3.0}, "強調": {"ガチ": 2.0}})
+    texts = ["ふむふむ", "ガチでやばい", "ふむ、ガチ"]
+    expected = [analyzer._compute_tone(text) for text in texts]
+
+    assert analyzer.detect_tones(texts, engine="numpy") == expected
+    assert expected[0] == "独自"
+
+
+def test_detect_tones_aligns_with_blank_entries() -> None:
+    analyzer = LanguageAnalyzer()
+    assert analyzer.detect_tones([None, "", "本当にすごい！", "本当にすごい！"], engine="numpy") == [
+        None,
+        None,
+        "強調",
+        "強調",
+    ]
@@ -33,6 +33,7 @@ def update_workbook(workbook_path: Path):
         "TIMELINE": DEFAULT_TEMPLATE.timeline_headers,
         "SCHEMA_MAP": DEFAULT_TEMPLATE.schema_headers,
         "CHARACTERS": DEFAULT_TEMPLATE.characters_headers,
+        "TONE_KEYWORDS": DEFAULT_TEMPLATE.tone_keyword_headers,
     }
 
     updated = False